@@ -11,11 +11,44 @@ Versión: 2.0 - Simplificada con POO
 from flask import Flask, request, jsonify
 from AmigoRegular import AmigoRegular
 from AmigoCercano import AmigoCercano
-from config import obtener_gestor, guardar_datos
+import config
+import instantaneas
+from config import obtener_gestor, guardar_datos, registrar_recuerdo, registrar_recuerdos, escritura
+from DuplicadosAmigos import normalizarTexto, recuerdoRepetido
+from inquilinos import instalar_inquilinos
+from limitador import instalar_limitador
+from validacion import instalar_validacion, validar
+from perfilador import instalar_perfilador, medir_fase
 
 # Crear la aplicación Flask
 app = Flask(__name__)
 
+# Máximo de recuerdos aceptados en una sola petición de carga masiva
+MAX_RECUERDOS_LOTE = 10000
+
+# Nombres de tipo aceptados en la carga masiva
+TIPOS_AMIGO = {
+    "regular": "AmigoRegular",
+    "cercano": "AmigoCercano",
+    "AmigoRegular": "AmigoRegular",
+    "AmigoCercano": "AmigoCercano"
+}
+
+# Límite de escrituras opcional (AMIGOS_LIMITE=1): responde 429 ante ráfagas de POST
+# Se instala antes que todo para que rechazar una escritura sea lo más barato posible
+limitador = instalar_limitador(app)
+
+# Cuerpos demasiado grandes (413) o con JSON mal formado (400) se rechazan antes de la ruta
+instalar_validacion(app)
+
+# Modo multiusuario opcional (AMIGOS_INQUILINOS=1): cabecera X-Usuario o prefijo /u/<usuario>
+# Se instala primero para que el perfilado y la compresión ya vean al inquilino.
+# Esta es la API que escribe: al desalojar un inquilino compacta su diario
+inquilinos = instalar_inquilinos(app, compactar=True)
+
+# Perfilado opcional (AMIGOS_PERFIL=1): registra peticiones lentas y sus fases
+perfilador = instalar_perfilador(app, "juan", lambda: config.gestor_actual().contarAmigos())
+
 
 # ============================================
 # CLASE AUXILIAR: ManejadorRespuestas
@@ -84,26 +117,38 @@ class ControladorAmigos:
         """Constructor: inicializa el manejador de respuestas"""
         self.respuestas = ManejadorRespuestas()
     
-    def validar_datos_basicos(self, datos):
+    def validar_datos_basicos(self, datos, tipo="AmigoRegular"):
         """
-        Valida que los datos básicos estén presentes.
+        Valida los datos de un amigo con el esquema compilado de su tipo.
+        
+        Revisa campos obligatorios, tipos, formato del cumpleaños (dd/mm/aaaa)
+        y largo de textos y listas, sin tocar el gestor ni el disco.
         
         Args:
             datos (dict): Datos recibidos en la petición
+            tipo (str): "AmigoRegular" o "AmigoCercano"
         
         Returns:
             tuple: (es_valido, mensaje_error)
         """
-        if not datos:
-            return False, "No se enviaron datos"
-        
-        if not datos.get('nombre'):
-            return False, "Falta el campo obligatorio: nombre"
+        return validar(tipo, datos)
+    
+    def revisar_duplicados(self, gestor, amigo):
+        """
+        Revisa un amigo nuevo contra los existentes antes de agregarlo.
         
-        if not datos.get('cumpleanos'):
-            return False, "Falta el campo obligatorio: cumpleanos"
+        Un nombre idéntico se rechaza (buscarAmigo solo encontraría al primero);
+        los nombres parecidos y el contenido idéntico se aceptan con un aviso.
         
-        return True, None
+        Returns:
+            tuple: (respuesta de error o None, avisos de duplicado)
+        """
+        with medir_fase("duplicados"):
+            avisos = gestor.duplicadosDe(amigo)
+        for aviso in avisos:
+            if aviso["tipo"] == "nombre" and amigo.nombre in aviso["con"]:
+                return self.respuestas.error(f"Ya existe un amigo llamado: {amigo.nombre}", 409), avisos
+        return None, avisos
     
     def crear_amigo_regular(self, datos):
         """
@@ -123,24 +168,31 @@ class ControladorAmigos:
         # 2. Extraer datos con valores por defecto
         nombre = datos.get('nombre')
         cumpleanos = datos.get('cumpleanos')
-        gustos = datos.get('gustos', [])
-        recuerdos = datos.get('recuerdos', [])
-        anecdotas = datos.get('anecdotas', [])
+        gustos = datos.get('gustos') or []
+        recuerdos = datos.get('recuerdos') or []
+        anecdotas = datos.get('anecdotas') or []
         
         # 3. Crear el objeto AmigoRegular (POO)
         nuevo_amigo = AmigoRegular(nombre, cumpleanos, gustos, recuerdos, anecdotas)
         
-        # 4. Obtener el gestor y agregar el amigo
-        gestor = obtener_gestor()
-        gestor.agregarAmigo(nuevo_amigo)
-        
-        # 5. Guardar en el archivo
-        guardar_datos()
+        # 4. Obtener el gestor, revisar duplicados, agregar el amigo y guardar
+        #    (con el candado: ningún otro proceso escribe en el medio)
+        with escritura(nombres=[nombre]):
+            with medir_fase("carga"):
+                gestor = obtener_gestor()
+            error, avisos = self.revisar_duplicados(gestor, nuevo_amigo)
+            if error:
+                return error
+            gestor.agregarAmigo(nuevo_amigo)
+            
+            # 5. Guardar en el archivo
+            with medir_fase("guardado"):
+                guardar_datos()
         
         # 6. Retornar respuesta exitosa
         return self.respuestas.exito(
             "Amigo regular creado exitosamente",
-            {"nombre": nombre, "tipo": "Amigo Regular"},
+            {"nombre": nombre, "tipo": "Amigo Regular", "duplicados": avisos},
             201
         )
     
@@ -154,44 +206,44 @@ class ControladorAmigos:
         Returns:
             tuple: Respuesta HTTP
         """
-        # 1. Validar datos básicos
-        es_valido, mensaje_error = self.validar_datos_basicos(datos)
+        # 1. Validar los datos (incluye el nivel de confianza entre 1 y 10)
+        es_valido, mensaje_error = self.validar_datos_basicos(datos, "AmigoCercano")
         if not es_valido:
             return self.respuestas.error(mensaje_error, 400)
         
-        # 2. Validar nivel de confianza
+        # 2. Extraer datos con valores por defecto
         nivelConfianza = datos.get('nivelConfianza')
-        
-        if nivelConfianza is None:
-            return self.respuestas.error("Falta el campo obligatorio: nivelConfianza", 400)
-        
-        if nivelConfianza < 1 or nivelConfianza > 10:
-            return self.respuestas.error("El nivel de confianza debe estar entre 1 y 10", 400)
-        
-        # 3. Extraer datos con valores por defecto
         nombre = datos.get('nombre')
         cumpleanos = datos.get('cumpleanos')
-        gustos = datos.get('gustos', [])
-        recuerdos = datos.get('recuerdos', [])
-        anecdotas = datos.get('anecdotas', [])
+        gustos = datos.get('gustos') or []
+        recuerdos = datos.get('recuerdos') or []
+        anecdotas = datos.get('anecdotas') or []
         
-        # 4. Crear el objeto AmigoCercano (POO)
+        # 3. Crear el objeto AmigoCercano (POO)
         nuevo_amigo = AmigoCercano(nombre, cumpleanos, gustos, recuerdos, anecdotas, nivelConfianza)
         
-        # 5. Obtener el gestor y agregar el amigo
-        gestor = obtener_gestor()
-        gestor.agregarAmigo(nuevo_amigo)
-        
-        # 6. Guardar en el archivo
-        guardar_datos()
+        # 4. Obtener el gestor, revisar duplicados, agregar el amigo y guardar
+        #    (con el candado: ningún otro proceso escribe en el medio)
+        with escritura(nombres=[nombre]):
+            with medir_fase("carga"):
+                gestor = obtener_gestor()
+            error, avisos = self.revisar_duplicados(gestor, nuevo_amigo)
+            if error:
+                return error
+            gestor.agregarAmigo(nuevo_amigo)
+            
+            # 5. Guardar en el archivo
+            with medir_fase("guardado"):
+                guardar_datos()
         
-        # 7. Retornar respuesta exitosa
+        # 6. Retornar respuesta exitosa
         return self.respuestas.exito(
             "Amigo cercano creado exitosamente",
             {
                 "nombre": nombre,
                 "nivelConfianza": nivelConfianza,
-                "tipo": "Amigo Cercano"
+                "tipo": "Amigo Cercano",
+                "duplicados": avisos
             },
             201
         )
@@ -208,35 +260,144 @@ class ControladorAmigos:
         Returns:
             tuple: Respuesta HTTP
         """
-        # 1. Validar que se envió el recuerdo
-        if not recuerdo:
-            return self.respuestas.error("Falta el campo: recuerdo", 400)
+        # 1. Validar que se envió el recuerdo (texto y largo)
+        es_valido, mensaje_error = validar("recuerdo", {"recuerdo": recuerdo})
+        if not es_valido:
+            return self.respuestas.error(mensaje_error, 400)
         
-        # 2. Buscar el amigo en el gestor
-        gestor = obtener_gestor()
-        amigo = gestor.buscarAmigo(nombre)
+        # 2-6 con el candado de escritura: el id del recuerdo se calcula sobre lo
+        #     último del disco y ningún otro proceso escribe en el medio
+        #     (con fragmentos, ninguno escribe en el fragmento de este amigo)
+        with escritura(nombres=[nombre]):
+            # 2. Buscar el amigo en el gestor
+            with medir_fase("carga"):
+                gestor = obtener_gestor()
+            with medir_fase("busqueda"):
+                amigo = gestor.buscarAmigo(nombre)
+            
+            if not amigo:
+                return self.respuestas.error(f"No se encontró el amigo: {nombre}", 404)
+            
+            # 3. Verificar que el tipo coincida
+            tipo_actual = type(amigo).__name__
+            if tipo_actual != tipo_amigo:
+                return self.respuestas.error(
+                    f"El amigo '{nombre}' no es de tipo {tipo_amigo}, es {tipo_actual}",
+                    400
+                )
+            
+            # 4. Rechazar un recuerdo repetido; uno casi igual se agrega con aviso
+            with medir_fase("duplicados"):
+                repetido = recuerdoRepetido(amigo.recuerdos.recuerdos, recuerdo)
+            if repetido and repetido[0] == "exacto":
+                return self.respuestas.error(f"El amigo '{nombre}' ya tiene ese recuerdo", 409)
+            
+            # 5. Agregar el recuerdo al amigo ya encontrado (el gestor marca el cambio)
+            resultado = gestor.agregarRecuerdoAmigo(amigo, recuerdo)
+            
+            # 6. Guardar cambios (solo se agrega el recuerdo al diario, no se reescribe todo)
+            with medir_fase("guardado"):
+                registrar_recuerdo(amigo)
         
-        if not amigo:
-            return self.respuestas.error(f"No se encontró el amigo: {nombre}", 404)
+        # 7. Retornar respuesta exitosa
+        datos = {"nombre": nombre, "resultado": resultado}
+        if repetido:
+            datos["parecido_a"] = repetido[1]
+        return self.respuestas.exito("Recuerdo agregado exitosamente", datos)
+
+
+    def agregar_recuerdos_lote(self, entradas):
+        """
+        Agrega muchos recuerdos en una sola operación.
         
-        # 3. Verificar que el tipo coincida
-        tipo_actual = type(amigo).__name__
-        if tipo_actual != tipo_amigo:
+        Los amigos se resuelven con una sola pasada por el gestor y todos los
+        recuerdos se guardan juntos al final (una sola escritura).
+        Cada recuerdo pasa por el gestor para que sus índices se actualicen.
+        Los recuerdos que el amigo ya tiene (o que se repiten en el lote) se
+        saltan con estado 409; aquí solo se buscan repetidos exactos.
+        
+        Args:
+            entradas (list): Diccionarios con nombre, tipo y recuerdo
+        
+        Returns:
+            tuple: Respuesta HTTP con el estado de cada entrada
+        """
+        # 1. Validar la forma general del lote
+        if not isinstance(entradas, list) or not entradas:
+            return self.respuestas.error("Falta el campo: recuerdos (lista no vacía)", 400)
+        
+        if len(entradas) > MAX_RECUERDOS_LOTE:
             return self.respuestas.error(
-                f"El amigo '{nombre}' no es de tipo {tipo_amigo}, es {tipo_actual}",
-                400
+                f"El lote supera el máximo de {MAX_RECUERDOS_LOTE} recuerdos", 413
             )
         
-        # 4. Agregar el recuerdo usando el método del objeto (POO)
-        resultado = amigo.agregarRecuerdo(recuerdo)
-        
-        # 5. Guardar cambios
-        guardar_datos()
+        # 2-4 con el candado de escritura de los amigos del lote (ver agregar_recuerdo)
+        nombres = [e.get('nombre') for e in entradas
+                   if isinstance(e, dict) and isinstance(e.get('nombre'), str)]
+        with escritura(nombres=nombres):
+            # 2. Resolver todos los amigos en una sola pasada
+            with medir_fase("carga"):
+                gestor = obtener_gestor()
+            with medir_fase("busqueda"):
+                amigos = gestor.buscarVarios(nombres)
+            
+            # 3. Aplicar cada entrada y anotar su estado
+            resultados = []
+            cambios = []
+            vistos = {}
+            for indice, entrada in enumerate(entradas):
+                estado = {"indice": indice}
+                resultados.append(estado)
+                
+                if not isinstance(entrada, dict):
+                    estado.update({"estado": 400, "error": "La entrada debe ser un objeto"})
+                    continue
+                
+                nombre = entrada.get('nombre')
+                recuerdo = entrada.get('recuerdo')
+                estado["nombre"] = nombre
+                
+                es_valido, mensaje_error = validar("recuerdo_lote", entrada)
+                if not es_valido:
+                    estado.update({"estado": 400, "error": mensaje_error})
+                    continue
+                tipo_amigo = TIPOS_AMIGO[entrada['tipo']]
+                
+                amigo = amigos.get(nombre)
+                if amigo is None:
+                    estado.update({"estado": 404, "error": f"No se encontró el amigo: {nombre}"})
+                    continue
+                
+                tipo_actual = type(amigo).__name__
+                if tipo_actual != tipo_amigo:
+                    estado.update({
+                        "estado": 400,
+                        "error": f"El amigo '{nombre}' no es de tipo {tipo_amigo}, es {tipo_actual}"
+                    })
+                    continue
+                
+                conocidos = vistos.get(nombre)
+                if conocidos is None:
+                    conocidos = {normalizarTexto(texto) for texto in amigo.recuerdos.recuerdos}
+                    vistos[nombre] = conocidos
+                normalizado = normalizarTexto(recuerdo)
+                if normalizado in conocidos:
+                    estado.update({"estado": 409, "error": f"El amigo '{nombre}' ya tiene ese recuerdo"})
+                    continue
+                conocidos.add(normalizado)
+                
+                estado["resultado"] = gestor.agregarRecuerdoAmigo(amigo, recuerdo)
+                estado["estado"] = 200
+                cambios.append((amigo, amigo.recuerdos.ultimaEntrada()))
+            
+            # 4. Guardar todos los cambios de una sola vez
+            with medir_fase("guardado"):
+                registrar_recuerdos(cambios)
         
-        # 6. Retornar respuesta exitosa
         return self.respuestas.exito(
-            "Recuerdo agregado exitosamente",
-            {"nombre": nombre, "resultado": resultado}
+            f"{len(cambios)} de {len(entradas)} recuerdos agregados",
+            {"agregados": len(cambios), "fallidos": len(entradas) - len(cambios),
+             "resultados": resultados}
         )
 
 
@@ -264,10 +425,33 @@ def inicio():
             "1": "POST /amigo-regular - Crear amigo regular",
             "2": "POST /amigo-cercano - Crear amigo cercano",
             "3": "POST /amigo-regular/<nombre>/recuerdo - Agregar recuerdo a amigo regular",
-            "4": "POST /amigo-cercano/<nombre>/recuerdo - Agregar recuerdo a amigo cercano"
+            "4": "POST /amigo-cercano/<nombre>/recuerdo - Agregar recuerdo a amigo cercano",
+            "5": "POST /recuerdos/bulk - Agregar muchos recuerdos en una sola petición",
+            "6": "GET /limites - Configuración y contadores del límite de escrituras",
+            "7": "POST /duplicados/fusionar - Unir amigos con el mismo nombre y quitar recuerdos repetidos",
+            "8": "GET /instantaneas - Instantáneas conservadas y desde cuándo se puede restaurar",
+            "9": "POST /instantaneas - Tomar una instantánea ahora (en segundo plano)",
+            "10": "POST /instantaneas/restaurar - Volver los datos a un momento dado"
         }
     }), 200
 
+
+@app.route('/limites', methods=['GET'])
+def ver_limites():
+    """
+    GET /limites - Estado del límite de escrituras.
+    
+    Incluye la configuración (tasa, ráfaga, concurrencia) y los contadores de
+    escrituras admitidas y rechazadas por tasa o por concurrencia.
+    """
+    if limitador is None:
+        return jsonify({"exito": True, "activo": False}), 200
+    datos = limitador.resumen()
+    datos["exito"] = True
+    datos["activo"] = True
+    return jsonify(datos), 200
+
+
 @app.route('/amigo-regular', methods=['POST'])
 def crear_amigo_regular():
     """
@@ -283,8 +467,8 @@ def crear_amigo_regular():
     }
     """
     try:
-        # Obtener los datos del JSON
-        datos = request.get_json()
+        # Obtener los datos del JSON (None si el cuerpo no es JSON: lo rechaza la validación)
+        datos = request.get_json(silent=True)
         
         # Delegar la lógica al controlador (POO)
         return controlador.crear_amigo_regular(datos)
@@ -310,8 +494,8 @@ def crear_amigo_cercano():
     }
     """
     try:
-        # Obtener los datos del JSON
-        datos = request.get_json()
+        # Obtener los datos del JSON (None si el cuerpo no es JSON: lo rechaza la validación)
+        datos = request.get_json(silent=True)
         
         # Delegar la lógica al controlador (POO)
         return controlador.crear_amigo_cercano(datos)
@@ -332,9 +516,9 @@ def agregar_recuerdo_regular(nombre):
     }
     """
     try:
-        # Obtener los datos del JSON
-        datos = request.get_json()
-        recuerdo = datos.get('recuerdo') if datos else None
+        # Obtener los datos del JSON (None si el cuerpo no es JSON: lo rechaza la validación)
+        datos = request.get_json(silent=True)
+        recuerdo = datos.get('recuerdo') if isinstance(datos, dict) else None
         
         # Delegar la lógica al controlador (POO)
         return controlador.agregar_recuerdo(nombre, recuerdo, "AmigoRegular")
@@ -355,9 +539,9 @@ def agregar_recuerdo_cercano(nombre):
     }
     """
     try:
-        # Obtener los datos del JSON
-        datos = request.get_json()
-        recuerdo = datos.get('recuerdo') if datos else None
+        # Obtener los datos del JSON (None si el cuerpo no es JSON: lo rechaza la validación)
+        datos = request.get_json(silent=True)
+        recuerdo = datos.get('recuerdo') if isinstance(datos, dict) else None
         
         # Delegar la lógica al controlador (POO)
         return controlador.agregar_recuerdo(nombre, recuerdo, "AmigoCercano")
@@ -367,8 +551,163 @@ def agregar_recuerdo_cercano(nombre):
         return controlador.respuestas.error(f"Error interno: {str(e)}", 500)
 
 
+@app.route('/recuerdos/bulk', methods=['POST'])
+def agregar_recuerdos_lote():
+    """
+    POST /recuerdos/bulk - Agrega muchos recuerdos en una sola petición.
+    
+    Ejemplo de Body JSON:
+    {
+        "recuerdos": [
+            {"nombre": "Carlos", "tipo": "regular", "recuerdo": "Fuimos al cine"},
+            {"nombre": "Juan", "tipo": "cercano", "recuerdo": "Fuimos al concierto"}
+        ]
+    }
+    
+    Responde con el estado de cada entrada (200, 400, 404 o 409) en "resultados".
+    """
+    try:
+        # Obtener los datos del JSON (None si el cuerpo no es JSON: lo rechaza la validación)
+        datos = request.get_json(silent=True)
+        entradas = datos.get('recuerdos') if isinstance(datos, dict) else None
+        
+        # Delegar la lógica al controlador (POO)
+        return controlador.agregar_recuerdos_lote(entradas)
+        
+    except Exception as e:
+        # Manejo de errores inesperados
+        return controlador.respuestas.error(f"Error interno: {str(e)}", 500)
+
+
+@app.route('/duplicados/fusionar', methods=['POST'])
+def fusionar_duplicados():
+    """
+    POST /duplicados/fusionar - Une los amigos con el mismo nombre y quita los
+    recuerdos repetidos de cada amigo.
+    
+    Ejemplo de Body JSON (opcional):
+    {
+        "recuerdos": true,
+        "casi": false,
+        "parecidos": false
+    }
+    
+    Por defecto solo se unen los nombres idénticos; los que solo coinciden sin
+    contar acentos, mayúsculas ni signos ("José" y "Jose") se devuelven en
+    "posibles_duplicados" y se unen con "parecidos": true.
+    Por defecto solo se quitan los recuerdos idénticos (sin contar acentos,
+    mayúsculas ni signos); con "casi": true también los casi iguales.
+    Los amigos con el mismo contenido pero distinto nombre no se unen; se ven en
+    GET /duplicados de la API de consultas.
+    """
+    try:
+        datos = request.get_json(silent=True)
+        if datos is None:
+            datos = {}
+        if not isinstance(datos, dict):
+            return controlador.respuestas.error("El cuerpo debe ser un objeto JSON", 400)
+        opciones = {"recuerdos": datos.get('recuerdos', True), "casi": datos.get('casi', False),
+                    "parecidos": datos.get('parecidos', False)}
+        for campo, valor in opciones.items():
+            if not isinstance(valor, bool):
+                return controlador.respuestas.error(f"El campo '{campo}' debe ser true o false", 400)
+        
+        with escritura():
+            with medir_fase("carga"):
+                gestor = obtener_gestor()
+            resumen = gestor.fusionarDuplicados(opciones["recuerdos"], opciones["casi"],
+                                                opciones["parecidos"])
+            if resumen["amigos_unidos"] or resumen["recuerdos_quitados"]:
+                with medir_fase("guardado"):
+                    guardar_datos()
+        return controlador.respuestas.exito("Duplicados fusionados", resumen)
+        
+    except Exception as e:
+        # Manejo de errores inesperados
+        return controlador.respuestas.error(f"Error interno: {str(e)}", 500)
+
+
+@app.route('/instantaneas', methods=['GET'])
+def ver_instantaneas():
+    """
+    GET /instantaneas - Instantáneas conservadas (de la más vieja a la más nueva).
+    
+    "desde" es el momento más viejo al que se puede restaurar.
+    """
+    try:
+        datos = config.instantaneas_actuales().listar()
+        datos["exito"] = True
+        datos["historial_activo"] = instantaneas.esta_activo()
+        return jsonify(datos), 200
+    
+    except Exception as e:
+        # Manejo de errores inesperados
+        return controlador.respuestas.error(f"Error interno: {str(e)}", 500)
+
+
+@app.route('/instantaneas', methods=['POST'])
+def tomar_instantanea():
+    """
+    POST /instantaneas - Toma una instantánea ahora.
+    
+    La lista de amigos se copia al instante y se escribe en segundo plano,
+    así la petición no espera la escritura (responde 202).
+    """
+    try:
+        config.tomar_instantanea(esperar=False)
+        return controlador.respuestas.exito("Instantánea en curso", codigo=202)
+    
+    except Exception as e:
+        # Manejo de errores inesperados
+        return controlador.respuestas.error(f"Error interno: {str(e)}", 500)
+
+
+@app.route('/instantaneas/restaurar', methods=['POST'])
+def restaurar_instantanea():
+    """
+    POST /instantaneas/restaurar - Vuelve los datos al estado de un momento dado.
+    
+    Ejemplo de Body JSON:
+    {
+        "hasta": "2024-06-01T10:30:00"
+    }
+    
+    Usa la última instantánea anterior a "hasta" y le aplica el historial de
+    cambios hasta ese momento (el historial requiere AMIGOS_INSTANTANEAS).
+    """
+    try:
+        datos = request.get_json(silent=True)
+        hasta = datos.get('hasta') if isinstance(datos, dict) else None
+        try:
+            resumen = config.restaurar_instantanea(hasta)
+        except ValueError as e:
+            return controlador.respuestas.error(str(e), 400)
+        return controlador.respuestas.exito("Datos restaurados", resumen)
+    
+    except Exception as e:
+        # Manejo de errores inesperados
+        return controlador.respuestas.error(f"Error interno: {str(e)}", 500)
+
+
+# ============================================
+# ARRANQUE
+# ============================================
+# Importar la API no carga datos (se cargan en la primera petición).
+# Con AMIGOS_CALENTAR=1 se cargan al importar, así cada worker de un servidor
+# como gunicorn ya está listo antes de recibir tráfico.
+# Las instantáneas periódicas (AMIGOS_INSTANTANEAS) arrancan junto con la carga;
+# con varios workers cada uno las intenta, y las que se cruzan se omiten.
+if config.CALENTAR:
+    config.calentar()
+    config.iniciar_instantaneas()
+
+
 if __name__ == '__main__':
     import socket
+    
+    # Al ejecutar la API directamente siempre se calienta antes de escuchar
+    config.calentar()
+    config.iniciar_instantaneas()
     hostname = socket.gethostname()
     local_ip = socket.gethostbyname(hostname)
     
@@ -383,6 +722,12 @@ if __name__ == '__main__':
     print("  POST /amigo-cercano")
     print("  POST /amigo-regular/<nombre>/recuerdo")
     print("  POST /amigo-cercano/<nombre>/recuerdo")
+    print("  POST /recuerdos/bulk")
+    print("  GET  /limites")
+    print("  POST /duplicados/fusionar")
+    print("  GET  /instantaneas")
+    print("  POST /instantaneas")
+    print("  POST /instantaneas/restaurar")
     print("="*50 + "\n")
     
     app.run(debug=True, host='0.0.0.0', port=5001)
\ No newline at end of file
@@ -9,11 +9,50 @@ Versión: 2.0 - Simplificada con POO
 """
 
 from flask import Flask, request, jsonify
-from config import obtener_gestor
+import config
+from config import obtener_gestor, version_datos
+from GestorFragmentado import GestorFragmentado
+from GestorDisco import GestorDisco
+from IndicesAmigos import IndicesAmigos, ORDENES
+from ColumnasAmigos import ColumnasAmigos
+from inquilinos import instalar_inquilinos
+from intercambio import FORMATOS, detectar_compresion, generar_exportacion, nombre_exportacion
+from perfilador import instalar_perfilador, medir_fase
+from compresion import instalar_compresion
+from replicacion import instalar_lecturas
 
 # Crear la aplicación Flask
 app = Flask(__name__)
 
+# Máximo de nombres aceptados en una consulta por lote
+MAX_NOMBRES_LOTE = 1000
+
+# Valores aceptados en el filtro ?tipo=
+TIPOS_FILTRO = {
+    "regular": "AmigoRegular",
+    "cercano": "AmigoCercano"
+}
+
+# Valores aceptados en ?direccion= para ?orden=
+DIRECCIONES_ORDEN = {
+    "asc": False,
+    "desc": True
+}
+
+# Modo multiusuario opcional (AMIGOS_INQUILINOS=1): cabecera X-Usuario o prefijo /u/<usuario>
+# Se instala primero para que el perfilado y la compresión ya vean al inquilino
+inquilinos = instalar_inquilinos(app)
+
+# Perfilado opcional (AMIGOS_PERFIL=1): registra peticiones lentas y sus fases
+perfilador = instalar_perfilador(app, "laura", lambda: config.gestor_actual().contarAmigos())
+
+# Compresión gzip/br/zstd con caché de cuerpos comprimidos por versión de datos.
+# Solo se cachean las rutas que dependen únicamente de los datos: /estadisticas,
+# /duplicados (avisos recientes) y /replicacion cambian sin que cambie la versión
+compresor = instalar_compresion(app, version_datos, cacheables=(
+    "obtener_amigos", "obtener_amigos_lote", "obtener_recuerdos",
+    "obtener_similares", "ver_analitica"))
+
 
 # ============================================
 # CLASE AUXILIAR: FormateadorDatos
@@ -75,6 +114,109 @@ class FormateadorDatos:
         datos["informacion"] = amigo.obtenerInfo()
         
         return datos
+    
+    # Campos que se pueden pedir con ?campos= y cómo se obtiene cada uno
+    EXTRACTORES = {
+        "nombre": lambda amigo: amigo.nombre,
+        "cumpleanos": lambda amigo: amigo.cumpleanos,
+        "gustos": lambda amigo: amigo.gustos,
+        "recuerdos": lambda amigo: amigo.recuerdos.recuerdos,
+        "anecdotas": lambda amigo: amigo.anecdotas,
+        "tipo": lambda amigo: "Amigo Cercano" if type(amigo).__name__ == "AmigoCercano" else "Amigo Regular",
+        "nivelConfianza": lambda amigo: getattr(amigo, "nivelConfianza", None)
+    }
+    
+    @staticmethod
+    def preparar_proyeccion(campos_texto):
+        """
+        Convierte el parámetro ?campos=nombre,cumpleanos en la lista de extractores.
+        
+        Se prepara una sola vez por petición, no una vez por amigo.
+        
+        Args:
+            campos_texto (str): Nombres de campos separados por coma
+        
+        Returns:
+            list: Pares (campo, funcion_extractora) en el orden pedido
+        
+        Raises:
+            ValueError: Si se pide un campo que no existe
+        """
+        proyeccion = []
+        for campo in campos_texto.split(","):
+            campo = campo.strip()
+            if not campo:
+                continue
+            if campo not in FormateadorDatos.EXTRACTORES:
+                disponibles = ", ".join(FormateadorDatos.EXTRACTORES)
+                raise ValueError(f"Campo desconocido: {campo}. Disponibles: {disponibles}")
+            proyeccion.append((campo, FormateadorDatos.EXTRACTORES[campo]))
+        
+        if not proyeccion:
+            raise ValueError("El parámetro campos no puede estar vacío")
+        return proyeccion
+    
+    @staticmethod
+    def amigo_proyectado(amigo, proyeccion):
+        """
+        Convierte un amigo a diccionario solo con los campos pedidos.
+        
+        Args:
+            amigo: Objeto AmigoRegular o AmigoCercano
+            proyeccion (list): Resultado de preparar_proyeccion
+        
+        Returns:
+            dict: Diccionario con los campos pedidos (nivelConfianza solo si aplica)
+        """
+        datos = {}
+        for campo, extractor in proyeccion:
+            valor = extractor(amigo)
+            if valor is not None:
+                datos[campo] = valor
+        return datos
+    
+    @staticmethod
+    def amigo_resumen(amigo):
+        """
+        Convierte un amigo a un resumen compacto: cantidades en lugar de listas.
+        
+        Args:
+            amigo: Objeto AmigoRegular o AmigoCercano
+        
+        Returns:
+            dict: Nombre, tipo, cumpleaños y cantidades de gustos, recuerdos y anécdotas
+        """
+        datos = {
+            "nombre": amigo.nombre,
+            "tipo": FormateadorDatos.EXTRACTORES["tipo"](amigo),
+            "cumpleanos": amigo.cumpleanos,
+            "cantidad_gustos": len(amigo.gustos),
+            "cantidad_recuerdos": amigo.recuerdos.contarRecuerdos(),
+            "cantidad_anecdotas": len(amigo.anecdotas)
+        }
+        
+        if type(amigo).__name__ == "AmigoCercano":
+            datos["nivelConfianza"] = amigo.nivelConfianza
+        
+        return datos
+    
+    @staticmethod
+    def elegir_conversion(proyeccion=None, resumen=False):
+        """
+        Elige la función que convierte cada amigo según los parámetros de la petición.
+        
+        Args:
+            proyeccion (list): Campos pedidos con ?campos= (o None)
+            resumen (bool): True si se pidió ?resumen=1
+        
+        Returns:
+            callable: Función amigo → diccionario
+        """
+        if proyeccion:
+            return lambda amigo: FormateadorDatos.amigo_proyectado(amigo, proyeccion)
+        if resumen:
+            return FormateadorDatos.amigo_resumen
+        return FormateadorDatos.amigo_a_diccionario
 
 
 # ============================================
@@ -102,9 +244,19 @@ class BuscadorAmigos:
         amigo_encontrado = None
         indice = 0
         
+        # Con el gestor fragmentado solo se recorre el fragmento dueño del nombre
+        if isinstance(gestor, GestorFragmentado):
+            amigos = gestor.amigosDelFragmento(nombre)
+        elif isinstance(gestor, GestorDisco):
+            # Con el gestor en disco el índice residente ubica al amigo directamente
+            amigo = gestor.buscarAmigo(nombre)
+            amigos = [amigo] if amigo else []
+        else:
+            amigos = gestor.amigos
+        
         # Recorrer la lista con while (requisito académico)
-        while indice < len(gestor.amigos):
-            amigo_actual = gestor.amigos[indice]
+        while indice < len(amigos):
+            amigo_actual = amigos[indice]
             
             if amigo_actual.obtenerNombre() == nombre:
                 amigo_encontrado = amigo_actual
@@ -130,18 +282,26 @@ class ControladorConsultas:
         self.formateador = FormateadorDatos()
         self.buscador = BuscadorAmigos()
     
-    def obtener_todos_los_amigos(self):
+    def obtener_todos_los_amigos(self, proyeccion=None, resumen=False):
         """
         Obtiene la lista completa de amigos.
         
+        Args:
+            proyeccion (list): Campos pedidos con ?campos= (None = todos)
+            resumen (bool): True para devolver cantidades en lugar de listas
+        
         Returns:
             tuple: (respuesta_json, codigo_http)
         """
         # Obtener el gestor con datos actualizados
-        gestor = obtener_gestor()
+        with medir_fase("carga"):
+            gestor = obtener_gestor()
+        
+        # Tomar la lista una sola vez (en el gestor fragmentado se arma uniendo fragmentos)
+        amigos = gestor.amigos
         
         # Verificar si hay amigos
-        if len(gestor.amigos) == 0:
+        if len(amigos) == 0:
             return jsonify({
                 "mensaje": "No hay amigos registrados",
                 "total": 0,
@@ -149,40 +309,50 @@ class ControladorConsultas:
             }), 200
         
         # Convertir cada amigo a diccionario usando while
+        convertir = self.formateador.elegir_conversion(proyeccion, resumen)
         lista_de_amigos = []
         indice = 0
         
-        while indice < len(gestor.amigos):
-            amigo_actual = gestor.amigos[indice]
-            
-            # Usar el formateador para convertir el amigo
-            datos_amigo = self.formateador.amigo_a_diccionario(amigo_actual)
-            lista_de_amigos.append(datos_amigo)
-            
-            indice = indice + 1
+        with medir_fase("conversion"):
+            while indice < len(amigos):
+                amigo_actual = amigos[indice]
+                
+                # Con el gestor en disco, un amigo eliminado mientras se recorre es None
+                if amigo_actual is not None:
+                    # Usar el formateador para convertir el amigo
+                    datos_amigo = convertir(amigo_actual)
+                    lista_de_amigos.append(datos_amigo)
+                
+                indice = indice + 1
         
         # Retornar respuesta
-        return jsonify({
-            "exito": True,
-            "total": len(gestor.amigos),
-            "amigos": lista_de_amigos
-        }), 200
+        with medir_fase("serializacion"):
+            respuesta = jsonify({
+                "exito": True,
+                "total": len(lista_de_amigos),
+                "amigos": lista_de_amigos
+            })
+        return respuesta, 200
     
-    def buscar_amigo_por_nombre(self, nombre):
+    def buscar_amigo_por_nombre(self, nombre, proyeccion=None, resumen=False):
         """
         Busca un amigo específico por nombre.
         
         Args:
             nombre (str): Nombre del amigo a buscar
+            proyeccion (list): Campos pedidos con ?campos= (None = detalle completo)
+            resumen (bool): True para devolver cantidades en lugar de listas
         
         Returns:
             tuple: (respuesta_json, codigo_http)
         """
         # Obtener el gestor con datos actualizados
-        gestor = obtener_gestor()
+        with medir_fase("carga"):
+            gestor = obtener_gestor()
         
         # Buscar el amigo usando la clase BuscadorAmigos
-        amigo_encontrado = self.buscador.buscar_por_nombre(gestor, nombre)
+        with medir_fase("busqueda"):
+            amigo_encontrado = self.buscador.buscar_por_nombre(gestor, nombre)
         
         # Verificar si se encontró
         if amigo_encontrado is None:
@@ -192,10 +362,138 @@ class ControladorConsultas:
             }), 404
         
         # Formatear los datos del amigo encontrado
-        datos = self.formateador.amigo_detallado(amigo_encontrado)
-        datos["exito"] = True
+        with medir_fase("serializacion"):
+            if proyeccion or resumen:
+                datos = self.formateador.elegir_conversion(proyeccion, resumen)(amigo_encontrado)
+            else:
+                datos = self.formateador.amigo_detallado(amigo_encontrado)
+            datos["exito"] = True
+            respuesta = jsonify(datos)
         
-        return jsonify(datos), 200
+        return respuesta, 200
+    
+    def filtrar_amigos(self, filtros, proyeccion=None, resumen=False, orden=None):
+        """
+        Lista los amigos que cumplen los filtros usando los índices del gestor.
+        
+        Con orden y sin filtros se lee directo el índice ordenado (top-k sin ordenar).
+        Con orden y filtros se ordena solo el resultado filtrado, con un heap si hay límite.
+        
+        Args:
+            filtros (dict): tipo, confianza_min, confianza_max, mes y/o min_recuerdos
+            proyeccion (list): Campos pedidos con ?campos= (None = todos)
+            resumen (bool): True para devolver cantidades en lugar de listas
+            orden (dict): orden, limite y descendente (None = sin ordenar)
+        
+        Returns:
+            tuple: (respuesta_json, codigo_http)
+        """
+        with medir_fase("carga"):
+            gestor = obtener_gestor()
+        
+        with medir_fase("busqueda"):
+            if filtros:
+                amigos, plan = gestor.filtrarAmigos(**filtros)
+                if orden:
+                    amigos = IndicesAmigos.seleccionar(amigos, orden["orden"], orden["limite"],
+                                                       orden["descendente"])
+            else:
+                amigos = gestor.ordenarAmigos(orden["orden"], orden["limite"], orden["descendente"])
+                plan = {"indice": "orden_" + orden["orden"], "candidatos": len(amigos),
+                        "total": gestor.contarAmigos()}
+        
+        convertir = self.formateador.elegir_conversion(proyeccion, resumen)
+        with medir_fase("conversion"):
+            lista_de_amigos = [convertir(amigo) for amigo in amigos]
+        
+        with medir_fase("serializacion"):
+            respuesta = jsonify({
+                "exito": True,
+                "total": len(lista_de_amigos),
+                "filtros": filtros,
+                "orden": orden,
+                "plan": plan,
+                "amigos": lista_de_amigos
+            })
+        return respuesta, 200
+    
+    def buscar_varios_amigos(self, nombres, proyeccion=None, resumen=False):
+        """
+        Busca muchos amigos a la vez contra una sola carga del gestor.
+        
+        Args:
+            nombres (list): Nombres a buscar (sin repetidos, en el orden pedido)
+            proyeccion (list): Campos pedidos con ?campos= (None = todos)
+            resumen (bool): True para devolver cantidades en lugar de listas
+        
+        Returns:
+            tuple: (respuesta_json, codigo_http)
+        """
+        with medir_fase("carga"):
+            gestor = obtener_gestor()
+        
+        # Una sola pasada por el gestor para todos los nombres
+        with medir_fase("busqueda"):
+            encontrados_por_nombre = gestor.buscarVarios(nombres)
+        
+        convertir = self.formateador.elegir_conversion(proyeccion, resumen)
+        encontrados = []
+        faltantes = []
+        
+        with medir_fase("conversion"):
+            for nombre in nombres:
+                amigo = encontrados_por_nombre.get(nombre)
+                if amigo is None:
+                    faltantes.append(nombre)
+                else:
+                    encontrados.append(convertir(amigo))
+        
+        with medir_fase("serializacion"):
+            respuesta = jsonify({
+                "exito": True,
+                "total_encontrados": len(encontrados),
+                "total_faltantes": len(faltantes),
+                "encontrados": encontrados,
+                "faltantes": faltantes
+            })
+        return respuesta, 200
+    
+    def obtener_recuerdos(self, nombre, desde, limite):
+        """
+        Obtiene una página de los recuerdos de un amigo.
+        
+        Args:
+            nombre (str): Nombre del amigo
+            desde (int): Último id de recuerdo que el cliente ya tiene
+            limite (int): Cantidad máxima de recuerdos a retornar
+        
+        Returns:
+            tuple: (respuesta_json, codigo_http)
+        """
+        with medir_fase("carga"):
+            gestor = obtener_gestor()
+        
+        with medir_fase("busqueda"):
+            amigo = self.buscador.buscar_por_nombre(gestor, nombre)
+        
+        if amigo is None:
+            return jsonify({
+                "error": "No se encontró el amigo",
+                "mensaje": f"No existe un amigo con el nombre: {nombre}"
+            }), 404
+        
+        pagina, siguiente = amigo.recuerdos.obtenerDesde(desde, limite)
+        
+        with medir_fase("serializacion"):
+            respuesta = jsonify({
+                "exito": True,
+                "nombre": nombre,
+                "version": amigo.recuerdos.version,
+                "total": amigo.recuerdos.contarRecuerdos(),
+                "recuerdos": pagina,
+                "siguiente": siguiente
+            })
+        return respuesta, 200
     
     def obtener_estadisticas(self):
         """
@@ -205,32 +503,175 @@ class ControladorConsultas:
             tuple: (respuesta_json, codigo_http)
         """
         # Obtener el gestor con datos actualizados
-        gestor = obtener_gestor()
+        with medir_fase("carga"):
+            gestor = obtener_gestor()
         
-        total = len(gestor.amigos)
+        amigos = gestor.amigos
+        total = len(amigos)
         cantidad_regulares = 0
         cantidad_cercanos = 0
         
         # Contar por tipo usando while
         indice = 0
-        while indice < total:
-            amigo = gestor.amigos[indice]
+        while indice < len(amigos):
+            amigo = amigos[indice]
             nombre_clase = type(amigo).__name__
             
-            if nombre_clase == "AmigoCercano":
+            # Con el gestor en disco, un amigo eliminado mientras se recorre es None
+            if amigo is None:
+                total = total - 1
+            elif nombre_clase == "AmigoCercano":
                 cantidad_cercanos = cantidad_cercanos + 1
             else:
                 cantidad_regulares = cantidad_regulares + 1
             
             indice = indice + 1
         
-        # Retornar estadísticas
-        return jsonify({
+        datos = {
             "exito": True,
             "total_amigos": total,
             "amigos_regulares": cantidad_regulares,
             "amigos_cercanos": cantidad_cercanos
-        }), 200
+        }
+        
+        # Aciertos y fallos de la caché de amigos (solo con el gestor en disco)
+        if isinstance(gestor, GestorDisco):
+            datos["cache_disco"] = gestor.estadisticasCache()
+        
+        # Estado de la caché de inquilinos (solo en modo multiusuario)
+        if inquilinos is not None:
+            datos["inquilinos"] = inquilinos.registro.resumen()
+        
+        # Retornar estadísticas
+        return jsonify(datos), 200
+    
+    def obtener_similares(self, nombre, limite):
+        """
+        Busca los amigos más parecidos a uno por gustos y recuerdos en común.
+        
+        Args:
+            nombre (str): Nombre del amigo de referencia
+            limite (int): Cantidad máxima de amigos parecidos
+        
+        Returns:
+            tuple: (respuesta_json, codigo_http)
+        """
+        with medir_fase("carga"):
+            gestor = obtener_gestor()
+        
+        with medir_fase("busqueda"):
+            similares, plan = gestor.buscarSimilares(nombre, limite)
+        
+        if similares is None:
+            return jsonify({
+                "error": "No se encontró el amigo",
+                "mensaje": f"No existe un amigo con el nombre: {nombre}"
+            }), 404
+        
+        with medir_fase("serializacion"):
+            respuesta = jsonify({
+                "exito": True,
+                "nombre": nombre,
+                "total": len(similares),
+                "similares": similares,
+                "plan": plan
+            })
+        return respuesta, 200
+    
+    def obtener_analitica(self, top_gustos):
+        """
+        Calcula agregados (confianza, cumpleaños, recuerdos, gustos) sobre el espejo columnar.
+        
+        Args:
+            top_gustos (int): Cantidad de gustos y pares de gustos más frecuentes
+        
+        Returns:
+            tuple: (respuesta_json, codigo_http)
+        """
+        with medir_fase("carga"):
+            gestor = obtener_gestor()
+        
+        with medir_fase("recorrido"):
+            datos = gestor.calcularAnalitica(top_gustos)
+        
+        datos["exito"] = True
+        with medir_fase("serializacion"):
+            respuesta = jsonify(datos)
+        return respuesta, 200
+    
+    def obtener_duplicados(self, recuerdos=True):
+        """
+        Revisión completa de duplicados: nombres repetidos, contenido idéntico y
+        recuerdos repetidos dentro de cada amigo.
+        
+        Args:
+            recuerdos (bool): Si también se revisan los recuerdos de cada amigo
+        
+        Returns:
+            tuple: (respuesta_json, codigo_http)
+        """
+        with medir_fase("carga"):
+            gestor = obtener_gestor()
+        
+        with medir_fase("recorrido"):
+            datos = gestor.reporteDuplicados(recuerdos)
+        
+        datos["exito"] = True
+        with medir_fase("serializacion"):
+            respuesta = jsonify(datos)
+        return respuesta, 200
+    
+    def obtener_replicacion(self):
+        """
+        Estado de la réplica de lectura: cambios aplicados y retraso.
+        
+        Returns:
+            tuple: (respuesta_json, codigo_http)
+        """
+        estado = config.estado_replica()
+        if estado is None:
+            return jsonify({
+                "exito": True,
+                "replica": False,
+                "mensaje": "Esta API recarga los datos cuando el archivo cambia (AMIGOS_REPLICACION=0)"
+            }), 200
+        
+        estado["exito"] = True
+        estado["replica"] = True
+        return jsonify(estado), 200
+    
+    def exportar_amigos(self, formato, compresion=None):
+        """
+        Exporta todos los amigos como una respuesta en streaming.
+        
+        El cuerpo se genera por bloques mientras se envía, así que la memoria
+        del servidor no depende de la cantidad de amigos.
+        
+        Args:
+            formato (str): "ndjson", "csv" o "columnar"
+            compresion (str): "gzip", "zstd", "br" o None
+        
+        Returns:
+            Response: Respuesta con el archivo como adjunto
+        """
+        with medir_fase("carga"):
+            gestor = obtener_gestor()
+        
+        # Tomar la vista de amigos ahora: el generador corre después de la
+        # petición, cuando el inquilino activo ya se desactivó (y, en una
+        # réplica, sin la lectura tomada: la lista se copia para que los
+        # cambios aplicados mientras se envía no la muevan)
+        amigos = gestor.amigos
+        if isinstance(amigos, list):
+            amigos = list(amigos)
+        
+        respuesta = app.response_class(
+            generar_exportacion(amigos, formato, compresion),
+            mimetype=FORMATOS[formato]
+        )
+        respuesta.headers["Content-Disposition"] = \
+            f'attachment; filename="{nombre_exportacion(formato, compresion)}"'
+        return respuesta
 
 
 # ============================================
@@ -244,6 +685,93 @@ controlador = ControladorConsultas()
 # RUTAS DE LA API (Endpoints)
 # ============================================
 
+def leer_proyeccion():
+    """
+    Lee los parámetros ?campos= y ?resumen= de la petición actual.
+    
+    Returns:
+        tuple: (proyeccion o None, resumen)
+    
+    Raises:
+        ValueError: Si ?campos= pide un campo desconocido
+    """
+    campos = request.args.get('campos')
+    resumen = request.args.get('resumen', '') in ('1', 'true', 'si')
+    proyeccion = None
+    if campos is not None:
+        proyeccion = FormateadorDatos.preparar_proyeccion(campos)
+    return proyeccion, resumen
+
+
+def leer_filtros():
+    """
+    Lee los filtros de ?tipo=, ?confianza_min=, ?confianza_max=, ?mes= y ?min_recuerdos=.
+    
+    Returns:
+        dict: Solo los filtros presentes, con sus valores ya convertidos
+    
+    Raises:
+        ValueError: Si algún filtro tiene un valor inválido
+    """
+    filtros = {}
+    
+    tipo = request.args.get('tipo')
+    if tipo is not None:
+        if tipo not in TIPOS_FILTRO:
+            raise ValueError("El filtro tipo debe ser 'regular' o 'cercano'")
+        filtros["tipo"] = TIPOS_FILTRO[tipo]
+    
+    for parametro in ("confianza_min", "confianza_max", "mes", "min_recuerdos"):
+        valor = request.args.get(parametro)
+        if valor is None:
+            continue
+        try:
+            filtros[parametro] = int(valor)
+        except ValueError:
+            raise ValueError(f"El filtro {parametro} debe ser un número entero")
+    
+    if "mes" in filtros and not 1 <= filtros["mes"] <= 12:
+        raise ValueError("El filtro mes debe estar entre 1 y 12")
+    
+    return filtros
+
+
+def leer_orden():
+    """
+    Lee ?orden=, ?direccion= y ?limite= de la petición actual.
+    
+    Returns:
+        dict o None: orden, limite y descendente (None si no se pidió orden)
+    
+    Raises:
+        ValueError: Si algún parámetro tiene un valor inválido
+    """
+    orden = request.args.get('orden')
+    if orden is None:
+        return None
+    if orden not in ORDENES:
+        raise ValueError("El orden debe ser 'confianza', 'recuerdos' o 'nombre'")
+    
+    direccion = request.args.get('direccion')
+    if direccion is not None and direccion not in DIRECCIONES_ORDEN:
+        raise ValueError("La dirección debe ser 'asc' o 'desc'")
+    
+    limite = request.args.get('limite')
+    if limite is not None:
+        try:
+            limite = int(limite)
+        except ValueError:
+            raise ValueError("El límite debe ser un número entero")
+        if limite < 1:
+            raise ValueError("El límite debe ser mayor a 0")
+    
+    return {
+        "orden": orden,
+        "limite": limite,
+        "descendente": DIRECCIONES_ORDEN.get(direccion, ORDENES[orden])
+    }
+
+
 @app.route('/', methods=['GET'])
 def inicio():
     """
@@ -257,7 +785,17 @@ def inicio():
             "1": "GET / - Información",
             "2": "GET /amigos - Ver todos los amigos",
             "3": "GET /amigos?nombre=NombreAmigo - Buscar un amigo",
-            "4": "GET /estadisticas - Ver estadísticas"
+            "4": "GET /estadisticas - Ver estadísticas",
+            "5": "GET /amigos/<nombre>/recuerdos?desde=0&limite=50 - Recuerdos paginados",
+            "6": "GET /amigos?campos=nombre,tipo o ?resumen=1 - Respuestas livianas",
+            "7": "GET /amigos/lote?nombres=Juan,Carlos - Buscar muchos amigos a la vez",
+            "8": "GET /amigos?tipo=cercano&confianza_min=7&mes=6&min_recuerdos=2 - Filtrar",
+            "9": "GET /amigos?orden=confianza|recuerdos|nombre&limite=10 - Los primeros k",
+            "10": "GET /exportar?formato=ndjson|csv|columnar&compresion=gzip - Descargar todo",
+            "11": "GET /analitica?top=10 - Agregados de confianza, cumpleaños, recuerdos y gustos",
+            "12": "GET /amigos/<nombre>/similares?limite=10 - Amigos con gustos y recuerdos parecidos",
+            "13": "GET /duplicados?recuerdos=1 - Amigos y recuerdos repetidos",
+            "14": "GET /replicacion - Estado y retraso de la réplica de lectura"
         }
     }), 200
 
@@ -267,23 +805,182 @@ def obtener_amigos():
     """
     GET /amigos - Obtiene todos los amigos o busca uno por nombre.
     
-    Parámetro opcional: ?nombre=Juan
+    Parámetros opcionales:
+        ?nombre=Juan               → Busca un amigo específico
+        ?campos=nombre,cumpleanos  → Solo devuelve esos campos de cada amigo
+        ?resumen=1                 → Cantidades en lugar de listas (gustos, recuerdos, anécdotas)
+    
+    Filtros combinables (se resuelven con índices, sin recorrer toda la lista):
+        ?tipo=regular|cercano
+        ?confianza_min=7&confianza_max=10   → Solo amigos cercanos en ese rango
+        ?mes=3                              → Cumpleaños en marzo
+        ?min_recuerdos=2                    → Al menos 2 recuerdos
+    
+    Orden (se lee de índices ya ordenados, sin ordenar toda la lista):
+        ?orden=confianza   → Amigos cercanos de mayor a menor confianza
+        ?orden=recuerdos   → Los más recordados primero
+        ?orden=nombre      → Alfabético (sin distinguir acentos ni mayúsculas)
+        ?direccion=asc|desc&limite=10
     
     Ejemplos:
-        GET /amigos              → Lista todos los amigos
-        GET /amigos?nombre=Juan  → Busca a Juan específicamente
+        GET /amigos                     → Lista todos los amigos
+        GET /amigos?nombre=Juan         → Busca a Juan específicamente
+        GET /amigos?campos=nombre,tipo  → Lista liviana con nombre y tipo
+        GET /amigos?tipo=cercano&mes=6  → Amigos cercanos que cumplen en junio
+        GET /amigos?orden=confianza&limite=5 → Los 5 amigos más cercanos
     """
     try:
         # Obtener el parámetro de búsqueda (si existe)
         nombre_a_buscar = request.args.get('nombre')
         
+        # Proyección de campos y modo resumen (se validan antes de cargar datos)
+        try:
+            proyeccion, resumen = leer_proyeccion()
+        except ValueError as e:
+            return jsonify({"exito": False, "error": str(e)}), 400
+        
+        # Filtros del lado del servidor (tipo, confianza, mes, recuerdos)
+        try:
+            filtros = leer_filtros()
+        except ValueError as e:
+            return jsonify({"exito": False, "error": str(e)}), 400
+        
+        # Orden y top-k (confianza, recuerdos o nombre)
+        try:
+            orden = leer_orden()
+        except ValueError as e:
+            return jsonify({"exito": False, "error": str(e)}), 400
+        
         # Decidir qué hacer según si hay parámetro o no
         if nombre_a_buscar:
             # Buscar un amigo específico
-            return controlador.buscar_amigo_por_nombre(nombre_a_buscar)
+            return controlador.buscar_amigo_por_nombre(nombre_a_buscar, proyeccion, resumen)
+        elif filtros or orden:
+            # Filtrar y/u ordenar usando los índices del gestor
+            return controlador.filtrar_amigos(filtros, proyeccion, resumen, orden)
         else:
             # Obtener todos los amigos
-            return controlador.obtener_todos_los_amigos()
+            return controlador.obtener_todos_los_amigos(proyeccion, resumen)
+    
+    except Exception as e:
+        # Manejo de errores inesperados
+        return jsonify({
+            "exito": False,
+            "error": f"Error interno: {str(e)}"
+        }), 500
+
+
+@app.route('/amigos/lote', methods=['GET'])
+def obtener_amigos_lote():
+    """
+    GET /amigos/lote - Busca muchos amigos en una sola petición.
+    
+    Parámetros:
+        ?nombres=Juan,Carlos,Laura   → Nombres separados por coma
+        ?nombre=Juan&nombre=Carlos   → También se aceptan repetidos (nombres con coma)
+        ?campos=... / ?resumen=1     → Igual que en GET /amigos
+    
+    Responde con "encontrados" (en el orden pedido) y "faltantes".
+    """
+    try:
+        # Reunir los nombres sin repetir, conservando el orden pedido
+        nombres = []
+        vistos = set()
+        candidatos = request.args.getlist('nombre')
+        for texto in request.args.getlist('nombres'):
+            candidatos.extend(texto.split(","))
+        for nombre in candidatos:
+            nombre = nombre.strip()
+            if nombre and nombre not in vistos:
+                vistos.add(nombre)
+                nombres.append(nombre)
+        
+        if not nombres:
+            return jsonify({
+                "exito": False,
+                "error": "Falta el parámetro: nombres (ej: ?nombres=Juan,Carlos)"
+            }), 400
+        
+        if len(nombres) > MAX_NOMBRES_LOTE:
+            return jsonify({
+                "exito": False,
+                "error": f"Se aceptan como máximo {MAX_NOMBRES_LOTE} nombres por consulta"
+            }), 400
+        
+        try:
+            proyeccion, resumen = leer_proyeccion()
+        except ValueError as e:
+            return jsonify({"exito": False, "error": str(e)}), 400
+        
+        return controlador.buscar_varios_amigos(nombres, proyeccion, resumen)
+    
+    except Exception as e:
+        # Manejo de errores inesperados
+        return jsonify({
+            "exito": False,
+            "error": f"Error interno: {str(e)}"
+        }), 500
+
+
+@app.route('/amigos/<nombre>/recuerdos', methods=['GET'])
+def obtener_recuerdos(nombre):
+    """
+    GET /amigos/<nombre>/recuerdos - Recuerdos de un amigo, paginados.
+    
+    Parámetros opcionales:
+        ?desde=0    → Último id de recuerdo que ya se tiene (se devuelven los posteriores)
+        ?limite=50  → Tamaño de la página (máximo 500)
+    
+    La respuesta incluye "siguiente": el valor de ?desde= para pedir la
+    próxima página, o null si ya no hay más.
+    """
+    try:
+        try:
+            desde = int(request.args.get('desde', 0))
+            limite = int(request.args.get('limite', 50))
+        except ValueError:
+            return jsonify({
+                "exito": False,
+                "error": "Los parámetros desde y limite deben ser números enteros"
+            }), 400
+        
+        if desde < 0 or limite < 1:
+            return jsonify({
+                "exito": False,
+                "error": "desde debe ser >= 0 y limite debe ser >= 1"
+            }), 400
+        
+        return controlador.obtener_recuerdos(nombre, desde, min(limite, 500))
+    
+    except Exception as e:
+        # Manejo de errores inesperados
+        return jsonify({
+            "exito": False,
+            "error": f"Error interno: {str(e)}"
+        }), 500
+
+
+@app.route('/amigos/<nombre>/similares', methods=['GET'])
+def obtener_similares(nombre):
+    """
+    GET /amigos/<nombre>/similares - Amigos más parecidos por gustos y recuerdos en común.
+    
+    Parámetros opcionales:
+        ?limite=10  → Cantidad de amigos parecidos (máximo 100)
+    
+    Cada resultado trae su similitud (0 a 1) y los gustos y recuerdos que
+    comparte con el amigo. Los candidatos salen de firmas MinHash (LSH), así
+    que la consulta no compara contra todos los amigos.
+    """
+    try:
+        try:
+            limite = int(request.args.get('limite', 10))
+        except ValueError:
+            return jsonify({"exito": False, "error": "El parámetro limite debe ser un número entero"}), 400
+        if limite < 1:
+            return jsonify({"exito": False, "error": "El parámetro limite debe ser mayor a 0"}), 400
+        
+        return controlador.obtener_similares(nombre, min(limite, 100))
     
     except Exception as e:
         # Manejo de errores inesperados
@@ -315,8 +1012,142 @@ def ver_estadisticas():
         }), 500
 
 
+@app.route('/analitica', methods=['GET'])
+def ver_analitica():
+    """
+    GET /analitica - Agregados sobre todos los amigos, calculados con NumPy.
+    
+    Responde con el promedio y la distribución de nivelConfianza, los cumpleaños
+    por mes, los percentiles de recuerdos por amigo y los gustos (y pares de
+    gustos) más frecuentes.
+    
+    Parámetros opcionales:
+        ?top=10   → Cantidad de gustos y pares de gustos a listar (máximo 100)
+    """
+    try:
+        if not ColumnasAmigos.disponible():
+            return jsonify({
+                "exito": False,
+                "error": "La analítica necesita NumPy (pip install numpy)"
+            }), 501
+        
+        try:
+            top = int(request.args.get('top', 10))
+        except ValueError:
+            return jsonify({"exito": False, "error": "El parámetro top debe ser un número entero"}), 400
+        if top < 1:
+            return jsonify({"exito": False, "error": "El parámetro top debe ser mayor a 0"}), 400
+        
+        return controlador.obtener_analitica(min(top, 100))
+    
+    except Exception as e:
+        # Manejo de errores inesperados
+        return jsonify({
+            "exito": False,
+            "error": f"Error interno: {str(e)}"
+        }), 500
+
+
+@app.route('/duplicados', methods=['GET'])
+def ver_duplicados():
+    """
+    GET /duplicados - Amigos y recuerdos repetidos.
+    
+    Responde con los grupos de amigos con el mismo nombre (sin contar acentos
+    ni mayúsculas), los de contenido idéntico con distinto nombre, los
+    recuerdos repetidos o casi iguales de cada amigo y los últimos avisos
+    detectados al agregar amigos.
+    
+    Parámetros opcionales:
+        ?recuerdos=0  → No revisar los recuerdos (más rápido con muchos amigos)
+    """
+    try:
+        recuerdos = request.args.get('recuerdos', '1') not in ('0', 'false', 'no')
+        return controlador.obtener_duplicados(recuerdos)
+    
+    except Exception as e:
+        # Manejo de errores inesperados
+        return jsonify({
+            "exito": False,
+            "error": f"Error interno: {str(e)}"
+        }), 500
+
+
+@app.route('/replicacion', methods=['GET'])
+def ver_replicacion():
+    """
+    GET /replicacion - Estado de la réplica de lectura (AMIGOS_REPLICACION=1).
+    
+    Responde con los cambios aplicados desde el registro, los bytes que
+    faltan aplicar y el retraso (en ms) entre que la API de escrituras
+    publicó el último cambio y esta API lo aplicó.
+    """
+    try:
+        return controlador.obtener_replicacion()
+    
+    except Exception as e:
+        # Manejo de errores inesperados
+        return jsonify({
+            "exito": False,
+            "error": f"Error interno: {str(e)}"
+        }), 500
+
+
+@app.route('/exportar', methods=['GET'])
+def exportar_amigos():
+    """
+    GET /exportar - Descarga todos los amigos en streaming.
+    
+    Parámetros opcionales:
+        ?formato=ndjson       → ndjson (por defecto), csv o columnar
+        ?compresion=gzip      → gzip, zstd o br (según lo instalado); sin comprimir por defecto
+    
+    La respuesta ya viene comprimida si se pidió, así que no pasa por la
+    compresión automática de respuestas.
+    """
+    try:
+        formato = request.args.get('formato', 'ndjson')
+        if formato not in FORMATOS:
+            return jsonify({
+                "exito": False,
+                "error": "El formato debe ser 'ndjson', 'csv' o 'columnar'"
+            }), 400
+        
+        try:
+            compresion = detectar_compresion("", request.args.get('compresion'))
+        except ValueError as e:
+            return jsonify({"exito": False, "error": str(e)}), 400
+        
+        return controlador.exportar_amigos(formato, compresion)
+    
+    except Exception as e:
+        # Manejo de errores inesperados
+        return jsonify({
+            "exito": False,
+            "error": f"Error interno: {str(e)}"
+        }), 500
+
+
+# ============================================
+# ARRANQUE
+# ============================================
+# Importar la API no carga datos (se cargan en la primera petición).
+# Con AMIGOS_CALENTAR=1 se cargan al importar, así cada worker de un servidor
+# como gunicorn ya está listo antes de recibir tráfico.
+# Con AMIGOS_REPLICACION=1 esta API es una réplica: aplica los cambios que
+# publica la API de escrituras en lugar de recargar los datos completos.
+replica = config.iniciar_replica()
+if replica is not None:
+    instalar_lecturas(app, replica, config.poner_replica_al_dia)
+if config.CALENTAR:
+    config.calentar()
+
+
 if __name__ == '__main__':
     import socket
+    
+    # Al ejecutar la API directamente siempre se calienta antes de escuchar
+    config.calentar()
     hostname = socket.gethostname()
     local_ip = socket.gethostbyname(hostname)
     
@@ -331,6 +1162,14 @@ if __name__ == '__main__':
     print("  GET /amigos")
     print("  GET /amigos?nombre=Juan")
     print("  GET /estadisticas")
+    print("  GET /amigos/<nombre>/recuerdos?desde=0")
+    print("  GET /amigos/lote?nombres=Juan,Carlos")
+    print("  GET /amigos?orden=confianza&limite=5")
+    print("  GET /exportar?formato=csv&compresion=gzip")
+    print("  GET /analitica")
+    print("  GET /amigos/<nombre>/similares?limite=5")
+    print("  GET /duplicados")
+    print("  GET /replicacion")
     print("="*50 + "\n")
     
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,323 @@
+import datetime
+import threading
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Código numérico de cada tipo de amigo en la columna "tipo"
+TIPOS = {"AmigoRegular": 0, "AmigoCercano": 1}
+
+# Días acumulados antes de cada mes en un año bisiesto (así el 29/02 también tiene día del año)
+DIAS_ACUMULADOS = [0, 0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335]
+
+# Percentiles de recuerdos por amigo que se informan
+PERCENTILES = (50, 90, 99)
+
+
+class ColumnasAmigos:
+    """
+    Espejo columnar (NumPy) de los amigos de un gestor para calcular agregados sin recorrerlos.
+
+    Cada amigo es una fila y cada dato un arreglo:
+    - tipo:       0 = AmigoRegular, 1 = AmigoCercano
+    - confianza:  nivelConfianza (NaN en los amigos regulares)
+    - mes, dia:   mes (1-12) y día del año (1-366) del cumpleaños; 0 si no se puede leer
+    - recuerdos:  cantidad de recuerdos
+    - gustos:     ids de gusto de cada amigo en formato CSR (ver _csrGustos): un
+                  arreglo plano con los ids de todas las filas seguidas y el
+                  inicio de cada fila, así cada amigo ocupa solo sus gustos
+
+    Igual que IndicesAmigos, es un observador: el gestor avisa cada cambio con
+    actualizar() y el espejo se corrige en el lugar (agregar al final, eliminar
+    moviendo la última fila al hueco). Si se reemplaza la lista completa queda
+    obsoleto y se reconstruye en el siguiente cálculo.
+
+    Las filas se identifican por nombre y no se guardan los objetos Amigo, así
+    que con GestorDisco el espejo no retiene en memoria a todos los amigos.
+    """
+
+    def __init__(self):
+        if np is None:
+            raise RuntimeError("NumPy no está instalado (pip install numpy)")
+        self.candado = threading.Lock()
+        self.gustos_ids = {}
+        self.gustos_nombres = []
+        self.nombres = []
+        self.filas = {}
+        # Gustos de cada fila (tuplas de ids) y su versión CSR, armada al calcular
+        self.gustos_filas = []
+        self.csr = None
+        self.total = 0
+        self.obsoleto = True
+        self._reservar(0)
+
+    @staticmethod
+    def disponible():
+        """Indica si NumPy está instalado"""
+        return np is not None
+
+    @staticmethod
+    def fechaDe(amigo):
+        """Retorna (mes, día del año) del cumpleaños (formato dd/mm/aaaa) o (0, 0)"""
+        partes = str(amigo.cumpleanos).split("/")
+        if len(partes) < 2:
+            return 0, 0
+        try:
+            dia = int(partes[0])
+            mes = int(partes[1])
+        except ValueError:
+            return 0, 0
+        if not 1 <= mes <= 12 or not 1 <= dia <= 31:
+            return 0, 0
+        return mes, DIAS_ACUMULADOS[mes] + dia
+
+    def _idGusto(self, gusto):
+        identificador = self.gustos_ids.get(gusto)
+        if identificador is None:
+            identificador = len(self.gustos_nombres)
+            self.gustos_ids[gusto] = identificador
+            self.gustos_nombres.append(gusto)
+        return identificador
+
+    def _valores(self, amigo):
+        """Retorna los datos de la fila de un amigo"""
+        mes, dia = ColumnasAmigos.fechaDe(amigo)
+        es_cercano = type(amigo).__name__ == "AmigoCercano"
+        confianza = float(amigo.nivelConfianza) if es_cercano else float("nan")
+        # Sin repetidos: un gusto cuenta una vez por amigo
+        gustos = [self._idGusto(gusto) for gusto in dict.fromkeys(amigo.gustos or [])]
+        return (TIPOS.get(type(amigo).__name__, 0), confianza, mes, dia,
+                amigo.recuerdos.contarRecuerdos(), gustos)
+
+    def _reservar(self, capacidad):
+        """Crea los arreglos vacíos con lugar para capacidad filas"""
+        self.tipo = np.zeros(capacidad, dtype=np.int8)
+        self.confianza = np.full(capacidad, np.nan, dtype=np.float32)
+        self.mes = np.zeros(capacidad, dtype=np.int8)
+        self.dia = np.zeros(capacidad, dtype=np.int16)
+        self.recuerdos = np.zeros(capacidad, dtype=np.int32)
+
+    def _crecer(self, filas):
+        """Agranda los arreglos (al doble) si no alcanzan para filas filas"""
+        capacidad = len(self.tipo)
+        if filas <= capacidad:
+            return
+        anteriores = (self.tipo, self.confianza, self.mes, self.dia, self.recuerdos)
+        self._reservar(max(filas, capacidad * 2, 16))
+        n = self.total
+        for nuevo, anterior in zip((self.tipo, self.confianza, self.mes, self.dia, self.recuerdos),
+                                   anteriores):
+            nuevo[:n] = anterior[:n]
+
+    def _escribirFila(self, fila, valores):
+        tipo, confianza, mes, dia, recuerdos, gustos = valores
+        self._crecer(fila + 1)
+        self.tipo[fila] = tipo
+        self.confianza[fila] = confianza
+        self.mes[fila] = mes
+        self.dia[fila] = dia
+        self.recuerdos[fila] = recuerdos
+        if fila == len(self.gustos_filas):
+            self.gustos_filas.append(tuple(gustos))
+        else:
+            self.gustos_filas[fila] = tuple(gustos)
+        self.csr = None
+
+    def _csrGustos(self):
+        """
+        Retorna los gustos de todas las filas en formato CSR: (inicios, ids).
+
+        Los ids de la fila f son ids[inicios[f]:inicios[f + 1]]. Se arma una vez
+        por cambio (no por cálculo) y ocupa lo mismo que la cantidad total de
+        gustos, sin el relleno de una matriz tan ancha como el amigo con más gustos.
+        """
+        if self.csr is None:
+            longitudes = np.fromiter((len(gustos) for gustos in self.gustos_filas),
+                                     dtype=np.int64, count=len(self.gustos_filas))
+            inicios = np.zeros(len(longitudes) + 1, dtype=np.int64)
+            np.cumsum(longitudes, out=inicios[1:])
+            ids = np.fromiter((gusto for gustos in self.gustos_filas for gusto in gustos),
+                              dtype=np.int32, count=int(inicios[-1]))
+            self.csr = (inicios, ids)
+        return self.csr
+
+    def reconstruir(self, amigos):
+        """Arma todas las columnas desde cero a partir de la lista de amigos"""
+        self.gustos_ids = {}
+        self.gustos_nombres = []
+        self.nombres = []
+        self.filas = {}
+        columnas = ([], [], [], [], [], [])
+        for amigo in amigos:
+            if amigo.nombre in self.filas:
+                # Nombre repetido: queda una sola fila (la última versión)
+                self.nombres[self.filas[amigo.nombre]] = None
+            self.filas[amigo.nombre] = len(self.nombres)
+            self.nombres.append(amigo.nombre)
+            for columna, valor in zip(columnas, self._valores(amigo)):
+                columna.append(valor)
+
+        n = len(self.nombres)
+        self._reservar(n)
+        self.tipo[:] = columnas[0]
+        self.confianza[:] = columnas[1]
+        self.mes[:] = columnas[2]
+        self.dia[:] = columnas[3]
+        self.recuerdos[:] = columnas[4]
+        self.gustos_filas = [tuple(gustos) for gustos in columnas[5]]
+        self.csr = None
+        self.total = n
+        self.obsoleto = False
+        # Quitar las filas de los nombres repetidos
+        for fila in range(n - 1, -1, -1):
+            if self.nombres[fila] is None:
+                self._quitarFila(fila)
+
+    def actualizar(self, evento, amigo):
+        """
+        Recibe un cambio del gestor.
+        evento: "agregar", "eliminar", "recuerdo" o "reemplazar"
+        """
+        with self.candado:
+            if self.obsoleto:
+                return
+            if evento == "agregar":
+                fila = self.filas.get(amigo.nombre)
+                if fila is not None:
+                    self._escribirFila(fila, self._valores(amigo))
+                else:
+                    self._escribirFila(self.total, self._valores(amigo))
+                    self.filas[amigo.nombre] = self.total
+                    self.nombres.append(amigo.nombre)
+                    self.total = self.total + 1
+            elif evento == "eliminar":
+                fila = self.filas.pop(amigo.nombre, None)
+                if fila is not None:
+                    self._quitarFila(fila)
+            elif evento == "recuerdo":
+                fila = self.filas.get(amigo.nombre)
+                if fila is not None:
+                    self.recuerdos[fila] = amigo.recuerdos.contarRecuerdos()
+            elif evento == "reemplazar":
+                self.obsoleto = True
+
+    def _quitarFila(self, fila):
+        """Quita una fila moviendo la última a su lugar"""
+        ultima = self.total - 1
+        if fila != ultima:
+            movido = self.nombres[ultima]
+            self.nombres[fila] = movido
+            if movido is not None:
+                self.filas[movido] = fila
+            for columna in (self.tipo, self.confianza, self.mes, self.dia, self.recuerdos,
+                            self.gustos_filas):
+                columna[fila] = columna[ultima]
+        self.nombres.pop()
+        self.gustos_filas.pop()
+        self.csr = None
+        self.total = ultima
+
+    def calcular(self, obtener_amigos, top_gustos=10):
+        """
+        Calcula los agregados con operaciones vectorizadas sobre las columnas.
+
+        Args:
+            obtener_amigos (callable): Retorna la lista completa (solo para reconstruir)
+            top_gustos (int): Cantidad de gustos y pares de gustos más frecuentes
+
+        Returns:
+            dict: Agregados de confianza, cumpleaños, recuerdos y gustos
+        """
+        with self.candado:
+            reconstruido = self.obsoleto
+            if self.obsoleto:
+                self.reconstruir(obtener_amigos())
+
+            n = self.total
+            tipo = self.tipo[:n]
+            cercanos = tipo == TIPOS["AmigoCercano"]
+            return {
+                "total": n,
+                "amigos_regulares": int(n - np.count_nonzero(cercanos)),
+                "amigos_cercanos": int(np.count_nonzero(cercanos)),
+                "confianza": self._resumenConfianza(self.confianza[:n][cercanos]),
+                "cumpleanos": self._resumenCumpleanos(self.mes[:n], self.dia[:n]),
+                "recuerdos": self._resumenRecuerdos(self.recuerdos[:n]),
+                "gustos": self._resumenGustos(*self._csrGustos(), top_gustos),
+                "reconstruido": reconstruido
+            }
+
+    @staticmethod
+    def _resumenConfianza(confianza):
+        if confianza.size == 0:
+            return {"promedio": None, "minimo": None, "maximo": None, "distribucion": {}}
+        valores, cantidades = np.unique(confianza, return_counts=True)
+        return {
+            "promedio": round(float(confianza.mean()), 3),
+            "minimo": float(confianza.min()),
+            "maximo": float(confianza.max()),
+            "distribucion": {("%g" % valor): int(cantidad) for valor, cantidad in zip(valores, cantidades)}
+        }
+
+    @staticmethod
+    def _resumenCumpleanos(mes, dia, dias_proximos=30):
+        por_mes = np.bincount(mes, minlength=13)
+        hoy = datetime.date.today()
+        dia_hoy = DIAS_ACUMULADOS[hoy.month] + hoy.day
+        # Distancia en días hasta el próximo cumpleaños (el año se trata como bisiesto)
+        distancia = (dia.astype(np.int32) - dia_hoy) % 366
+        return {
+            "por_mes": {str(numero): int(por_mes[numero]) for numero in range(1, 13)},
+            "sin_fecha": int(por_mes[0]),
+            "proximos_%d_dias" % dias_proximos: int(np.count_nonzero((dia > 0) & (distancia < dias_proximos)))
+        }
+
+    @staticmethod
+    def _resumenRecuerdos(recuerdos):
+        if recuerdos.size == 0:
+            return {"total": 0, "promedio": None, "maximo": None, "percentiles": {}}
+        valores = np.percentile(recuerdos, PERCENTILES)
+        return {
+            "total": int(recuerdos.sum()),
+            "promedio": round(float(recuerdos.mean()), 3),
+            "maximo": int(recuerdos.max()),
+            "percentiles": {"p%d" % p: float(valor) for p, valor in zip(PERCENTILES, valores)}
+        }
+
+    def _resumenGustos(self, inicios, ids, top):
+        cantidad = len(self.gustos_nombres)
+        if cantidad == 0 or ids.size == 0:
+            return {"distintos": cantidad, "frecuentes": [], "pares_frecuentes": []}
+
+        frecuencias = np.bincount(ids, minlength=cantidad)
+        orden = np.argsort(-frecuencias, kind="stable")[:top]
+        frecuentes = [{"gusto": self.gustos_nombres[i], "amigos": int(frecuencias[i])}
+                      for i in orden if frecuencias[i] > 0]
+
+        # Co-ocurrencia: cada posición del arreglo plano se empareja con las que le
+        # siguen dentro de su misma fila. Se arman todos los pares de una vez con
+        # repeat (tantos como pares existen, sin recorrer columnas de relleno) y se
+        # codifican como menor * cantidad + mayor
+        posiciones = np.arange(ids.size, dtype=np.int64)
+        filas = np.repeat(np.arange(len(inicios) - 1), np.diff(inicios))
+        siguientes = inicios[1:][filas] - posiciones - 1
+        total_pares = int(siguientes.sum())
+
+        pares = []
+        if total_pares:
+            primeros = np.repeat(posiciones, siguientes)
+            desplazamiento = np.repeat(np.cumsum(siguientes) - siguientes, siguientes)
+            segundos = np.arange(total_pares, dtype=np.int64) - desplazamiento + primeros + 1
+            a = ids[primeros].astype(np.int64)
+            b = ids[segundos].astype(np.int64)
+            codigos = np.minimum(a, b) * cantidad + np.maximum(a, b)
+            unicos, cuentas = np.unique(codigos, return_counts=True)
+            for posicion in np.argsort(-cuentas, kind="stable")[:top]:
+                menor, mayor = divmod(int(unicos[posicion]), cantidad)
+                pares.append({"gustos": [self.gustos_nombres[menor], self.gustos_nombres[mayor]],
+                              "amigos": int(cuentas[posicion])})
+
+        return {"distintos": cantidad, "frecuentes": frecuentes, "pares_frecuentes": pares}
@@ -0,0 +1,438 @@
+import hashlib
+import json
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter, deque
+
+
+# Similitud mínima (Jaccard de trigramas) para considerar casi iguales dos recuerdos
+UMBRAL_CASI = 0.8
+
+# Con más recuerdos distintos que esto, un amigo solo se revisa por recuerdos exactos
+MAX_RECUERDOS_CASI = 2000
+
+# Avisos recientes que se recuerdan
+MAX_AVISOS = 200
+
+# Prefijos que Recuerdo.agregarRecuerdo antepone a cada texto
+PREFIJOS_RECUERDO = ("[Regular] ", "[Cercano] ")
+
+_NO_ALFANUMERICO = re.compile(r"[^\w]+")
+
+
+def normalizarTexto(texto):
+    """Texto comparable: sin prefijo de recuerdo, sin acentos ni signos, en minúsculas"""
+    texto = str(texto)
+    for prefijo in PREFIJOS_RECUERDO:
+        if texto.startswith(prefijo):
+            texto = texto[len(prefijo):]
+            break
+    descompuesto = unicodedata.normalize("NFKD", texto)
+    sin_acentos = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return _NO_ALFANUMERICO.sub(" ", sin_acentos.casefold()).strip()
+
+
+def claveNombre(nombre):
+    return normalizarTexto(nombre)
+
+
+def huellaContenido(amigo):
+    """
+    Huella del contenido normalizado de un amigo (todo menos el nombre).
+
+    Dos amigos con la misma huella tienen el mismo tipo, cumpleaños, gustos,
+    recuerdos, anécdotas y confianza, sin importar el orden ni mayúsculas.
+    """
+    contenido = [
+        type(amigo).__name__,
+        str(amigo.cumpleanos).strip(),
+        sorted({normalizarTexto(gusto) for gusto in amigo.gustos or []}),
+        sorted({normalizarTexto(texto) for texto in amigo.recuerdos.recuerdos}),
+        sorted({normalizarTexto(texto) for texto in getattr(amigo, "anecdotas", None) or []}),
+        getattr(amigo, "nivelConfianza", None)
+    ]
+    dato = json.dumps(contenido, ensure_ascii=False).encode('utf-8')
+    return hashlib.blake2b(dato, digest_size=16).hexdigest()
+
+
+def trigramas(texto):
+    texto = " " + texto + " "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def recuerdosRepetidos(textos, casi=True):
+    """
+    Agrupa los recuerdos repetidos de un amigo.
+
+    Se conserva siempre la ocurrencia más reciente (la última), así el último id
+    de recuerdo no cambia y los clientes que piden "desde" un id no se confunden.
+
+    Args:
+        textos (list): Recuerdos del amigo, en orden
+        casi (bool): Si también se agrupan los casi iguales (si no, solo los exactos)
+
+    Returns:
+        list: Grupos {"conservar": índice, "quitar": [índices], "tipo": "exacto"|"casi"}
+    """
+    # Recuerdos exactos (después de normalizar): índices por texto
+    por_texto = {}
+    for indice, texto in enumerate(textos):
+        por_texto.setdefault(normalizarTexto(texto), []).append(indice)
+
+    # Casi iguales: los textos distintos se unen en grupos (unión-búsqueda)
+    padres = {texto: texto for texto in por_texto}
+
+    def raiz(texto):
+        while padres[texto] != texto:
+            padres[texto] = padres[padres[texto]]
+            texto = padres[texto]
+        return texto
+
+    if casi and len(por_texto) <= MAX_RECUERDOS_CASI:
+        # Filtro de prefijos: con los trigramas de cada texto ordenados de menos a
+        # más frecuentes, dos textos con Jaccard >= UMBRAL_CASI comparten al menos
+        # uno de sus primeros |t| - ceil(UMBRAL_CASI * |t|) + 1 trigramas. Solo se
+        # comparan los que comparten alguno y tienen tamaños compatibles
+        distintos = list(por_texto)
+        conjuntos = [trigramas(texto) for texto in distintos]
+        frecuencias = Counter(trigrama for conjunto in conjuntos for trigrama in conjunto)
+        por_trigrama = {}
+        for i, conjunto in enumerate(conjuntos):
+            ordenados = sorted(conjunto, key=lambda trigrama: (frecuencias[trigrama], trigrama))
+            prefijo = ordenados[:len(ordenados) - math.ceil(UMBRAL_CASI * len(ordenados)) + 1]
+            candidatos = set()
+            for trigrama in prefijo:
+                candidatos.update(por_trigrama.get(trigrama, ()))
+                por_trigrama.setdefault(trigrama, []).append(i)
+            for j in candidatos:
+                if raiz(distintos[j]) == raiz(distintos[i]):
+                    continue
+                menor, mayor = sorted((len(conjuntos[j]), len(conjunto)))
+                if menor >= UMBRAL_CASI * mayor and jaccard(conjuntos[j], conjunto) >= UMBRAL_CASI:
+                    padres[raiz(distintos[i])] = raiz(distintos[j])
+
+    grupos = {}
+    for texto, indices in por_texto.items():
+        grupos.setdefault(raiz(texto), []).append((texto, indices))
+
+    resultado = []
+    for miembros in grupos.values():
+        indices = sorted(indice for _, lista in miembros for indice in lista)
+        if len(indices) < 2:
+            continue
+        resultado.append({
+            "conservar": indices[-1],
+            "quitar": indices[:-1],
+            "tipo": "exacto" if len(miembros) == 1 else "casi"
+        })
+    return resultado
+
+
+def recuerdoRepetido(existentes, texto):
+    """
+    Revisa si un recuerdo nuevo repite uno de los existentes.
+
+    Los exactos se buscan en todos; los casi iguales, en los MAX_RECUERDOS_CASI más recientes.
+
+    Returns:
+        tuple o None: ("exacto" o "casi", recuerdo existente)
+    """
+    normalizado = normalizarTexto(texto)
+    for existente in existentes:
+        if normalizarTexto(existente) == normalizado:
+            return "exacto", existente
+
+    nuevos = trigramas(normalizado)
+    for existente in existentes[-MAX_RECUERDOS_CASI:]:
+        if jaccard(nuevos, trigramas(normalizarTexto(existente))) >= UMBRAL_CASI:
+            return "casi", existente
+    return None
+
+
+class DuplicadosAmigos:
+    """
+    Detecta amigos duplicados mientras se agregan y en revisiones completas.
+
+    - por_nombre:  nombre normalizado (sin acentos ni mayúsculas) → {nombre: None}
+    - por_huella:  huella del contenido normalizado → {nombre: None}
+    - cantidades:  nombre exacto → cuántos amigos lo tienen (normalmente 1)
+
+    Se guarda por nombre, sin los objetos Amigo: con GestorDisco cada lectura
+    materializa una copia nueva y el detector no retiene a todos los amigos.
+
+    Igual que IndicesAmigos, es un observador: cada amigo agregado se compara
+    contra los índices (costo constante) y, si choca, queda un aviso. Cuando un
+    amigo recibe un recuerdo solo se anota; su huella se recalcula en la
+    siguiente revisión, así una carga masiva de recuerdos no la recalcula cada vez.
+    """
+
+    def __init__(self):
+        self.por_nombre = {}
+        self.por_huella = {}
+        self.claves = {}
+        self.cantidades = {}
+        self.pendientes = {}
+        self.avisos = deque(maxlen=MAX_AVISOS)
+        self.candado = threading.Lock()
+        self.obsoleto = True
+
+    def reconstruir(self, amigos):
+        self.por_nombre = {}
+        self.por_huella = {}
+        self.claves = {}
+        self.cantidades = {}
+        self.pendientes = {}
+        for amigo in amigos:
+            self._indexar(amigo)
+        self.obsoleto = False
+
+    def _indexar(self, amigo):
+        # Con nombres exactos repetidos se cuenta cada uno, pero la huella es la del
+        # primero (el que encuentra buscarAmigo)
+        nombre = amigo.nombre
+        self.cantidades[nombre] = self.cantidades.get(nombre, 0) + 1
+        if nombre in self.claves:
+            return
+        clave = claveNombre(nombre)
+        huella = huellaContenido(amigo)
+        self.claves[nombre] = (clave, huella)
+        self.por_nombre.setdefault(clave, {})[nombre] = None
+        self.por_huella.setdefault(huella, {})[nombre] = None
+
+    def _quitarHuella(self, nombre):
+        clave, huella = self.claves.pop(nombre)
+        for indice, valor in ((self.por_nombre, clave), (self.por_huella, huella)):
+            grupo = indice.get(valor)
+            if grupo is not None:
+                grupo.pop(nombre, None)
+                if not grupo:
+                    del indice[valor]
+
+    def _desindexar(self, amigo):
+        nombre = amigo.nombre
+        cantidad = self.cantidades.get(nombre, 0)
+        if cantidad == 0:
+            return
+        if cantidad > 1:
+            # No se sabe cuál de los homónimos quedó: se arma de nuevo en la siguiente revisión
+            self.obsoleto = True
+            return
+        del self.cantidades[nombre]
+        self._quitarHuella(nombre)
+
+    def _aplicarPendientes(self):
+        for nombre, amigo in self.pendientes.items():
+            if nombre in self.claves:
+                cantidad = self.cantidades[nombre]
+                self._quitarHuella(nombre)
+                del self.cantidades[nombre]
+                self._indexar(amigo)
+                self.cantidades[nombre] = cantidad
+        self.pendientes = {}
+
+    def _prepararConsulta(self, obtener_amigos):
+        if self.obsoleto:
+            self.reconstruir(obtener_amigos())
+        self._aplicarPendientes()
+
+    def revisar(self, obtener_amigos, amigo):
+        """
+        Retorna los avisos de duplicado de un amigo contra los ya indexados (sin indexarlo).
+
+        Args:
+            obtener_amigos (callable): Retorna la lista completa (solo para reconstruir)
+            amigo (Amigo): Amigo a revisar (ej: uno que se va a agregar)
+
+        Returns:
+            list: Avisos {"tipo": "nombre"|"contenido", "nombre", "con": [nombres]}
+        """
+        with self.candado:
+            self._prepararConsulta(obtener_amigos)
+            return self._avisosDe(amigo)
+
+    def _avisosDe(self, amigo):
+        avisos = []
+        mismos_nombres = list(self.por_nombre.get(claveNombre(amigo.nombre), {}))
+        if mismos_nombres:
+            avisos.append({"tipo": "nombre", "nombre": amigo.nombre, "con": mismos_nombres})
+        mismo_contenido = [nombre for nombre in self.por_huella.get(huellaContenido(amigo), {})
+                           if nombre != amigo.nombre]
+        if mismo_contenido:
+            avisos.append({"tipo": "contenido", "nombre": amigo.nombre, "con": mismo_contenido})
+        return avisos
+
+    def actualizar(self, evento, amigo):
+        """
+        Recibe un cambio del gestor.
+        evento: "agregar", "eliminar", "recuerdo" o "reemplazar"
+        """
+        with self.candado:
+            if self.obsoleto:
+                return
+            if evento == "agregar":
+                self.avisos.extend(self._avisosDe(amigo))
+                self._indexar(amigo)
+            elif evento == "eliminar":
+                self.pendientes.pop(amigo.nombre, None)
+                self._desindexar(amigo)
+            elif evento == "recuerdo":
+                self.pendientes[amigo.nombre] = amigo
+            elif evento == "reemplazar":
+                self.obsoleto = True
+
+    def reporte(self, obtener_amigos, recuerdos=True):
+        """
+        Revisión completa: grupos de nombres repetidos, de contenido idéntico y
+        recuerdos repetidos dentro de cada amigo.
+
+        Args:
+            obtener_amigos (callable): Retorna la lista completa
+            recuerdos (bool): Si también se revisan los recuerdos de cada amigo
+
+        Returns:
+            dict: Grupos encontrados y totales
+        """
+        with self.candado:
+            self._prepararConsulta(obtener_amigos)
+            nombres = []
+            for grupo in self.por_nombre.values():
+                homonimos = [nombre for nombre in grupo for _ in range(self.cantidades[nombre])]
+                if len(homonimos) > 1:
+                    nombres.append(homonimos)
+            contenidos = [list(grupo) for grupo in self.por_huella.values() if len(grupo) > 1]
+            avisos = list(self.avisos)
+
+        repetidos = []
+        total_recuerdos = 0
+        total_exactos = 0
+        if recuerdos:
+            for amigo in obtener_amigos():
+                grupos = recuerdosRepetidos(amigo.recuerdos.recuerdos)
+                if grupos:
+                    sobrantes = sum(len(grupo["quitar"]) for grupo in grupos)
+                    total_recuerdos = total_recuerdos + sobrantes
+                    exactos = recuerdosRepetidos(amigo.recuerdos.recuerdos, False)
+                    total_exactos = total_exactos + sum(len(grupo["quitar"]) for grupo in exactos)
+                    repetidos.append({
+                        "nombre": amigo.nombre,
+                        "sobrantes": sobrantes,
+                        "grupos": [[amigo.recuerdos.recuerdos[i] for i in grupo["quitar"] + [grupo["conservar"]]]
+                                   for grupo in grupos]
+                    })
+
+        return {
+            "nombres_repetidos": nombres,
+            "contenido_identico": contenidos,
+            "recuerdos_repetidos": repetidos,
+            "totales": {
+                "grupos_nombre": len(nombres),
+                "amigos_sobrantes_nombre": sum(len(grupo) - 1 for grupo in nombres),
+                "grupos_contenido": len(contenidos),
+                "recuerdos_sobrantes": total_recuerdos,
+                # Los que quita fusionarDuplicados sin casi=True
+                "recuerdos_sobrantes_exactos": total_exactos
+            },
+            "avisos_recientes": avisos
+        }
+
+
+def _unir(primera, segunda):
+    """Une dos listas de textos sin repetir (comparando normalizados) y conservando el orden"""
+    vistos = {normalizarTexto(texto) for texto in primera}
+    resultado = list(primera)
+    for texto in segunda:
+        clave = normalizarTexto(texto)
+        if clave not in vistos:
+            vistos.add(clave)
+            resultado.append(texto)
+    return resultado
+
+
+def _absorber(base, otro):
+    """Pasa a base los gustos, anécdotas, recuerdos y confianza de otro amigo"""
+    base.gustos = _unir(base.gustos or [], otro.gustos or [])
+    if hasattr(base, "anecdotas"):
+        base.anecdotas = _unir(base.anecdotas or [], getattr(otro, "anecdotas", None) or [])
+    if hasattr(base, "nivelConfianza") and getattr(otro, "nivelConfianza", None) is not None:
+        base.nivelConfianza = max(base.nivelConfianza, otro.nivelConfianza)
+    base.recuerdos.incorporar(otro.recuerdos)
+
+
+def fusionarDuplicados(amigos, recuerdos=True, casi=False, parecidos=False):
+    """
+    Une los amigos con el mismo nombre y quita los recuerdos repetidos.
+
+    De cada grupo queda el primer amigo cercano (o el primero, si no hay
+    cercanos), en el lugar del primero del grupo, con los gustos, anécdotas y
+    recuerdos de todos y la confianza más alta. Los amigos con contenido
+    idéntico pero distinto nombre no se unen: pueden ser personas distintas.
+
+    Solo se unen los nombres exactamente iguales. Los que solo coinciden al
+    normalizar ("José" y "Jose", "Ana-María" y "Ana María") pueden ser personas
+    distintas y una unión no se deshace: se informan en "posibles_duplicados"
+    y se unen solo con parecidos=True.
+
+    Solo se quitan los recuerdos exactamente iguales (después de normalizar).
+    Los casi iguales ("el lunes 3 de marzo" y "el lunes 4 de marzo") suelen
+    ser recuerdos distintos: el reporte los muestra y se quitan solo con casi=True.
+
+    Args:
+        amigos (iterable): Amigos actuales (se modifican en el lugar)
+        recuerdos (bool): Si también se quitan los recuerdos repetidos de cada amigo
+        casi (bool): Si además se quitan los casi iguales
+        parecidos (bool): Si también se unen los nombres iguales al normalizar
+
+    Returns:
+        tuple: (lista nueva de amigos, resumen de lo hecho,
+                (amigos absorbidos, amigos conservados que cambiaron))
+    """
+    grupos = {}
+    for amigo in amigos:
+        clave = claveNombre(amigo.nombre) if parecidos else amigo.nombre
+        grupos.setdefault(clave, []).append(amigo)
+
+    # Nombres distintos que coinciden al normalizar y no se unieron
+    posibles = {}
+    if not parecidos:
+        for nombre in grupos:
+            posibles.setdefault(claveNombre(nombre), []).append(nombre)
+
+    resultado = []
+    absorbidos_todos = []
+    cambiados = []
+    resumen = {"amigos_unidos": 0, "recuerdos_quitados": 0, "uniones": []}
+    for grupo in grupos.values():
+        base = grupo[0]
+        if len(grupo) > 1:
+            base = next((amigo for amigo in grupo if type(amigo).__name__ == "AmigoCercano"), grupo[0])
+            absorbidos = [otro for otro in grupo if otro is not base]
+            for otro in absorbidos:
+                _absorber(base, otro)
+            absorbidos_todos.extend(absorbidos)
+            cambiados.append(base)
+            resumen["amigos_unidos"] = resumen["amigos_unidos"] + len(absorbidos)
+            resumen["uniones"].append({"conservado": base.nombre,
+                                       "absorbidos": [otro.nombre for otro in absorbidos]})
+
+        if recuerdos:
+            quitar = [indice for grupo_recuerdos in recuerdosRepetidos(base.recuerdos.recuerdos, casi)
+                      for indice in grupo_recuerdos["quitar"]]
+            if quitar:
+                base.recuerdos.quitarRecuerdos(quitar)
+                resumen["recuerdos_quitados"] = resumen["recuerdos_quitados"] + len(quitar)
+                if not cambiados or cambiados[-1] is not base:
+                    cambiados.append(base)
+
+        resultado.append(base)
+
+    resumen["amigos_resultantes"] = len(resultado)
+    resumen["posibles_duplicados"] = [nombres for nombres in posibles.values() if len(nombres) > 1]
+    return resultado, resumen, (absorbidos_todos, cambiados)
@@ -1,14 +1,74 @@
+from IndicesAmigos import IndicesAmigos
+from ColumnasAmigos import ColumnasAmigos
+from SimilitudAmigos import SimilitudAmigos
+from DuplicadosAmigos import DuplicadosAmigos, fusionarDuplicados
+
+
 class GestorAmigos:
     
     def __init__(self, amigos, manipulador):
+        self._iniciarEstado(manipulador)
         self.amigos = amigos
+    
+    def _iniciarEstado(self, manipulador, indices=True):
+        # Estado común a todos los gestores (también GestorFragmentado y GestorDisco,
+        # que guardan los amigos a su manera): observadores y estructuras derivadas
+        self.observadores = []
+        self.indices = None
+        if indices:
+            self.indices = IndicesAmigos()
+            self.agregarObservador(self.indices)
+        self.columnas = None
+        self.similitud = None
+        self.duplicados = None
         self.manipulador = manipulador
     
+    @property
+    def amigos(self):
+        return self._amigos
+    
+    @amigos.setter
+    def amigos(self, lista):
+        # Reemplazar la lista completa invalida los índices y demás observadores
+        self._amigos = lista
+        self._notificar("reemplazar", None)
+    
+    def agregarObservador(self, observador):
+        # Un observador tiene un método actualizar(evento, amigo) y se entera de cada cambio
+        self.observadores.append(observador)
+    
+    def _notificar(self, evento, amigo):
+        for observador in self.observadores:
+            observador.actualizar(evento, amigo)
+    
     def agregarAmigo(self, amigo):
         self.amigos.append(amigo)
+        self._notificar("agregar", amigo)
         print("✓ Amigo agregado: " + amigo.obtenerNombre())
         return amigo
     
+    def agregarVarios(self, amigos):
+        # Carga masiva: igual que agregarAmigo pero con un solo mensaje al final
+        for amigo in amigos:
+            self.amigos.append(amigo)
+            self._notificar("agregar", amigo)
+        print("✓ " + str(len(amigos)) + " amigos agregados")
+        return len(amigos)
+    
+    def reemplazarVarios(self, nuevos):
+        # nuevos: {nombre: amigo}; cada amigo ocupa el lugar del que tenía ese nombre
+        reemplazados = 0
+        amigos = self.amigos
+        for i in range(len(amigos)):
+            nuevo = nuevos.get(amigos[i].obtenerNombre())
+            if nuevo is not None and nuevo is not amigos[i]:
+                anterior = amigos[i]
+                amigos[i] = nuevo
+                self._notificar("eliminar", anterior)
+                self._notificar("agregar", nuevo)
+                reemplazados = reemplazados + 1
+        return reemplazados
+    
     def buscarAmigo(self, nombre):
         for amigo in self.amigos:
             nombre_amigo = amigo.obtenerNombre()
@@ -16,22 +76,113 @@ class GestorAmigos:
                 return amigo
         return None
     
+    def buscarVarios(self, nombres):
+        # Una sola pasada por la lista para resolver muchos nombres a la vez
+        pendientes = set(nombres)
+        encontrados = {}
+        for amigo in self.amigos:
+            if not pendientes:
+                break
+            nombre_amigo = amigo.obtenerNombre()
+            if nombre_amigo in pendientes:
+                encontrados[nombre_amigo] = amigo
+                pendientes.discard(nombre_amigo)
+        return encontrados
+    
     def eliminarAmigo(self, nombre):
         amigo = self.buscarAmigo(nombre)
         if amigo:
             self.amigos.remove(amigo)
+            self._notificar("eliminar", amigo)
             print("✓ Amigo eliminado: " + nombre)
             return True
         else:
             print("✗ No se encontró el amigo: " + nombre)
             return False
     
+    def agregarRecuerdo(self, nombre, nuevo_recuerdo):
+        amigo = self.buscarAmigo(nombre)
+        if amigo:
+            return self.agregarRecuerdoAmigo(amigo, nuevo_recuerdo)
+        return None
+    
+    def agregarRecuerdoAmigo(self, amigo, nuevo_recuerdo):
+        # Para cuando el amigo ya se buscó antes (ej: carga masiva)
+        resultado = amigo.agregarRecuerdo(nuevo_recuerdo)
+        self._notificar("recuerdo", amigo)
+        return resultado
+    
+    def aplicarRecuerdo(self, amigo, entrada):
+        # Aplica un recuerdo ya registrado ({id, texto, fecha}); se ignora si ya estaba
+        if amigo.recuerdos.aplicarEntrada(entrada):
+            self._notificar("recuerdo", amigo)
+            return True
+        return False
+    
+    def filtrarAmigos(self, tipo=None, confianza_min=None, confianza_max=None,
+                      mes=None, min_recuerdos=None):
+        # Usa los índices secundarios; retorna (amigos, plan de la consulta)
+        return self.indices.consultar(lambda: self.amigos, tipo, confianza_min, confianza_max,
+                                      mes, min_recuerdos)
+    
+    def ordenarAmigos(self, orden, limite=None, descendente=None):
+        # orden: "confianza", "recuerdos" o "nombre"; se lee del índice ya ordenado
+        return self.indices.ordenar(lambda: self.amigos, orden, limite, descendente)
+    
+    def calcularAnalitica(self, top_gustos=10):
+        # El espejo columnar (NumPy) se crea en la primera consulta y desde ahí sigue cada cambio
+        if self.columnas is None:
+            self.columnas = ColumnasAmigos()
+            self.agregarObservador(self.columnas)
+        return self.columnas.calcular(lambda: self.amigos, top_gustos)
+    
+    def buscarSimilares(self, nombre, limite=10):
+        # Igual que la analítica: las firmas MinHash se calculan en la primera consulta
+        if self.similitud is None:
+            self.similitud = SimilitudAmigos()
+            self.agregarObservador(self.similitud)
+        return self.similitud.similares(lambda: self.amigos, nombre, limite)
+    
+    def _detectorDuplicados(self):
+        # Igual que las firmas: se arma recién cuando alguien lo usa
+        if self.duplicados is None:
+            self.duplicados = DuplicadosAmigos()
+            self.agregarObservador(self.duplicados)
+        return self.duplicados
+    
+    def duplicadosDe(self, amigo):
+        # Avisos de duplicado de un amigo que todavía no se agregó (nombre o contenido repetido)
+        return self._detectorDuplicados().revisar(lambda: self.amigos, amigo)
+    
+    def reporteDuplicados(self, recuerdos=True):
+        return self._detectorDuplicados().reporte(lambda: self.amigos, recuerdos)
+    
+    def fusionarDuplicados(self, recuerdos=True, casi=False, parecidos=False):
+        # Une homónimos exactos y quita recuerdos repetidos (los casi iguales solo
+        # con casi=True, los nombres iguales al normalizar solo con parecidos=True);
+        # retorna el resumen de lo hecho.
+        # Además de "reemplazar", se avisa cada amigo quitado o cambiado: los
+        # observadores que llevan un historial de cambios no se enteran de otra forma
+        lista, resumen, (absorbidos, cambiados) = fusionarDuplicados(list(self.amigos), recuerdos, casi,
+                                                                        parecidos)
+        if absorbidos or cambiados:
+            self.amigos = lista
+            for amigo in absorbidos:
+                self._notificar("eliminar", amigo)
+            for amigo in cambiados:
+                self._notificar("agregar", amigo)
+        return resumen
+    
     def obtenerAmigos(self):
         return self.amigos
     
     def contarAmigos(self):
         return len(self.amigos)
     
+    def contarResidentes(self):
+        # Amigos que ocupan memoria ahora (sin cargar nada del disco)
+        return len(self._amigos)
+    
     def generarLista(self):
         if not self.amigos:
             return "No hay amigos registrados."
@@ -51,18 +202,13 @@ class GestorAmigos:
         if not self.amigos:
             return "No hay notificaciones."
         
-        notificaciones = "\n" + "="*50 + "\n"
-        notificaciones = notificaciones + "        NOTIFICACIONES\n"
-        notificaciones = notificaciones + "="*50 + "\n\n"
-        
-        i = 0
-        while i < len(self.amigos):
-            amigo = self.amigos[i]
-            notif = self.manipulador.formatearNotificacion(amigo)
-            notificaciones = notificaciones + "• " + notif + "\n"
-            i = i + 1
+        # Se arma una lista y se une una sola vez: sumar strings en un ciclo copia
+        # todo el texto acumulado en cada vuelta
+        partes = ["\n" + "="*50 + "\n", "        NOTIFICACIONES\n", "="*50 + "\n\n"]
+        for notif in self.manipulador.formatearNotificaciones(self.amigos):
+            partes.append("• " + notif + "\n")
         
-        return notificaciones
+        return "".join(partes)
     
     def asignarManipulador(self, manipulador):
         self.manipulador = manipulador
@@ -0,0 +1,450 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from GestorAmigos import GestorAmigos
+from IndicesAmigos import IndicesAmigos
+from persistencia import amigo_a_diccionario, diccionario_a_amigo
+
+
+# Nombre del archivo de registros dentro de la carpeta del gestor
+ARCHIVO_REGISTROS = "amigos.ndjson"
+
+# No vale la pena compactar archivos más chicos que esto (bytes)
+MINIMO_COMPACTAR = 64 * 1024
+
+
+class VistaAmigos:
+    """
+    Secuencia de solo lectura sobre los amigos de un GestorDisco.
+
+    Guarda solo los nombres (en el orden del gestor) y lee cada amigo del disco
+    cuando se pide, así recorrer todo no deja todos los objetos en memoria.
+
+    Si un amigo se elimina mientras se recorre la vista, iterarla lo salta y
+    pedirlo por posición retorna None: quien recorre por índice debe saltarlo.
+    """
+
+    def __init__(self, gestor, nombres):
+        self.gestor = gestor
+        self.nombres = nombres
+
+    def __len__(self):
+        return len(self.nombres)
+
+    def __bool__(self):
+        return len(self.nombres) > 0
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return VistaAmigos(self.gestor, self.nombres[indice])
+        # None si el amigo se eliminó después de armar la vista
+        return self.gestor.materializar(self.nombres[indice], recorrido=True)
+
+    def __iter__(self):
+        for nombre in self.nombres:
+            amigo = self.gestor.materializar(nombre, recorrido=True)
+            if amigo is not None:
+                yield amigo
+
+
+class GestorDisco(GestorAmigos):
+    """
+    Gestor cuyos amigos viven en disco; en memoria solo queda un índice y una caché.
+
+    - Registros: amigos.ndjson, una línea JSON por cada versión de un amigo
+      (cada cambio agrega una línea nueva; las viejas quedan como basura)
+    - Índice residente: nombre → (posición, largo) de la última versión
+    - Caché LRU: los amigos usados más recientemente, como máximo max_cache
+
+    Así la memoria del proceso depende de max_cache y no del tamaño de los datos.
+    Los recorridos completos (listar, filtrar, ordenar) leen los amigos uno por
+    uno sin meterlos en la caché, para no desalojar a los que se usan seguido.
+
+    Limitación: no hay índices secundarios residentes (tipo, confianza, recuerdos),
+    porque ocuparían memoria proporcional al total de amigos. Por eso filtrarAmigos
+    y ordenarAmigos leen todos los amigos del disco en cada consulta.
+
+    Pensado para que un solo proceso escriba (la API POST) y otros lean: cada
+    lector detecta las líneas nuevas por el tamaño del archivo y las indexa.
+    Las líneas que escribe este mismo proceso ya avisaron a los observadores;
+    solo las que agregó otro proceso se anotan para avisarles después.
+    """
+
+    def __init__(self, directorio, max_cache, manipulador):
+        """
+        directorio: Carpeta donde vive amigos.ndjson
+        max_cache: Cantidad máxima de amigos completos en memoria
+        manipulador: ManipuladorTexto para las notificaciones
+        """
+        # Sin índices en memoria: los recorridos leen del disco (ver filtrarAmigos)
+        self._iniciarEstado(manipulador, indices=False)
+        self.directorio = directorio
+        self.max_cache = max(1, max_cache)
+        self.ruta = os.path.join(directorio, ARCHIVO_REGISTROS)
+
+        self.posiciones = OrderedDict()
+        self.cache = OrderedDict()
+        self.bytes_vivos = 0
+        self.leido_hasta = 0
+        self.inodo = None
+        self.lector = None
+        self.candado = threading.RLock()
+        self.estadisticas = {"aciertos": 0, "fallos": 0, "desalojos": 0, "lecturas_recorrido": 0}
+        # Posiciones de las líneas escritas por este proceso que aún no se indexaron
+        self.propias = set()
+        # Cambios de otros procesos pendientes de avisar: (ubicación vieja, nueva)
+        self.cambios_ajenos = []
+        self.reemplazo_ajeno = False
+        self.reescribiendo = False
+
+    def existe(self):
+        """Indica si ya hay registros en disco"""
+        return os.path.exists(self.ruta)
+
+    def rutasDatos(self):
+        return [self.ruta]
+
+    # ============================================
+    # ÍNDICE RESIDENTE
+    # ============================================
+
+    def _refrescar(self):
+        """
+        Pone el índice al día con el archivo.
+
+        Si el archivo solo creció se indexan las líneas nuevas; si fue reemplazado
+        (compactación) se vuelve a indexar desde el principio.
+        """
+        try:
+            estado = os.stat(self.ruta)
+        except FileNotFoundError:
+            if self.inodo is not None:
+                self._reiniciar(None)
+            return
+
+        if estado.st_ino != self.inodo or estado.st_size < self.leido_hasta:
+            self._reiniciar(estado.st_ino)
+
+        if estado.st_size > self.leido_hasta:
+            self._indexar_desde(self.leido_hasta)
+
+    def _reiniciar(self, inodo):
+        if self.inodo is not None:
+            # Otro proceso reemplazó el archivo: los observadores deben rearmarse completos
+            if self.observadores and not self.reescribiendo:
+                self.reemplazo_ajeno = True
+            self.cambios_ajenos = []
+            self.propias = set()
+        if self.lector is not None:
+            self.lector.close()
+        self.lector = open(self.ruta, 'rb') if inodo is not None else None
+        self.inodo = inodo
+        self.posiciones = OrderedDict()
+        self.cache = OrderedDict()
+        self.bytes_vivos = 0
+        self.leido_hasta = 0
+
+    def _indexar_desde(self, inicio):
+        """Indexa las líneas completas a partir de una posición del archivo"""
+        self.lector.seek(inicio)
+        posicion = inicio
+        for linea in self.lector:
+            if not linea.endswith(b"\n"):
+                # Línea a medio escribir por otro proceso: se indexa la próxima vez
+                break
+            largo = len(linea)
+            try:
+                registro = json.loads(linea)
+                nombre = registro["nombre"]
+            except (ValueError, KeyError):
+                posicion = posicion + largo
+                continue
+
+            # Una versión nueva (de este u otro proceso) invalida la copia en caché
+            self.cache.pop(nombre, None)
+            anterior = self.posiciones.get(nombre)
+            if anterior is not None:
+                self.bytes_vivos = self.bytes_vivos - anterior[1]
+
+            nueva = None
+            if registro.get("op") == "eliminar":
+                self.posiciones.pop(nombre, None)
+            else:
+                # Un amigo que ya existía conserva su lugar en el orden
+                nueva = (posicion, largo)
+                self.posiciones[nombre] = nueva
+                self.bytes_vivos = self.bytes_vivos + largo
+
+            if posicion in self.propias:
+                self.propias.discard(posicion)
+            elif self.observadores and not self.reemplazo_ajeno:
+                self._anotarAjeno(anterior, nueva)
+            posicion = posicion + largo
+        self.leido_hasta = posicion
+
+    def _escribir(self, registro):
+        """Agrega un registro al final del archivo y lo indexa"""
+        os.makedirs(self.directorio, exist_ok=True)
+        dato = (json.dumps(registro, ensure_ascii=False) + "\n").encode('utf-8')
+        with open(self.ruta, 'ab') as archivo:
+            archivo.write(dato)
+            # En modo 'ab' la línea queda al final: tell() marca dónde terminó
+            self.propias.add(archivo.tell() - len(dato))
+        # Indexa esta línea (y las que haya agregado otro proceso antes)
+        self._refrescar()
+
+    # ============================================
+    # CACHÉ LRU DE AMIGOS
+    # ============================================
+
+    def materializar(self, nombre, recorrido=False):
+        """
+        Retorna el objeto completo de un amigo, desde la caché o leyéndolo del disco.
+
+        Args:
+            nombre (str): Nombre del amigo
+            recorrido (bool): True si es parte de un recorrido completo
+                              (se lee sin guardarlo en la caché)
+
+        Returns:
+            Amigo o None si no existe
+        """
+        with self.candado:
+            amigo = self.cache.get(nombre)
+            if amigo is not None:
+                self.cache.move_to_end(nombre)
+                self.estadisticas["aciertos"] = self.estadisticas["aciertos"] + 1
+                return amigo
+
+            ubicacion = self.posiciones.get(nombre)
+            if ubicacion is None:
+                return None
+
+            amigo = self._leerUbicacion(ubicacion)
+
+            if recorrido:
+                self.estadisticas["lecturas_recorrido"] = self.estadisticas["lecturas_recorrido"] + 1
+            else:
+                self.estadisticas["fallos"] = self.estadisticas["fallos"] + 1
+                self._cachear(nombre, amigo)
+            return amigo
+
+    def _cachear(self, nombre, amigo):
+        self.cache[nombre] = amigo
+        self.cache.move_to_end(nombre)
+        while len(self.cache) > self.max_cache:
+            self.cache.popitem(last=False)
+            self.estadisticas["desalojos"] = self.estadisticas["desalojos"] + 1
+
+    def estadisticasCache(self):
+        """Retorna aciertos, fallos y desalojos de la caché junto con su ocupación"""
+        with self.candado:
+            datos = dict(self.estadisticas)
+            consultas = datos["aciertos"] + datos["fallos"]
+            datos["tasa_aciertos"] = round(datos["aciertos"] / consultas, 4) if consultas else None
+            datos["residentes"] = len(self.cache)
+            datos["max_cache"] = self.max_cache
+            datos["indexados"] = len(self.posiciones)
+            return datos
+
+    # ============================================
+    # OPERACIONES DEL GESTOR
+    # ============================================
+
+    @property
+    def amigos(self):
+        with self.candado:
+            self._refrescar()
+            return VistaAmigos(self, list(self.posiciones))
+
+    @amigos.setter
+    def amigos(self, lista):
+        # Reemplazar todos los datos: se escribe un archivo nuevo ya compactado
+        with self.candado:
+            self._reescribir(amigo_a_diccionario(amigo) for amigo in lista)
+        self._notificar("reemplazar", None)
+
+    def _reescribir(self, diccionarios):
+        """Escribe un archivo nuevo con un registro por amigo y lo reemplaza de una vez"""
+        os.makedirs(self.directorio, exist_ok=True)
+        temporal = self.ruta + ".tmp"
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            for amigo_dict in diccionarios:
+                amigo_dict["op"] = "amigo"
+                archivo.write(json.dumps(amigo_dict, ensure_ascii=False) + "\n")
+        os.replace(temporal, self.ruta)
+        # Reemplazo propio: quien lo pidió avisa a los observadores si hace falta
+        self.reescribiendo = True
+        try:
+            self._refrescar()
+        finally:
+            self.reescribiendo = False
+
+    def agregarAmigo(self, amigo):
+        self.guardarAmigo(amigo)
+        self._notificar("agregar", amigo)
+        print("✓ Amigo agregado: " + amigo.obtenerNombre())
+        return amigo
+
+    def agregarVarios(self, amigos):
+        for amigo in amigos:
+            self.guardarAmigo(amigo)
+            self._notificar("agregar", amigo)
+        print("✓ " + str(len(amigos)) + " amigos agregados")
+        return len(amigos)
+
+    def reemplazarVarios(self, nuevos):
+        # Escribir la versión nueva alcanza: el amigo conserva su lugar en el orden
+        reemplazados = 0
+        for nombre, nuevo in nuevos.items():
+            anterior = self.buscarAmigo(nombre)
+            if anterior is not None and anterior is not nuevo:
+                self.guardarAmigo(nuevo)
+                self._notificar("eliminar", anterior)
+                self._notificar("agregar", nuevo)
+                reemplazados = reemplazados + 1
+        return reemplazados
+
+    def buscarAmigo(self, nombre):
+        with self.candado:
+            self._refrescar()
+            return self.materializar(nombre)
+
+    def buscarVarios(self, nombres):
+        encontrados = {}
+        with self.candado:
+            self._refrescar()
+            for nombre in set(nombres):
+                amigo = self.materializar(nombre)
+                if amigo is not None:
+                    encontrados[nombre] = amigo
+        return encontrados
+
+    def eliminarAmigo(self, nombre):
+        with self.candado:
+            amigo = self.buscarAmigo(nombre)
+            if amigo:
+                self._escribir({"op": "eliminar", "nombre": nombre})
+        if amigo:
+            self._notificar("eliminar", amigo)
+            print("✓ Amigo eliminado: " + nombre)
+            return True
+        else:
+            print("✗ No se encontró el amigo: " + nombre)
+            return False
+
+    def agregarRecuerdoAmigo(self, amigo, nuevo_recuerdo):
+        resultado = GestorAmigos.agregarRecuerdoAmigo(self, amigo, nuevo_recuerdo)
+        self.guardarAmigo(amigo)
+        return resultado
+
+    def guardarAmigo(self, amigo):
+        """Escribe la versión actual de un amigo ya modificado (escritura inmediata)"""
+        registro = amigo_a_diccionario(amigo)
+        registro["op"] = "amigo"
+        with self.candado:
+            self._escribir(registro)
+            self._cachear(amigo.obtenerNombre(), amigo)
+
+    def marcarModificado(self, nombre):
+        """Compatibilidad con GestorFragmentado: aquí cada cambio ya se escribió"""
+        return None
+
+    def filtrarAmigos(self, tipo=None, confianza_min=None, confianza_max=None,
+                      mes=None, min_recuerdos=None):
+        # Sin índices secundarios en memoria: se recorre leyendo un amigo a la vez
+        amigos = self.amigos
+        resultado = [amigo for amigo in amigos
+                     if IndicesAmigos.cumpleFiltros(amigo, tipo, confianza_min, confianza_max,
+                                                    mes, min_recuerdos)]
+        plan = {"indice": "recorrido_disco", "candidatos": len(amigos), "total": len(amigos)}
+        return resultado, plan
+
+    def ordenarAmigos(self, orden, limite=None, descendente=None):
+        # Heap de k elementos sobre un recorrido: la memoria depende de k, no del total
+        return IndicesAmigos.seleccionar(iter(self.amigos), orden, limite, descendente)
+
+    def _anotarAjeno(self, anterior, nueva):
+        """Anota un cambio de otro proceso; si son demasiados, se rearma todo"""
+        if len(self.cambios_ajenos) >= self.max_cache:
+            self.cambios_ajenos = []
+            self.reemplazo_ajeno = True
+        else:
+            self.cambios_ajenos.append((anterior, nueva))
+
+    def _leerUbicacion(self, ubicacion):
+        self.lector.seek(ubicacion[0])
+        return diccionario_a_amigo(json.loads(self.lector.read(ubicacion[1])))
+
+    def _revisarDerivados(self):
+        """
+        Avisa a los observadores de las líneas que agregó otro proceso.
+
+        Cada cambio ajeno se avisa como "eliminar" de la versión vieja y "agregar"
+        de la nueva (las dos siguen en el archivo). Solo si otro proceso compactó
+        el archivo, o los cambios pendientes son demasiados, se avisa "reemplazar".
+        """
+        with self.candado:
+            self._refrescar()
+            reemplazo = self.reemplazo_ajeno
+            cambios = [] if reemplazo else [
+                (self._leerUbicacion(anterior) if anterior is not None else None,
+                 self._leerUbicacion(nueva) if nueva is not None else None)
+                for anterior, nueva in self.cambios_ajenos]
+            self.cambios_ajenos = []
+            self.reemplazo_ajeno = False
+
+        if reemplazo:
+            self._notificar("reemplazar", None)
+            return
+        for viejo, nuevo in cambios:
+            if viejo is not None:
+                self._notificar("eliminar", viejo)
+            if nuevo is not None:
+                self._notificar("agregar", nuevo)
+
+    def calcularAnalitica(self, top_gustos=10):
+        self._revisarDerivados()
+        return GestorAmigos.calcularAnalitica(self, top_gustos)
+
+    def buscarSimilares(self, nombre, limite=10):
+        self._revisarDerivados()
+        return GestorAmigos.buscarSimilares(self, nombre, limite)
+
+    def _detectorDuplicados(self):
+        self._revisarDerivados()
+        return GestorAmigos._detectorDuplicados(self)
+
+    def contarAmigos(self):
+        with self.candado:
+            self._refrescar()
+            return len(self.posiciones)
+
+    def contarResidentes(self):
+        return len(self.cache)
+
+    def guardarCambios(self):
+        """
+        Compacta el archivo si más de la mitad son versiones viejas o eliminadas.
+
+        Cada cambio ya se escribió al hacerlo, así que no hay nada más pendiente.
+
+        Returns:
+            int: 1 si se reescribió el archivo, 0 si no hizo falta
+        """
+        with self.candado:
+            self._refrescar()
+            if self.leido_hasta < MINIMO_COMPACTAR or self.leido_hasta <= 2 * self.bytes_vivos:
+                return 0
+
+            ubicaciones = list(self.posiciones.values())
+
+            def registros_vivos():
+                for posicion, largo in ubicaciones:
+                    self.lector.seek(posicion)
+                    yield json.loads(self.lector.read(largo))
+
+            self._reescribir(registros_vivos())
+            return 1
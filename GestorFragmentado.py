@@ -0,0 +1,265 @@
+import os
+import threading
+import zlib
+
+from GestorAmigos import GestorAmigos
+from persistencia import iterar_amigos_json, escribir_amigos_json, firma_archivo
+
+
+class GestorFragmentado(GestorAmigos):
+    """
+    Gestor que reparte los amigos en K archivos según el hash de su nombre.
+
+    Cada nombre pertenece siempre al mismo fragmento, así que buscar, agregar o
+    modificar un amigo solo lee y escribe su archivo. Las operaciones sobre la
+    lista completa (listar, estadísticas, notificaciones) recorren todos los fragmentos.
+
+    La lista completa (amigos) es una tupla armada en cada lectura: para
+    cambiarla se usan los métodos del gestor, que saben en qué fragmento va cada amigo.
+    """
+
+    def __init__(self, directorio, cantidad_fragmentos, manipulador):
+        """
+        directorio: Carpeta donde viven los archivos fragmento-NNN.json
+        cantidad_fragmentos: Número K de fragmentos (no debe cambiar con datos existentes)
+        manipulador: ManipuladorTexto para las notificaciones
+        """
+        # No se llama a GestorAmigos.__init__: asignar la lista marcaría todos los
+        # fragmentos como modificados antes de leer ninguno
+        self._iniciarEstado(manipulador)
+        self.directorio = directorio
+        self.cantidad_fragmentos = cantidad_fragmentos
+
+        # Fragmentos cargados (None = todavía no se leyó) y la firma del archivo leído
+        self.fragmentos = [None] * cantidad_fragmentos
+        self.firmas = [None] * cantidad_fragmentos
+        self.sucios = set()
+        self.candados = [threading.Lock() for _ in range(cantidad_fragmentos)]
+
+    def fragmentoDe(self, nombre):
+        """Retorna el número de fragmento dueño de un nombre (estable entre procesos)"""
+        return zlib.crc32(nombre.encode('utf-8')) % self.cantidad_fragmentos
+
+    def rutaFragmento(self, numero):
+        return os.path.join(self.directorio, "fragmento-%03d.json" % numero)
+
+    def rutaCandado(self, numero):
+        """Archivo del candado de escritura de un fragmento (ver config.escritura)"""
+        return os.path.join(self.directorio, "fragmento-%03d.candado" % numero)
+
+    def existe(self):
+        """Indica si ya hay fragmentos en disco"""
+        return os.path.isdir(self.directorio)
+
+    def rutasDatos(self):
+        return [self.rutaFragmento(numero) for numero in range(self.cantidad_fragmentos)]
+
+    def _firma(self, ruta):
+        # La misma firma que config.version_datos (con el inodo: detecta un
+        # reemplazo con igual tamaño dentro de la misma marca de tiempo)
+        return firma_archivo(ruta)
+
+    def obtenerFragmento(self, numero):
+        """
+        Retorna la lista de amigos de un fragmento, leyéndola del disco solo si
+        no estaba cargada o si otro proceso la modificó desde la última lectura.
+        """
+        with self.candados[numero]:
+            ruta = self.rutaFragmento(numero)
+            firma = self._firma(ruta)
+            cambiado = numero not in self.sucios and firma != self.firmas[numero]
+
+            anteriores = self.fragmentos[numero]
+            recargado = False
+            if anteriores is None or cambiado:
+                self.fragmentos[numero] = list(iterar_amigos_json(ruta)) if firma else []
+                self.firmas[numero] = firma
+                recargado = True
+            nuevos = self.fragmentos[numero]
+
+        if recargado and anteriores is None:
+            # Primera lectura: lo que armaron los observadores sin este fragmento no sirve
+            self._notificar("reemplazar", None)
+        elif recargado:
+            # Otro proceso cambió el fragmento: solo se cambian las entradas de sus amigos
+            for amigo in anteriores:
+                self._notificar("eliminar", amigo)
+            for amigo in nuevos:
+                self._notificar("agregar", amigo)
+        return nuevos
+
+    def amigosDelFragmento(self, nombre):
+        """Retorna solo los amigos del fragmento donde puede estar el nombre"""
+        return self.obtenerFragmento(self.fragmentoDe(nombre))
+
+    @property
+    def amigos(self):
+        # Vista completa: une todos los fragmentos en orden de fragmento.
+        # Es una tupla: un append o remove sobre una copia se perdería sin aviso
+        todos = []
+        for numero in range(self.cantidad_fragmentos):
+            todos.extend(self.obtenerFragmento(numero))
+        return tuple(todos)
+
+    @amigos.setter
+    def amigos(self, lista):
+        # Reemplazar todos los datos: se reparten y todos los fragmentos quedan por guardar
+        for numero in range(self.cantidad_fragmentos):
+            self.fragmentos[numero] = []
+            self.sucios.add(numero)
+        for amigo in lista:
+            self.fragmentos[self.fragmentoDe(amigo.obtenerNombre())].append(amigo)
+        self._notificar("reemplazar", None)
+
+    def agregarAmigo(self, amigo):
+        numero = self.fragmentoDe(amigo.obtenerNombre())
+        self.obtenerFragmento(numero).append(amigo)
+        self.sucios.add(numero)
+        self._notificar("agregar", amigo)
+        print("✓ Amigo agregado: " + amigo.obtenerNombre())
+        return amigo
+
+    def agregarVarios(self, amigos):
+        for amigo in amigos:
+            numero = self.fragmentoDe(amigo.obtenerNombre())
+            self.obtenerFragmento(numero).append(amigo)
+            self.sucios.add(numero)
+            self._notificar("agregar", amigo)
+        print("✓ " + str(len(amigos)) + " amigos agregados")
+        return len(amigos)
+
+    def reemplazarVarios(self, nuevos):
+        # Solo se recorren los fragmentos de los nombres a reemplazar
+        por_fragmento = {}
+        for nombre in nuevos:
+            por_fragmento.setdefault(self.fragmentoDe(nombre), []).append(nombre)
+
+        reemplazados = 0
+        for numero in por_fragmento:
+            fragmento = self.obtenerFragmento(numero)
+            for i in range(len(fragmento)):
+                nuevo = nuevos.get(fragmento[i].obtenerNombre())
+                if nuevo is not None and nuevo is not fragmento[i]:
+                    anterior = fragmento[i]
+                    fragmento[i] = nuevo
+                    self.sucios.add(numero)
+                    self._notificar("eliminar", anterior)
+                    self._notificar("agregar", nuevo)
+                    reemplazados = reemplazados + 1
+        return reemplazados
+
+    def buscarAmigo(self, nombre):
+        for amigo in self.amigosDelFragmento(nombre):
+            if amigo.obtenerNombre() == nombre:
+                return amigo
+        return None
+
+    def buscarVarios(self, nombres):
+        # Agrupar los nombres por fragmento y recorrer solo los fragmentos necesarios
+        por_fragmento = {}
+        for nombre in nombres:
+            por_fragmento.setdefault(self.fragmentoDe(nombre), set()).add(nombre)
+
+        encontrados = {}
+        for numero, pendientes in por_fragmento.items():
+            for amigo in self.obtenerFragmento(numero):
+                if not pendientes:
+                    break
+                nombre_amigo = amigo.obtenerNombre()
+                if nombre_amigo in pendientes:
+                    encontrados[nombre_amigo] = amigo
+                    pendientes.discard(nombre_amigo)
+        return encontrados
+
+    def marcarModificado(self, nombre):
+        """Marca el fragmento de un amigo como pendiente de guardar"""
+        self.sucios.add(self.fragmentoDe(nombre))
+
+    def eliminarAmigo(self, nombre):
+        numero = self.fragmentoDe(nombre)
+        amigo = self.buscarAmigo(nombre)
+        if amigo:
+            self.obtenerFragmento(numero).remove(amigo)
+            self.sucios.add(numero)
+            self._notificar("eliminar", amigo)
+            print("✓ Amigo eliminado: " + nombre)
+            return True
+        else:
+            print("✗ No se encontró el amigo: " + nombre)
+            return False
+
+    def agregarRecuerdoAmigo(self, amigo, nuevo_recuerdo):
+        resultado = GestorAmigos.agregarRecuerdoAmigo(self, amigo, nuevo_recuerdo)
+        self.marcarModificado(amigo.obtenerNombre())
+        return resultado
+
+    def filtrarAmigos(self, tipo=None, confianza_min=None, confianza_max=None,
+                      mes=None, min_recuerdos=None):
+        # Revisar primero si otro proceso cambió algún fragmento (actualiza los índices)
+        for numero in range(self.cantidad_fragmentos):
+            self.obtenerFragmento(numero)
+        return GestorAmigos.filtrarAmigos(self, tipo, confianza_min, confianza_max,
+                                          mes, min_recuerdos)
+
+    def ordenarAmigos(self, orden, limite=None, descendente=None):
+        # Igual que filtrarAmigos: primero detectar fragmentos cambiados por otro proceso
+        for numero in range(self.cantidad_fragmentos):
+            self.obtenerFragmento(numero)
+        return GestorAmigos.ordenarAmigos(self, orden, limite, descendente)
+
+    def calcularAnalitica(self, top_gustos=10):
+        # Igual que filtrarAmigos: primero detectar fragmentos cambiados por otro proceso
+        for numero in range(self.cantidad_fragmentos):
+            self.obtenerFragmento(numero)
+        return GestorAmigos.calcularAnalitica(self, top_gustos)
+
+    def buscarSimilares(self, nombre, limite=10):
+        for numero in range(self.cantidad_fragmentos):
+            self.obtenerFragmento(numero)
+        return GestorAmigos.buscarSimilares(self, nombre, limite)
+
+    def _detectorDuplicados(self):
+        for numero in range(self.cantidad_fragmentos):
+            self.obtenerFragmento(numero)
+        return GestorAmigos._detectorDuplicados(self)
+
+    def contarAmigos(self):
+        total = 0
+        for numero in range(self.cantidad_fragmentos):
+            total = total + len(self.obtenerFragmento(numero))
+        return total
+
+    def contarResidentes(self):
+        # Solo los fragmentos ya cargados; no lee ningún archivo
+        return sum(len(fragmento) for fragmento in self.fragmentos if fragmento is not None)
+
+    def guardarCambios(self, numeros=None):
+        """
+        Escribe solo los fragmentos modificados.
+
+        Cada archivo se escribe primero como temporal y luego se reemplaza,
+        así un lector de otro proceso nunca ve un fragmento a medio escribir.
+
+        Args:
+            numeros: Fragmentos que se pueden escribir (None = todos); quien
+                     tiene el candado de algunos fragmentos solo escribe esos
+
+        Returns:
+            int: Cantidad de fragmentos escritos
+        """
+        os.makedirs(self.directorio, exist_ok=True)
+        escritos = 0
+
+        pendientes = self.sucios if numeros is None else self.sucios & set(numeros)
+        for numero in sorted(pendientes):
+            with self.candados[numero]:
+                ruta = self.rutaFragmento(numero)
+                temporal = ruta + ".tmp"
+                with open(temporal, 'w', encoding='utf-8') as archivo:
+                    escribir_amigos_json(archivo, self.fragmentos[numero] or [])
+                os.replace(temporal, ruta)
+                self.firmas[numero] = self._firma(ruta)
+                self.sucios.discard(numero)
+                escritos = escritos + 1
+
+        return escritos
@@ -0,0 +1,331 @@
+import heapq
+import threading
+import unicodedata
+from bisect import bisect_left, bisect_right, insort
+
+
+# Criterios de orden disponibles y si por defecto van de mayor a menor
+ORDENES = {
+    "confianza": True,
+    "recuerdos": True,
+    "nombre": False
+}
+
+
+class IndicesAmigos:
+    """
+    Índices secundarios sobre los amigos de un gestor para filtrar y ordenar sin recorrer todo.
+
+    - por_tipo:   tipo de amigo → amigos de ese tipo
+    - confianza:  lista ordenada de (nivelConfianza, amigo) de los amigos cercanos
+    - por_mes:    mes de cumpleaños (1-12) → amigos que cumplen ese mes
+    - recuerdos:  lista ordenada de (cantidad de recuerdos, amigo)
+    - nombres:    lista ordenada de (clave de colación del nombre, amigo)
+
+    Los "conjuntos" son diccionarios {amigo: None} para conservar el orden de llegada.
+    El gestor avisa cada cambio con actualizar(); si se reemplaza la lista completa,
+    los índices se marcan como obsoletos y se reconstruyen en la siguiente consulta.
+
+    Igual que DuplicadosAmigos, todo pasa con el candado tomado: un cambio
+    avisado desde otro hilo no modifica un índice mientras una consulta lo
+    recorre, y una reconstrucción arma los índices aparte y los cambia todos
+    juntos, así nadie ve uno a medio llenar. Es reentrante porque reconstruir
+    puede pedir la lista al gestor, y eso a su vez puede avisar cambios.
+    """
+
+    def __init__(self):
+        self.candado = threading.RLock()
+        self.por_tipo = {}
+        self.confianza = []
+        self.por_mes = {}
+        self.recuerdos = []
+        self.cuentas = {}
+        self.nombres = []
+        self.total = 0
+        self.obsoleto = True
+
+    @staticmethod
+    def claveNombre(nombre):
+        """Clave de colación: sin acentos y sin distinguir mayúsculas (Ángela junto a Andrés)"""
+        descompuesto = unicodedata.normalize("NFKD", nombre)
+        sin_acentos = "".join(c for c in descompuesto if not unicodedata.combining(c))
+        return (sin_acentos.casefold(), nombre)
+
+    @staticmethod
+    def mesDe(amigo):
+        """Retorna el mes de cumpleaños (formato dd/mm/aaaa) o None si no se puede leer"""
+        partes = str(amigo.cumpleanos).split("/")
+        if len(partes) < 2:
+            return None
+        try:
+            mes = int(partes[1])
+        except ValueError:
+            return None
+        return mes if 1 <= mes <= 12 else None
+
+    def reconstruir(self, amigos):
+        """Arma todos los índices desde cero a partir de la lista de amigos"""
+        with self.candado:
+            # Todo se arma en variables locales y se asigna junto al final
+            por_tipo = {}
+            por_mes = {}
+            cuentas = {}
+            confianza = []
+            recuerdos = []
+            nombres = []
+            total = 0
+            for amigo in amigos:
+                por_tipo.setdefault(type(amigo).__name__, {})[amigo] = None
+                cantidad = amigo.recuerdos.contarRecuerdos()
+                cuentas[amigo] = cantidad
+                recuerdos.append((cantidad, amigo))
+                nombres.append((IndicesAmigos.claveNombre(amigo.nombre), amigo))
+                mes = IndicesAmigos.mesDe(amigo)
+                if mes is not None:
+                    por_mes.setdefault(mes, {})[amigo] = None
+                if type(amigo).__name__ == "AmigoCercano":
+                    confianza.append((amigo.nivelConfianza, amigo))
+                total = total + 1
+            confianza.sort(key=lambda par: par[0])
+            recuerdos.sort(key=lambda par: par[0])
+            nombres.sort(key=lambda par: par[0])
+            (self.por_tipo, self.por_mes, self.cuentas, self.confianza, self.recuerdos,
+             self.nombres, self.total) = (por_tipo, por_mes, cuentas, confianza, recuerdos,
+                                          nombres, total)
+            self.obsoleto = False
+
+    def _indexar(self, amigo):
+        # Cambio individual: se inserta en su lugar con búsqueda binaria.
+        # insort es O(n) (corre los elementos de la lista), pero en memoria contigua
+        self.por_tipo.setdefault(type(amigo).__name__, {})[amigo] = None
+
+        cantidad = amigo.recuerdos.contarRecuerdos()
+        self.cuentas[amigo] = cantidad
+        insort(self.recuerdos, (cantidad, amigo), key=lambda par: par[0])
+        insort(self.nombres, (IndicesAmigos.claveNombre(amigo.nombre), amigo), key=lambda par: par[0])
+
+        mes = IndicesAmigos.mesDe(amigo)
+        if mes is not None:
+            self.por_mes.setdefault(mes, {})[amigo] = None
+
+        if type(amigo).__name__ == "AmigoCercano":
+            insort(self.confianza, (amigo.nivelConfianza, amigo), key=lambda par: par[0])
+
+    def _desindexar(self, amigo):
+        self.por_tipo.get(type(amigo).__name__, {}).pop(amigo, None)
+
+        mes = IndicesAmigos.mesDe(amigo)
+        if mes is not None:
+            self.por_mes.get(mes, {}).pop(amigo, None)
+
+        if type(amigo).__name__ == "AmigoCercano":
+            IndicesAmigos._quitar(self.confianza, amigo.nivelConfianza, amigo)
+
+        IndicesAmigos._quitar(self.recuerdos, self.cuentas.pop(amigo, 0), amigo)
+        IndicesAmigos._quitar(self.nombres, IndicesAmigos.claveNombre(amigo.nombre), amigo)
+
+    @staticmethod
+    def _quitar(lista, clave, amigo):
+        """Quita un amigo de una lista ordenada buscando su clave con búsqueda binaria"""
+        inicio = bisect_left(lista, clave, key=lambda par: par[0])
+        fin = bisect_right(lista, clave, key=lambda par: par[0])
+        for i in range(inicio, fin):
+            if lista[i][1] is amigo:
+                del lista[i]
+                return True
+        return False
+
+    def actualizar(self, evento, amigo):
+        """
+        Recibe un cambio del gestor.
+        evento: "agregar", "eliminar", "recuerdo" o "reemplazar"
+        """
+        with self.candado:
+            if self.obsoleto:
+                return
+            if evento == "agregar":
+                self._indexar(amigo)
+                self.total = self.total + 1
+            elif evento == "eliminar":
+                self._desindexar(amigo)
+                self.total = self.total - 1
+            elif evento == "recuerdo":
+                # Cambió la cantidad de recuerdos: mover al amigo a su nuevo lugar
+                IndicesAmigos._quitar(self.recuerdos, self.cuentas.get(amigo, 0), amigo)
+                cantidad = amigo.recuerdos.contarRecuerdos()
+                self.cuentas[amigo] = cantidad
+                insort(self.recuerdos, (cantidad, amigo), key=lambda par: par[0])
+            elif evento == "reemplazar":
+                self.obsoleto = True
+
+    def _desde_recuerdos(self, minimo):
+        """Retorna dónde empiezan, en la lista ordenada, los amigos con al menos 'minimo' recuerdos"""
+        return bisect_left(self.recuerdos, minimo, key=lambda par: par[0])
+
+    def _rango_confianza(self, minimo, maximo):
+        """Retorna (inicio, fin) de la lista ordenada para el rango pedido"""
+        inicio = 0 if minimo is None else bisect_left(self.confianza, minimo, key=lambda par: par[0])
+        fin = len(self.confianza) if maximo is None else \
+            bisect_right(self.confianza, maximo, key=lambda par: par[0])
+        return inicio, max(inicio, fin)
+
+    @staticmethod
+    def cumpleFiltros(amigo, tipo=None, confianza_min=None, confianza_max=None,
+                      mes=None, min_recuerdos=None):
+        """Verifica los filtros de consultar() sobre un solo amigo (para recorridos sin índices)"""
+        nombre_clase = type(amigo).__name__
+        if tipo is not None and nombre_clase != tipo:
+            return False
+        if confianza_min is not None or confianza_max is not None:
+            if nombre_clase != "AmigoCercano":
+                return False
+            if confianza_min is not None and amigo.nivelConfianza < confianza_min:
+                return False
+            if confianza_max is not None and amigo.nivelConfianza > confianza_max:
+                return False
+        if mes is not None and IndicesAmigos.mesDe(amigo) != mes:
+            return False
+        if min_recuerdos is not None and amigo.recuerdos.contarRecuerdos() < min_recuerdos:
+            return False
+        return True
+
+    def consultar(self, obtener_amigos, tipo=None, confianza_min=None, confianza_max=None,
+                  mes=None, min_recuerdos=None):
+        """
+        Retorna los amigos que cumplen todos los filtros.
+
+        Se estima cuántos candidatos aporta cada índice y se recorre solo el más
+        chico; los demás filtros se verifican sobre esos candidatos.
+
+        Args:
+            obtener_amigos (callable): Retorna la lista completa; solo se llama si hay
+                                       que reconstruir los índices o ningún índice sirve
+            tipo (str): "AmigoRegular" o "AmigoCercano"
+            confianza_min, confianza_max (int): Rango de nivelConfianza (implica AmigoCercano)
+            mes (int): Mes de cumpleaños (1-12)
+            min_recuerdos (int): Cantidad mínima de recuerdos
+
+        Returns:
+            tuple: (lista de amigos, plan) donde plan indica el índice usado y los candidatos
+        """
+        with self.candado:
+            if self.obsoleto:
+                self.reconstruir(obtener_amigos())
+
+            usa_confianza = confianza_min is not None or confianza_max is not None
+
+            # Estimar el costo (cantidad de candidatos) de cada forma de empezar
+            opciones = [("recorrido_completo", self.total)]
+            if tipo is not None:
+                opciones.append(("tipo", len(self.por_tipo.get(tipo, {}))))
+            if usa_confianza:
+                inicio, fin = self._rango_confianza(confianza_min, confianza_max)
+                opciones.append(("confianza", fin - inicio))
+            if mes is not None:
+                opciones.append(("mes", len(self.por_mes.get(mes, {}))))
+            if min_recuerdos is not None:
+                desde = self._desde_recuerdos(min_recuerdos)
+                opciones.append(("recuerdos", len(self.recuerdos) - desde))
+
+            indice, candidatos_estimados = min(opciones, key=lambda opcion: opcion[1])
+
+            if indice == "tipo":
+                candidatos = self.por_tipo.get(tipo, {})
+            elif indice == "confianza":
+                candidatos = (par[1] for par in self.confianza[inicio:fin])
+            elif indice == "mes":
+                candidatos = self.por_mes.get(mes, {})
+            elif indice == "recuerdos":
+                candidatos = (par[1] for par in self.recuerdos[desde:])
+            else:
+                candidatos = obtener_amigos()
+
+            resultado = []
+            for amigo in candidatos:
+                nombre_clase = type(amigo).__name__
+                if tipo is not None and indice != "tipo" and nombre_clase != tipo:
+                    continue
+                if usa_confianza and indice != "confianza":
+                    if nombre_clase != "AmigoCercano":
+                        continue
+                    if confianza_min is not None and amigo.nivelConfianza < confianza_min:
+                        continue
+                    if confianza_max is not None and amigo.nivelConfianza > confianza_max:
+                        continue
+                if mes is not None and indice != "mes" and IndicesAmigos.mesDe(amigo) != mes:
+                    continue
+                if min_recuerdos is not None and indice != "recuerdos" and \
+                        amigo.recuerdos.contarRecuerdos() < min_recuerdos:
+                    continue
+                resultado.append(amigo)
+
+            plan = {"indice": indice, "candidatos": candidatos_estimados, "total": self.total}
+            return resultado, plan
+
+    def ordenar(self, obtener_amigos, orden, limite=None, descendente=None):
+        """
+        Retorna los primeros k amigos según un criterio, leyendo el índice ordenado.
+
+        No se ordena nada en la consulta: se toma un tramo de la lista ya ordenada.
+
+        Args:
+            obtener_amigos (callable): Retorna la lista completa (solo para reconstruir)
+            orden (str): "confianza" (solo amigos cercanos), "recuerdos" o "nombre"
+            limite (int): Cantidad máxima de amigos (None = todos)
+            descendente (bool): None usa el sentido por defecto del criterio
+
+        Returns:
+            list: Amigos en el orden pedido
+        """
+        with self.candado:
+            if self.obsoleto:
+                self.reconstruir(obtener_amigos())
+
+            if descendente is None:
+                descendente = ORDENES[orden]
+
+            if orden == "confianza":
+                lista = self.confianza
+            elif orden == "recuerdos":
+                lista = self.recuerdos
+            else:
+                lista = self.nombres
+
+            cantidad = len(lista) if limite is None else min(limite, len(lista))
+            if descendente:
+                tramo = lista[len(lista) - cantidad:]
+                tramo.reverse()
+            else:
+                tramo = lista[:cantidad]
+            return [par[1] for par in tramo]
+
+    @staticmethod
+    def seleccionar(amigos, orden, limite=None, descendente=None):
+        """
+        Ordena una lista ya filtrada; con límite usa un heap (k elementos) en lugar de ordenar todo.
+
+        Args:
+            amigos (list): Amigos a ordenar (ej: resultado de consultar)
+            orden (str): "confianza", "recuerdos" o "nombre"
+            limite (int): Cantidad máxima de amigos (None = todos)
+            descendente (bool): None usa el sentido por defecto del criterio
+
+        Returns:
+            list: Amigos en el orden pedido
+        """
+        if descendente is None:
+            descendente = ORDENES[orden]
+
+        if orden == "confianza":
+            amigos = [amigo for amigo in amigos if type(amigo).__name__ == "AmigoCercano"]
+            clave = lambda amigo: amigo.nivelConfianza
+        elif orden == "recuerdos":
+            clave = lambda amigo: amigo.recuerdos.contarRecuerdos()
+        else:
+            clave = lambda amigo: IndicesAmigos.claveNombre(amigo.nombre)
+
+        if limite is None:
+            return sorted(amigos, key=clave, reverse=descendente)
+        if descendente:
+            return heapq.nlargest(limite, amigos, key=clave)
+        return heapq.nsmallest(limite, amigos, key=clave)
@@ -1,8 +1,39 @@
+"""
+Main.py - Gestor de amigos por consola
+
+Sin argumentos abre el menú interactivo (con un gestor propio en memoria).
+Con un comando trabaja sin preguntas sobre los datos compartidos de config.py
+(amigos_data.json), pensado para scripts y tareas programadas:
+
+    python Main.py importar amigos.ndjson [--lote 1000] [--si-existe reemplazar]
+    python Main.py exportar amigos.csv
+    python Main.py exportar amigos.columnar.zst    (formato y compresión por extensión)
+    python Main.py buscar Carlos Dani
+    python Main.py recuerdo Carlos "Fuimos al cine"
+    python Main.py recuerdos recuerdos.csv        (columnas nombre,recuerdo)
+    python Main.py notificaciones [--informal] [--idioma en] [--plantillas plantillas.json]
+    python Main.py duplicados [--fusionar [--casi] [--parecidos]] [--sin-recuerdos]
+    python Main.py instantanea                    (tomar una instantánea ahora)
+    python Main.py instantaneas                   (listar las instantáneas)
+    python Main.py restaurar 2024-06-01T10:30:00  (volver los datos a ese momento)
+
+Los resultados van a la salida estándar y los mensajes a la salida de errores.
+"""
+
+import argparse
+import contextlib
+import json
+import sys
+
 from Amigo import Amigo
 from AmigoRegular import AmigoRegular
 from AmigoCercano import AmigoCercano
 from ManipuladorTexto import ManipuladorTexto
 from GestorAmigos import GestorAmigos
+from DuplicadosAmigos import normalizarTexto, recuerdoRepetido
+from intercambio import (abrir_texto, detectar_compresion, detectar_formato, en_lotes,
+                         generar_exportacion, leer_registros, separar_lista,
+                         validar_diccionario)
 
 
 def mostrar_menu():
@@ -26,21 +57,7 @@ def obtener_lista(mensaje):
     print("(Ingrese los elementos separados por coma)")
     entrada = input("➤ ")
     
-    elementos = []
-    elemento_actual = ""
-    
-    for caracter in entrada:
-        if caracter == ",":
-            if elemento_actual:
-                elementos.append(elemento_actual.strip())
-            elemento_actual = ""
-        else:
-            elemento_actual = elemento_actual + caracter
-    
-    if elemento_actual:
-        elementos.append(elemento_actual.strip())
-    
-    return elementos
+    return separar_lista(entrada)
 
 
 def agregar_amigo_regular(gestor):
@@ -94,7 +111,7 @@ def agregar_recuerdo_amigo(gestor):
     
     if amigo:
         nuevo_recuerdo = input("Ingrese el recuerdo: ")
-        resultado = amigo.agregarRecuerdo(nuevo_recuerdo)
+        resultado = gestor.agregarRecuerdoAmigo(amigo, nuevo_recuerdo)
         print("✓ " + resultado)
     else:
         print("\n✗ No se encontró ningún amigo con el nombre: " + nombre)
@@ -166,5 +183,330 @@ def main():
         input("\nPresione Enter para continuar...")
 
 
+# ============================================
+# MODO POR LOTES (sin preguntas)
+# ============================================
+
+def nombres_existentes(gestor):
+    """Nombres de todos los amigos del gestor, en una sola pasada"""
+    from GestorDisco import VistaAmigos
+    
+    amigos = gestor.amigos
+    if isinstance(amigos, VistaAmigos):
+        # El gestor en disco ya tiene los nombres indexados: no hace falta leer los amigos
+        return set(amigos.nombres)
+    return {amigo.obtenerNombre() for amigo in amigos}
+
+
+def comando_importar(argumentos, salida):
+    """Agrega (o reemplaza) amigos desde un archivo NDJSON o CSV, por lotes"""
+    import config
+    from persistencia import diccionario_a_amigo
+    
+    formato = detectar_formato(argumentos.archivo, argumentos.formato)
+    reemplazar = argumentos.si_existe == "reemplazar"
+    with config.escritura():
+        gestor = config.obtener_gestor()
+        totales = {"agregados": 0, "reemplazados": 0, "omitidos": 0, "errores": 0}
+        # Los nombres se leen una sola vez, no en cada lote
+        conocidos = nombres_existentes(gestor)
+        
+        with abrir_texto(argumentos.archivo, 'r') as archivo:
+            for lote in en_lotes(leer_registros(archivo, formato), argumentos.lote):
+                validos = {}
+                for numero, amigo_dict, error in lote:
+                    if error is None:
+                        try:
+                            amigo = diccionario_a_amigo(validar_diccionario(amigo_dict))
+                        except ValueError as e:
+                            error = str(e)
+                    if error is not None:
+                        print(f"✗ Línea {numero}: {error}")
+                        totales["errores"] = totales["errores"] + 1
+                        continue
+                    if amigo.nombre in validos and not reemplazar:
+                        totales["omitidos"] = totales["omitidos"] + 1
+                        continue
+                    validos[amigo.nombre] = amigo
+                
+                existentes = [nombre for nombre in validos if nombre in conocidos]
+                nuevos = [amigo for nombre, amigo in validos.items() if nombre not in conocidos]
+                if nuevos:
+                    totales["agregados"] = totales["agregados"] + gestor.agregarVarios(nuevos)
+                    conocidos.update(amigo.nombre for amigo in nuevos)
+                if reemplazar:
+                    cambios = {nombre: validos[nombre] for nombre in existentes}
+                    totales["reemplazados"] = totales["reemplazados"] + gestor.reemplazarVarios(cambios)
+                else:
+                    totales["omitidos"] = totales["omitidos"] + len(existentes)
+        
+        # Un solo guardado al final, no uno por lote
+        if totales["agregados"] or totales["reemplazados"]:
+            config.guardar_datos()
+    
+    salida.write(json.dumps(totales, ensure_ascii=False) + "\n")
+    return 1 if totales["errores"] else 0
+
+
+def comando_exportar(argumentos, salida):
+    """Escribe todos los amigos en NDJSON, CSV o columnar, por bloques y opcionalmente comprimidos"""
+    import config
+    
+    formato = detectar_formato(argumentos.archivo, argumentos.formato)
+    compresion = detectar_compresion(argumentos.archivo, argumentos.compresion)
+    gestor = config.obtener_gestor()
+    estadisticas = {}
+    
+    if argumentos.archivo == "-":
+        destino = contextlib.nullcontext(salida.buffer)
+    else:
+        destino = open(argumentos.archivo, 'wb')
+    with destino as archivo:
+        for bloque in generar_exportacion(gestor.amigos, formato, compresion, estadisticas):
+            archivo.write(bloque)
+    
+    print(f"✓ {estadisticas['amigos']} amigos exportados a {argumentos.archivo} "
+          f"({estadisticas['bytes']} bytes)")
+    return 0
+
+
+def comando_buscar(argumentos, salida):
+    """Muestra en NDJSON los amigos pedidos; retorna 1 si falta alguno"""
+    import config
+    from persistencia import amigo_a_diccionario
+    
+    gestor = config.obtener_gestor()
+    encontrados = gestor.buscarVarios(argumentos.nombres)
+    for nombre in argumentos.nombres:
+        amigo = encontrados.get(nombre)
+        if amigo is None:
+            print("✗ No se encontró ningún amigo con el nombre: " + nombre)
+            continue
+        salida.write(json.dumps(amigo_a_diccionario(amigo), ensure_ascii=False) + "\n")
+    return 0 if len(encontrados) == len(set(argumentos.nombres)) else 1
+
+
+def comando_recuerdo(argumentos, salida):
+    """Agrega un recuerdo a un amigo"""
+    import config
+    
+    with config.escritura(nombres=[argumentos.nombre]):
+        gestor = config.obtener_gestor()
+        amigo = gestor.buscarAmigo(argumentos.nombre)
+        if amigo is None:
+            print("✗ No se encontró ningún amigo con el nombre: " + argumentos.nombre)
+            return 1
+        # Igual que la API: un recuerdo repetido se rechaza, uno casi igual se agrega con aviso
+        repetido = recuerdoRepetido(amigo.recuerdos.recuerdos, argumentos.texto)
+        if repetido and repetido[0] == "exacto":
+            print(f"✗ El amigo '{argumentos.nombre}' ya tiene ese recuerdo")
+            return 1
+        if repetido:
+            print("ℹ Parecido a un recuerdo anterior: " + repetido[1])
+        resultado = gestor.agregarRecuerdoAmigo(amigo, argumentos.texto)
+        config.registrar_recuerdo(amigo)
+    salida.write(resultado + "\n")
+    return 0
+
+
+def comando_recuerdos(argumentos, salida):
+    """Agrega muchos recuerdos desde un archivo (nombre, recuerdo), por lotes"""
+    import config
+    
+    formato = detectar_formato(argumentos.archivo, argumentos.formato)
+    with config.escritura():
+        gestor = config.obtener_gestor()
+        totales = {"agregados": 0, "errores": 0}
+        # Recuerdos ya conocidos (normalizados) de cada amigo visto, como en la API
+        vistos = {}
+        
+        with abrir_texto(argumentos.archivo, 'r') as archivo:
+            for lote in en_lotes(leer_registros(archivo, formato, dict), argumentos.lote):
+                nombres = [registro.get("nombre") for _, registro, _ in lote
+                           if isinstance(registro, dict) and isinstance(registro.get("nombre"), str)]
+                encontrados = gestor.buscarVarios(nombres)
+                
+                cambios = []
+                for numero, registro, error in lote:
+                    if error is None:
+                        if not isinstance(registro, dict) or not isinstance(registro.get("recuerdo"), str) \
+                                or not registro.get("recuerdo"):
+                            error = "Faltan los campos: nombre y recuerdo"
+                        elif registro.get("nombre") not in encontrados:
+                            error = f"No se encontró el amigo: {registro.get('nombre')}"
+                    if error is not None:
+                        print(f"✗ Línea {numero}: {error}")
+                        totales["errores"] = totales["errores"] + 1
+                        continue
+                    
+                    amigo = encontrados[registro["nombre"]]
+                    conocidos = vistos.get(amigo.nombre)
+                    if conocidos is None:
+                        conocidos = {normalizarTexto(texto) for texto in amigo.recuerdos.recuerdos}
+                        vistos[amigo.nombre] = conocidos
+                    normalizado = normalizarTexto(registro["recuerdo"])
+                    if normalizado in conocidos:
+                        print(f"✗ Línea {numero}: El amigo '{amigo.nombre}' ya tiene ese recuerdo")
+                        totales["errores"] = totales["errores"] + 1
+                        continue
+                    conocidos.add(normalizado)
+                    
+                    gestor.agregarRecuerdoAmigo(amigo, registro["recuerdo"])
+                    cambios.append((amigo, amigo.recuerdos.ultimaEntrada()))
+                
+                # Una sola escritura por lote
+                config.registrar_recuerdos(cambios)
+                totales["agregados"] = totales["agregados"] + len(cambios)
+    
+    salida.write(json.dumps(totales, ensure_ascii=False) + "\n")
+    return 1 if totales["errores"] else 0
+
+
+def comando_notificaciones(argumentos, salida):
+    """Muestra las notificaciones de todos los amigos"""
+    import config
+    
+    gestor = config.obtener_gestor()
+    gestor.asignarManipulador(ManipuladorTexto(estiloFormal=not argumentos.informal,
+                                               idioma=argumentos.idioma,
+                                               archivo_plantillas=argumentos.plantillas))
+    salida.write(gestor.generarNotificacion() + "\n")
+    return 0
+
+
+def comando_duplicados(argumentos, salida):
+    """Muestra los amigos y recuerdos repetidos; con --fusionar además los une y guarda"""
+    import config
+    
+    recuerdos = not argumentos.sin_recuerdos
+    if argumentos.fusionar:
+        with config.escritura():
+            resumen = config.obtener_gestor().fusionarDuplicados(recuerdos, argumentos.casi,
+                                                                 argumentos.parecidos)
+            if resumen["amigos_unidos"] or resumen["recuerdos_quitados"]:
+                config.guardar_datos()
+        print(f"✓ {resumen['amigos_unidos']} amigos unidos, "
+              f"{resumen['recuerdos_quitados']} recuerdos repetidos quitados")
+        salida.write(json.dumps(resumen, ensure_ascii=False) + "\n")
+        return 0
+    
+    reporte = config.obtener_gestor().reporteDuplicados(recuerdos)
+    salida.write(json.dumps(reporte, ensure_ascii=False) + "\n")
+    return 0
+
+
+def comando_instantanea(argumentos, salida):
+    """Toma una instantánea de los datos actuales"""
+    import config
+    
+    datos = config.tomar_instantanea(esperar=True)
+    salida.write(json.dumps(datos, ensure_ascii=False) + "\n")
+    return 0
+
+
+def comando_instantaneas(argumentos, salida):
+    """Lista las instantáneas conservadas"""
+    import config
+    
+    salida.write(json.dumps(config.instantaneas_actuales().listar(), ensure_ascii=False) + "\n")
+    return 0
+
+
+def comando_restaurar(argumentos, salida):
+    """Vuelve los datos al estado que tenían en un momento dado"""
+    import config
+    
+    resumen = config.restaurar_instantanea(argumentos.hasta)
+    print(f"✓ Datos restaurados a {resumen['hasta']} (instantánea de {resumen['instantanea']} "
+          f"+ {resumen['cambios_aplicados']} cambios)")
+    salida.write(json.dumps(resumen, ensure_ascii=False) + "\n")
+    return 0
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(description="Gestor de amigos (sin argumentos: menú interactivo)")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    
+    importar = comandos.add_parser("importar", help="Importar amigos desde NDJSON, CSV o columnar")
+    importar.add_argument("archivo", help="Archivo a importar (- = entrada estándar)")
+    importar.add_argument("--formato", choices=["ndjson", "csv", "columnar"], default=None)
+    importar.add_argument("--lote", type=int, default=1000, help="Registros por lote")
+    importar.add_argument("--si-existe", choices=["omitir", "reemplazar"], default="omitir")
+    importar.set_defaults(funcion=comando_importar)
+    
+    exportar = comandos.add_parser("exportar", help="Exportar todos los amigos a NDJSON, CSV o columnar")
+    exportar.add_argument("archivo", help="Archivo de salida (- = salida estándar)")
+    exportar.add_argument("--formato", choices=["ndjson", "csv", "columnar"], default=None)
+    exportar.add_argument("--compresion", choices=["gzip", "zstd", "br", "ninguna"], default=None)
+    exportar.set_defaults(funcion=comando_exportar)
+    
+    buscar = comandos.add_parser("buscar", help="Buscar amigos por nombre")
+    buscar.add_argument("nombres", nargs="+")
+    buscar.set_defaults(funcion=comando_buscar)
+    
+    recuerdo = comandos.add_parser("recuerdo", help="Agregar un recuerdo a un amigo")
+    recuerdo.add_argument("nombre")
+    recuerdo.add_argument("texto")
+    recuerdo.set_defaults(funcion=comando_recuerdo)
+    
+    recuerdos = comandos.add_parser("recuerdos", help="Agregar recuerdos desde NDJSON o CSV")
+    recuerdos.add_argument("archivo", help="Registros con nombre y recuerdo (- = entrada estándar)")
+    recuerdos.add_argument("--formato", choices=["ndjson", "csv"], default=None)
+    recuerdos.add_argument("--lote", type=int, default=1000, help="Registros por lote")
+    recuerdos.set_defaults(funcion=comando_recuerdos)
+    
+    notificaciones = comandos.add_parser("notificaciones", help="Generar notificaciones")
+    notificaciones.add_argument("--informal", action="store_true")
+    notificaciones.add_argument("--idioma", default=None, help="Idioma de las plantillas (es, en...)")
+    notificaciones.add_argument("--plantillas", default=None,
+                                help="JSON {idioma: {estilo: {tipo: plantilla}}} con plantillas propias")
+    notificaciones.set_defaults(funcion=comando_notificaciones)
+    
+    duplicados = comandos.add_parser("duplicados", help="Buscar (o unir) amigos y recuerdos repetidos")
+    duplicados.add_argument("--fusionar", action="store_true",
+                            help="Unir los amigos con el mismo nombre y quitar recuerdos repetidos")
+    duplicados.add_argument("--casi", action="store_true",
+                            help="Con --fusionar, quitar también los recuerdos casi iguales")
+    duplicados.add_argument("--parecidos", action="store_true",
+                            help="Con --fusionar, unir también los nombres iguales sin acentos "
+                                 "ni mayúsculas (José y Jose)")
+    duplicados.add_argument("--sin-recuerdos", action="store_true",
+                            help="No revisar los recuerdos de cada amigo")
+    duplicados.set_defaults(funcion=comando_duplicados)
+    
+    instantanea = comandos.add_parser("instantanea", help="Tomar una instantánea de los datos ahora")
+    instantanea.set_defaults(funcion=comando_instantanea)
+    
+    lista_instantaneas = comandos.add_parser("instantaneas", help="Listar las instantáneas conservadas")
+    lista_instantaneas.set_defaults(funcion=comando_instantaneas)
+    
+    restaurar = comandos.add_parser("restaurar", help="Volver los datos a un momento dado")
+    restaurar.add_argument("hasta", help="Momento ISO (ej: 2024-06-01T10:30:00) o segundos desde 1970")
+    restaurar.set_defaults(funcion=comando_restaurar)
+    
+    return parser
+
+
+def ejecutar_comando(argv):
+    """
+    Ejecuta un comando del modo por lotes.
+    
+    Returns:
+        int: Código de salida (0 = todo bien, 1 = hubo registros con error, 2 = error general)
+    """
+    argumentos = crear_parser().parse_args(argv)
+    salida = sys.stdout
+    
+    # Los mensajes del gestor y de config (✓/✗) van a stderr; stdout queda para los datos
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            return argumentos.funcion(argumentos, salida)
+        except (OSError, ValueError) as e:
+            print(f"✗ Error: {e}")
+            return 2
+
+
 if __name__ == "__main__":
-    main()      
+    if len(sys.argv) > 1:
+        sys.exit(ejecutar_comando(sys.argv[1:]))
+    main()
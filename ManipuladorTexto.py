@@ -1,11 +1,188 @@
+import json
+import os
+from string import Formatter
+
+
+# Plantillas de notificación por idioma, estilo y tipo de amigo ("*" = cualquier tipo).
+# Campos disponibles: {nombre}, {cumpleanos}, {tipo}, {gustos}, {recuerdos} (cantidad)
+# y {nivelConfianza} (vacío en los amigos regulares). Las llaves literales van como {{ }}.
+PLANTILLAS = {
+    "es": {
+        "formal": {"*": "Estimado usuario, le recordamos contactar a: {nombre}"},
+        "informal": {"*": "Hey! No olvides hablar con {nombre} 😊"}
+    },
+    "en": {
+        "formal": {"*": "Dear user, please remember to contact: {nombre}"},
+        "informal": {"*": "Hey! Don't forget to talk to {nombre} 😊"}
+    }
+}
+
+# Idioma usado cuando no hay plantilla para el pedido
+IDIOMA_PREDETERMINADO = "es"
+
+# Cómo se obtiene cada campo de una plantilla a partir del amigo
+CAMPOS = {
+    "nombre": lambda amigo: amigo.nombre,
+    "cumpleanos": lambda amigo: amigo.cumpleanos,
+    "tipo": lambda amigo: type(amigo).__name__,
+    "gustos": lambda amigo: ", ".join(amigo.gustos),
+    "recuerdos": lambda amigo: amigo.recuerdos.contarRecuerdos(),
+    "nivelConfianza": lambda amigo: getattr(amigo, "nivelConfianza", "")
+}
+
+
+def compilarPlantilla(plantilla):
+    """
+    Convierte una plantilla en una función amigo → texto.
+
+    La plantilla se analiza una sola vez: se valida que sus campos existan y se
+    reescribe con campos posicionales ({0}, {1}...), así al renderizar solo se
+    calculan los campos que usa y el formateo lo hace str.format.
+
+    Raises:
+        ValueError: Si la plantilla usa un campo desconocido o está mal formada
+    """
+    partes = []
+    obtener = []
+    for literal, campo, especificacion, conversion in Formatter().parse(plantilla):
+        partes.append(literal.replace("{", "{{").replace("}", "}}"))
+        if campo is None:
+            continue
+        if campo not in CAMPOS:
+            raise ValueError(f"Campo desconocido en la plantilla: {{{campo}}} "
+                             f"(disponibles: {', '.join(CAMPOS)})")
+        partes.append("{" + str(len(obtener)) + ("!" + conversion if conversion else "") +
+                      (":" + especificacion if especificacion else "") + "}")
+        obtener.append(CAMPOS[campo])
+
+    formato = "".join(partes)
+    if not obtener:
+        return lambda amigo: formato.format()
+    if len(obtener) == 1:
+        unico = obtener[0]
+        return lambda amigo: formato.format(unico(amigo))
+    return lambda amigo: formato.format(*[funcion(amigo) for funcion in obtener])
+
+
 class ManipuladorTexto:
 
-    def __init__(self, estiloFormal=True):
+    def __init__(self, estiloFormal=True, idioma=None, plantillas=None, archivo_plantillas=None):
         """
         Constructor con estilo formal por defecto
         estiloFormal: Boolean que indica si el estilo es formal o informal
+        idioma: Código de idioma de las plantillas (por defecto AMIGOS_IDIOMA o "es")
+        plantillas: Dict {idioma: {estilo: {tipo: plantilla}}} que se suma a las predeterminadas
+        archivo_plantillas: JSON con el mismo formato (por defecto AMIGOS_PLANTILLAS); si el
+                            archivo cambia, se vuelve a leer antes de la siguiente notificación
         """
         self.estiloFormal = estiloFormal
+        self.idioma = idioma or os.environ.get("AMIGOS_IDIOMA", IDIOMA_PREDETERMINADO)
+        self.plantillas_propias = plantillas or {}
+        self.archivo_plantillas = archivo_plantillas or os.environ.get("AMIGOS_PLANTILLAS")
+        self.firma_archivo = None
+        self.plantillas = {}
+        self.funciones = {}
+        self.compiladas = {}
+        self._cargarPlantillas()
+
+    def _cargarPlantillas(self):
+        """
+        Une las plantillas predeterminadas, las del archivo y las recibidas, las
+        compila todas y vacía la caché.
+
+        Si el archivo no se puede leer o alguna plantilla no compila, se conserva el
+        conjunto anterior (al crear el manipulador, el que no usa el archivo).
+        """
+        # La firma se toma antes de leer: un cambio durante la lectura se verá después
+        firma = self._firmaArchivo()
+        try:
+            plantillas, funciones = self._unirPlantillas(leer_archivo=True)
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            print(f"✗ No se cargaron las plantillas de {self.archivo_plantillas}: {e}")
+            self.firma_archivo = firma
+            if self.funciones:
+                return
+            plantillas, funciones = self._unirPlantillas(leer_archivo=False)
+
+        self.plantillas = plantillas
+        self.funciones = funciones
+        self.compiladas = {}
+        self.firma_archivo = firma
+
+    def _unirPlantillas(self, leer_archivo):
+        """Retorna (plantillas, funciones compiladas por (idioma, estilo, tipo))"""
+        plantillas = {}
+        fuentes = [PLANTILLAS]
+        if leer_archivo and self.archivo_plantillas and os.path.exists(self.archivo_plantillas):
+            with open(self.archivo_plantillas, 'r', encoding='utf-8') as archivo:
+                fuentes.append(json.load(archivo))
+        fuentes.append(self.plantillas_propias)
+
+        for fuente in fuentes:
+            for idioma, estilos in fuente.items():
+                for estilo, por_tipo in estilos.items():
+                    plantillas.setdefault(idioma, {}).setdefault(estilo, {}).update(por_tipo)
+
+        funciones = {}
+        for idioma, estilos in plantillas.items():
+            for estilo, por_tipo in estilos.items():
+                for tipo, plantilla in por_tipo.items():
+                    funciones[(idioma, estilo, tipo)] = compilarPlantilla(plantilla)
+        return plantillas, funciones
+
+    def _firmaArchivo(self):
+        if not self.archivo_plantillas:
+            return None
+        try:
+            estado = os.stat(self.archivo_plantillas)
+            return (estado.st_mtime_ns, estado.st_size)
+        except FileNotFoundError:
+            return None
+
+    def recargarSiCambio(self):
+        """Vuelve a leer el archivo de plantillas si cambió desde la última lectura"""
+        if self.archivo_plantillas and self._firmaArchivo() != self.firma_archivo:
+            self._cargarPlantillas()
+
+    def definirPlantilla(self, tipo, plantilla, estilo=None, idioma=None):
+        """
+        Define (o cambia) una plantilla; se valida compilándola en el momento.
+        tipo: "AmigoRegular", "AmigoCercano" o "*"
+        estilo: "formal" o "informal" (por defecto el estilo actual)
+        idioma: Código de idioma (por defecto el actual)
+        """
+        funcion = compilarPlantilla(plantilla)
+        estilo = estilo or self.estilo()
+        idioma = idioma or self.idioma
+        self.plantillas_propias.setdefault(idioma, {}).setdefault(estilo, {})[tipo] = plantilla
+        self.plantillas.setdefault(idioma, {}).setdefault(estilo, {})[tipo] = plantilla
+        self.funciones[(idioma, estilo, tipo)] = funcion
+        self.compiladas = {}
+
+    def estilo(self):
+        return "formal" if self.estiloFormal else "informal"
+
+    def plantillaPara(self, tipo):
+        """
+        Retorna la función compilada para un tipo de amigo con el idioma y estilo actuales.
+
+        Busca primero el tipo exacto y luego "*", en el idioma actual y luego en el
+        predeterminado. Las plantillas ya se compilaron al cargarlas; aquí solo se
+        recuerda qué función le toca a cada combinación.
+        """
+        estilo = self.estilo()
+        clave = (self.idioma, estilo, tipo)
+        compilada = self.compiladas.get(clave)
+        if compilada is None:
+            for idioma in (self.idioma, IDIOMA_PREDETERMINADO):
+                compilada = self.funciones.get((idioma, estilo, tipo)) or \
+                    self.funciones.get((idioma, estilo, "*"))
+                if compilada is not None:
+                    break
+            if compilada is None:
+                compilada = compilarPlantilla(PLANTILLAS[IDIOMA_PREDETERMINADO][estilo]["*"])
+            self.compiladas[clave] = compilada
+        return compilada
 
     def manipularTexto(self, texto):
         """Método para manipular texto genérico"""
@@ -16,12 +193,27 @@ class ManipuladorTexto:
         Formatea la notificación según el estilo definido
         amigo: Objeto de tipo Amigo
         """
-        nombre = amigo.nombre
-        if self.estiloFormal:
-            return "Estimado usuario, le recordamos contactar a: " + nombre
-        else:
-            return "Hey! No olvides hablar con " + nombre + " 😊"
-    
+        self.recargarSiCambio()
+        return self.plantillaPara(type(amigo).__name__)(amigo)
+
+    def formatearNotificaciones(self, amigos):
+        """
+        Formatea las notificaciones de muchos amigos de una vez
+        amigos: Iterable de objetos Amigo
+        Retorna una lista de textos (en el mismo orden)
+        """
+        self.recargarSiCambio()
+        por_tipo = {}
+        textos = []
+        for amigo in amigos:
+            tipo = type(amigo).__name__
+            compilada = por_tipo.get(tipo)
+            if compilada is None:
+                compilada = self.plantillaPara(tipo)
+                por_tipo[tipo] = compilada
+            textos.append(compilada(amigo))
+        return textos
+
     def cambiarEstiloFormal(self, nuevo_estilo):
         """
         Cambia el estilo de las notificaciones
@@ -32,3 +224,11 @@ class ManipuladorTexto:
             return "Estilo cambiado a: Formal"
         else:
             return "Estilo cambiado a: Informal"
+
+    def cambiarIdioma(self, idioma):
+        """
+        Cambia el idioma de las notificaciones
+        idioma: Código de idioma (ej: "es", "en")
+        """
+        self.idioma = idioma
+        return "Idioma cambiado a: " + idioma
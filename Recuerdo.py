@@ -1,3 +1,7 @@
+import time
+from bisect import bisect_right
+
+
 class Recuerdo:
     
     def __init__(self, recuerdos, tipoRecuerdo):
@@ -5,9 +9,42 @@ class Recuerdo:
         Constructor de la clase Recuerdo
         recuerdos: Lista de strings con los recuerdos
         tipoRecuerdo: Entero que indica el tipo (1: Regular, 2: Cercano)
+        
+        Cada recuerdo tiene además un id creciente y una fecha, guardados en
+        self.metadatos como pares [id, fecha] alineados con self.recuerdos.
+        self.version aumenta con cada cambio.
         """
         self.recuerdos = recuerdos if recuerdos else []
         self.tipoRecuerdo = tipoRecuerdo
+        fecha = Recuerdo.fechaActual()
+        self.metadatos = [[i + 1, fecha] for i in range(len(self.recuerdos))]
+        self.version = len(self.recuerdos)
+    
+    @staticmethod
+    def fechaActual():
+        """Retorna la fecha y hora actual en formato ISO (UTC)"""
+        return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    
+    def restaurar(self, recuerdos, metadatos=None):
+        """
+        Reemplaza los recuerdos con los leídos del archivo
+        recuerdos: Lista de strings (ya con su prefijo)
+        metadatos: Lista de pares [id, fecha]; si falta, se numeran 1..n sin fecha
+        """
+        self.recuerdos = recuerdos
+        if metadatos and len(metadatos) == len(recuerdos):
+            self.metadatos = metadatos
+        else:
+            self.metadatos = [[i + 1, None] for i in range(len(recuerdos))]
+        self.version = self.metadatos[-1][0] if self.metadatos else 0
+    
+    def _sincronizarMetadatos(self):
+        """Completa los metadatos si alguien modificó la lista de recuerdos directamente"""
+        while len(self.metadatos) < len(self.recuerdos):
+            ultimo_id = self.metadatos[-1][0] if self.metadatos else 0
+            self.metadatos.append([ultimo_id + 1, None])
+        if len(self.metadatos) > len(self.recuerdos):
+            del self.metadatos[len(self.recuerdos):]
     
     def obtenerRecuerdo(self):
         """Retorna todos los recuerdos como un string"""
@@ -26,6 +63,7 @@ class Recuerdo:
         if 0 <= indice < len(self.recuerdos):
             recuerdo_anterior = self.recuerdos[indice]
             self.recuerdos[indice] = nuevo_recuerdo
+            self.version = self.version + 1
             return "Recuerdo modificado de '" + recuerdo_anterior + "' a '" + nuevo_recuerdo + "'"
         else:
             return "Índice inválido"
@@ -49,9 +87,89 @@ class Recuerdo:
         """Agrega un nuevo recuerdo a la lista"""
         prefijo = "[Regular] " if self.tipoRecuerdo == 1 else "[Cercano] "
         recuerdo_completo = prefijo + nuevo_recuerdo
+        self._sincronizarMetadatos()
+        ultimo_id = self.metadatos[-1][0] if self.metadatos else 0
         self.recuerdos.append(recuerdo_completo)
+        self.metadatos.append([ultimo_id + 1, Recuerdo.fechaActual()])
+        self.version = self.version + 1
         return "Recuerdo agregado: " + nuevo_recuerdo
     
+    def obtenerMetadatos(self):
+        """Retorna la lista de pares [id, fecha] alineada con los recuerdos"""
+        self._sincronizarMetadatos()
+        return self.metadatos
+    
+    def ultimaEntrada(self):
+        """Retorna el último recuerdo como diccionario {id, texto, fecha}, o None"""
+        if not self.recuerdos:
+            return None
+        self._sincronizarMetadatos()
+        identificador, fecha = self.metadatos[-1]
+        return {"id": identificador, "texto": self.recuerdos[-1], "fecha": fecha}
+    
+    def aplicarEntrada(self, entrada):
+        """
+        Aplica un recuerdo registrado en el diario de cambios
+        entrada: Diccionario {id, texto, fecha}
+        Es idempotente: si el id ya existe, no hace nada
+        """
+        self._sincronizarMetadatos()
+        ultimo_id = self.metadatos[-1][0] if self.metadatos else 0
+        if entrada["id"] <= ultimo_id:
+            return False
+        self.recuerdos.append(entrada["texto"])
+        self.metadatos.append([entrada["id"], entrada["fecha"]])
+        self.version = max(self.version + 1, entrada["id"])
+        return True
+    
+    def obtenerDesde(self, desde=0, limite=50):
+        """
+        Retorna una página de recuerdos con id mayor a 'desde'
+        desde: Último id que el cliente ya tiene (0 = desde el principio)
+        limite: Cantidad máxima de recuerdos en la página
+        Retorna: (lista de {id, texto, fecha}, id para pedir la siguiente página o None)
+        """
+        self._sincronizarMetadatos()
+        # Los ids son crecientes: búsqueda binaria en lugar de recorrer la lista
+        inicio = bisect_right(self.metadatos, desde, key=lambda par: par[0])
+        fin = min(inicio + limite, len(self.recuerdos))
+        
+        pagina = []
+        for i in range(inicio, fin):
+            pagina.append({"id": self.metadatos[i][0],
+                           "texto": self.recuerdos[i],
+                           "fecha": self.metadatos[i][1]})
+        
+        siguiente = self.metadatos[fin - 1][0] if fin < len(self.recuerdos) and pagina else None
+        return pagina, siguiente
+    
     def contarRecuerdos(self):
         """Retorna la cantidad de recuerdos"""
         return len(self.recuerdos)
+    
+    def quitarRecuerdos(self, indices):
+        """
+        Quita los recuerdos de las posiciones indicadas (ej: repetidos)
+        indices: Posiciones a quitar
+        Los ids de los que quedan no cambian, así que siguen siendo crecientes
+        """
+        self._sincronizarMetadatos()
+        quitar = set(indices)
+        self.recuerdos = [texto for i, texto in enumerate(self.recuerdos) if i not in quitar]
+        self.metadatos = [par for i, par in enumerate(self.metadatos) if i not in quitar]
+        self.version = self.version + 1
+        return len(quitar)
+    
+    def incorporar(self, otro):
+        """
+        Agrega al final los recuerdos de otro objeto Recuerdo (ej: al unir dos amigos)
+        Cada recuerdo recibe un id nuevo y conserva su fecha
+        """
+        self._sincronizarMetadatos()
+        ultimo_id = self.metadatos[-1][0] if self.metadatos else 0
+        for texto, (_, fecha) in zip(otro.recuerdos, otro.obtenerMetadatos()):
+            ultimo_id = ultimo_id + 1
+            self.recuerdos.append(texto)
+            self.metadatos.append([ultimo_id, fecha])
+        self.version = max(self.version + 1, ultimo_id)
+        return len(otro.recuerdos)
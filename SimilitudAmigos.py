@@ -0,0 +1,190 @@
+import hashlib
+import heapq
+import random
+import threading
+from itertools import islice
+
+
+# Firmas MinHash: BANDAS bandas de FILAS_BANDA valores (64 permutaciones en total).
+# Dos amigos comparten alguna banda con probabilidad alta si su Jaccard supera
+# ~(1/BANDAS)^(1/FILAS_BANDA) ≈ 0.18: con pocos gustos por amigo, 0.25 ya es mucho en común
+BANDAS = 32
+FILAS_BANDA = 2
+PERMUTACIONES = BANDAS * FILAS_BANDA
+
+# Primo de Mersenne 2^61 - 1 para las permutaciones (a * x + b) mod PRIMO
+PRIMO = (1 << 61) - 1
+
+# Semilla fija: las firmas son iguales entre procesos y entre ejecuciones
+SEMILLA = 20240601
+
+# Peso de cada parte en la similitud final (gustos en común y recuerdos en común)
+PESO_GUSTOS = 0.7
+PESO_RECUERDOS = 0.3
+
+# Candidatos que se comparan de verdad como máximo, y amigos leídos por cubeta
+MAX_CANDIDATOS = 2000
+MAX_CUBETA = 500
+
+# Tokens cuyos valores MinHash se recuerdan (los gustos se repiten mucho entre amigos)
+MAX_TOKENS_CACHE = 100000
+
+
+def _normalizar(texto):
+    return str(texto).strip().casefold()
+
+
+class SimilitudAmigos:
+    """
+    Índice de amigos parecidos por gustos y recuerdos en común, con firmas MinHash y LSH.
+
+    Cada amigo es un conjunto de tokens ("g:<gusto>" y "r:<recuerdo>"). Su firma
+    MinHash se parte en bandas y cada banda va a una cubeta; los candidatos de una
+    consulta son los amigos que comparten alguna cubeta, y solo a ellos se les
+    calcula la similitud exacta (Jaccard). Así una consulta no compara contra todos.
+
+    Igual que IndicesAmigos, es un observador: agregar, eliminar y recuerdo
+    actualizan solo al amigo afectado; "reemplazar" lo deja obsoleto y se
+    reconstruye en la siguiente consulta. Se guarda por nombre, sin los objetos Amigo.
+    """
+
+    def __init__(self):
+        generador = random.Random(SEMILLA)
+        self.coeficientes = [(generador.randrange(1, PRIMO), generador.randrange(PRIMO))
+                             for _ in range(PERMUTACIONES)]
+        self.candado = threading.Lock()
+        self.cache_tokens = {}
+        self.amigos = {}
+        self.cubetas = [{} for _ in range(BANDAS)]
+        self.obsoleto = True
+
+    @staticmethod
+    def conjuntosDe(amigo):
+        """Retorna (gustos, recuerdos) normalizados del amigo, como conjuntos"""
+        gustos = frozenset(_normalizar(gusto) for gusto in amigo.gustos or [])
+        recuerdos = frozenset(_normalizar(texto) for texto in amigo.recuerdos.recuerdos)
+        return gustos, recuerdos
+
+    def _valoresToken(self, token):
+        """Valores del token en cada permutación (memorizados)"""
+        valores = self.cache_tokens.get(token)
+        if valores is None:
+            base = int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), "big")
+            valores = tuple((a * base + b) % PRIMO for a, b in self.coeficientes)
+            if len(self.cache_tokens) >= MAX_TOKENS_CACHE:
+                self.cache_tokens.clear()
+            self.cache_tokens[token] = valores
+        return valores
+
+    def firma(self, gustos, recuerdos):
+        """Firma MinHash del conjunto de tokens (None si el amigo no tiene gustos ni recuerdos)"""
+        vectores = [self._valoresToken("g:" + gusto) for gusto in gustos]
+        vectores.extend(self._valoresToken("r:" + texto) for texto in recuerdos)
+        if not vectores:
+            return None
+        return tuple(map(min, zip(*vectores)))
+
+    @staticmethod
+    def clavesBandas(firma):
+        # zip sobre el mismo iterador FILAS_BANDA veces agrupa la firma en bandas consecutivas
+        return list(map(hash, zip(*[iter(firma)] * FILAS_BANDA)))
+
+    def _indexar(self, amigo):
+        self._quitar(amigo.nombre)
+        gustos, recuerdos = SimilitudAmigos.conjuntosDe(amigo)
+        firma = self.firma(gustos, recuerdos)
+        claves = SimilitudAmigos.clavesBandas(firma) if firma is not None else []
+        for banda, clave in enumerate(claves):
+            self.cubetas[banda].setdefault(clave, {})[amigo.nombre] = None
+        self.amigos[amigo.nombre] = (gustos, recuerdos, claves)
+
+    def _quitar(self, nombre):
+        datos = self.amigos.pop(nombre, None)
+        if datos is None:
+            return
+        for banda, clave in enumerate(datos[2]):
+            cubeta = self.cubetas[banda].get(clave)
+            if cubeta is not None:
+                cubeta.pop(nombre, None)
+                if not cubeta:
+                    del self.cubetas[banda][clave]
+
+    def reconstruir(self, amigos):
+        """Calcula las firmas de todos los amigos desde cero"""
+        self.amigos = {}
+        self.cubetas = [{} for _ in range(BANDAS)]
+        for amigo in amigos:
+            self._indexar(amigo)
+        self.obsoleto = False
+
+    def actualizar(self, evento, amigo):
+        """
+        Recibe un cambio del gestor.
+        evento: "agregar", "eliminar", "recuerdo" o "reemplazar"
+        """
+        with self.candado:
+            if self.obsoleto:
+                return
+            if evento in ("agregar", "recuerdo"):
+                self._indexar(amigo)
+            elif evento == "eliminar":
+                self._quitar(amigo.nombre)
+            elif evento == "reemplazar":
+                self.obsoleto = True
+
+    @staticmethod
+    def jaccard(a, b):
+        if not a and not b:
+            return 0.0
+        return len(a & b) / len(a | b)
+
+    def similares(self, obtener_amigos, nombre, limite=10):
+        """
+        Retorna los amigos más parecidos a uno, ordenados de más a menos parecido.
+
+        Args:
+            obtener_amigos (callable): Retorna la lista completa (solo para reconstruir)
+            nombre (str): Nombre del amigo de referencia
+            limite (int): Cantidad máxima de amigos parecidos
+
+        Returns:
+            tuple: (lista de dicts con nombre, similitud y lo que tienen en común, plan)
+                   o (None, None) si el amigo no existe
+        """
+        with self.candado:
+            if self.obsoleto:
+                self.reconstruir(obtener_amigos())
+
+            datos = self.amigos.get(nombre)
+            if datos is None:
+                return None, None
+            gustos, recuerdos, claves = datos
+
+            # Candidatos: cuantas más bandas comparten con el amigo, más probable que se parezcan
+            coincidencias = {}
+            for banda, clave in enumerate(claves):
+                for otro in islice(self.cubetas[banda].get(clave, ()), MAX_CUBETA + 1):
+                    if otro != nombre:
+                        coincidencias[otro] = coincidencias.get(otro, 0) + 1
+            candidatos = coincidencias
+            if len(coincidencias) > MAX_CANDIDATOS:
+                candidatos = heapq.nlargest(MAX_CANDIDATOS, coincidencias, key=coincidencias.get)
+
+            resultados = []
+            for otro in candidatos:
+                gustos_otro, recuerdos_otro = self.amigos[otro][:2]
+                similitud = PESO_GUSTOS * SimilitudAmigos.jaccard(gustos, gustos_otro) + \
+                    PESO_RECUERDOS * SimilitudAmigos.jaccard(recuerdos, recuerdos_otro)
+                if similitud > 0:
+                    resultados.append((similitud, otro, gustos_otro, recuerdos_otro))
+
+            mejores = heapq.nlargest(limite, resultados, key=lambda resultado: (resultado[0], resultado[1]))
+            plan = {"candidatos": len(coincidencias), "comparados": len(candidatos),
+                    "total": len(self.amigos)}
+
+        return [{
+            "nombre": otro,
+            "similitud": round(similitud, 4),
+            "gustos_comunes": sorted(gustos & gustos_otro),
+            "recuerdos_comunes": sorted(recuerdos & recuerdos_otro)
+        } for similitud, otro, gustos_otro, recuerdos_otro in mejores], plan
@@ -0,0 +1,445 @@
+"""
+benchmark.py - Suite de benchmarks reproducibles
+
+Mide el rendimiento de las piezas principales del sistema con datos sintéticos:
+- GestorAmigos: buscarAmigo, eliminarAmigo, generarLista, generarNotificacion
+- config: cargar_datos y guardar_datos
+- APIs Flask (Laura y Juan): peticiones por segundo usando el cliente de pruebas
+
+Los datos se generan con una semilla fija, así que dos corridas con los mismos
+parámetros usan exactamente los mismos amigos. Los resultados se emiten en JSON
+para poder compararlos entre versiones y detectar regresiones.
+
+Uso:
+    python benchmark.py
+    python benchmark.py --tamanos 1000,10000 --salida resultados.json
+    python benchmark.py --tamanos 100000 --max-http 10000
+    python benchmark.py --omitir generarLista,generarNotificacion
+    python benchmark.py --tamanos 100000 --procesos 8
+    python benchmark.py --arranque 5 --tamanos 1000,100000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import config
+from GestorAmigos import GestorAmigos
+from ManipuladorTexto import ManipuladorTexto
+from persistencia import diccionario_a_amigo, escribir_amigos_json
+
+
+# Tamaños por defecto (cantidad de amigos)
+TAMANOS_POR_DEFECTO = [1000, 10000, 100000, 1000000]
+
+# Escenarios de arranque: código que ejecuta un intérprete nuevo en cada medición
+ESCENARIOS_ARRANQUE = [
+    ("arranque python", "pass"),
+    ("arranque import config", "import config"),
+    ("arranque import config + calentar", "import config; config.calentar()"),
+    ("arranque import Main", "import Main"),
+    ("arranque import API Laura", "import AmigoRegular_APIlaura"),
+    ("arranque import API Juan", "import AmigoCercano_APIJuandi")
+]
+
+# Operaciones que no se deben ejecutar (se llena desde la línea de comandos)
+OPERACIONES_OMITIDAS = []
+
+# Valores que imitan la distribución de amigos_data.json
+NOMBRES = ["Carlos", "Ricardo", "Dani", "Braulio", "Stido", "Edgar", "Laura",
+           "Juan", "Sofia", "Valentina", "Mateo", "Camila", "Andres", "Paula"]
+GUSTOS = ["deportes", "musica", "cine", "lectura", "videojuegos", "cocina",
+          "viajes", "baile"]
+RECUERDOS = ["viaje a la playa", "concierto", "fuimos al cine",
+             "cumpleaños sorpresa", "partido de futbol", "paseo al rio"]
+ANECDOTAS = ["nos reimos mucho", "nos reimos poco", "nos perdimos en el centro",
+             "se nos daño el carro"]
+
+
+# ============================================
+# GENERADOR DE DATOS SINTÉTICOS
+# ============================================
+
+def generar_amigos(cantidad, semilla=42):
+    """
+    Genera una lista de diccionarios de amigos con el formato de amigos_data.json.
+
+    Args:
+        cantidad (int): Número de amigos a generar
+        semilla (int): Semilla del generador aleatorio (reproducibilidad)
+
+    Returns:
+        list: Lista de diccionarios de amigos
+    """
+    aleatorio = random.Random(semilla)
+    datos = []
+
+    for i in range(cantidad):
+        amigo_dict = {
+            "tipo": "AmigoCercano" if aleatorio.random() < 0.35 else "AmigoRegular",
+            "nombre": aleatorio.choice(NOMBRES) + " " + str(i),
+            "cumpleanos": "%02d/%02d/%d" % (aleatorio.randint(1, 28),
+                                            aleatorio.randint(1, 12),
+                                            aleatorio.randint(1970, 2010)),
+            # La mayoría tiene 1 o 2 gustos y 1 recuerdo, como en los datos reales
+            "gustos": aleatorio.sample(GUSTOS, aleatorio.choice([1, 1, 2, 2, 3])),
+            "recuerdos": [aleatorio.choice(RECUERDOS)
+                          for _ in range(aleatorio.choice([1, 1, 1, 2, 3]))],
+            "anecdotas": [aleatorio.choice(ANECDOTAS)
+                          for _ in range(aleatorio.choice([0, 1, 1, 2]))]
+        }
+
+        if amigo_dict["tipo"] == "AmigoCercano":
+            amigo_dict["nivelConfianza"] = aleatorio.randint(1, 10)
+
+        datos.append(amigo_dict)
+
+    return datos
+
+
+def construir_amigo(amigo_dict):
+    """Convierte un diccionario generado en un objeto AmigoRegular o AmigoCercano"""
+    # Copiar los recuerdos para que cada corrida parta de los mismos datos
+    return diccionario_a_amigo(dict(amigo_dict, recuerdos=list(amigo_dict["recuerdos"])))
+
+
+def construir_gestor(datos):
+    """Crea un GestorAmigos nuevo con los amigos generados"""
+    amigos = [construir_amigo(amigo_dict) for amigo_dict in datos]
+    return GestorAmigos(amigos, ManipuladorTexto(estiloFormal=True))
+
+
+# ============================================
+# MEDICIÓN
+# ============================================
+
+def medir(nombre, cantidad, funcion, repeticiones):
+    """
+    Ejecuta una función varias veces y devuelve un resultado serializable.
+
+    Args:
+        nombre (str): Nombre de la operación medida
+        cantidad (int): Tamaño del dataset
+        funcion (callable): Función que recibe el número de iteración
+        repeticiones (int): Veces que se ejecuta la función
+
+    Returns:
+        dict: Resultado con tiempos en segundos y operaciones por segundo,
+              o None si la operación está en OPERACIONES_OMITIDAS
+    """
+    for fragmento in OPERACIONES_OMITIDAS:
+        if fragmento in nombre:
+            return None
+
+    tiempos = []
+    cpu_inicio = time.process_time()
+
+    # Los métodos del gestor imprimen mensajes; los silenciamos para no medir la consola
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(repeticiones):
+            inicio = time.perf_counter()
+            funcion(i)
+            tiempos.append(time.perf_counter() - inicio)
+    cpu_total = time.process_time() - cpu_inicio
+
+    total = sum(tiempos)
+    return {
+        "operacion": nombre,
+        "amigos": cantidad,
+        "repeticiones": repeticiones,
+        "total_s": total,
+        "media_s": total / repeticiones,
+        "mediana_s": statistics.median(tiempos),
+        "min_s": min(tiempos),
+        "max_s": max(tiempos),
+        # CPU de este proceso solamente: lo que no se reparte entre los procesos hijos
+        "cpu_media_s": cpu_total / repeticiones,
+        "ops_por_segundo": repeticiones / total if total > 0 else None
+    }
+
+
+def repeticiones_para(cantidad, base):
+    """Reduce las repeticiones de las operaciones lineales en datasets grandes"""
+    return max(1, min(base, base * 1000 // max(cantidad, 1)))
+
+
+def benchmark_gestor(datos, aleatorio):
+    """Mide las operaciones de GestorAmigos sobre un dataset"""
+    cantidad = len(datos)
+    nombres = [amigo_dict["nombre"] for amigo_dict in datos]
+    resultados = []
+
+    gestor = construir_gestor(datos)
+
+    # Búsquedas: la mitad existentes (posición aleatoria) y la mitad inexistentes
+    busquedas = [aleatorio.choice(nombres) if i % 2 == 0 else "No Existe " + str(i)
+                 for i in range(1000)]
+    resultados.append(medir("GestorAmigos.buscarAmigo", cantidad,
+                            lambda i: gestor.buscarAmigo(busquedas[i % len(busquedas)]),
+                            repeticiones_para(cantidad, 200)))
+
+    resultados.append(medir("GestorAmigos.generarLista", cantidad,
+                            lambda i: gestor.generarLista(),
+                            repeticiones_para(cantidad, 5)))
+
+    resultados.append(medir("GestorAmigos.generarNotificacion", cantidad,
+                            lambda i: gestor.generarNotificacion(),
+                            repeticiones_para(cantidad, 5)))
+
+    # Eliminar modifica el gestor, por eso va al final y usa nombres distintos
+    a_eliminar = aleatorio.sample(nombres, min(len(nombres), repeticiones_para(cantidad, 100)))
+    resultados.append(medir("GestorAmigos.eliminarAmigo", cantidad,
+                            lambda i: gestor.eliminarAmigo(a_eliminar[i]),
+                            len(a_eliminar)))
+
+    return resultados
+
+
+def procesos_a_medir(procesos):
+    """Cantidades de procesos del snapshot en partes: 2, 4, 8... hasta `procesos` (incluido)"""
+    cantidades = []
+    cantidad = 2
+    while cantidad < procesos:
+        cantidades.append(cantidad)
+        cantidad = cantidad * 2
+    return cantidades + [procesos] if procesos > 1 else []
+
+
+def benchmark_persistencia(datos, directorio, procesos=0):
+    """
+    Mide config.guardar_datos y config.cargar_datos sobre un archivo temporal.
+
+    Si procesos > 1, también mide el snapshot en partes con 2, 4, 8... hasta
+    ese número de procesos (y el doble de partes). La referencia es el archivo
+    único; "cpu_media_s" muestra la parte del trabajo que queda en el proceso
+    principal y no se reparte.
+    """
+    cantidad = len(datos)
+    archivo_original = config.ARCHIVO_DATOS
+    procesos_original = config.PROCESOS_SNAPSHOT
+    partes_original = config.PARTES_SNAPSHOT
+    config.ARCHIVO_DATOS = os.path.join(directorio, "amigos_bench_%d.json" % cantidad)
+    resultados = []
+
+    try:
+        config.gestor.amigos = construir_gestor(datos).amigos
+        repeticiones = repeticiones_para(cantidad, 5)
+
+        config.PROCESOS_SNAPSHOT = 0
+        resultados.append(medir("config.guardar_datos", cantidad,
+                                lambda i: config.guardar_datos(), repeticiones))
+        resultados.append(medir("config.cargar_datos", cantidad,
+                                lambda i: config.cargar_datos(), repeticiones))
+
+        # Snapshot en partes con 2, 4, 8... procesos hasta `procesos`: el guardado
+        # (y la CPU del proceso principal) debería bajar a medida que crecen;
+        # la carga lee las partes en serie y debería costar como el archivo único
+        for cantidad_procesos in procesos_a_medir(procesos):
+            config.PROCESOS_SNAPSHOT = cantidad_procesos
+            config.PARTES_SNAPSHOT = cantidad_procesos * 2
+            nombre = " (%d partes, %d procesos)" % (cantidad_procesos * 2, cantidad_procesos)
+            resultados.append(medir("config.guardar_datos" + nombre, cantidad,
+                                    lambda i: config.guardar_datos(), repeticiones))
+            resultados.append(medir("config.cargar_datos" + nombre, cantidad,
+                                    lambda i: config.cargar_datos(), repeticiones))
+    finally:
+        config.ARCHIVO_DATOS = archivo_original
+        config.PROCESOS_SNAPSHOT = procesos_original
+        config.PARTES_SNAPSHOT = partes_original
+
+    return resultados
+
+
+def benchmark_http(datos, directorio, aleatorio):
+    """
+    Mide el throughput de punta a punta de ambas APIs con el cliente de pruebas de Flask.
+
+    Cada endpoint se mide sobre el mismo archivo de datos; las peticiones POST
+    escriben en una copia temporal para no tocar amigos_data.json.
+    """
+    try:
+        import AmigoRegular_APIlaura as api_laura
+        import AmigoCercano_APIJuandi as api_juan
+    except ImportError as e:
+        print(f"ℹ Se omiten los benchmarks HTTP: {e}", file=sys.stderr)
+        return []
+
+    cantidad = len(datos)
+    archivo_original = config.ARCHIVO_DATOS
+    config.ARCHIVO_DATOS = os.path.join(directorio, "amigos_http_%d.json" % cantidad)
+    nombres = [amigo_dict["nombre"] for amigo_dict in datos]
+    resultados = []
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            config.gestor.amigos = construir_gestor(datos).amigos
+            config.guardar_datos()
+
+        cliente_laura = api_laura.app.test_client()
+        cliente_juan = api_juan.app.test_client()
+        repeticiones = repeticiones_para(cantidad, 20)
+
+        def peticion(cliente, metodo, ruta, **kwargs):
+            respuesta = cliente.open(ruta, method=metodo, **kwargs)
+            if respuesta.status_code >= 500:
+                raise RuntimeError(f"{metodo} {ruta} devolvió {respuesta.status_code}")
+            return respuesta
+
+        resultados.append(medir("GET /amigos", cantidad,
+                                lambda i: peticion(cliente_laura, "GET", "/amigos"),
+                                repeticiones))
+        resultados.append(medir("GET /amigos?nombre=", cantidad,
+                                lambda i: peticion(cliente_laura, "GET", "/amigos",
+                                                   query_string={"nombre": aleatorio.choice(nombres)}),
+                                repeticiones))
+        resultados.append(medir("GET /estadisticas", cantidad,
+                                lambda i: peticion(cliente_laura, "GET", "/estadisticas"),
+                                repeticiones))
+        resultados.append(medir("POST /amigo-regular", cantidad,
+                                lambda i: peticion(cliente_juan, "POST", "/amigo-regular",
+                                                   json={"nombre": "Bench " + str(i),
+                                                         "cumpleanos": "01/01/2000",
+                                                         "gustos": ["musica"],
+                                                         "recuerdos": [], "anecdotas": []}),
+                                repeticiones))
+        resultados.append(medir("POST /amigo-regular/<nombre>/recuerdo", cantidad,
+                                lambda i: peticion(cliente_juan, "POST",
+                                                   "/amigo-regular/Bench " + str(i) + "/recuerdo",
+                                                   json={"recuerdo": "benchmark"}),
+                                repeticiones))
+    finally:
+        config.ARCHIVO_DATOS = archivo_original
+
+    for resultado in resultados:
+        if resultado is None:
+            continue
+        resultado["peticiones_por_segundo"] = resultado.pop("ops_por_segundo")
+
+    return resultados
+
+
+def benchmark_arranque(datos, directorio, repeticiones):
+    """
+    Mide cuánto tarda un proceso nuevo en importar cada módulo (y en calentar los datos).
+
+    Cada repetición lanza un intérprete aparte en una carpeta con el dataset, así
+    que se mide el costo real de arrancar un comando o un worker.
+    """
+    cantidad = len(datos)
+    carpeta = os.path.join(directorio, "arranque_%d" % cantidad)
+    os.makedirs(carpeta, exist_ok=True)
+    with open(os.path.join(carpeta, "amigos_data.json"), 'w', encoding='utf-8') as archivo:
+        escribir_amigos_json(archivo, (construir_amigo(amigo_dict) for amigo_dict in datos))
+
+    entorno = dict(os.environ)
+    raiz = os.path.dirname(os.path.abspath(__file__))
+    entorno["PYTHONPATH"] = raiz + os.pathsep + entorno.get("PYTHONPATH", "")
+
+    def lanzar(codigo):
+        subprocess.run([sys.executable, "-c", codigo], cwd=carpeta, env=entorno, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    resultados = []
+    for nombre, codigo in ESCENARIOS_ARRANQUE:
+        resultados.append(medir(nombre, cantidad, lambda i: lanzar(codigo), repeticiones))
+    return resultados
+
+
+# ============================================
+# PROGRAMA PRINCIPAL
+# ============================================
+
+def ejecutar(tamanos, max_http, semilla, omitir=(), procesos=0, arranque=0):
+    """
+    Ejecuta la suite completa y devuelve el documento de resultados.
+
+    Args:
+        tamanos (list): Cantidades de amigos a medir
+        max_http (int): Tamaño máximo para el que se miden las APIs (0 = todos)
+        semilla (int): Semilla de los datos sintéticos
+        omitir (iterable): Fragmentos de nombres de operaciones a descartar
+        procesos (int): Procesos para medir también el snapshot paralelo (0 = no medir)
+        arranque (int): Repeticiones del modo arranque; con más de 0 solo se mide
+                        el tiempo de arranque de procesos nuevos
+
+    Returns:
+        dict: Metadatos de la corrida y lista de resultados
+    """
+    documento = {
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "semilla": semilla,
+        "procesos": procesos,
+        "resultados": []
+    }
+
+    OPERACIONES_OMITIDAS[:] = list(omitir)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        for cantidad in tamanos:
+            print(f"▶ Midiendo con {cantidad} amigos...", file=sys.stderr)
+            aleatorio = random.Random(semilla)
+            datos = generar_amigos(cantidad, semilla)
+
+            if arranque > 0:
+                documento["resultados"].extend(benchmark_arranque(datos, directorio, arranque))
+                continue
+
+            documento["resultados"].extend(benchmark_gestor(datos, aleatorio))
+            documento["resultados"].extend(benchmark_persistencia(datos, directorio, procesos))
+
+            if max_http == 0 or cantidad <= max_http:
+                documento["resultados"].extend(benchmark_http(datos, directorio, aleatorio))
+
+    # Las operaciones omitidas no producen resultado
+    documento["resultados"] = [r for r in documento["resultados"] if r is not None]
+    if omitir:
+        documento["omitidas"] = list(omitir)
+
+    return documento
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del gestor de amigos")
+    parser.add_argument("--tamanos", default=",".join(str(t) for t in TAMANOS_POR_DEFECTO),
+                        help="Cantidades de amigos separadas por coma")
+    parser.add_argument("--max-http", type=int, default=0,
+                        help="Tamaño máximo para medir las APIs (0 = sin límite)")
+    parser.add_argument("--semilla", type=int, default=42,
+                        help="Semilla de los datos sintéticos")
+    parser.add_argument("--procesos", type=int, default=0,
+                        help="Procesos para medir el snapshot paralelo (0 = no medir)")
+    parser.add_argument("--omitir", default="",
+                        help="Operaciones a omitir separadas por coma (ej: generarLista)")
+    parser.add_argument("--arranque", type=int, default=0,
+                        help="Solo medir el arranque de procesos nuevos, N veces cada escenario")
+    parser.add_argument("--salida", default=None,
+                        help="Archivo JSON de resultados (por defecto, salida estándar)")
+    argumentos = parser.parse_args()
+
+    tamanos = [int(t) for t in argumentos.tamanos.split(",") if t.strip()]
+    omitir = [o.strip() for o in argumentos.omitir.split(",") if o.strip()]
+    documento = ejecutar(tamanos, argumentos.max_http, argumentos.semilla, omitir,
+                        argumentos.procesos, argumentos.arranque)
+
+    texto = json.dumps(documento, indent=2, ensure_ascii=False)
+    if argumentos.salida:
+        with open(argumentos.salida, 'w', encoding='utf-8') as archivo:
+            archivo.write(texto + "\n")
+        print(f"✓ Resultados guardados en {argumentos.salida}", file=sys.stderr)
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+compresion.py - Compresión de respuestas con caché de cuerpos comprimidos
+
+Las respuestas de GET /amigos son JSON grandes y muy repetitivos, así que se
+comprimen muy bien. Este módulo:
+- Negocia el algoritmo según la cabecera Accept-Encoding (zstd, br o gzip)
+- No comprime respuestas menores a un tamaño mínimo (no vale la pena)
+- Guarda el cuerpo ya comprimido asociado a la versión de los datos, así la
+  misma consulta se comprime una sola vez y se sirve muchas veces sin volver
+  a cargar, serializar ni comprimir
+
+Solo se cachean las rutas que se indican como cacheables: las que dependen
+únicamente de los datos. Las que muestran contadores o estado del proceso
+(estadísticas, réplica, avisos recientes) cambian sin que cambie la versión
+de los datos; esas se comprimen en cada petición.
+
+brotli y zstandard son opcionales: si no están instalados solo se ofrece gzip.
+
+Variables de entorno:
+- AMIGOS_COMPRESION=0               → desactiva la compresión
+- AMIGOS_COMPRESION_MINIMO=1024     → bytes mínimos para comprimir
+- AMIGOS_COMPRESION_CACHE=64        → cantidad de cuerpos comprimidos en caché
+"""
+
+import gzip
+import os
+import threading
+from collections import OrderedDict
+
+from flask import current_app, g, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def _comprimir_gzip(datos):
+    return gzip.compress(datos, compresslevel=9)
+
+
+def _comprimir_brotli(datos):
+    return brotli.compress(datos, quality=9)
+
+
+def _comprimir_zstd(datos):
+    return zstandard.ZstdCompressor(level=9).compress(datos)
+
+
+# Algoritmos disponibles en orden de preferencia del servidor
+ALGORITMOS = OrderedDict()
+if zstandard is not None:
+    ALGORITMOS["zstd"] = _comprimir_zstd
+if brotli is not None:
+    ALGORITMOS["br"] = _comprimir_brotli
+ALGORITMOS["gzip"] = _comprimir_gzip
+
+
+def negociar_algoritmo(accept_encoding):
+    """
+    Elige el algoritmo de compresión según la cabecera Accept-Encoding.
+
+    Se respetan los valores q del cliente; a igual q gana el orden de ALGORITMOS.
+
+    Args:
+        accept_encoding (str): Valor de la cabecera (ej: "gzip, br;q=0.9")
+
+    Returns:
+        str o None: "zstd", "br", "gzip" o None si no hay ninguno aceptable
+    """
+    if not accept_encoding:
+        return None
+
+    aceptados = {}
+    for parte in accept_encoding.split(","):
+        pedazos = parte.strip().split(";")
+        nombre = pedazos[0].strip().lower()
+        calidad = 1.0
+        for parametro in pedazos[1:]:
+            parametro = parametro.strip()
+            if parametro.startswith("q="):
+                try:
+                    calidad = float(parametro[2:])
+                except ValueError:
+                    calidad = 0.0
+        aceptados[nombre] = calidad
+
+    mejor = None
+    mejor_calidad = 0.0
+    for nombre in ALGORITMOS:
+        calidad = aceptados.get(nombre, aceptados.get("*", 0.0))
+        if calidad > mejor_calidad:
+            mejor = nombre
+            mejor_calidad = calidad
+    return mejor
+
+
+class CompresorRespuestas:
+    """
+    Instala hooks en una app Flask para comprimir y cachear respuestas GET.
+
+    Responsabilidad: negociar, comprimir y reutilizar cuerpos comprimidos.
+    """
+
+    def __init__(self, app, obtener_version, cacheables=(), minimo=None, max_entradas=None):
+        """
+        Constructor del compresor.
+
+        Args:
+            app (Flask): Aplicación cuyas respuestas se comprimen
+            obtener_version (callable): Retorna la versión actual de los datos
+                                        (cambia cuando los datos cambian)
+            cacheables (iterable): Endpoints (nombres de las funciones de Flask) cuya
+                                   respuesta depende solo de los datos y se puede cachear
+            minimo (int): Bytes mínimos para comprimir
+            max_entradas (int): Cantidad máxima de cuerpos en caché
+        """
+        self.obtener_version = obtener_version
+        self.cacheables = frozenset(cacheables)
+        self.minimo = minimo if minimo is not None else \
+            int(os.environ.get("AMIGOS_COMPRESION_MINIMO", "1024"))
+        self.max_entradas = max_entradas if max_entradas is not None else \
+            int(os.environ.get("AMIGOS_COMPRESION_CACHE", "64"))
+
+        self.cache = OrderedDict()
+        self.candado = threading.Lock()
+        self.estadisticas = {"aciertos": 0, "fallos": 0, "sin_comprimir": 0}
+
+        app.before_request(self._desde_cache)
+        app.after_request(self._comprimir)
+
+    def _desde_cache(self):
+        """Si la misma consulta ya se comprimió para esta versión de datos, la responde"""
+        if request.method != "GET":
+            return None
+
+        algoritmo = negociar_algoritmo(request.headers.get("Accept-Encoding"))
+        if algoritmo is None:
+            return None
+
+        g.compresion_algoritmo = algoritmo
+        if request.endpoint not in self.cacheables:
+            # Se comprime igual, pero no se guarda (ver _comprimir)
+            return None
+
+        clave = (self.obtener_version(), request.full_path, algoritmo)
+        g.compresion_clave = clave
+
+        with self.candado:
+            guardado = self.cache.get(clave)
+            if guardado is not None:
+                self.cache.move_to_end(clave)
+                self.estadisticas["aciertos"] = self.estadisticas["aciertos"] + 1
+
+        if guardado is None:
+            return None
+
+        cuerpo, tipo_contenido = guardado
+        respuesta = current_app.response_class(cuerpo, status=200, content_type=tipo_contenido)
+        respuesta.headers["Content-Encoding"] = algoritmo
+        respuesta.headers["Vary"] = "Accept-Encoding"
+        respuesta.headers["X-Cache-Compresion"] = "acierto"
+        return respuesta
+
+    def _comprimir(self, respuesta):
+        """Comprime la respuesta si el cliente lo acepta y el cuerpo es grande"""
+        algoritmo = getattr(g, "compresion_algoritmo", None)
+        if (algoritmo is None or respuesta.status_code != 200
+                or respuesta.direct_passthrough or respuesta.is_streamed
+                or "Content-Encoding" in respuesta.headers):
+            return respuesta
+
+        respuesta.headers.add("Vary", "Accept-Encoding")
+        cuerpo = respuesta.get_data()
+
+        if len(cuerpo) < self.minimo:
+            with self.candado:
+                self.estadisticas["sin_comprimir"] = self.estadisticas["sin_comprimir"] + 1
+            return respuesta
+
+        comprimido = ALGORITMOS[algoritmo](cuerpo)
+        respuesta.set_data(comprimido)
+        respuesta.headers["Content-Encoding"] = algoritmo
+        respuesta.headers["X-Cache-Compresion"] = "fallo"
+
+        clave = g.get("compresion_clave")
+        if clave is None:
+            respuesta.headers["X-Cache-Compresion"] = "no-cacheable"
+            return respuesta
+
+        with self.candado:
+            self.estadisticas["fallos"] = self.estadisticas["fallos"] + 1
+            self.cache[clave] = (comprimido, respuesta.content_type)
+            self.cache.move_to_end(clave)
+            while len(self.cache) > self.max_entradas:
+                self.cache.popitem(last=False)
+
+        return respuesta
+
+
+def instalar_compresion(app, obtener_version, cacheables=()):
+    """
+    Instala la compresión en la app salvo que AMIGOS_COMPRESION=0.
+
+    Args:
+        app (Flask): Aplicación a comprimir
+        obtener_version (callable): Retorna la versión actual de los datos
+        cacheables (iterable): Endpoints cuya respuesta depende solo de los datos
+
+    Returns:
+        CompresorRespuestas o None
+    """
+    if os.environ.get("AMIGOS_COMPRESION", "1") in ("0", "false", "no"):
+        return None
+    return CompresorRespuestas(app, obtener_version, cacheables)
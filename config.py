@@ -14,23 +14,296 @@ SOLUCIÓN:
 - Usar un archivo JSON (amigos_data.json) como "base de datos"
 - Ambas APIs leen y escriben en el mismo archivo
 - Los datos persisten incluso si reinicias las APIs
+
+INICIALIZACIÓN:
+- Importar este módulo no lee ningún archivo
+- Los datos se cargan la primera vez que se llama a obtener_gestor() y después
+  solo se recargan si los archivos cambiaron (ver version_datos)
+- calentar() hace la carga y arma los índices por adelantado; las APIs lo llaman
+  al arrancar, o al importarse si AMIGOS_CALENTAR=1 (ej: workers de gunicorn)
+
+INSTANTÁNEAS (AMIGOS_INSTANTANEAS=segundos, ver instantaneas.py):
+- Cada cambio del gestor queda en un historial y cada tanto se toma una
+  instantánea; restaurar_instantanea() vuelve los datos a un momento dado
+
+RÉPLICAS DE LECTURA (AMIGOS_REPLICACION=1, ver replicacion.py):
+- Los procesos que escriben publican cada cambio en amigos_data.json.cambios
+- La API de consultas llama a iniciar_replica(): carga los datos una vez y
+  después aplica ese registro en lugar de recargar cuando el archivo cambia
+
+ESCRITURAS DE VARIOS PROCESOS (API de Juan, sus workers, la CLI):
+- Quien modifica los datos lo hace dentro de `with escritura():`, un candado
+  exclusivo sobre amigos_data.json.candado: adentro obtener_gestor() trae lo
+  último del disco, así los ids de los recuerdos nuevos no se repiten entre
+  procesos y una compactación no pisa lo que otro proceso agregó al diario
+- Con fragmentos, `with escritura(nombres=[...]):` solo toma los candados de
+  los fragmentos de esos amigos: escribir amigos de fragmentos distintos no espera
+
+INQUILINOS (varios usuarios en un mismo servidor):
+- Por defecto se usan `gestor` y ARCHIVO_DATOS de este módulo
+- Si una petición pertenece a un usuario (ver inquilinos.py), se activa su
+  propio archivo y gestor y todas las funciones de abajo trabajan sobre ellos
 """
 
+import contextvars
 import json
 import os
+import threading
+from contextlib import contextmanager, ExitStack
 from GestorAmigos import GestorAmigos
+from GestorFragmentado import GestorFragmentado
+from GestorDisco import GestorDisco
 from ManipuladorTexto import ManipuladorTexto
-from AmigoRegular import AmigoRegular
-from AmigoCercano import AmigoCercano
+import instantaneas
+import replicacion
+try:
+    import fcntl
+except ImportError:
+    # Sin fcntl (Windows) el candado de escritura solo protege entre hilos
+    fcntl = None
+from persistencia import (iterar_amigos_json, iterar_snapshot, escribir_amigos_json,
+                          guardar_partes, cargar_partes, existen_partes,
+                          descartar_partes, directorio_partes, ARCHIVO_INDICE_PARTES,
+                          firma_archivo)
 
 # Nombre del archivo donde se guardarán los datos
 ARCHIVO_DATOS = "amigos_data.json"
 
+# Procesos para guardar el snapshot en paralelo (0 o 1 = un solo archivo).
+# Con 2 o más, los datos se guardan en partes dentro de amigos_data.json.partes/;
+# mientras haya partes, todos los procesos las leen (en serie, ver persistencia.py)
+PROCESOS_SNAPSHOT = int(os.environ.get("AMIGOS_PROCESOS", "0"))
+
+# Cantidad de partes del snapshot (por defecto, dos por proceso para repartir mejor)
+PARTES_SNAPSHOT = int(os.environ.get("AMIGOS_PARTES", "0")) or PROCESOS_SNAPSHOT * 2
+
+# Fragmentos por hash del nombre (0 = un solo archivo).
+# Con K > 0, cada amigo vive en amigos_data.json.fragmentos/fragmento-NNN.json
+# según el hash de su nombre, y cada escritura solo reescribe su fragmento.
+FRAGMENTOS = int(os.environ.get("AMIGOS_FRAGMENTOS", "0"))
+
+# Modo en disco (AMIGOS_DISCO=1): los amigos viven en amigos_data.json.disco/amigos.ndjson
+# y en memoria solo queda un índice y una caché LRU de CACHE_DISCO amigos completos.
+DISCO = os.environ.get("AMIGOS_DISCO", "0") not in ("", "0", "false", "no")
+CACHE_DISCO = int(os.environ.get("AMIGOS_DISCO_CACHE", "1000"))
+
+# Calentar los datos al importar las APIs (además de al ejecutarlas directamente)
+CALENTAR = os.environ.get("AMIGOS_CALENTAR", "0") not in ("", "0", "false", "no")
+
+# Gestores que guardan sus datos en sus propios archivos (no en ARCHIVO_DATOS)
+ALMACENAMIENTO_PROPIO = (GestorFragmentado, GestorDisco)
+
+# Diario de cambios: cada recuerdo nuevo se agrega como una línea al final de
+# amigos_data.json.diario en lugar de reescribir todo el archivo. Cuando el diario
+# acumula COMPACTAR_CADA entradas se hace un guardado completo y se vacía.
+COMPACTAR_CADA = int(os.environ.get("AMIGOS_COMPACTAR_CADA", "1000"))
+
+# Entradas que tiene cada diario actualmente, por archivo de datos
+# (se actualiza al cargar y registrar)
+_entradas_diario = {}
+
+# Instantáneas de cada archivo de datos (ver instantaneas_de)
+_instantaneas = {}
+
+# Publicador del registro de cambios de los datos principales (modo réplica)
+_publicador = None
+
+# Réplica que sigue ese registro (solo en la API de consultas, ver iniciar_replica)
+_replica = None
+
+# Archivos de datos cuyo candado de escritura tiene tomado cada hilo (ver escritura)
+_escrituras = threading.local()
+
+# Candado entre hilos, solo cuando no hay fcntl
+_candado_hilos = threading.RLock()
+
+# Versión de los datos (version_datos) en la última carga, por archivo de datos
+_versiones_cargadas = {}
+
 # Crear el manipulador de texto (estilo formal por defecto)
 manipulador = ManipuladorTexto(estiloFormal=True)
 
+# Inquilino activo en la petición actual (None = datos principales de este módulo)
+_inquilino_activo = contextvars.ContextVar("inquilino_activo", default=None)
+
+
+def crear_gestor(archivo_datos):
+    """
+    Crea un gestor vacío para un archivo de datos (en disco o fragmentado si así se configuró).
+    Con las instantáneas activadas, sus cambios van además al historial, y con
+    el modo réplica los cambios de los datos principales se publican para las réplicas.
+    """
+    global _publicador
+    if DISCO:
+        nuevo = GestorDisco(archivo_datos + ".disco", CACHE_DISCO, manipulador)
+    elif FRAGMENTOS > 0:
+        nuevo = GestorFragmentado(archivo_datos + ".fragmentos", FRAGMENTOS, manipulador)
+    else:
+        nuevo = GestorAmigos([], manipulador)
+    if instantaneas.esta_activo():
+        instantaneas_de(archivo_datos).instalar(nuevo)
+    if (replicacion.esta_activo() and archivo_datos == ARCHIVO_DATOS
+            and not isinstance(nuevo, ALMACENAMIENTO_PROPIO)):
+        _publicador = replicacion.PublicadorCambios(replicacion.ruta_registro(archivo_datos))
+        nuevo.agregarObservador(_publicador)
+    return nuevo
+
+
+def instantaneas_de(archivo_datos):
+    """Retorna el gestor de instantáneas de un archivo de datos (lo crea la primera vez)"""
+    gestor_instantaneas = _instantaneas.get(archivo_datos)
+    if gestor_instantaneas is None:
+        gestor_instantaneas = instantaneas.GestorInstantaneas(
+            archivo_datos, candado_datos=lambda: escritura(archivo_datos))
+        _instantaneas[archivo_datos] = gestor_instantaneas
+    return gestor_instantaneas
+
+
 # Crear el gestor vacío inicialmente
-gestor = GestorAmigos([], manipulador)
+gestor = crear_gestor(ARCHIVO_DATOS)
+
+
+def activar_inquilino(inquilino):
+    """
+    Hace que las funciones de este módulo trabajen sobre los datos de un inquilino.
+    
+    Args:
+        inquilino: Objeto con atributos archivo y gestor (None = datos principales)
+    
+    Returns:
+        Token para desactivar_inquilino
+    """
+    return _inquilino_activo.set(inquilino)
+
+
+def desactivar_inquilino(token):
+    """Vuelve al inquilino que estaba activo antes de activar_inquilino"""
+    _inquilino_activo.reset(token)
+
+
+def datos_actuales():
+    """
+    Retorna el archivo de datos y el gestor con los que se trabaja ahora.
+    
+    Returns:
+        tuple: (archivo_datos, gestor) del inquilino activo o los principales
+    """
+    inquilino = _inquilino_activo.get()
+    if inquilino is None:
+        return ARCHIVO_DATOS, gestor
+    return inquilino.archivo, inquilino.gestor
+
+
+def gestor_actual():
+    """Retorna el gestor activo sin recargar datos"""
+    return datos_actuales()[1]
+
+
+def _asegurar_directorio(ruta):
+    """Crea la carpeta de un archivo si no existe (los inquilinos nuevos no la tienen)"""
+    directorio = os.path.dirname(ruta)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+
+
+@contextmanager
+def escritura(archivo_datos=None, nombres=None):
+    """
+    Candado exclusivo entre procesos para leer, modificar y guardar los datos actuales.
+    
+    Dentro del bloque ningún otro proceso (ni otro hilo) escribe estos datos:
+    obtener_gestor() retorna lo último del disco, los ids de los recuerdos
+    nuevos no se repiten y una compactación no pisa recuerdos ajenos.
+    Es reentrante dentro del mismo hilo; guardar_datos y registrar_recuerdos
+    también lo toman.
+    
+    Con el gestor fragmentado y `nombres`, solo se toman (en orden) los
+    candados de los fragmentos de esos amigos, más el candado general en modo
+    compartido: las escrituras a amigos de fragmentos distintos no se esperan
+    entre sí. Sin `nombres` (compactar, guardar todo, fusionar, importar) se
+    toma el candado general exclusivo, que espera a todos los fragmentos.
+    
+    Args:
+        archivo_datos (str): Datos a proteger (por defecto, los actuales)
+        nombres (list): Amigos que se van a modificar (None = todos)
+    
+    Raises:
+        RuntimeError: Si un hilo que tiene candados de fragmentos pide el
+                      general o fragmentos nuevos (podría trabarse con otro)
+    
+    Ejemplo:
+        with config.escritura(nombres=[amigo.nombre]):
+            gestor = config.obtener_gestor()
+            gestor.agregarRecuerdoAmigo(amigo, "...")
+            config.registrar_recuerdo(amigo)
+    """
+    archivo_actual, gestor_actual = datos_actuales()
+    archivo_datos = archivo_datos or archivo_actual
+    tomados = getattr(_escrituras, "tomados", None)
+    if tomados is None:
+        tomados = _escrituras.tomados = set()
+    if archivo_datos in tomados:
+        yield
+        return
+    
+    fragmentos = []
+    if (nombres is not None and fcntl is not None and archivo_datos == archivo_actual
+            and isinstance(gestor_actual, GestorFragmentado)):
+        if archivo_datos not in _versiones_cargadas:
+            # La primera carga puede migrar el archivo único a fragmentos (los toca todos)
+            obtener_gestor()
+        fragmentos = sorted({gestor_actual.fragmentoDe(nombre) for nombre in nombres})
+    
+    propios = _fragmentos_tomados(archivo_datos)
+    if propios:
+        if nombres is None or not set(fragmentos) <= propios:
+            raise RuntimeError("Los fragmentos a escribir se piden todos juntos al tomar el candado")
+        yield
+        return
+    
+    if not fragmentos:
+        with _candado_archivo(archivo_datos + ".candado"):
+            tomados.add(archivo_datos)
+            try:
+                yield
+            finally:
+                tomados.discard(archivo_datos)
+        return
+    
+    with ExitStack() as pila:
+        pila.enter_context(_candado_archivo(archivo_datos + ".candado", exclusivo=False))
+        for numero in fragmentos:
+            pila.enter_context(_candado_archivo(gestor_actual.rutaCandado(numero)))
+            tomados.add((archivo_datos, numero))
+        try:
+            yield
+        finally:
+            for numero in fragmentos:
+                tomados.discard((archivo_datos, numero))
+
+
+@contextmanager
+def _candado_archivo(ruta, exclusivo=True):
+    """flock sobre un archivo de candado (sin fcntl, el candado entre hilos)"""
+    _asegurar_directorio(ruta)
+    with open(ruta, 'a') as candado:
+        if fcntl is not None:
+            fcntl.flock(candado, fcntl.LOCK_EX if exclusivo else fcntl.LOCK_SH)
+        else:
+            _candado_hilos.acquire()
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(candado, fcntl.LOCK_UN)
+            else:
+                _candado_hilos.release()
+
+
+def _fragmentos_tomados(archivo_datos):
+    """Retorna los fragmentos de un archivo de datos cuyo candado tiene este hilo"""
+    tomados = getattr(_escrituras, "tomados", ())
+    return {clave[1] for clave in tomados if isinstance(clave, tuple) and clave[0] == archivo_datos}
 
 
 def guardar_datos():
@@ -39,34 +312,67 @@ def guardar_datos():
     
     Convierte cada amigo a un diccionario con sus datos y lo guarda.
     Se llama automáticamente después de agregar o modificar amigos.
+    Los amigos se escriben uno por uno, sin armar la lista completa en memoria.
+    Con el gestor fragmentado solo se reescriben los fragmentos modificados
+    (y, si el hilo tiene candados de fragmentos, solo esos).
+    Con el gestor en disco cada cambio ya se escribió; aquí solo se compacta.
+    
+    Se guarda con el candado de escritura tomado. Antes de vaciar el diario se
+    aplican sus entradas (las de otro proceso que este todavía no leyó), así
+    una compactación nunca borra recuerdos que no absorbió.
     """
-    datos = []
+    archivo_datos, gestor = datos_actuales()
+    propios = _fragmentos_tomados(archivo_datos)
+    if propios and isinstance(gestor, GestorFragmentado):
+        escritos = gestor.guardarCambios(propios)
+        print(f"✓ Datos guardados en {escritos} archivo(s) de {gestor.directorio}")
+        return
     
-    for amigo in gestor.amigos:
-        # Obtener el tipo de amigo
-        tipo = type(amigo).__name__
-        
-        # Crear diccionario con los datos básicos
-        amigo_dict = {
-            "tipo": tipo,
-            "nombre": amigo.nombre,
-            "cumpleanos": amigo.cumpleanos,
-            "gustos": amigo.gustos,
-            "recuerdos": amigo.recuerdos.recuerdos,  # Lista de recuerdos
-            "anecdotas": amigo.anecdotas
-        }
-        
-        # Si es amigo cercano, agregar nivel de confianza
-        if tipo == "AmigoCercano":
-            amigo_dict["nivelConfianza"] = amigo.nivelConfianza
-        
-        datos.append(amigo_dict)
+    with escritura():
+        _guardar_datos()
+
+
+def _guardar_datos():
+    archivo_datos, gestor = datos_actuales()
+    
+    if isinstance(gestor, ALMACENAMIENTO_PROPIO):
+        escritos = gestor.guardarCambios()
+        print(f"✓ Datos guardados en {escritos} archivo(s) de {gestor.directorio}")
+        return
+    
+    # Los recuerdos absorbidos pasan por el gestor: índices y demás se actualizan de a uno
+    aplicar_diario(gestor.amigos, gestor)
+    
+    # Modo paralelo: el snapshot se reparte en partes codificadas por varios procesos
+    if PROCESOS_SNAPSHOT > 1:
+        cantidad = guardar_partes(archivo_datos, gestor.amigos, PROCESOS_SNAPSHOT, PARTES_SNAPSHOT)
+        vaciar_diario()
+        # Lo que hay en memoria es lo que quedó en disco: no hace falta recargar
+        _versiones_cargadas[archivo_datos] = version_datos()
+        _archivar_registro(archivo_datos)
+        print(f"✓ {cantidad} amigos guardados en {archivo_datos}.partes")
+        return
     
-    # Guardar en el archivo JSON
-    with open(ARCHIVO_DATOS, 'w', encoding='utf-8') as archivo:
-        json.dump(datos, archivo, indent=2, ensure_ascii=False)
+    # Guardar en el archivo JSON (primero un temporal, así nadie lee un archivo a medias)
+    _asegurar_directorio(archivo_datos)
+    temporal = archivo_datos + ".tmp"
+    with open(temporal, 'w', encoding='utf-8') as archivo:
+        escribir_amigos_json(archivo, gestor.amigos)
+    os.replace(temporal, archivo_datos)
+    # Si otro proceso guardaba en partes, esas partes quedaron viejas
+    descartar_partes(archivo_datos)
+    vaciar_diario()
+    _versiones_cargadas[archivo_datos] = version_datos()
+    _archivar_registro(archivo_datos)
     
-    print(f"✓ Datos guardados en {ARCHIVO_DATOS}")
+    print(f"✓ Datos guardados en {archivo_datos}")
+
+
+def _archivar_registro(archivo_datos):
+    """Después de un guardado completo, archiva el registro de cambios si creció demasiado"""
+    if _publicador is not None and archivo_datos == ARCHIVO_DATOS:
+        if _publicador.archivarSiGrande():
+            print(f"ℹ Registro de cambios archivado en {_publicador.ruta}.anterior")
 
 
 def cargar_datos():
@@ -75,49 +381,334 @@ def cargar_datos():
     
     Lee el archivo, reconstruye los objetos Amigo y los agrega al gestor.
     Se llama automáticamente al iniciar cada API.
+    
+    El archivo se lee de forma incremental: cada elemento del arreglo se
+    convierte en objeto apenas se decodifica, así que la memoria máxima
+    durante la carga es cercana a la de los objetos finales.
+    
+    Con el gestor fragmentado no se lee nada aquí: cada fragmento se carga
+    la primera vez que se usa. Si todavía no hay fragmentos pero sí existe
+    el archivo único, sus amigos se reparten en fragmentos (migración).
+    Lo mismo con el gestor en disco: el índice se pone al día al usarlo.
     """
+    archivo_datos, gestor = datos_actuales()
+    
+    # La versión se toma antes de leer: si algo cambia durante la carga, la
+    # próxima llamada a obtener_gestor() vuelve a cargar
+    _versiones_cargadas[archivo_datos] = version_datos()
+    
+    if isinstance(gestor, ALMACENAMIENTO_PROPIO):
+        if not gestor.existe() and (os.path.exists(archivo_datos) or existen_partes(archivo_datos)):
+            with escritura(archivo_datos):
+                if not gestor.existe():
+                    gestor.amigos = iterar_snapshot(archivo_datos)
+                    gestor.guardarCambios()
+                    print(f"✓ {archivo_datos} migrado a {gestor.directorio}")
+        return
+    
+    # Si el último guardado fue en partes, esos son los datos vigentes
+    if existen_partes(archivo_datos):
+        try:
+            amigos = cargar_partes(archivo_datos)
+            aplicar_diario(amigos)
+            gestor.amigos = amigos
+            print(f"✓ Cargados {len(gestor.amigos)} amigos desde {archivo_datos}.partes")
+        except Exception as e:
+            print(f"✗ Error al cargar datos: {e}")
+        return
+    
     # Si el archivo no existe, no hay nada que cargar
-    if not os.path.exists(ARCHIVO_DATOS):
-        print(f"ℹ No existe {ARCHIVO_DATOS}, iniciando con gestor vacío")
+    if not os.path.exists(archivo_datos):
+        print(f"ℹ No existe {archivo_datos}, iniciando con gestor vacío")
         return
     
     try:
-        # Leer el archivo JSON
-        with open(ARCHIVO_DATOS, 'r', encoding='utf-8') as archivo:
-            datos = json.load(archivo)
+        # Reconstruir cada amigo a medida que se lee el archivo.
+        # La lista nueva solo reemplaza a la actual si el archivo se leyó completo.
+        amigos = []
+        for amigo in iterar_amigos_json(archivo_datos):
+            amigos.append(amigo)
         
-        # Limpiar el gestor actual
-        gestor.amigos = []
+        # Aplicar los recuerdos registrados en el diario después del último guardado
+        aplicar_diario(amigos)
         
-        # Reconstruir cada amigo
-        for amigo_dict in datos:
-            tipo = amigo_dict["tipo"]
-            nombre = amigo_dict["nombre"]
-            cumpleanos = amigo_dict["cumpleanos"]
-            gustos = amigo_dict["gustos"]
-            recuerdos = amigo_dict["recuerdos"]
-            anecdotas = amigo_dict["anecdotas"]
-            
-            # Crear el objeto según el tipo
-            if tipo == "AmigoCercano":
-                nivelConfianza = amigo_dict["nivelConfianza"]
-                amigo = AmigoCercano(nombre, cumpleanos, gustos, [], anecdotas, nivelConfianza)
-                # Restaurar los recuerdos manualmente
-                amigo.recuerdos.recuerdos = recuerdos
-            else:  # AmigoRegular
-                amigo = AmigoRegular(nombre, cumpleanos, gustos, [], anecdotas)
-                # Restaurar los recuerdos manualmente
-                amigo.recuerdos.recuerdos = recuerdos
-            
-            # Agregar al gestor (sin imprimir mensaje)
-            gestor.amigos.append(amigo)
+        gestor.amigos = amigos
         
-        print(f"✓ Cargados {len(datos)} amigos desde {ARCHIVO_DATOS}")
+        print(f"✓ Cargados {len(amigos)} amigos desde {archivo_datos}")
         
     except Exception as e:
         print(f"✗ Error al cargar datos: {e}")
 
 
+def archivo_diario():
+    """Retorna la ruta del diario de cambios del archivo de datos actual"""
+    return datos_actuales()[0] + ".diario"
+
+
+def registrar_recuerdo(amigo):
+    """
+    Persiste el último recuerdo agregado a un amigo sin reescribir todo el archivo.
+    
+    Agrega una línea al diario de cambios con el id, texto y fecha del recuerdo.
+    Cada COMPACTAR_CADA entradas se hace un guardado completo (compactación).
+    Con el gestor fragmentado se reescribe solo el fragmento del amigo.
+    
+    Args:
+        amigo: Objeto Amigo al que se le acaba de agregar un recuerdo
+    """
+    registrar_recuerdos([(amigo, amigo.recuerdos.ultimaEntrada())])
+
+
+def registrar_recuerdos(cambios):
+    """
+    Persiste un lote de recuerdos nuevos con una sola escritura.
+    
+    Args:
+        cambios (list): Pares (amigo, entrada) donde entrada es el diccionario
+                        {id, texto, fecha} retornado por Recuerdo.ultimaEntrada()
+    """
+    if not cambios:
+        return
+    
+    with escritura(nombres=[amigo.nombre for amigo, _ in cambios]):
+        _registrar_recuerdos(cambios)
+
+
+def _registrar_recuerdos(cambios):
+    archivo_datos, gestor = datos_actuales()
+    if isinstance(gestor, ALMACENAMIENTO_PROPIO):
+        for amigo, entrada in cambios:
+            gestor.marcarModificado(amigo.nombre)
+        guardar_datos()
+        return
+    
+    # Si nadie más escribió desde la última carga, después de agregar las líneas
+    # lo que hay en memoria sigue siendo lo que hay en disco
+    al_dia = _versiones_cargadas.get(archivo_datos) == version_datos()
+    
+    lineas = []
+    for amigo, entrada in cambios:
+        linea = {"op": "recuerdo", "nombre": amigo.nombre}
+        linea.update(entrada)
+        lineas.append(json.dumps(linea, ensure_ascii=False) + "\n")
+    
+    ruta = archivo_diario()
+    _asegurar_directorio(ruta)
+    with open(ruta, 'a', encoding='utf-8') as archivo:
+        archivo.write("".join(lineas))
+    _entradas_diario[ruta] = _entradas_diario.get(ruta, 0) + len(lineas)
+    if al_dia:
+        _versiones_cargadas[archivo_datos] = version_datos()
+    
+    if _entradas_diario[ruta] >= COMPACTAR_CADA:
+        guardar_datos()
+    else:
+        print(f"✓ {len(lineas)} recuerdo(s) registrado(s) en {ruta}")
+
+
+def aplicar_diario(amigos, gestor=None):
+    """
+    Aplica sobre una lista de amigos los recuerdos del diario de cambios.
+    
+    Aplicar una entrada es idempotente (se ignoran ids ya presentes), así que
+    no importa si el snapshot ya incluía parte del diario.
+    
+    Args:
+        amigos (list): Amigos recién cargados del snapshot
+        gestor (GestorAmigos): Si los amigos ya están en un gestor, cada recuerdo
+                               se aplica a través de él para avisar a sus observadores
+    
+    Returns:
+        int: Cantidad de recuerdos aplicados
+    """
+    ruta = archivo_diario()
+    if not os.path.exists(ruta):
+        _entradas_diario[ruta] = 0
+        return 0
+    
+    por_nombre = {}
+    for amigo in amigos:
+        por_nombre.setdefault(amigo.nombre, amigo)
+    
+    aplicadas = 0
+    leidas = 0
+    with open(ruta, 'r', encoding='utf-8') as archivo:
+        for linea in archivo:
+            linea = linea.strip()
+            if not linea:
+                continue
+            try:
+                entrada = json.loads(linea)
+            except ValueError:
+                # Línea a medio escribir por otro proceso: se ignora
+                continue
+            leidas = leidas + 1
+            
+            amigo = por_nombre.get(entrada.get("nombre"))
+            if not amigo or entrada.get("op") != "recuerdo":
+                continue
+            if gestor is not None:
+                aplicada = gestor.aplicarRecuerdo(amigo, entrada)
+            else:
+                aplicada = amigo.recuerdos.aplicarEntrada(entrada)
+            if aplicada:
+                aplicadas = aplicadas + 1
+    
+    _entradas_diario[ruta] = leidas
+    return aplicadas
+
+
+def vaciar_diario():
+    """Borra el diario de cambios (se llama después de un guardado completo)"""
+    ruta = archivo_diario()
+    if os.path.exists(ruta):
+        os.remove(ruta)
+    _entradas_diario[ruta] = 0
+
+
+def entradas_pendientes():
+    """Retorna cuántas entradas tiene el diario del archivo de datos actual"""
+    return _entradas_diario.get(archivo_diario(), 0)
+
+
+def version_datos():
+    """
+    Retorna una firma de los archivos de datos que cambia cada vez que se modifican.
+    
+    Sirve para saber, sin leer los datos, si algo cambió desde la última vez
+    (por ejemplo, para reutilizar respuestas ya calculadas).
+    
+    Returns:
+        tuple: archivo de datos y (inodo, fecha de modificación, tamaño) de cada
+               archivo relevante; el archivo distingue a inquilinos con firmas
+               iguales y el inodo detecta reemplazos dentro de la misma marca de tiempo
+    """
+    archivo_datos, gestor = datos_actuales()
+    if _replica is not None and gestor is _replica.gestor:
+        # La réplica no mira los archivos: sus datos cambian con cada línea aplicada
+        return (archivo_datos,) + _replica.version()
+    if isinstance(gestor, ALMACENAMIENTO_PROPIO):
+        rutas = gestor.rutasDatos()
+    else:
+        rutas = [archivo_datos, archivo_diario(),
+                 os.path.join(directorio_partes(archivo_datos), ARCHIVO_INDICE_PARTES)]
+    
+    return (archivo_datos,) + tuple(firma_archivo(ruta) for ruta in rutas)
+
+
+def instantaneas_actuales():
+    """Retorna el gestor de instantáneas del archivo de datos actual"""
+    return instantaneas_de(datos_actuales()[0])
+
+
+def tomar_instantanea(esperar=True):
+    """
+    Toma una instantánea de los datos actuales.
+    
+    Args:
+        esperar (bool): Si es False, la escritura se hace en un hilo aparte
+    
+    Returns:
+        dict o None: Datos de la instantánea (None si quedó en segundo plano)
+    """
+    return instantaneas_actuales().tomar(obtener_gestor(), esperar)
+
+
+def restaurar_instantanea(hasta):
+    """
+    Vuelve los datos actuales al estado que tenían en un momento dado.
+    
+    Se reconstruyen desde la última instantánea anterior a ese momento más el
+    historial, se guardan, y se toma una instantánea nueva: el historial no
+    anota reemplazos completos, así que los cambios siguientes parten de ella.
+    
+    Args:
+        hasta: Momento a restaurar (texto ISO o segundos, ver instantaneas.leer_momento)
+    
+    Returns:
+        dict: Resumen de la restauración
+    
+    Raises:
+        ValueError: Si el momento es inválido o no está cubierto por las instantáneas
+    """
+    archivo_datos = datos_actuales()[0]
+    gestor_instantaneas = instantaneas_actuales()
+    with escritura():
+        gestor = obtener_gestor()
+        amigos, resumen = gestor_instantaneas.restaurar(hasta)
+        # Lo restaurado reemplaza todo, también los recuerdos del diario
+        vaciar_diario()
+        gestor.amigos = amigos
+        guardar_datos()
+    gestor_instantaneas.tomar(gestor, esperar=True)
+    if _publicador is not None and archivo_datos == ARCHIVO_DATOS:
+        _publicador.publicarRecarga()
+    return resumen
+
+
+def iniciar_instantaneas():
+    """Lanza las instantáneas periódicas de los datos principales (si están activadas)"""
+    if instantaneas.esta_activo():
+        instantaneas_de(ARCHIVO_DATOS).iniciarPeriodico(obtener_gestor)
+
+
+def iniciar_replica():
+    """
+    Convierte a este proceso en una réplica de lectura de los datos principales.
+    
+    El gestor deja de publicar cambios y de anotarlos en el historial de
+    instantáneas (los que aplica ya los anotó el proceso que los hizo),
+    obtener_gestor() deja de recargar cuando los archivos cambian y un hilo
+    aplica el registro a medida que crece. La API tiene que hacer que sus
+    peticiones lean con replicacion.instalar_lecturas.
+    
+    Returns:
+        ReplicaLectura o None: La réplica (None si el modo réplica no está
+                               activado o el gestor guarda sus propios archivos)
+    """
+    global _publicador, _replica
+    if _replica is not None:
+        return _replica
+    if _publicador is None:
+        if replicacion.esta_activo():
+            print("ℹ El modo réplica solo funciona con el gestor en memoria")
+        return None
+    gestor.observadores.remove(_publicador)
+    _publicador = None
+    historial = instantaneas_de(ARCHIVO_DATOS).historial
+    if historial in gestor.observadores:
+        gestor.observadores.remove(historial)
+    _replica = replicacion.ReplicaLectura(replicacion.ruta_registro(ARCHIVO_DATOS), gestor, cargar_datos)
+    _replica.iniciar()
+    print(f"✓ Réplica de lectura siguiendo {_replica.ruta}")
+    return _replica
+
+
+def poner_replica_al_dia():
+    """
+    Carga la réplica la primera vez y después aplica los cambios nuevos del registro.
+    
+    Siempre trabaja sobre los datos principales, aunque haya un inquilino activo.
+    """
+    token = activar_inquilino(None)
+    try:
+        if ARCHIVO_DATOS not in _versiones_cargadas:
+            # El registro se abre antes de leer los datos: si se archiva durante
+            # la carga, lo que tenía ya está en el archivo leído o en el abierto
+            _replica.cargar()
+        else:
+            _replica.sincronizar()
+    finally:
+        desactivar_inquilino(token)
+
+
+def estado_replica():
+    """Retorna el resumen de la réplica (None si este proceso no es una réplica)"""
+    if _replica is None:
+        return None
+    return _replica.resumen()
+
+
 def obtener_gestor():
     """
     Retorna el gestor con los datos actualizados desde el archivo.
@@ -125,12 +716,40 @@ def obtener_gestor():
     IMPORTANTE: Llama a esta función al inicio de cada endpoint para
     asegurarte de tener los datos más recientes.
     
+    Los datos se cargan la primera vez y luego solo si los archivos cambiaron
+    (otro proceso o este mismo guardaron algo). Los gestores fragmentado y en
+    disco detectan sus propios cambios, así que con ellos solo se carga una vez.
+    
+    En una réplica de lectura los datos se cargan una sola vez y después se
+    aplican los cambios nuevos del registro (ver iniciar_replica).
+    
+    Con un inquilino activo retorna el gestor de ese inquilino.
+    
     Returns:
         GestorAmigos: El gestor con los datos cargados
     """
-    cargar_datos()
+    archivo_datos, gestor = datos_actuales()
+    if _replica is not None and gestor is _replica.gestor:
+        # En una petición de la API la réplica ya se puso al día antes de tomar
+        # la lectura (ver replicacion.instalar_lecturas)
+        if not _replica.acceso.leyendo():
+            poner_replica_al_dia()
+    elif isinstance(gestor, ALMACENAMIENTO_PROPIO):
+        if archivo_datos not in _versiones_cargadas:
+            cargar_datos()
+    elif _versiones_cargadas.get(archivo_datos) != version_datos():
+        cargar_datos()
     return gestor
 
 
-# Cargar datos al importar este módulo
-cargar_datos()
+def calentar():
+    """
+    Carga los datos y arma los índices antes de la primera petición.
+    
+    Returns:
+        int: Cantidad de amigos cargados
+    """
+    gestor = obtener_gestor()
+    if gestor.indices is not None and gestor.indices.obsoleto:
+        gestor.indices.reconstruir(gestor.amigos)
+    return gestor.contarAmigos()
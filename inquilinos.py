@@ -0,0 +1,257 @@
+"""
+inquilinos.py - Varios usuarios (inquilinos) servidos por un mismo servidor
+
+Sin este módulo cada usuario necesita su propio proceso, porque config.py tiene
+un solo gestor y un solo archivo de datos. Con el modo multiusuario activado:
+- Cada usuario tiene su propia carpeta: inquilinos/<usuario>/amigos_data.json
+- Su gestor se carga recién cuando llega la primera petición de ese usuario
+- Solo quedan en memoria los inquilinos usados más recientemente (LRU); cuando
+  se supera el límite de inquilinos o de amigos en memoria, los menos usados
+  se descartan (sus cambios ya están en disco). Solo la API que escribe
+  compacta antes el diario del inquilino, y lo hace después de recargarlo:
+  la API de consultas nunca escribe
+
+Cómo se identifica el usuario de una petición:
+- Cabecera "X-Usuario: ana"
+- Prefijo de ruta: /u/ana/amigos se atiende como /amigos del inquilino "ana"
+Las peticiones sin usuario usan los datos principales (amigos_data.json).
+
+Variables de entorno:
+- AMIGOS_INQUILINOS=1                   → activa el modo multiusuario
+- AMIGOS_INQUILINOS_DIR=inquilinos      → carpeta con una subcarpeta por usuario
+- AMIGOS_INQUILINOS_MAX=100             → inquilinos residentes en memoria como máximo
+- AMIGOS_INQUILINOS_MAX_AMIGOS=200000   → amigos residentes como máximo (sumando todos)
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from flask import g, jsonify, request
+
+import config
+from GestorFragmentado import GestorFragmentado
+
+
+# Cabecera que indica el usuario de la petición
+CABECERA_USUARIO = "X-Usuario"
+
+# Prefijo de ruta alternativo: /u/<usuario>/...
+PREFIJO_RUTA = "/u/"
+
+# Clave del entorno WSGI donde el middleware deja el usuario del prefijo
+CLAVE_ENTORNO = "amigos.usuario"
+
+# Ids aceptados (también evita rutas como "../otro")
+PATRON_USUARIO = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class Inquilino:
+    """
+    Datos de un usuario: su archivo y su gestor.
+
+    config.activar_inquilino() hace que guardar_datos, cargar_datos y el resto
+    de funciones de config trabajen sobre este archivo y este gestor.
+    """
+
+    def __init__(self, usuario, archivo, gestor):
+        self.usuario = usuario
+        self.archivo = archivo
+        self.gestor = gestor
+        self.peticiones_activas = 0
+        self.ultimo_uso = time.time()
+
+
+class RegistroInquilinos:
+    """
+    Caché LRU de inquilinos residentes en memoria.
+
+    Responsabilidad: crear inquilinos cuando se piden y desalojar a los menos
+    usados cuando se supera el límite de inquilinos o de amigos en memoria.
+    """
+
+    def __init__(self, directorio=None, max_residentes=None, max_amigos=None, compactar=False):
+        """
+        Constructor del registro.
+
+        Args:
+            directorio (str): Carpeta con una subcarpeta por usuario
+            max_residentes (int): Inquilinos en memoria como máximo
+            max_amigos (int): Amigos en memoria como máximo, sumando todos los inquilinos
+            compactar (bool): Si al desalojar se compacta el diario (solo en el proceso que escribe)
+        """
+        self.directorio = directorio or os.environ.get("AMIGOS_INQUILINOS_DIR", "inquilinos")
+        self.max_residentes = max_residentes if max_residentes is not None else \
+            int(os.environ.get("AMIGOS_INQUILINOS_MAX", "100"))
+        self.max_amigos = max_amigos if max_amigos is not None else \
+            int(os.environ.get("AMIGOS_INQUILINOS_MAX_AMIGOS", "200000"))
+
+        self.compactar = compactar
+        self.residentes = OrderedDict()
+        self.candado = threading.RLock()
+        self.estadisticas = {"aciertos": 0, "cargas": 0, "desalojos": 0}
+
+    def archivoDe(self, usuario):
+        return os.path.join(self.directorio, usuario, config.ARCHIVO_DATOS)
+
+    def obtener(self, usuario):
+        """
+        Retorna el inquilino de un usuario, creándolo si no está en memoria.
+
+        Sus datos no se leen aquí: se cargan con config.obtener_gestor() como siempre.
+        """
+        with self.candado:
+            inquilino = self.residentes.get(usuario)
+            if inquilino is not None:
+                self.residentes.move_to_end(usuario)
+                self.estadisticas["aciertos"] = self.estadisticas["aciertos"] + 1
+            else:
+                archivo = self.archivoDe(usuario)
+                inquilino = Inquilino(usuario, archivo, config.crear_gestor(archivo))
+                self.residentes[usuario] = inquilino
+                self.estadisticas["cargas"] = self.estadisticas["cargas"] + 1
+
+            inquilino.peticiones_activas = inquilino.peticiones_activas + 1
+            inquilino.ultimo_uso = time.time()
+            return inquilino
+
+    def liberar(self, inquilino):
+        """Marca el fin de una petición del inquilino y desaloja si hace falta"""
+        with self.candado:
+            inquilino.peticiones_activas = inquilino.peticiones_activas - 1
+            self.ajustar()
+
+    def amigosResidentes(self):
+        return sum(inquilino.gestor.contarResidentes() for inquilino in self.residentes.values())
+
+    def ajustar(self):
+        """
+        Desaloja inquilinos (del menos al más usado) hasta respetar los límites.
+
+        Los inquilinos con peticiones en curso nunca se desalojan.
+
+        Returns:
+            int: Cantidad de inquilinos desalojados
+        """
+        desalojados = 0
+        with self.candado:
+            total_amigos = self.amigosResidentes()
+            for usuario in list(self.residentes):
+                if len(self.residentes) <= self.max_residentes and total_amigos <= self.max_amigos:
+                    break
+                inquilino = self.residentes[usuario]
+                if inquilino.peticiones_activas > 0:
+                    continue
+                total_amigos = total_amigos - inquilino.gestor.contarResidentes()
+                self._desalojar(inquilino)
+                desalojados = desalojados + 1
+        return desalojados
+
+    def _desalojar(self, inquilino):
+        """
+        Quita al inquilino de memoria.
+
+        Cada cambio ya se escribió (en el snapshot, el diario o su fragmento), así
+        que alcanza con soltar el gestor. Con compactar=True, antes se absorbe el
+        diario en el snapshot, recargando primero: otro proceso pudo agregar
+        recuerdos desde que este cargó los datos, y guardar la copia vieja los perdería.
+        """
+        if self.compactar:
+            token = config.activar_inquilino(inquilino)
+            try:
+                pendiente = config.entradas_pendientes() > 0
+                if isinstance(inquilino.gestor, GestorFragmentado):
+                    pendiente = bool(inquilino.gestor.sucios)
+                if pendiente:
+                    config.obtener_gestor()
+                    config.guardar_datos()
+            finally:
+                config.desactivar_inquilino(token)
+
+        del self.residentes[inquilino.usuario]
+        self.estadisticas["desalojos"] = self.estadisticas["desalojos"] + 1
+
+    def resumen(self):
+        """Retorna el estado del registro (para /estadisticas)"""
+        with self.candado:
+            datos = dict(self.estadisticas)
+            datos["residentes"] = len(self.residentes)
+            datos["amigos_residentes"] = self.amigosResidentes()
+            datos["max_residentes"] = self.max_residentes
+            datos["max_amigos"] = self.max_amigos
+            return datos
+
+
+class PrefijoUsuario:
+    """
+    Middleware WSGI: convierte /u/<usuario>/ruta en /ruta y recuerda el usuario.
+
+    Así las rutas de las APIs no cambian y el prefijo funciona igual que la cabecera.
+    """
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        ruta = environ.get("PATH_INFO", "")
+        if ruta.startswith(PREFIJO_RUTA):
+            partes = ruta[len(PREFIJO_RUTA):].split("/", 1)
+            environ[CLAVE_ENTORNO] = partes[0]
+            environ["PATH_INFO"] = "/" + (partes[1] if len(partes) > 1 else "")
+            environ["SCRIPT_NAME"] = environ.get("SCRIPT_NAME", "") + PREFIJO_RUTA + partes[0]
+        return self.wsgi_app(environ, start_response)
+
+
+class ControladorInquilinos:
+    """
+    Instala en una app Flask la selección del inquilino de cada petición.
+
+    Debe instalarse antes que el perfilador y la compresión, para que ellos
+    ya vean los datos del inquilino correcto.
+    """
+
+    def __init__(self, app, registro=None):
+        self.registro = registro or RegistroInquilinos()
+        app.wsgi_app = PrefijoUsuario(app.wsgi_app)
+        app.before_request(self._activar)
+        app.teardown_request(self._desactivar)
+
+    def _activar(self):
+        usuario = request.environ.get(CLAVE_ENTORNO) or request.headers.get(CABECERA_USUARIO)
+        if not usuario:
+            return None
+
+        if not PATRON_USUARIO.match(usuario):
+            return jsonify({
+                "exito": False,
+                "error": "Usuario inválido: solo letras, números, '-' y '_' (máximo 64)"
+            }), 400
+
+        g.inquilino = self.registro.obtener(usuario)
+        g.inquilino_token = config.activar_inquilino(g.inquilino)
+        return None
+
+    def _desactivar(self, error=None):
+        inquilino = g.pop("inquilino", None)
+        if inquilino is None:
+            return
+        config.desactivar_inquilino(g.pop("inquilino_token"))
+        self.registro.liberar(inquilino)
+
+
+def instalar_inquilinos(app, compactar=False):
+    """
+    Activa el modo multiusuario en la app solo si AMIGOS_INQUILINOS está activado.
+
+    Args:
+        app (Flask): Aplicación a configurar
+        compactar (bool): Si al desalojar se compacta el diario (solo la API que escribe)
+
+    Returns:
+        ControladorInquilinos o None
+    """
+    if os.environ.get("AMIGOS_INQUILINOS", "0") in ("", "0", "false", "no"):
+        return None
+    return ControladorInquilinos(app, RegistroInquilinos(compactar=compactar))
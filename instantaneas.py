@@ -0,0 +1,447 @@
+"""
+instantaneas.py - Instantáneas periódicas y restauración a un momento dado
+
+amigos_data.json se reescribe en el lugar en cada guardado completo, así que
+por sí solo no permite volver atrás. Con las instantáneas activadas:
+- Cada cambio (amigo agregado o reemplazado, eliminado, recuerdo nuevo) se
+  agrega como una línea al historial, con su momento
+- Cada INTERVALO segundos, si hubo cambios, se toma una instantánea: con el
+  candado de los datos tomado (ver GestorInstantaneas) cada amigo se convierte
+  a diccionario, así la copia es exactamente la de ese momento, y el texto se
+  escribe en disco desde un hilo aparte, fuera del camino de las peticiones
+- Se conservan las últimas GENERACIONES instantáneas y el historial necesario
+  para ir desde la más vieja hasta ahora; lo anterior se borra
+- Restaurar a un momento dado carga la última instantánea anterior a ese
+  momento y aplica encima los cambios del historial hasta ese momento
+
+El historial es independiente del diario de config.py: la compactación vacía
+el diario, pero no toca el historial ni las instantáneas.
+
+Archivos (en amigos_data.json.instantaneas/):
+- instantanea-<ns>.json     → amigos en el formato de amigos_data.json
+- historial.ndjson          → cambios desde la última instantánea
+- historial-<ns>.ndjson     → tramos de historial ya cerrados (hasta <ns>)
+
+Variables de entorno:
+- AMIGOS_INSTANTANEAS=0               → segundos entre instantáneas (0 = apagado;
+                                        con un valor > 0 también se lleva el historial)
+- AMIGOS_INSTANTANEAS_GENERACIONES=5  → instantáneas que se conservan
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime
+
+from persistencia import (amigo_a_diccionario, diccionario_a_amigo, escribir_diccionarios_json,
+                          iterar_amigos_json)
+
+
+# Segundos entre instantáneas automáticas (0 = apagado) e instantáneas conservadas
+INTERVALO = float(os.environ.get("AMIGOS_INSTANTANEAS", "0"))
+GENERACIONES = int(os.environ.get("AMIGOS_INSTANTANEAS_GENERACIONES", "5"))
+
+ARCHIVO_HISTORIAL = "historial.ndjson"
+
+_INSTANTANEA = re.compile(r"^instantanea-(\d+)\.json$")
+_TRAMO = re.compile(r"^historial-(\d+)\.ndjson$")
+
+
+def esta_activo():
+    """Indica si las instantáneas (y el historial) están activadas por variable de entorno"""
+    return INTERVALO > 0
+
+
+def directorio_instantaneas(archivo_datos):
+    return archivo_datos + ".instantaneas"
+
+
+def leer_momento(valor):
+    """
+    Convierte un momento a segundos desde 1970.
+
+    Args:
+        valor: Número (segundos) o texto ISO 8601 (ej: "2024-06-01T10:30:00";
+               sin zona horaria se toma la hora local)
+
+    Raises:
+        ValueError: Si el valor no es un momento válido
+    """
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return float(valor)
+    if not isinstance(valor, str) or not valor.strip():
+        raise ValueError("Falta el momento a restaurar (ej: 2024-06-01T10:30:00)")
+    try:
+        return float(valor)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(valor.strip()).timestamp()
+    except ValueError:
+        raise ValueError(f"Momento inválido: {valor} (formato ISO, ej: 2024-06-01T10:30:00)")
+
+
+def _fecha(ns):
+    return datetime.fromtimestamp(ns / 1e9).isoformat(timespec="seconds")
+
+
+def copiar_amigo(amigo):
+    """
+    Como amigo_a_diccionario, pero sin listas compartidas con el amigo vivo.
+
+    amigo_a_diccionario reutiliza las listas de gustos, recuerdos y metadatos;
+    una instantánea que se escribe en otro hilo necesita las suyas propias.
+    """
+    amigo_dict = amigo_a_diccionario(amigo)
+    for clave in ("gustos", "recuerdos", "anecdotas"):
+        if isinstance(amigo_dict.get(clave), list):
+            amigo_dict[clave] = list(amigo_dict[clave])
+    if "recuerdos_meta" in amigo_dict:
+        amigo_dict["recuerdos_meta"] = [list(par) for par in amigo_dict["recuerdos_meta"]]
+    return amigo_dict
+
+
+def aplicar_historial(amigos, entradas):
+    """
+    Aplica cambios del historial sobre una lista de amigos.
+
+    Igual que los registros de GestorDisco: "amigo" agrega o reemplaza (el
+    amigo conserva su lugar), "eliminar" lo quita y "recuerdo" agrega un
+    recuerdo (idempotente por id, así no importa si la instantánea ya lo tenía).
+
+    Args:
+        amigos (iterable): Amigos de la instantánea
+        entradas (iterable): Cambios del historial, en orden
+
+    Returns:
+        tuple: (lista de amigos resultante, cantidad de cambios aplicados)
+    """
+    por_nombre = {}
+    for amigo in amigos:
+        por_nombre.setdefault(amigo.nombre, amigo)
+
+    aplicados = 0
+    for entrada in entradas:
+        operacion = entrada.get("op")
+        nombre = entrada.get("nombre")
+        if operacion == "amigo":
+            por_nombre[nombre] = diccionario_a_amigo(entrada)
+        elif operacion == "eliminar":
+            if por_nombre.pop(nombre, None) is None:
+                continue
+        elif operacion == "recuerdo":
+            amigo = por_nombre.get(nombre)
+            if amigo is None or not amigo.recuerdos.aplicarEntrada(entrada):
+                continue
+        else:
+            continue
+        aplicados = aplicados + 1
+    return list(por_nombre.values()), aplicados
+
+
+class HistorialCambios:
+    """
+    Observador que agrega cada cambio del gestor al historial.
+
+    Cada línea se escribe con una sola llamada al sistema sobre un archivo
+    abierto en modo "append", así las líneas de varios procesos no se mezclan.
+    Cuando una instantánea cierra el tramo actual (lo renombra), el próximo
+    cambio lo nota y abre el archivo nuevo.
+
+    "reemplazar" no se anota: lo produce también cada recarga desde el disco.
+    Quien reemplaza los datos a propósito (restaurar) toma una instantánea después.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.candado = threading.Lock()
+        self.descriptor = None
+
+    def _abrir(self):
+        if self.descriptor is not None:
+            try:
+                if os.stat(self.ruta).st_ino == os.fstat(self.descriptor).st_ino:
+                    return self.descriptor
+            except FileNotFoundError:
+                pass
+            os.close(self.descriptor)
+        directorio = os.path.dirname(self.ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        self.descriptor = os.open(self.ruta, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        return self.descriptor
+
+    def anotar(self, registro):
+        registro["t"] = time.time_ns()
+        linea = (json.dumps(registro, ensure_ascii=False) + "\n").encode('utf-8')
+        with self.candado:
+            os.write(self._abrir(), linea)
+
+    def actualizar(self, evento, amigo):
+        """
+        Recibe un cambio del gestor.
+        evento: "agregar", "eliminar", "recuerdo" o "reemplazar"
+        """
+        if evento == "agregar":
+            registro = amigo_a_diccionario(amigo)
+            registro["op"] = "amigo"
+        elif evento == "eliminar":
+            registro = {"op": "eliminar", "nombre": amigo.nombre}
+        elif evento == "recuerdo":
+            entrada = amigo.recuerdos.ultimaEntrada()
+            if entrada is None:
+                return
+            registro = {"op": "recuerdo", "nombre": amigo.nombre}
+            registro.update(entrada)
+        else:
+            return
+        self.anotar(registro)
+
+
+class GestorInstantaneas:
+    """
+    Toma, lista y restaura las instantáneas de un archivo de datos.
+
+    Responsabilidad: decidir cuándo hay que tomar una instantánea, escribirla
+    sin bloquear a quien la pide, conservar GENERACIONES de ellas y reconstruir
+    los amigos de cualquier momento cubierto por las instantáneas y el historial.
+
+    candado_datos es el candado que toman quienes modifican los datos (en las
+    APIs, config.escritura): mientras se copian los amigos nadie los cambia.
+    Sin él, la copia solo es consistente si nadie escribe al mismo tiempo.
+    """
+
+    def __init__(self, archivo_datos, generaciones=None, candado_datos=None):
+        """
+        Args:
+            archivo_datos (str): Archivo de datos (ej: amigos_data.json)
+            generaciones (int): Instantáneas conservadas (por defecto AMIGOS_INSTANTANEAS_GENERACIONES)
+            candado_datos (callable): Retorna el context manager que excluye a los que escriben
+        """
+        self.directorio = directorio_instantaneas(archivo_datos)
+        self.candado_datos = candado_datos or nullcontext
+        self.generaciones = max(1, generaciones if generaciones is not None else GENERACIONES)
+        self.historial = HistorialCambios(os.path.join(self.directorio, ARCHIVO_HISTORIAL))
+        # Una instantánea a la vez; el hilo en curso (si hay) se guarda para no lanzar otro
+        self.candado = threading.Lock()
+        self.en_curso = None
+        self.periodico = None
+        self.estadisticas = {"tomadas": 0, "omitidas": 0, "ultima_ms": None, "ultimo_error": None}
+
+    def instalar(self, gestor):
+        """Hace que el historial reciba los cambios del gestor"""
+        gestor.agregarObservador(self.historial)
+
+    # ============================================
+    # TOMAR INSTANTÁNEAS
+    # ============================================
+
+    def hayCambios(self):
+        """Indica si hubo cambios desde la última instantánea (o si todavía no hay ninguna)"""
+        try:
+            if os.path.getsize(self.historial.ruta) > 0:
+                return True
+        except FileNotFoundError:
+            pass
+        return not self._instantaneas()
+
+    def tomar(self, gestor, esperar=True):
+        """
+        Toma una instantánea de los amigos del gestor.
+
+        Con candado_datos tomado se anota el momento y cada amigo se convierte
+        a diccionario (también con GestorDisco y GestorFragmentado, cuya lista
+        se arma al recorrerla): la copia no comparte nada con los objetos vivos.
+        La escritura se hace en este hilo si esperar=True o en un hilo aparte si
+        no. Lo que cambie después del momento queda en el historial, así que
+        restaurar nunca pierde un cambio (los recuerdos repetidos se ignoran por id).
+
+        Returns:
+            dict o None: Datos de la instantánea (esperar=True), o None si se
+                         lanzó en segundo plano o ya había otra en curso
+        """
+        with self.candado:
+            if self.en_curso is not None and self.en_curso.is_alive():
+                self.estadisticas["omitidas"] = self.estadisticas["omitidas"] + 1
+                return None
+            with self.candado_datos():
+                momento = time.time_ns()
+                diccionarios = [copiar_amigo(amigo) for amigo in gestor.amigos]
+            if esperar:
+                self.en_curso = None
+            else:
+                self.en_curso = threading.Thread(target=self._escribir, args=(diccionarios, momento),
+                                                 name="instantanea", daemon=True)
+                self.en_curso.start()
+                return None
+        return self._escribir(diccionarios, momento)
+
+    def _escribir(self, diccionarios, momento):
+        inicio = time.perf_counter()
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            ruta = os.path.join(self.directorio, f"instantanea-{momento}.json")
+            temporal = ruta + ".tmp"
+            with open(temporal, 'w', encoding='utf-8') as archivo:
+                cantidad = escribir_diccionarios_json(archivo, diccionarios)
+            os.replace(temporal, ruta)
+
+            # Cerrar el tramo de historial: lo que siga va a un archivo nuevo
+            if os.path.exists(self.historial.ruta):
+                os.replace(self.historial.ruta,
+                           os.path.join(self.directorio, f"historial-{time.time_ns()}.ndjson"))
+            self._podar()
+        except OSError as e:
+            self.estadisticas["ultimo_error"] = str(e)
+            print(f"✗ Error al tomar la instantánea: {e}")
+            raise
+
+        milisegundos = round((time.perf_counter() - inicio) * 1000, 1)
+        self.estadisticas["tomadas"] = self.estadisticas["tomadas"] + 1
+        self.estadisticas["ultima_ms"] = milisegundos
+        print(f"✓ Instantánea de {cantidad} amigos en {ruta} ({milisegundos} ms)")
+        return {"fecha": _fecha(momento), "t": momento, "amigos": cantidad, "ruta": ruta}
+
+    def _podar(self):
+        """Borra las instantáneas de más y los tramos de historial anteriores a la más vieja"""
+        instantaneas = self._instantaneas()
+        for momento, ruta in instantaneas[:-self.generaciones]:
+            os.remove(ruta)
+        conservadas = instantaneas[-self.generaciones:]
+        if not conservadas:
+            return
+        mas_vieja = conservadas[0][0]
+        for cierre, ruta in self._tramos():
+            # Un tramo cerrado antes de la instantánea más vieja ya no hace falta
+            if cierre < mas_vieja:
+                os.remove(ruta)
+
+    def iniciarPeriodico(self, obtener_gestor, intervalo=None):
+        """
+        Lanza un hilo que toma una instantánea cada intervalo segundos (si hubo cambios).
+
+        Args:
+            obtener_gestor (callable): Retorna el gestor con los datos al día
+            intervalo (float): Segundos entre instantáneas (por defecto AMIGOS_INSTANTANEAS)
+        """
+        intervalo = intervalo if intervalo is not None else INTERVALO
+        if self.periodico is not None or intervalo <= 0:
+            return
+
+        def ciclo():
+            while True:
+                time.sleep(intervalo)
+                try:
+                    if self.hayCambios():
+                        self.tomar(obtener_gestor(), esperar=True)
+                except Exception as e:
+                    # El hilo sigue: la próxima vuelta lo intenta de nuevo
+                    self.estadisticas["ultimo_error"] = str(e)
+
+        self.periodico = threading.Thread(target=ciclo, name="instantaneas", daemon=True)
+        self.periodico.start()
+
+    # ============================================
+    # LISTAR Y RESTAURAR
+    # ============================================
+
+    def _archivos(self, patron):
+        try:
+            nombres = os.listdir(self.directorio)
+        except FileNotFoundError:
+            return []
+        encontrados = []
+        for nombre in nombres:
+            coincidencia = patron.match(nombre)
+            if coincidencia:
+                encontrados.append((int(coincidencia.group(1)), os.path.join(self.directorio, nombre)))
+        encontrados.sort()
+        return encontrados
+
+    def _instantaneas(self):
+        return self._archivos(_INSTANTANEA)
+
+    def _tramos(self):
+        return self._archivos(_TRAMO)
+
+    def listar(self):
+        """
+        Retorna las instantáneas conservadas (de la más vieja a la más nueva) y el estado.
+
+        Returns:
+            dict: instantaneas [{fecha, t, bytes}], desde (momento más viejo restaurable),
+                  generaciones y contadores
+        """
+        instantaneas = []
+        for momento, ruta in self._instantaneas():
+            try:
+                tamano = os.path.getsize(ruta)
+            except FileNotFoundError:
+                continue
+            instantaneas.append({"fecha": _fecha(momento), "t": momento, "bytes": tamano})
+        datos = dict(self.estadisticas)
+        datos["instantaneas"] = instantaneas
+        datos["desde"] = instantaneas[0]["fecha"] if instantaneas else None
+        datos["generaciones"] = self.generaciones
+        datos["historial_bytes"] = sum(os.path.getsize(ruta) for _, ruta in self._tramos()) + \
+            (os.path.getsize(self.historial.ruta) if os.path.exists(self.historial.ruta) else 0)
+        return datos
+
+    def _entradasHistorial(self, desde, hasta):
+        """Cambios con momento en (desde, hasta], en orden"""
+        rutas = [ruta for _, ruta in self._tramos()]
+        if os.path.exists(self.historial.ruta):
+            rutas.append(self.historial.ruta)
+        entradas = []
+        for ruta in rutas:
+            try:
+                archivo = open(ruta, 'r', encoding='utf-8')
+            except FileNotFoundError:
+                continue
+            with archivo:
+                for linea in archivo:
+                    try:
+                        entrada = json.loads(linea)
+                    except ValueError:
+                        # Línea a medio escribir por otro proceso: se ignora
+                        continue
+                    if desde < entrada.get("t", 0) <= hasta:
+                        entradas.append(entrada)
+        # Un cambio anotado justo al cerrar un tramo puede quedar en el anterior
+        entradas.sort(key=lambda entrada: entrada["t"])
+        return entradas
+
+    def restaurar(self, hasta):
+        """
+        Reconstruye los amigos tal como estaban en un momento dado.
+
+        No cambia los datos actuales: quien llama decide qué hacer con la lista
+        (ver config.restaurar_instantanea).
+
+        Args:
+            hasta: Momento a restaurar (ver leer_momento)
+
+        Returns:
+            tuple: (lista de amigos, resumen con la instantánea usada y los cambios aplicados)
+
+        Raises:
+            ValueError: Si el momento es inválido o anterior a la instantánea más vieja
+        """
+        limite = int(leer_momento(hasta) * 1e9)
+        anteriores = [(momento, ruta) for momento, ruta in self._instantaneas() if momento <= limite]
+        if not anteriores:
+            raise ValueError("No hay ninguna instantánea anterior a ese momento")
+        momento, ruta = anteriores[-1]
+
+        amigos = list(iterar_amigos_json(ruta))
+        amigos, aplicados = aplicar_historial(amigos, self._entradasHistorial(momento, limite))
+        resumen = {
+            "hasta": _fecha(limite),
+            "instantanea": _fecha(momento),
+            "cambios_aplicados": aplicados,
+            "amigos": len(amigos)
+        }
+        return amigos, resumen
@@ -0,0 +1,504 @@
+"""
+intercambio.py - Importación y exportación de amigos en NDJSON, CSV y columnar
+
+Lectores y escritores incrementales: se procesa un amigo (o un grupo chico de
+amigos) a la vez, así que importar o exportar cientos de miles de amigos no
+necesita tenerlos todos como texto o diccionarios en memoria.
+
+Formatos:
+- ndjson:   una línea JSON por amigo, con el mismo formato que amigos_data.json
+            (incluye recuerdos_meta, es decir ids y fechas de los recuerdos)
+- csv:      columnas tipo, nombre, cumpleanos, gustos, recuerdos, anecdotas y
+            nivelConfianza; cada lista va en una sola celda como arreglo JSON
+            (["cine", "teatro"]), así los elementos pueden tener "|", comas,
+            espacios o estar vacíos; al importar también se aceptan celdas
+            viejas separadas por "|" (no guarda fechas de recuerdos)
+- columnar: al estilo Parquet, una línea JSON por grupo de FILAS_POR_GRUPO amigos
+            con un arreglo por columna; cada lista (gustos, recuerdos, anécdotas)
+            se aplana en dos columnas hijas: "<lista>.largos" (cuántos elementos
+            tiene cada amigo) y "<lista>.valores" (todos los elementos seguidos).
+            La primera línea es un encabezado con el formato y las columnas.
+
+La exportación puede comprimirse mientras se escribe: gzip siempre, y zstd o br
+si están instalados zstandard o brotli.
+"""
+
+import csv
+import gzip
+import io
+import json
+import sys
+import zlib
+from contextlib import contextmanager
+
+from persistencia import amigo_a_diccionario
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# Formatos soportados según la extensión del archivo
+EXTENSIONES = {
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".csv": "csv",
+    ".columnar": "columnar"
+}
+
+# Formatos de exportación y su tipo de contenido HTTP
+FORMATOS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "columnar": "application/x-ndjson"
+}
+
+# Compresiones según la extensión del archivo
+EXTENSIONES_COMPRESION = {
+    ".gz": "gzip",
+    ".zst": "zstd",
+    ".br": "br"
+}
+
+# Amigos por grupo en el formato columnar (la memoria depende de esto, no del total)
+FILAS_POR_GRUPO = 1000
+
+# Bytes acumulados antes de entregar (o comprimir) un bloque de la exportación
+TAMANO_BLOQUE = 64 * 1024
+
+# Listas que el formato columnar aplana en columnas hijas
+COLUMNAS_LISTA = ["gustos", "recuerdos", "anecdotas"]
+
+# Columnas del formato CSV (en este orden)
+COLUMNAS_CSV = ["tipo", "nombre", "cumpleanos", "gustos", "recuerdos", "anecdotas", "nivelConfianza"]
+
+# Separador de las celdas CSV escritas antes de guardar las listas como JSON
+SEPARADOR_LISTAS = "|"
+
+# Tipos de amigo aceptados al importar
+TIPOS_VALIDOS = ("AmigoRegular", "AmigoCercano")
+
+
+def detectar_compresion(ruta, compresion=None):
+    """
+    Retorna la compresión de un archivo: la indicada o la que sugiere su extensión.
+
+    Returns:
+        str o None: "gzip", "zstd", "br" o None (sin comprimir)
+
+    Raises:
+        ValueError: Si la compresión no existe o su biblioteca no está instalada
+    """
+    if compresion in (None, "", "ninguna"):
+        compresion = None
+        for extension, nombre in EXTENSIONES_COMPRESION.items():
+            if ruta.lower().endswith(extension):
+                compresion = nombre
+    if compresion is None:
+        return None
+    if compresion not in compresiones_disponibles():
+        raise ValueError(f"Compresión no disponible: {compresion} "
+                         f"(disponibles: {', '.join(compresiones_disponibles())})")
+    return compresion
+
+
+def compresiones_disponibles():
+    disponibles = ["gzip"]
+    if zstandard is not None:
+        disponibles.append("zstd")
+    if brotli is not None:
+        disponibles.append("br")
+    return disponibles
+
+
+def detectar_formato(ruta, formato=None):
+    """
+    Retorna el formato de un archivo: el indicado o el que sugiere su extensión
+    (sin contar la de compresión: amigos.csv.gz es csv).
+
+    Raises:
+        ValueError: Si no se indicó formato y la extensión no es conocida
+    """
+    if formato:
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato desconocido: {formato}")
+        return formato
+    base = ruta.lower()
+    for extension in EXTENSIONES_COMPRESION:
+        if base.endswith(extension):
+            base = base[:-len(extension)]
+    for extension, nombre in EXTENSIONES.items():
+        if base.endswith(extension):
+            return nombre
+    if ruta == "-":
+        return "ndjson"
+    raise ValueError(f"No se reconoce el formato de {ruta}; indique --formato ndjson, csv o columnar")
+
+
+@contextmanager
+def abrir_texto(ruta, modo, estandar=None):
+    """
+    Abre un archivo de texto UTF-8; "-" es la entrada o salida estándar (que no se cierra).
+
+    Los archivos .gz se descomprimen (o comprimen) al vuelo.
+
+    Args:
+        ruta (str): Ruta del archivo o "-"
+        modo (str): "r" o "w"
+        estandar: Archivo a usar para "-" (por defecto sys.stdin o sys.stdout)
+    """
+    if ruta == "-":
+        yield estandar or (sys.stdin if "r" in modo else sys.stdout)
+        return
+    if ruta.lower().endswith(".gz"):
+        with gzip.open(ruta, modo + "t", encoding='utf-8', newline='') as archivo:
+            yield archivo
+        return
+    with open(ruta, modo, encoding='utf-8', newline='') as archivo:
+        yield archivo
+
+
+# ============================================
+# LECTURA
+# ============================================
+
+def separar_lista(texto, separador=","):
+    """Separa una lista escrita como texto ("a, b, c") en sus elementos"""
+    return [parte.strip() for parte in texto.split(separador) if parte]
+
+
+def celda_a_lista(celda):
+    """
+    Convierte una celda CSV de lista en sus elementos.
+
+    La celda es un arreglo JSON de textos; si no lo es (archivos escritos a mano
+    o exportados antes), se separa por SEPARADOR_LISTAS como se hacía antes.
+    """
+    if celda.startswith("["):
+        try:
+            lista = json.loads(celda)
+        except ValueError:
+            lista = None
+        if isinstance(lista, list) and all(isinstance(elemento, str) for elemento in lista):
+            return lista
+    return separar_lista(celda, SEPARADOR_LISTAS)
+
+
+def fila_csv_a_diccionario(fila):
+    """
+    Convierte una fila CSV en un diccionario con el formato de amigo_a_diccionario.
+
+    Raises:
+        ValueError: Si falta una columna obligatoria o el nivel de confianza no es un número
+    """
+    for columna in ("tipo", "nombre", "cumpleanos"):
+        if not fila.get(columna):
+            raise ValueError(f"Falta la columna {columna}")
+
+    amigo_dict = {
+        "tipo": fila["tipo"],
+        "nombre": fila["nombre"],
+        "cumpleanos": fila["cumpleanos"],
+        "gustos": celda_a_lista(fila.get("gustos") or ""),
+        "recuerdos": celda_a_lista(fila.get("recuerdos") or ""),
+        "anecdotas": celda_a_lista(fila.get("anecdotas") or "")
+    }
+    if fila["tipo"] == "AmigoCercano":
+        try:
+            amigo_dict["nivelConfianza"] = int(fila.get("nivelConfianza") or "")
+        except ValueError:
+            raise ValueError("nivelConfianza debe ser un número entero")
+    return amigo_dict
+
+
+def validar_diccionario(amigo_dict):
+    """
+    Verifica que un diccionario tenga lo necesario para reconstruir un amigo.
+
+    Raises:
+        ValueError: Con la descripción del problema
+    """
+    if not isinstance(amigo_dict, dict):
+        raise ValueError("El registro debe ser un objeto")
+    if amigo_dict.get("tipo") not in TIPOS_VALIDOS:
+        raise ValueError("El tipo debe ser AmigoRegular o AmigoCercano")
+    if not isinstance(amigo_dict.get("nombre"), str) or not amigo_dict["nombre"]:
+        raise ValueError("Falta el nombre")
+    if not isinstance(amigo_dict.get("cumpleanos"), str):
+        raise ValueError("Falta el cumpleaños")
+    for campo in ("gustos", "recuerdos", "anecdotas"):
+        amigo_dict.setdefault(campo, [])
+        if not isinstance(amigo_dict[campo], list):
+            raise ValueError(f"{campo} debe ser una lista")
+    if amigo_dict["tipo"] == "AmigoCercano" and not isinstance(amigo_dict.get("nivelConfianza"), int):
+        raise ValueError("nivelConfianza debe ser un número entero")
+    return amigo_dict
+
+
+def leer_registros(archivo, formato, convertir_fila=fila_csv_a_diccionario):
+    """
+    Recorre un archivo NDJSON o CSV y entrega un registro por vez.
+
+    Los registros con errores no detienen la lectura: se entregan como error.
+
+    Args:
+        archivo: Archivo de texto abierto
+        formato (str): "ndjson" o "csv"
+        convertir_fila (callable): Convierte cada fila CSV (dict) en el registro
+
+    Yields:
+        tuple: (número de línea, diccionario o None, mensaje de error o None)
+    """
+    if formato == "csv":
+        lector = csv.DictReader(archivo)
+        for fila in lector:
+            try:
+                yield lector.line_num, convertir_fila(fila), None
+            except ValueError as e:
+                yield lector.line_num, None, str(e)
+        return
+
+    if formato == "columnar":
+        yield from leer_columnar(archivo)
+        return
+
+    numero = 0
+    for linea in archivo:
+        numero = numero + 1
+        linea = linea.strip()
+        if not linea:
+            continue
+        try:
+            yield numero, json.loads(linea), None
+        except ValueError as e:
+            yield numero, None, f"JSON inválido: {e}"
+
+
+def leer_columnar(archivo):
+    """
+    Recorre un archivo columnar y entrega un amigo (diccionario) por vez.
+
+    Yields:
+        tuple: (número de línea, diccionario o None, mensaje de error o None)
+    """
+    numero = 0
+    for linea in archivo:
+        numero = numero + 1
+        linea = linea.strip()
+        if not linea:
+            continue
+        try:
+            grupo = json.loads(linea)
+        except ValueError as e:
+            yield numero, None, f"JSON inválido: {e}"
+            continue
+        if "filas" not in grupo:
+            # Encabezado del archivo
+            continue
+        try:
+            yield from ((numero, amigo_dict, None) for amigo_dict in columnas_a_diccionarios(grupo))
+        except (KeyError, IndexError, TypeError) as e:
+            yield numero, None, f"Grupo columnar inválido: {e}"
+
+
+def columnas_a_diccionarios(grupo):
+    """Reconstruye los diccionarios de amigo de un grupo columnar"""
+    listas = {}
+    for campo in COLUMNAS_LISTA:
+        valores = grupo[campo + ".valores"]
+        inicio = 0
+        separadas = []
+        for largo in grupo[campo + ".largos"]:
+            separadas.append(valores[inicio:inicio + largo])
+            inicio = inicio + largo
+        listas[campo] = separadas
+
+    amigos = []
+    for i in range(grupo["filas"]):
+        amigo_dict = {
+            "tipo": grupo["tipo"][i],
+            "nombre": grupo["nombre"][i],
+            "cumpleanos": grupo["cumpleanos"][i],
+            "gustos": listas["gustos"][i],
+            "recuerdos": listas["recuerdos"][i],
+            "anecdotas": listas["anecdotas"][i]
+        }
+        if grupo["nivelConfianza"][i] is not None:
+            amigo_dict["nivelConfianza"] = grupo["nivelConfianza"][i]
+        amigos.append(amigo_dict)
+    return amigos
+
+
+def en_lotes(iterable, tamano):
+    """Agrupa un iterable en listas de hasta `tamano` elementos sin leerlo completo"""
+    lote = []
+    for elemento in iterable:
+        lote.append(elemento)
+        if len(lote) >= tamano:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+# ============================================
+# ESCRITURA
+# ============================================
+
+def lista_a_celda(lista):
+    """Escribe una lista como celda CSV: un arreglo JSON que se lee sin ambigüedad"""
+    return json.dumps(lista, ensure_ascii=False)
+
+
+def diccionario_a_fila_csv(amigo_dict):
+    """Convierte un diccionario de amigo en una fila para COLUMNAS_CSV"""
+    return [
+        amigo_dict["tipo"],
+        amigo_dict["nombre"],
+        amigo_dict["cumpleanos"],
+        lista_a_celda(amigo_dict["gustos"]),
+        lista_a_celda(amigo_dict["recuerdos"]),
+        lista_a_celda(amigo_dict["anecdotas"]),
+        amigo_dict.get("nivelConfianza", "")
+    ]
+
+
+def diccionarios_a_columnas(diccionarios):
+    """Convierte un grupo de diccionarios de amigo en un grupo columnar"""
+    grupo = {"filas": len(diccionarios)}
+    for columna in ("tipo", "nombre", "cumpleanos"):
+        grupo[columna] = [amigo_dict[columna] for amigo_dict in diccionarios]
+    grupo["nivelConfianza"] = [amigo_dict.get("nivelConfianza") for amigo_dict in diccionarios]
+    for campo in COLUMNAS_LISTA:
+        grupo[campo + ".largos"] = [len(amigo_dict[campo]) for amigo_dict in diccionarios]
+        grupo[campo + ".valores"] = [valor for amigo_dict in diccionarios for valor in amigo_dict[campo]]
+    return grupo
+
+
+def _textos_ndjson(diccionarios):
+    for amigo_dict in diccionarios:
+        yield json.dumps(amigo_dict, ensure_ascii=False) + "\n"
+
+
+def _textos_csv(diccionarios):
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(COLUMNAS_CSV)
+    for amigo_dict in diccionarios:
+        escritor.writerow(diccionario_a_fila_csv(amigo_dict))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    yield buffer.getvalue()
+
+
+def _textos_columnar(diccionarios):
+    encabezado = {
+        "formato": "amigos-columnar",
+        "version": 1,
+        "filas_por_grupo": FILAS_POR_GRUPO,
+        "columnas": ["tipo", "nombre", "cumpleanos", "nivelConfianza"] +
+                    [campo + sufijo for campo in COLUMNAS_LISTA for sufijo in (".largos", ".valores")]
+    }
+    yield json.dumps(encabezado, ensure_ascii=False) + "\n"
+    for grupo in en_lotes(diccionarios, FILAS_POR_GRUPO):
+        yield json.dumps(diccionarios_a_columnas(grupo), ensure_ascii=False) + "\n"
+
+
+class _CompresorBrotli:
+    """Adapta brotli.Compressor a la interfaz compress/flush de zlib"""
+
+    def __init__(self):
+        self.compresor = brotli.Compressor()
+
+    def compress(self, datos):
+        return self.compresor.process(datos)
+
+    def flush(self):
+        return self.compresor.finish()
+
+
+def crear_compresor(compresion):
+    """Retorna un compresor de flujo (compress/flush) o None si no se comprime"""
+    if compresion is None:
+        return None
+    if compresion == "gzip":
+        # wbits=31: formato gzip (con encabezado), igual que un archivo .gz
+        return zlib.compressobj(6, zlib.DEFLATED, 31)
+    if compresion == "zstd":
+        return zstandard.ZstdCompressor(level=3).compressobj()
+    return _CompresorBrotli()
+
+
+def generar_exportacion(amigos, formato, compresion=None, estadisticas=None):
+    """
+    Genera la exportación de los amigos como bloques de bytes, listos para escribir o enviar.
+
+    Se procesa un amigo (o un grupo columnar) a la vez y se entregan bloques de
+    TAMANO_BLOQUE bytes, así que la memoria no crece con la cantidad de amigos.
+
+    Args:
+        amigos (iterable): Objetos Amigo
+        formato (str): "ndjson", "csv" o "columnar"
+        compresion (str): "gzip", "zstd", "br" o None
+        estadisticas (dict): Si se pasa, se completa con "amigos" y "bytes" al terminar
+
+    Yields:
+        bytes: Bloques de la exportación (ya comprimidos si se pidió)
+    """
+    contador = {"amigos": 0, "bytes": 0}
+
+    def diccionarios():
+        for amigo in amigos:
+            contador["amigos"] = contador["amigos"] + 1
+            yield amigo_a_diccionario(amigo)
+
+    if formato == "csv":
+        textos = _textos_csv(diccionarios())
+    elif formato == "columnar":
+        textos = _textos_columnar(diccionarios())
+    else:
+        textos = _textos_ndjson(diccionarios())
+
+    compresor = crear_compresor(compresion)
+    pendientes = []
+    acumulado = 0
+
+    for texto in textos:
+        dato = texto.encode('utf-8')
+        pendientes.append(dato)
+        acumulado = acumulado + len(dato)
+        if acumulado >= TAMANO_BLOQUE:
+            bloque = b"".join(pendientes)
+            pendientes = []
+            acumulado = 0
+            if compresor is not None:
+                bloque = compresor.compress(bloque)
+            if bloque:
+                contador["bytes"] = contador["bytes"] + len(bloque)
+                yield bloque
+
+    bloque = b"".join(pendientes)
+    if compresor is not None:
+        bloque = compresor.compress(bloque) + compresor.flush()
+    if bloque:
+        contador["bytes"] = contador["bytes"] + len(bloque)
+        yield bloque
+
+    if estadisticas is not None:
+        estadisticas.update(contador)
+
+
+def nombre_exportacion(formato, compresion=None):
+    """Nombre de archivo sugerido para una exportación (ej: amigos.csv.gz)"""
+    extension = {"ndjson": ".ndjson", "csv": ".csv", "columnar": ".columnar"}[formato]
+    for sufijo, nombre in EXTENSIONES_COMPRESION.items():
+        if nombre == compresion:
+            extension = extension + sufijo
+    return "amigos" + extension
@@ -0,0 +1,229 @@
+"""
+limitador.py - Límite de tasa y control de admisión para las escrituras (POST)
+
+Cada POST de la API de Juan carga y reescribe los datos, así que una ráfaga de
+escrituras puede acaparar el disco que también usa la API de consultas. Con el
+limitador activado, las escrituras de más se rechazan rápido con 429 en lugar
+de hacer cola y llevar la latencia de los GET a segundos:
+- Cada cliente (su dirección de origen) tiene un balde de fichas (token
+  bucket): se recarga a TASA fichas por segundo hasta RAFAGA fichas, y cada
+  escritura gasta una
+- Además, como máximo CONCURRENCIA escrituras se procesan a la vez entre todos
+  los clientes; las demás esperan hasta ESPERA_MS y luego se rechazan
+
+Las respuestas 429 incluyen la cabecera Retry-After (segundos a esperar).
+
+Alcance de los límites:
+- Son de cada proceso: los baldes y los lugares viven en memoria, así que con
+  N procesos (workers de gunicorn, varias réplicas) el límite real es N veces
+  el configurado. Para un límite global hay que repartir TASA y CONCURRENCIA
+  entre los procesos, o ponerlo en el proxy
+- Por defecto el cliente es remote_addr: detrás de un proxy todos los clientes
+  comparten la dirección del proxy (y un solo balde). En ese caso se puede
+  indicar con AMIGOS_LIMITE_CABECERA la cabecera que el proxy completa con la
+  dirección real (ej: X-Forwarded-For; se usa la última dirección, la que
+  agregó el proxy). Solo tiene sentido si el proxy es el único camino a la
+  API: si no, un cliente puede inventar la cabecera
+
+Variables de entorno:
+- AMIGOS_LIMITE=1                   → activa el limitador en la API de escrituras
+- AMIGOS_LIMITE_TASA=5              → escrituras por segundo por cliente (sostenidas)
+- AMIGOS_LIMITE_RAFAGA=20           → escrituras seguidas que un cliente puede hacer
+- AMIGOS_LIMITE_CONCURRENCIA=4      → escrituras en curso como máximo (todos los clientes)
+- AMIGOS_LIMITE_ESPERA_MS=100       → cuánto espera una escritura por un lugar libre
+- AMIGOS_LIMITE_MAX_CLIENTES=10000  → baldes recordados como máximo (los más viejos se olvidan)
+- AMIGOS_LIMITE_CABECERA=           → cabecera con la dirección del cliente (vacío = remote_addr)
+"""
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from flask import g, jsonify, request
+
+
+# Métodos que cuentan como escritura
+METODOS_ESCRITURA = ("POST", "PUT", "PATCH", "DELETE")
+
+
+class BaldeFichas:
+    """
+    Balde de fichas de un cliente.
+
+    No hay un hilo que lo recargue: las fichas ganadas se calculan con el tiempo
+    transcurrido desde la última consulta.
+    """
+
+    def __init__(self, capacidad, ahora):
+        self.fichas = float(capacidad)
+        self.actualizado = ahora
+
+    def tomar(self, tasa, capacidad, ahora):
+        """
+        Intenta gastar una ficha.
+
+        Returns:
+            float: 0 si se pudo, o los segundos que faltan para tener una ficha
+        """
+        self.fichas = min(capacidad, self.fichas + (ahora - self.actualizado) * tasa)
+        self.actualizado = ahora
+        if self.fichas >= 1:
+            self.fichas = self.fichas - 1
+            return 0.0
+        return (1 - self.fichas) / tasa
+
+
+class LimitadorEscrituras:
+    """
+    Instala en una app Flask el límite por cliente y la admisión global de escrituras.
+
+    Responsabilidad: decidir si una escritura se atiende o se rechaza con 429,
+    y llevar los contadores de lo decidido.
+    """
+
+    def __init__(self, app, tasa=None, rafaga=None, concurrencia=None, espera_ms=None,
+                 max_clientes=None, cabecera=None):
+        """
+        Constructor del limitador.
+
+        Args:
+            app (Flask): Aplicación a proteger
+            tasa (float): Escrituras por segundo por cliente (por defecto AMIGOS_LIMITE_TASA)
+            rafaga (int): Capacidad del balde (por defecto AMIGOS_LIMITE_RAFAGA)
+            concurrencia (int): Escrituras simultáneas (por defecto AMIGOS_LIMITE_CONCURRENCIA)
+            espera_ms (float): Espera por un lugar libre (por defecto AMIGOS_LIMITE_ESPERA_MS)
+            max_clientes (int): Baldes recordados (por defecto AMIGOS_LIMITE_MAX_CLIENTES)
+            cabecera (str): Cabecera con la dirección del cliente, puesta por un proxy
+                            de confianza (por defecto AMIGOS_LIMITE_CABECERA; vacío = remote_addr)
+        """
+        self.tasa = tasa if tasa is not None else \
+            float(os.environ.get("AMIGOS_LIMITE_TASA", "5"))
+        self.rafaga = rafaga if rafaga is not None else \
+            int(os.environ.get("AMIGOS_LIMITE_RAFAGA", "20"))
+        self.concurrencia = concurrencia if concurrencia is not None else \
+            int(os.environ.get("AMIGOS_LIMITE_CONCURRENCIA", "4"))
+        self.espera_ms = espera_ms if espera_ms is not None else \
+            float(os.environ.get("AMIGOS_LIMITE_ESPERA_MS", "100"))
+        self.max_clientes = max_clientes if max_clientes is not None else \
+            int(os.environ.get("AMIGOS_LIMITE_MAX_CLIENTES", "10000"))
+        self.cabecera = cabecera if cabecera is not None else \
+            os.environ.get("AMIGOS_LIMITE_CABECERA", "")
+
+        self.baldes = OrderedDict()
+        self.lugares = threading.BoundedSemaphore(self.concurrencia)
+        self.candado = threading.Lock()
+        self.en_curso = 0
+        self.estadisticas = {
+            "admitidas": 0,
+            "rechazadas_tasa": 0,
+            "rechazadas_concurrencia": 0,
+            "maximo_en_curso": 0
+        }
+
+        app.before_request(self._admitir)
+        app.teardown_request(self._liberar)
+
+    @staticmethod
+    def esta_activo():
+        """Indica si el limitador está activado por variable de entorno"""
+        return os.environ.get("AMIGOS_LIMITE", "0") not in ("", "0", "false", "no")
+
+    def clienteDe(self, peticion):
+        """
+        Identifica al cliente por su dirección.
+
+        No se usa la cabecera X-Usuario: la elige el cliente sin autenticarse,
+        así que cambiándola en cada petición tendría un balde nuevo cada vez.
+        Con una cabecera configurada se toma su última dirección, la que agregó
+        el proxy (las anteriores pudo haberlas escrito el cliente).
+        """
+        if self.cabecera:
+            valor = peticion.headers.get(self.cabecera, "")
+            direccion = valor.split(",")[-1].strip()
+            if direccion:
+                return direccion
+        return peticion.remote_addr or "desconocido"
+
+    def _esperaBalde(self, cliente):
+        """Gasta una ficha del balde del cliente; retorna los segundos a esperar (0 = admitido)"""
+        ahora = time.monotonic()
+        with self.candado:
+            balde = self.baldes.get(cliente)
+            if balde is None:
+                balde = BaldeFichas(self.rafaga, ahora)
+                self.baldes[cliente] = balde
+                if len(self.baldes) > self.max_clientes:
+                    self.baldes.popitem(last=False)
+            else:
+                self.baldes.move_to_end(cliente)
+            return balde.tomar(self.tasa, self.rafaga, ahora)
+
+    def _rechazar(self, motivo, segundos):
+        reintentar = max(1, math.ceil(segundos))
+        with self.candado:
+            self.estadisticas[motivo] = self.estadisticas[motivo] + 1
+        respuesta = jsonify({
+            "exito": False,
+            "error": "Demasiadas escrituras, intente de nuevo en " + str(reintentar) + " s"
+        })
+        respuesta.status_code = 429
+        respuesta.headers["Retry-After"] = str(reintentar)
+        return respuesta
+
+    def _admitir(self):
+        """Rechaza la escritura si el cliente agotó sus fichas o no hay lugar libre"""
+        if request.method not in METODOS_ESCRITURA:
+            return None
+
+        espera = self._esperaBalde(self.clienteDe(request))
+        if espera > 0:
+            return self._rechazar("rechazadas_tasa", espera)
+
+        if not self.lugares.acquire(timeout=self.espera_ms / 1000):
+            return self._rechazar("rechazadas_concurrencia", 1)
+
+        g.limite_lugar = True
+        with self.candado:
+            self.en_curso = self.en_curso + 1
+            self.estadisticas["admitidas"] = self.estadisticas["admitidas"] + 1
+            self.estadisticas["maximo_en_curso"] = max(self.estadisticas["maximo_en_curso"],
+                                                       self.en_curso)
+        return None
+
+    def _liberar(self, error=None):
+        """Devuelve el lugar de la escritura aunque la petición haya fallado"""
+        if not g.pop("limite_lugar", False):
+            return
+        with self.candado:
+            self.en_curso = self.en_curso - 1
+        self.lugares.release()
+
+    def resumen(self):
+        """Retorna la configuración y los contadores del limitador"""
+        with self.candado:
+            datos = dict(self.estadisticas)
+            datos["en_curso"] = self.en_curso
+            datos["clientes"] = len(self.baldes)
+        datos["tasa"] = self.tasa
+        datos["rafaga"] = self.rafaga
+        datos["concurrencia"] = self.concurrencia
+        datos["espera_ms"] = self.espera_ms
+        datos["cabecera"] = self.cabecera or None
+        return datos
+
+
+def instalar_limitador(app):
+    """
+    Instala el limitador en la app solo si AMIGOS_LIMITE está activado.
+
+    Args:
+        app (Flask): Aplicación a proteger
+
+    Returns:
+        LimitadorEscrituras o None: El limitador instalado, o None si está apagado
+    """
+    if not LimitadorEscrituras.esta_activo():
+        return None
+    return LimitadorEscrituras(app)
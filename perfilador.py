@@ -0,0 +1,239 @@
+"""
+perfilador.py - Perfilado opcional de peticiones y registro de peticiones lentas
+
+Permite diagnosticar por qué una petición tarda (carga del JSON, recorrido del
+gestor o serialización) sobre tráfico real, sin costo cuando está apagado.
+
+Cómo se activa (variables de entorno):
+- AMIGOS_PERFIL=1                → activa el perfilador en ambas APIs
+- AMIGOS_PERFIL_UMBRAL_MS=1000   → peticiones más lentas que esto se registran
+- AMIGOS_PERFIL_MUESTREO=0.05    → fracción de peticiones que se perfilan con cProfile
+- AMIGOS_PERFIL_DIR=perfiles     → carpeta donde se escriben los artefactos
+
+Además, cualquier petición con la cabecera "X-Perfilar: 1" se perfila completa
+(cProfile + tracemalloc) y siempre queda registrada, sin importar su duración.
+
+cProfile también es global al proceso desde Python 3.12 (usa sys.monitoring), así
+que se perfila una sola petición a la vez: si ya hay un perfil activo (de otra
+petición o de otro perfilador) la petición se mide igual, pero sin cProfile.
+
+Cada entrada del registro (perfiles/peticiones_lentas.ndjson) es una línea JSON con
+el endpoint, la cantidad de amigos, la duración total y el tiempo de cada fase.
+"""
+
+import cProfile
+import itertools
+import json
+import os
+import random
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+
+
+# Cabecera que fuerza el perfilado de una petición
+CABECERA_PERFILAR = "X-Perfilar"
+
+# Nombre del archivo de registro dentro de la carpeta de perfiles
+ARCHIVO_REGISTRO = "peticiones_lentas.ndjson"
+
+
+@contextmanager
+def medir_fase(nombre):
+    """
+    Mide el tiempo de una fase de la petición actual (carga, recorrido, serialización...).
+
+    Fuera de una petición o con el perfilador apagado solo ejecuta el bloque.
+
+    Args:
+        nombre (str): Nombre de la fase
+    """
+    if not has_request_context() or not hasattr(g, "perfil_fases"):
+        yield
+        return
+
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        duracion = (time.perf_counter() - inicio) * 1000
+        g.perfil_fases[nombre] = g.perfil_fases.get(nombre, 0) + duracion
+
+
+class PerfiladorPeticiones:
+    """
+    Instala hooks before_request/after_request en una app Flask para medir peticiones.
+
+    Responsabilidad: decidir qué peticiones se perfilan y escribir los artefactos.
+    """
+
+    def __init__(self, app, nombre_api, contar_amigos=None, directorio=None,
+                 umbral_ms=None, muestreo=None):
+        """
+        Constructor del perfilador.
+
+        Args:
+            app (Flask): Aplicación a instrumentar
+            nombre_api (str): Nombre corto de la API (aparece en el registro)
+            contar_amigos (callable): Función que retorna el tamaño actual del dataset
+            directorio (str): Carpeta de artefactos (por defecto AMIGOS_PERFIL_DIR)
+            umbral_ms (float): Umbral de petición lenta (por defecto AMIGOS_PERFIL_UMBRAL_MS)
+            muestreo (float): Fracción de peticiones perfiladas (por defecto AMIGOS_PERFIL_MUESTREO)
+        """
+        self.nombre_api = nombre_api
+        self.contar_amigos = contar_amigos
+        self.directorio = directorio or os.environ.get("AMIGOS_PERFIL_DIR", "perfiles")
+        self.umbral_ms = umbral_ms if umbral_ms is not None else \
+            float(os.environ.get("AMIGOS_PERFIL_UMBRAL_MS", "1000"))
+        self.muestreo = muestreo if muestreo is not None else \
+            float(os.environ.get("AMIGOS_PERFIL_MUESTREO", "0"))
+
+        # tracemalloc y cProfile son globales al proceso: solo una petición a la vez los usa
+        self._candado_memoria = threading.Lock()
+        self._candado_cprofile = threading.Lock()
+        self._candado_registro = threading.Lock()
+        # Distingue los artefactos de peticiones que terminan en el mismo segundo
+        self._secuencia = itertools.count(1)
+
+        app.before_request(self._antes_de_peticion)
+        app.after_request(self._despues_de_peticion)
+        app.teardown_request(self._al_terminar)
+
+    @staticmethod
+    def esta_activo():
+        """Indica si el perfilado está activado por variable de entorno"""
+        return os.environ.get("AMIGOS_PERFIL", "0") not in ("", "0", "false", "no")
+
+    def _antes_de_peticion(self):
+        """Arranca el cronómetro y, si corresponde, cProfile y tracemalloc"""
+        g.perfil_inicio = time.perf_counter()
+        g.perfil_fases = {}
+        g.perfil_forzado = request.headers.get(CABECERA_PERFILAR, "") in ("1", "true", "si")
+        g.perfil_cprofile = None
+        g.perfil_memoria = False
+
+        if g.perfil_forzado or (self.muestreo > 0 and random.random() < self.muestreo):
+            g.perfil_cprofile = self._iniciar_cprofile()
+
+        if g.perfil_forzado and self._candado_memoria.acquire(blocking=False):
+            tracemalloc.start()
+            g.perfil_memoria = True
+
+    def _despues_de_peticion(self, respuesta):
+        """Detiene las mediciones y escribe el registro si la petición fue lenta"""
+        if not hasattr(g, "perfil_inicio"):
+            return respuesta
+
+        duracion_ms = (time.perf_counter() - g.perfil_inicio) * 1000
+        perfil = self._detener_cprofile()
+        memoria = self._detener_memoria()
+
+        if not g.perfil_forzado and duracion_ms < self.umbral_ms:
+            return respuesta
+
+        os.makedirs(self.directorio, exist_ok=True)
+        base = "%s_%s_%d-%d_%s" % (time.strftime("%Y%m%d-%H%M%S"), self.nombre_api,
+                                   os.getpid(), next(self._secuencia),
+                                   request.endpoint or "desconocido")
+
+        entrada = {
+            "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "api": self.nombre_api,
+            "metodo": request.method,
+            "ruta": request.full_path.rstrip("?"),
+            "endpoint": request.endpoint,
+            "estado": respuesta.status_code,
+            "duracion_ms": round(duracion_ms, 3),
+            "amigos": self._contar_amigos(),
+            "fases_ms": {fase: round(ms, 3) for fase, ms in g.perfil_fases.items()},
+            "bytes_respuesta": respuesta.calculate_content_length(),
+            "forzado": g.perfil_forzado
+        }
+
+        if perfil is not None:
+            ruta_perfil = os.path.join(self.directorio, base + ".prof")
+            perfil.dump_stats(ruta_perfil)
+            entrada["perfil"] = ruta_perfil
+
+        if memoria is not None:
+            actual, pico, top = memoria
+            entrada["memoria_pico_kb"] = round(pico / 1024, 1)
+            entrada["memoria_top"] = top
+
+        linea = json.dumps(entrada, ensure_ascii=False)
+        with self._candado_registro:
+            with open(os.path.join(self.directorio, ARCHIVO_REGISTRO), 'a', encoding='utf-8') as archivo:
+                archivo.write(linea + "\n")
+
+        return respuesta
+
+    def _al_terminar(self, error=None):
+        """Garantiza que cProfile y tracemalloc se detengan aunque la petición falle"""
+        self._detener_cprofile()
+        self._detener_memoria()
+
+    def _iniciar_cprofile(self):
+        """Retorna un cProfile activo, o None si ya hay otro perfil corriendo en el proceso"""
+        if not self._candado_cprofile.acquire(blocking=False):
+            return None
+        perfil = cProfile.Profile()
+        try:
+            perfil.enable()
+        except ValueError:
+            # Python 3.12+: otro perfilador (fuera de esta app) ya está activo
+            self._candado_cprofile.release()
+            return None
+        return perfil
+
+    def _detener_cprofile(self):
+        perfil = getattr(g, "perfil_cprofile", None)
+        if perfil is not None:
+            try:
+                perfil.disable()
+            finally:
+                g.perfil_cprofile = None
+                self._candado_cprofile.release()
+        return perfil
+
+    def _detener_memoria(self):
+        """Retorna (actual, pico, top10) si tracemalloc estaba activo para esta petición"""
+        if not getattr(g, "perfil_memoria", False):
+            return None
+
+        try:
+            actual, pico = tracemalloc.get_traced_memory()
+            instantanea = tracemalloc.take_snapshot()
+            top = [str(estadistica) for estadistica in instantanea.statistics("lineno")[:10]]
+            return actual, pico, top
+        finally:
+            tracemalloc.stop()
+            g.perfil_memoria = False
+            self._candado_memoria.release()
+
+    def _contar_amigos(self):
+        if self.contar_amigos is None:
+            return None
+        try:
+            return self.contar_amigos()
+        except Exception:
+            return None
+
+
+def instalar_perfilador(app, nombre_api, contar_amigos=None):
+    """
+    Instala el perfilador en la app solo si AMIGOS_PERFIL está activado.
+
+    Args:
+        app (Flask): Aplicación a instrumentar
+        nombre_api (str): Nombre corto de la API
+        contar_amigos (callable): Función que retorna el tamaño del dataset
+
+    Returns:
+        PerfiladorPeticiones o None: El perfilador instalado, o None si está apagado
+    """
+    if not PerfiladorPeticiones.esta_activo():
+        return None
+    return PerfiladorPeticiones(app, nombre_api, contar_amigos)
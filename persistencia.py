@@ -0,0 +1,450 @@
+"""
+persistencia.py - Conversión entre objetos Amigo y el formato JSON en disco
+
+Funciones de bajo nivel que usa config.py para leer y escribir amigos_data.json:
+- amigo_a_diccionario / diccionario_a_amigo: conversión de un solo amigo
+- firma_archivo: (inodo, fecha, tamaño) para saber si un archivo cambió
+- iterar_amigos_json: lector incremental que recorre el arreglo elemento por elemento
+- escribir_amigos_json: escritor incremental con el mismo formato que json.dump(indent=2)
+- guardar_partes / cargar_partes: snapshot dividido en partes escritas en paralelo
+  (descartar_partes vuelve al archivo único; iterar_snapshot lee el que esté vigente)
+
+El lector incremental evita tener en memoria al mismo tiempo el texto completo del
+archivo, la lista de diccionarios y los objetos reconstruidos: cada elemento se
+decodifica, se convierte en objeto y su diccionario se descarta enseguida.
+"""
+
+import json
+import os
+
+from AmigoRegular import AmigoRegular
+from AmigoCercano import AmigoCercano
+
+
+# Tamaño de cada lectura del archivo (en caracteres)
+TAMANO_BLOQUE = 64 * 1024
+
+
+def firma_archivo(ruta):
+    """
+    Retorna (inodo, fecha de modificación en ns, tamaño) de un archivo, o None si no existe.
+
+    El inodo detecta un archivo reemplazado (os.replace) con el mismo tamaño
+    dentro de la misma marca de tiempo.
+    """
+    try:
+        estado = os.stat(ruta)
+    except FileNotFoundError:
+        return None
+    return (estado.st_ino, estado.st_mtime_ns, estado.st_size)
+
+
+def amigo_a_diccionario(amigo):
+    """
+    Convierte un objeto Amigo al diccionario que se guarda en el archivo.
+
+    Args:
+        amigo: Objeto AmigoRegular o AmigoCercano
+
+    Returns:
+        dict: Datos del amigo con la clave "tipo"
+    """
+    tipo = type(amigo).__name__
+
+    amigo_dict = {
+        "tipo": tipo,
+        "nombre": amigo.nombre,
+        "cumpleanos": amigo.cumpleanos,
+        "gustos": amigo.gustos,
+        "recuerdos": amigo.recuerdos.recuerdos,  # Lista de recuerdos
+        "anecdotas": amigo.anecdotas
+    }
+
+    # Si es amigo cercano, agregar nivel de confianza
+    if tipo == "AmigoCercano":
+        amigo_dict["nivelConfianza"] = amigo.nivelConfianza
+
+    # Ids y fechas de los recuerdos (solo si hay alguna fecha conocida,
+    # así los archivos con recuerdos antiguos conservan su formato original)
+    metadatos = amigo.recuerdos.obtenerMetadatos()
+    for par in metadatos:
+        if par[1] is not None:
+            amigo_dict["recuerdos_meta"] = metadatos
+            break
+
+    return amigo_dict
+
+
+def diccionario_a_amigo(amigo_dict):
+    """
+    Reconstruye un objeto Amigo a partir de un diccionario del archivo.
+
+    Args:
+        amigo_dict (dict): Datos del amigo con la clave "tipo"
+
+    Returns:
+        AmigoRegular o AmigoCercano: El objeto reconstruido
+    """
+    tipo = amigo_dict["tipo"]
+    nombre = amigo_dict["nombre"]
+    cumpleanos = amigo_dict["cumpleanos"]
+    gustos = amigo_dict["gustos"]
+    recuerdos = amigo_dict["recuerdos"]
+    anecdotas = amigo_dict["anecdotas"]
+
+    # Crear el objeto según el tipo
+    if tipo == "AmigoCercano":
+        nivelConfianza = amigo_dict["nivelConfianza"]
+        amigo = AmigoCercano(nombre, cumpleanos, gustos, [], anecdotas, nivelConfianza)
+    else:  # AmigoRegular
+        amigo = AmigoRegular(nombre, cumpleanos, gustos, [], anecdotas)
+
+    # Restaurar los recuerdos manualmente (ya traen su prefijo) con sus ids y fechas
+    amigo.recuerdos.restaurar(recuerdos, amigo_dict.get("recuerdos_meta"))
+    return amigo
+
+
+def iterar_json_arreglo(archivo, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Recorre un arreglo JSON de primer nivel y entrega sus elementos uno por uno.
+
+    Lee el archivo por bloques y decodifica cada elemento con raw_decode, así que
+    nunca se tiene el texto completo en memoria, solo el elemento actual.
+
+    Args:
+        archivo: Archivo abierto en modo texto
+        tamano_bloque (int): Caracteres leídos en cada bloque
+
+    Yields:
+        Cada elemento del arreglo ya decodificado
+
+    Raises:
+        ValueError: Si el contenido no es un arreglo JSON válido
+    """
+    decodificador = json.JSONDecoder()
+    buffer = ""
+    posicion = 0
+    fin_archivo = False
+
+    def leer_mas(cantidad):
+        nonlocal buffer, posicion, fin_archivo
+        bloque = archivo.read(cantidad)
+        if not bloque:
+            fin_archivo = True
+            return False
+        # Descartar lo ya consumido antes de crecer el buffer
+        buffer = buffer[posicion:] + bloque
+        posicion = 0
+        return True
+
+    def saltar_espacios():
+        nonlocal posicion
+        while True:
+            while posicion < len(buffer) and buffer[posicion] in " \t\r\n":
+                posicion = posicion + 1
+            if posicion < len(buffer) or not leer_mas(tamano_bloque):
+                return
+
+    # El archivo debe empezar con "["
+    saltar_espacios()
+    if posicion >= len(buffer) or buffer[posicion] != "[":
+        raise ValueError("El archivo no contiene un arreglo JSON")
+    posicion = posicion + 1
+
+    primero = True
+    while True:
+        saltar_espacios()
+        if posicion >= len(buffer):
+            raise ValueError("Arreglo JSON sin cerrar")
+
+        if buffer[posicion] == "]":
+            # Después del arreglo solo puede haber espacios (igual que json.load)
+            posicion = posicion + 1
+            saltar_espacios()
+            if posicion < len(buffer):
+                raise ValueError("Contenido extra después del arreglo JSON")
+            return
+
+        if not primero:
+            if buffer[posicion] != ",":
+                raise ValueError("Se esperaba ',' entre elementos del arreglo")
+            posicion = posicion + 1
+            saltar_espacios()
+
+        # Decodificar el siguiente elemento; si está cortado, leer más y reintentar
+        cantidad = tamano_bloque
+        while True:
+            try:
+                elemento, fin = decodificador.raw_decode(buffer, posicion)
+                # Un número cortado por el bloque ("12" de "123", "-0" de "-0.5") también se
+                # decodifica: solo vale si después viene un separador o se acabó el archivo
+                if fin_archivo or (fin < len(buffer) and buffer[fin] in " \t\r\n,]") or \
+                        not leer_mas(cantidad):
+                    break
+            except json.JSONDecodeError:
+                if fin_archivo or not leer_mas(cantidad):
+                    raise ValueError("Elemento JSON inválido o incompleto")
+                # Elementos muy grandes: duplicar la lectura para no reintentar de más
+                cantidad = cantidad * 2
+
+        posicion = fin
+        primero = False
+        yield elemento
+
+
+def iterar_amigos_json(ruta, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Recorre amigos_data.json y entrega un objeto Amigo por cada elemento.
+
+    Args:
+        ruta (str): Ruta del archivo JSON
+        tamano_bloque (int): Caracteres leídos en cada bloque
+
+    Yields:
+        AmigoRegular o AmigoCercano
+    """
+    with open(ruta, 'r', encoding='utf-8') as archivo:
+        for amigo_dict in iterar_json_arreglo(archivo, tamano_bloque):
+            yield diccionario_a_amigo(amigo_dict)
+
+
+def escribir_amigos_json(archivo, amigos):
+    """
+    Escribe los amigos como arreglo JSON, uno por uno.
+
+    El resultado es idéntico a json.dump(lista, indent=2, ensure_ascii=False),
+    pero sin construir la lista completa de diccionarios en memoria.
+
+    Args:
+        archivo: Archivo abierto en modo escritura de texto
+        amigos (iterable): Objetos Amigo a escribir
+
+    Returns:
+        int: Cantidad de amigos escritos
+    """
+    return escribir_diccionarios_json(archivo, (amigo_a_diccionario(amigo) for amigo in amigos))
+
+
+def escribir_diccionarios_json(archivo, diccionarios):
+    """
+    Escribe diccionarios de amigos como arreglo JSON, uno por uno.
+
+    Args:
+        archivo: Archivo abierto en modo escritura de texto
+        diccionarios (iterable): Diccionarios con el formato de amigo_a_diccionario
+
+    Returns:
+        int: Cantidad de elementos escritos
+    """
+    cantidad = 0
+
+    for amigo_dict in diccionarios:
+        texto = json.dumps(amigo_dict, indent=2, ensure_ascii=False)
+        archivo.write("[\n  " if cantidad == 0 else ",\n  ")
+        archivo.write(texto.replace("\n", "\n  "))
+        cantidad = cantidad + 1
+
+    archivo.write("[]" if cantidad == 0 else "\n]")
+    return cantidad
+
+
+# ============================================
+# SNAPSHOT EN PARTES (PARALELO)
+# ============================================
+# El snapshot se divide en rangos contiguos de amigos, uno por archivo:
+#     amigos_data.json.partes/parte-000007-0000.json, parte-000007-0001.json, ...
+#     amigos_data.json.partes/indice.json  → generación y lista ordenada de partes
+# El orden del índice garantiza que los amigos se recuperen en el mismo orden.
+#
+# Al guardar, cada proceso hijo se crea con fork: hereda los objetos Amigo del
+# padre sin copiarlos por un pipe, los convierte y codifica él mismo, y escribe
+# sus partes. El padre solo espera (con el candado de escritura tomado, así que
+# nadie modifica los amigos mientras tanto). Sin fork (Windows) las partes se
+# escriben en este mismo proceso.
+# Al cargar, las partes se leen una tras otra en este proceso: los objetos
+# tienen que quedar aquí, y recibirlos de otro proceso (como objetos o como
+# diccionarios a convertir) le cuesta al padre más CPU que decodificarlos él
+# mismo (ver benchmark.py --procesos), así que la carga no usa procesos.
+#
+# Cada guardado escribe sus partes con un número de generación nuevo, así que
+# nunca pisa archivos que figuran en el índice vigente. El índice se reemplaza
+# de una vez y recién después se borran las generaciones viejas; la anterior
+# se conserva para el lector que todavía está leyendo con el índice previo.
+# Mientras exista el índice, las partes son los datos vigentes (también para
+# los procesos sin AMIGOS_PROCESOS, ver iterar_snapshot): el archivo único no
+# se reescribe.
+
+ARCHIVO_INDICE_PARTES = "indice.json"
+
+# Generaciones anteriores a la vigente que se conservan después de un guardado
+GENERACIONES_CONSERVADAS = 1
+
+# Reintentos de cargar_partes si un guardado borró las partes mientras se leían
+REINTENTOS_CARGA = 3
+
+
+def directorio_partes(ruta):
+    """Retorna la carpeta de partes asociada a un archivo de datos"""
+    return ruta + ".partes"
+
+
+def _generacion(nombre):
+    """Número de generación de un archivo de parte (0 si tiene el formato viejo)"""
+    campos = nombre.split("-")
+    if len(campos) == 3 and campos[1].isdigit():
+        return int(campos[1])
+    return 0
+
+
+def _escribir_partes(trabajos):
+    """Escribe una lista de partes (ruta temporal, amigos); en un hijo o en este proceso"""
+    for temporal, amigos in trabajos:
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            escribir_amigos_json(archivo, amigos)
+
+
+def _contexto_fork():
+    """Contexto de multiprocessing que crea procesos con fork (None si no hay fork)"""
+    # Se importa aquí: solo el modo paralelo necesita multiprocessing
+    import multiprocessing
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return None
+    return multiprocessing.get_context("fork")
+
+
+def guardar_partes(ruta, amigos, procesos, partes):
+    """
+    Guarda los amigos repartidos en varias partes codificadas en paralelo.
+
+    Las partes nuevas llevan una generación que no usa ningún índice existente;
+    el índice se reemplaza al final, así que un lector nunca ve una mezcla de
+    snapshots viejos y nuevos, y las partes que lista el índice anterior siguen
+    en disco hasta el guardado siguiente.
+
+    Args:
+        ruta (str): Archivo de datos (ej: amigos_data.json)
+        amigos (list): Objetos Amigo en su orden actual
+        procesos (int): Procesos hijos que escriben las partes (0 o 1 = este proceso)
+        partes (int): Cantidad de partes en las que se divide el snapshot
+
+    Returns:
+        int: Cantidad de amigos guardados
+
+    Raises:
+        RuntimeError: Si algún proceso hijo no pudo escribir sus partes
+    """
+    directorio = directorio_partes(ruta)
+    os.makedirs(directorio, exist_ok=True)
+
+    existentes = [nombre for nombre in os.listdir(directorio) if nombre.startswith("parte-")]
+    generacion = max([_generacion(nombre) for nombre in existentes], default=0) + 1
+
+    partes = max(1, min(partes, len(amigos)))
+    tamano = -(-len(amigos) // partes) if amigos else 0
+    trabajos = []
+
+    for numero in range(partes):
+        nombre = "parte-%06d-%04d.json" % (generacion, numero)
+        trabajos.append((os.path.join(directorio, nombre) + ".tmp",
+                         amigos[numero * tamano:(numero + 1) * tamano]))
+
+    contexto = _contexto_fork() if procesos > 1 and partes > 1 else None
+    try:
+        if contexto is not None:
+            hijos = [contexto.Process(target=_escribir_partes, args=(trabajos[inicio::procesos],))
+                     for inicio in range(min(procesos, partes))]
+            for hijo in hijos:
+                hijo.start()
+            for hijo in hijos:
+                hijo.join()
+            if any(hijo.exitcode != 0 for hijo in hijos):
+                raise RuntimeError("Un proceso no pudo escribir sus partes del snapshot")
+        else:
+            _escribir_partes(trabajos)
+    except BaseException:
+        for temporal, _ in trabajos:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+        raise
+
+    indice = {"generacion": generacion, "partes": [], "total": 0}
+    for temporal, rango in trabajos:
+        ruta_parte = temporal[:-len(".tmp")]
+        os.replace(temporal, ruta_parte)
+        indice["partes"].append({"archivo": os.path.basename(ruta_parte), "amigos": len(rango)})
+        indice["total"] = indice["total"] + len(rango)
+
+    ruta_indice = os.path.join(directorio, ARCHIVO_INDICE_PARTES)
+    with open(ruta_indice + ".tmp", 'w', encoding='utf-8') as archivo:
+        json.dump(indice, archivo, indent=2)
+    os.replace(ruta_indice + ".tmp", ruta_indice)
+
+    # Recién ahora, con el índice nuevo en su lugar, se borran las generaciones viejas
+    for nombre in existentes:
+        if _generacion(nombre) < generacion - GENERACIONES_CONSERVADAS:
+            os.remove(os.path.join(directorio, nombre))
+
+    return indice["total"]
+
+
+def descartar_partes(ruta):
+    """
+    Deja de usar el snapshot en partes (después de guardar solo el archivo único).
+
+    Solo se borra el índice: las partes quedan para quien las esté leyendo y
+    el próximo guardar_partes las limpia.
+    """
+    try:
+        os.remove(os.path.join(directorio_partes(ruta), ARCHIVO_INDICE_PARTES))
+    except FileNotFoundError:
+        pass
+
+
+def existen_partes(ruta):
+    """Indica si hay un snapshot en partes para el archivo de datos"""
+    return os.path.exists(os.path.join(directorio_partes(ruta), ARCHIVO_INDICE_PARTES))
+
+
+def cargar_partes(ruta):
+    """
+    Carga un snapshot en partes, leyendo las partes en el orden del índice.
+
+    Si mientras se leía hubo dos guardados seguidos y una parte ya no existe,
+    se vuelve a leer el índice.
+
+    Args:
+        ruta (str): Archivo de datos (ej: amigos_data.json)
+
+    Returns:
+        list: Objetos Amigo en el orden original
+    """
+    directorio = directorio_partes(ruta)
+    for intento in range(REINTENTOS_CARGA):
+        with open(os.path.join(directorio, ARCHIVO_INDICE_PARTES), 'r', encoding='utf-8') as archivo:
+            indice = json.load(archivo)
+
+        rutas = [os.path.join(directorio, parte["archivo"]) for parte in indice["partes"]]
+
+        amigos = []
+        try:
+            for ruta_parte in rutas:
+                amigos.extend(iterar_amigos_json(ruta_parte))
+        except FileNotFoundError:
+            if intento == REINTENTOS_CARGA - 1:
+                raise
+            continue
+        return amigos
+
+
+def iterar_snapshot(ruta):
+    """
+    Recorre los amigos vigentes de un archivo de datos: sus partes si hay un
+    índice de partes, si no el archivo único (que puede no existir).
+
+    Yields:
+        AmigoRegular o AmigoCercano
+    """
+    if existen_partes(ruta):
+        yield from cargar_partes(ruta)
+    elif os.path.exists(ruta):
+        yield from iterar_amigos_json(ruta)
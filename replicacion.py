@@ -0,0 +1,444 @@
+"""
+replicacion.py - Modo réplica: la API de consultas sigue los cambios en lugar de recargar
+
+Sin este modo, la API de Laura se entera de una escritura de la API de Juan
+porque cambió el archivo de datos, y entonces lo vuelve a leer completo. Con
+AMIGOS_REPLICACION=1:
+- Cada proceso que escribe (API de Juan, Main.py) publica cada cambio como una
+  línea en amigos_data.json.cambios (amigo agregado o reemplazado, eliminado,
+  recuerdo nuevo), en el mismo formato que el historial de instantaneas.py
+- Cada API de consultas es una réplica: carga los datos una sola vez, aplica
+  ese registro desde el principio y después sigue su final (un hilo revisa el
+  archivo cada INTERVALO_MS y cada petición también se pone al día), aplicando
+  cada cambio a su gestor en memoria sin recargas completas
+- Se pueden levantar tantas réplicas como se quiera: solo leen el registro
+
+Las peticiones y el hilo que aplica los cambios comparten un candado de
+lectores y escritor: cada petición lee con los datos quietos (muchas a la
+vez) y los cambios se aplican entre peticiones, sin que nadie recorra una
+lista o un índice mientras cambia.
+
+Aplicar el registro es idempotente (un amigo se reemplaza completo, un
+recuerdo se ignora si ya tiene ese id), así que no importa si los datos
+cargados ya incluían parte de lo que se vuelve a aplicar.
+
+Después de un guardado completo, si el registro supera MAX_BYTES se archiva
+como amigos_data.json.cambios.anterior y se empieza uno nuevo; las réplicas
+terminan de leer el viejo antes de pasar al nuevo.
+
+Solo aplica a los datos principales con el gestor en memoria (no a inquilinos
+ni a los modos fragmentado y en disco, que ya detectan sus propios cambios).
+
+Variables de entorno:
+- AMIGOS_REPLICACION=1                    → activa el modo réplica
+- AMIGOS_REPLICACION_INTERVALO_MS=50      → cada cuánto una réplica revisa el registro
+- AMIGOS_REPLICACION_MAX_BYTES=16777216   → tamaño del registro a partir del cual se archiva
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from instantaneas import HistorialCambios
+from persistencia import diccionario_a_amigo
+
+
+INTERVALO_MS = float(os.environ.get("AMIGOS_REPLICACION_INTERVALO_MS", "50"))
+MAX_BYTES = int(os.environ.get("AMIGOS_REPLICACION_MAX_BYTES", str(16 * 1024 * 1024)))
+
+# Bytes leídos del registro en cada lectura
+TAMANO_BLOQUE = 64 * 1024
+
+
+def esta_activo():
+    """Indica si el modo réplica está activado por variable de entorno"""
+    return os.environ.get("AMIGOS_REPLICACION", "0") not in ("", "0", "false", "no")
+
+
+def ruta_registro(archivo_datos):
+    return archivo_datos + ".cambios"
+
+
+class PublicadorCambios(HistorialCambios):
+    """
+    Observador del gestor de un proceso que escribe: publica cada cambio en el registro.
+
+    Es el mismo escritor que el historial de instantáneas (una línea por cambio,
+    escrita de una vez en modo "append"), más el aviso de recarga completa y el
+    archivado del registro.
+    """
+
+    def publicarRecarga(self):
+        """Avisa a las réplicas que los datos se reemplazaron completos (ej: al restaurar)"""
+        self.anotar({"op": "recargar"})
+
+    def archivarSiGrande(self, max_bytes=None):
+        """
+        Archiva el registro si supera max_bytes. Solo se llama justo después de un
+        guardado completo, así todo lo que tenía ya está en el archivo de datos.
+        """
+        limite = max_bytes if max_bytes is not None else MAX_BYTES
+        try:
+            if os.path.getsize(self.ruta) <= limite:
+                return False
+        except FileNotFoundError:
+            return False
+        with self.candado:
+            os.replace(self.ruta, self.ruta + ".anterior")
+        return True
+
+
+class CandadoLectores:
+    """
+    Candado de muchos lectores o un solo escritor.
+
+    Un escritor que espera tiene prioridad sobre los lectores nuevos, así los
+    cambios no se postergan mientras sigan llegando peticiones.
+    """
+
+    def __init__(self):
+        self.condicion = threading.Condition()
+        self.lectores = 0
+        self.escribiendo = False
+        self.esperando = 0
+        self.local = threading.local()
+
+    def leyendo(self):
+        """Indica si este hilo tiene una lectura tomada"""
+        return getattr(self.local, "lecturas", 0) > 0
+
+    def tomarLectura(self):
+        with self.condicion:
+            while self.escribiendo or self.esperando:
+                self.condicion.wait()
+            self.lectores = self.lectores + 1
+        self.local.lecturas = getattr(self.local, "lecturas", 0) + 1
+
+    def soltarLectura(self):
+        self.local.lecturas = self.local.lecturas - 1
+        with self.condicion:
+            self.lectores = self.lectores - 1
+            if self.lectores == 0:
+                self.condicion.notify_all()
+
+    @contextmanager
+    def escritura(self):
+        with self.condicion:
+            self.esperando = self.esperando + 1
+            while self.escribiendo or self.lectores:
+                self.condicion.wait()
+            self.esperando = self.esperando - 1
+            self.escribiendo = True
+        try:
+            yield
+        finally:
+            with self.condicion:
+                self.escribiendo = False
+                self.condicion.notify_all()
+
+
+def instalar_lecturas(app, replica, poner_al_dia):
+    """
+    Hace que cada petición de una app Flask lea la réplica con una lectura tomada.
+
+    Antes de tomarla, la petición pone la réplica al día (la primera vez, la
+    carga); la lectura se suelta al terminar la petición.
+
+    Args:
+        app (Flask): API de consultas
+        replica (ReplicaLectura): Réplica de este proceso
+        poner_al_dia (callable): Carga o sincroniza la réplica (ver config.poner_replica_al_dia)
+    """
+    # Se importa aquí: la CLI usa este módulo sin Flask
+    from flask import g
+
+    def tomar():
+        poner_al_dia()
+        replica.acceso.tomarLectura()
+        g.lectura_replica = True
+
+    def soltar(error):
+        if g.pop("lectura_replica", False):
+            replica.acceso.soltarLectura()
+
+    app.before_request(tomar)
+    app.teardown_request(soltar)
+
+
+class ReplicaLectura:
+    """
+    Mantiene un gestor en memoria al día aplicando el registro de cambios.
+
+    Responsabilidad: leer las líneas nuevas del registro (también a través de
+    un archivado), aplicarlas al gestor con sus operaciones normales (así los
+    índices y demás observadores se actualizan solos) y medir el retraso.
+
+    También es un observador del gestor: lleva un diccionario nombre → amigo
+    para aplicar cada cambio sin recorrer la lista.
+
+    Los cambios se aplican con la escritura de self.acceso tomada; quien lea
+    el gestor desde otro hilo tiene que tomar una lectura (ver instalar_lecturas).
+    """
+
+    def __init__(self, ruta, gestor, recargar):
+        """
+        Args:
+            ruta (str): Registro de cambios a seguir
+            gestor (GestorAmigos): Gestor en memoria de la réplica
+            recargar (callable): Carga los datos completos (ante un aviso "recargar")
+        """
+        self.ruta = ruta
+        self.gestor = gestor
+        self.recargar = recargar
+        self.candado = threading.RLock()
+        self.acceso = CandadoLectores()
+        self.descriptor = None
+        self.inodo = None
+        self.posicion = 0
+        self.resto = b""
+        self.por_nombre = {}
+        self.obsoleto = True
+        self.hilo = None
+        self.estadisticas = {
+            "aplicadas": 0,
+            "recargas_completas": 0,
+            "archivos_seguidos": 0,
+            "retraso_ms": None,
+            "retraso_maximo_ms": 0.0,
+            "ultima_revision": None
+        }
+        gestor.agregarObservador(self)
+
+    # ============================================
+    # OBSERVADOR DEL GESTOR
+    # ============================================
+
+    def actualizar(self, evento, amigo):
+        """
+        Recibe un cambio del gestor.
+        evento: "agregar", "eliminar", "recuerdo" o "reemplazar"
+        """
+        if self.obsoleto:
+            return
+        if evento == "agregar":
+            self.por_nombre[amigo.nombre] = amigo
+        elif evento == "eliminar":
+            if self.por_nombre.get(amigo.nombre) is amigo:
+                del self.por_nombre[amigo.nombre]
+        elif evento == "reemplazar":
+            self.obsoleto = True
+
+    def _buscar(self, nombre):
+        if self.obsoleto:
+            self.por_nombre = {}
+            for amigo in self.gestor.amigos:
+                self.por_nombre.setdefault(amigo.nombre, amigo)
+            self.obsoleto = False
+        return self.por_nombre.get(nombre)
+
+    # ============================================
+    # LECTURA DEL REGISTRO
+    # ============================================
+
+    def reiniciar(self):
+        """Abre el registro desde el principio (antes de la carga inicial)"""
+        with self.candado:
+            if self.descriptor is not None:
+                os.close(self.descriptor)
+            self.descriptor = None
+            self.inodo = None
+            self.posicion = 0
+            self.resto = b""
+            self._abrir()
+
+    def _abrir(self):
+        try:
+            descriptor = os.open(self.ruta, os.O_RDONLY)
+        except FileNotFoundError:
+            return False
+        if self.descriptor is not None:
+            os.close(self.descriptor)
+            self.estadisticas["archivos_seguidos"] = self.estadisticas["archivos_seguidos"] + 1
+        self.descriptor = descriptor
+        self.inodo = os.fstat(descriptor).st_ino
+        self.posicion = 0
+        self.resto = b""
+        return True
+
+    def _leerHastaElFinal(self):
+        """Retorna las líneas completas nuevas del archivo abierto"""
+        bloques = [self.resto]
+        while True:
+            bloque = os.pread(self.descriptor, TAMANO_BLOQUE, self.posicion)
+            if not bloque:
+                break
+            bloques.append(bloque)
+            self.posicion = self.posicion + len(bloque)
+        datos = b"".join(bloques)
+        corte = datos.rfind(b"\n") + 1
+        # Lo que queda después del último salto es una línea a medio escribir
+        self.resto = datos[corte:]
+        return datos[:corte].splitlines()
+
+    def _lineasNuevas(self):
+        """
+        Retorna (líneas nuevas, si hay que recargar los datos completos).
+
+        Si el registro se archivó, el viejo ya se leyó completo y se sigue con
+        el nuevo. Si entre dos lecturas se archivó más de una vez, el archivado
+        no es el que se leyó: se saltó un registro entero, pero cada archivado
+        va después de un guardado completo, así que alcanza con recargar.
+        """
+        if self.descriptor is None and not self._abrir():
+            return [], False
+        lineas = self._leerHastaElFinal()
+        try:
+            archivado = os.stat(self.ruta).st_ino != self.inodo
+        except FileNotFoundError:
+            archivado = False
+        if not archivado:
+            return lineas, False
+
+        leido = self.inodo
+        if not self._abrir():
+            return lineas, False
+        # El nuevo se abre antes de mirar el archivado: si se archiva otra vez en
+        # el medio, el archivado ya no es el leído y se recarga
+        try:
+            salteado = os.stat(self.ruta + ".anterior").st_ino != leido
+        except FileNotFoundError:
+            salteado = True
+        if salteado:
+            return self._leerHastaElFinal(), True
+        lineas.extend(self._leerHastaElFinal())
+        return lineas, False
+
+    # ============================================
+    # APLICAR CAMBIOS
+    # ============================================
+
+    def cargar(self):
+        """Carga los datos completos y aplica el registro desde el principio"""
+        with self.candado:
+            with self.acceso.escritura():
+                self.reiniciar()
+                self.recargar()
+            return self.sincronizar()
+
+    def sincronizar(self):
+        """
+        Aplica las líneas nuevas del registro.
+
+        Con una lectura tomada en este hilo no se aplica nada (esperaría a que
+        se suelte): lo hace el hilo de la réplica al terminar la petición.
+
+        Returns:
+            int: Cambios aplicados
+        """
+        if self.acceso.leyendo():
+            return 0
+        with self.candado:
+            lineas, recargar = self._lineasNuevas()
+            self.estadisticas["ultima_revision"] = time.time()
+            if not lineas and not recargar:
+                return 0
+            with self.acceso.escritura():
+                if recargar:
+                    self.recargar()
+                    self.estadisticas["recargas_completas"] = self.estadisticas["recargas_completas"] + 1
+                return self._aplicarLineas(lineas)
+
+    def _aplicarLineas(self, lineas):
+        aplicadas = 0
+        nuevos = {}
+        for linea in lineas:
+            try:
+                entrada = json.loads(linea)
+            except ValueError:
+                continue
+            operacion = entrada.get("op")
+            nombre = entrada.get("nombre")
+
+            # Los amigos nuevos seguidos se agregan juntos (un solo mensaje)
+            if operacion == "amigo" and (nombre in nuevos or self._buscar(nombre) is None):
+                nuevos[nombre] = diccionario_a_amigo(entrada)
+                aplicadas = aplicadas + 1
+                self._medir(entrada)
+                continue
+            if nuevos:
+                self.gestor.agregarVarios(list(nuevos.values()))
+                nuevos = {}
+
+            if self._aplicar(operacion, nombre, entrada):
+                aplicadas = aplicadas + 1
+                self._medir(entrada)
+
+        if nuevos:
+            self.gestor.agregarVarios(list(nuevos.values()))
+        self.estadisticas["aplicadas"] = self.estadisticas["aplicadas"] + aplicadas
+        return aplicadas
+
+    def _aplicar(self, operacion, nombre, entrada):
+        if operacion == "amigo":
+            return self.gestor.reemplazarVarios({nombre: diccionario_a_amigo(entrada)}) > 0
+        if operacion == "eliminar":
+            return self._buscar(nombre) is not None and self.gestor.eliminarAmigo(nombre)
+        if operacion == "recuerdo":
+            amigo = self._buscar(nombre)
+            return amigo is not None and self.gestor.aplicarRecuerdo(amigo, entrada)
+        if operacion == "recargar":
+            self.recargar()
+            self.estadisticas["recargas_completas"] = self.estadisticas["recargas_completas"] + 1
+            return True
+        return False
+
+    def _medir(self, entrada):
+        if "t" not in entrada:
+            return
+        retraso = round((time.time_ns() - entrada["t"]) / 1e6, 3)
+        self.estadisticas["retraso_ms"] = retraso
+        if retraso > self.estadisticas["retraso_maximo_ms"]:
+            self.estadisticas["retraso_maximo_ms"] = retraso
+
+    def iniciar(self, intervalo_ms=None):
+        """Lanza el hilo que sigue el registro (una sola vez)"""
+        intervalo = (intervalo_ms if intervalo_ms is not None else INTERVALO_MS) / 1000
+        if self.hilo is not None:
+            return
+
+        def ciclo():
+            while True:
+                time.sleep(intervalo)
+                try:
+                    self.sincronizar()
+                except Exception as e:
+                    # El hilo sigue: la próxima vuelta lo intenta de nuevo
+                    print(f"✗ Error al aplicar cambios replicados: {e}")
+
+        self.hilo = threading.Thread(target=ciclo, name="replica", daemon=True)
+        self.hilo.start()
+
+    def version(self):
+        """Versión de los datos de la réplica: cambia con cada línea aplicada"""
+        return ("replica", self.inodo, self.posicion)
+
+    def resumen(self):
+        """Retorna los contadores y el retraso de la réplica"""
+        with self.candado:
+            datos = dict(self.estadisticas)
+            try:
+                tamano = os.path.getsize(self.ruta)
+                mismo = self.inodo is not None and os.stat(self.ruta).st_ino == self.inodo
+                datos["pendiente_bytes"] = tamano - self.posicion if mismo else tamano
+            except FileNotFoundError:
+                datos["pendiente_bytes"] = 0
+            datos["posicion"] = self.posicion
+        if datos["ultima_revision"] is not None:
+            datos["ultima_revision_ms"] = round((time.time() - datos.pop("ultima_revision")) * 1000, 1)
+        else:
+            datos.pop("ultima_revision")
+            datos["ultima_revision_ms"] = None
+        datos["al_dia"] = datos["pendiente_bytes"] == 0
+        return datos
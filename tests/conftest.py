@@ -0,0 +1,45 @@
+"""
+Utilidades compartidas por las pruebas.
+
+Varias pruebas necesitan más de un proceso (las dos APIs, la CLI): config.py
+guarda su estado en variables del módulo y lee la configuración de variables
+de entorno al importarse, así que cada "proceso" de una prueba se ejecuta de
+verdad como un proceso aparte dentro de una carpeta temporal.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+
+@pytest.fixture
+def proceso(tmp_path):
+    """
+    Retorna una función que ejecuta código en un proceso aparte dentro de tmp_path.
+
+    El código imprime su resultado como JSON en la última línea; la función lo
+    retorna ya decodificado. Los demás argumentos llegan al código en sys.argv[1:]
+    y las variables de entorno se pasan con nombre (ej: proceso(codigo, AMIGOS_DISCO=1)).
+    """
+    def ejecutar(codigo, *argumentos, **entorno):
+        variables = dict(os.environ)
+        variables["PYTHONPATH"] = RAIZ
+        for nombre, valor in entorno.items():
+            variables[nombre] = str(valor)
+        resultado = subprocess.run([sys.executable, "-c", textwrap.dedent(codigo), *argumentos],
+                                   cwd=tmp_path, env=variables, capture_output=True,
+                                   text=True, timeout=120)
+        assert resultado.returncode == 0, resultado.stderr
+        return json.loads(resultado.stdout.strip().splitlines()[-1])
+
+    return ejecutar
@@ -0,0 +1,65 @@
+"""Pruebas del arranque sin efectos al importar (config.py, Main.py y las APIs)"""
+
+
+IMPORTAR = """
+    import json
+    import sys
+
+    # Un archivo de datos inválido: si importar lo leyera, se notaría
+    with open("amigos_data.json", "w", encoding="utf-8") as archivo:
+        archivo.write("esto no es json")
+
+    import Main
+    flask_con_main = "flask" in sys.modules
+    import config
+    import AmigoRegular_APIlaura
+    import AmigoCercano_APIJuandi
+    print(json.dumps({"flask_con_main": flask_con_main,
+                      "cargados": len(config._versiones_cargadas)}))
+"""
+
+RECARGAR = """
+    import json
+    import os
+    import config
+    from AmigoRegular import AmigoRegular
+
+    gestor = config.obtener_gestor()
+    gestor.agregarAmigo(AmigoRegular("Ana", "01/02/1990", [], [], []))
+    config.guardar_datos()
+    version = config.version_datos()
+
+    mismo = config.obtener_gestor() is gestor and config.version_datos() == version
+
+    # Otro proceso reemplaza el archivo: la siguiente consulta lo recarga
+    with open("otro.json", "w", encoding="utf-8") as archivo:
+        json.dump([{"tipo": "AmigoRegular", "nombre": "Eva", "cumpleanos": "01/02/1990",
+                    "gustos": [], "recuerdos": [], "anecdotas": []}], archivo)
+    os.replace("otro.json", config.ARCHIVO_DATOS)
+    nombres = [amigo.nombre for amigo in config.obtener_gestor().amigos]
+    print(json.dumps({"mismo": mismo, "nombres": nombres}))
+"""
+
+CALENTAR = """
+    import json
+    import AmigoRegular_APIlaura
+    import config
+
+    gestor = config.obtener_gestor()
+    print(json.dumps({"cargados": len(config._versiones_cargadas),
+                      "indices_listos": not gestor.indices.obsoleto}))
+"""
+
+
+def test_importar_no_lee_datos_ni_flask_desde_la_consola(proceso):
+    assert proceso(IMPORTAR) == {"flask_con_main": False, "cargados": 0}
+
+
+def test_los_datos_se_recargan_solo_si_cambiaron(proceso):
+    assert proceso(RECARGAR) == {"mismo": True, "nombres": ["Eva"]}
+
+
+def test_calentar_al_importar_deja_datos_e_indices_listos(proceso):
+    proceso(RECARGAR)
+
+    assert proceso(CALENTAR, AMIGOS_CALENTAR=1) == {"cargados": 1, "indices_listos": True}
@@ -0,0 +1,41 @@
+"""Pruebas de la suite de benchmarks (benchmark.py)"""
+
+
+GENERAR = """
+    import json
+    import benchmark
+
+    print(json.dumps({"igual": benchmark.generar_amigos(200, 7) == benchmark.generar_amigos(200, 7),
+                      "distinto": benchmark.generar_amigos(200, 7) != benchmark.generar_amigos(200, 8),
+                      "nombres": len({amigo["nombre"] for amigo in benchmark.generar_amigos(200, 7)}),
+                      "procesos": [benchmark.procesos_a_medir(n) for n in (0, 1, 2, 6)]}))
+"""
+
+EJECUTAR = """
+    import json
+    import benchmark
+
+    documento = benchmark.ejecutar([30], 0, 7, omitir=["generarNotificacion"])
+    print(json.dumps(documento))
+"""
+
+
+def test_los_datos_sinteticos_son_reproducibles(proceso):
+    resultado = proceso(GENERAR)
+
+    assert resultado == {"igual": True, "distinto": True, "nombres": 200,
+                         "procesos": [[], [], [2], [2, 4, 6]]}
+
+
+def test_una_corrida_corta_emite_resultados_legibles(proceso):
+    documento = proceso(EJECUTAR)
+
+    operaciones = {resultado["operacion"] for resultado in documento["resultados"]}
+    assert {"GestorAmigos.buscarAmigo", "GestorAmigos.eliminarAmigo"} <= operaciones
+    assert not any("generarNotificacion" in operacion for operacion in operaciones)
+    assert any(operacion.startswith("config.") for operacion in operaciones)
+    assert documento["omitidas"] == ["generarNotificacion"]
+    for resultado in documento["resultados"]:
+        assert resultado["amigos"] == 30
+        assert resultado["repeticiones"] >= 1
+        assert resultado["min_s"] <= resultado["mediana_s"] <= resultado["max_s"]
@@ -0,0 +1,56 @@
+"""Pruebas de los comandos por lotes de la consola (Main.py)"""
+
+
+IMPORTAR = """
+    import sys
+    import Main
+
+    with open("amigos.ndjson", "w", encoding="utf-8") as archivo:
+        for nombre in sys.argv[1:]:
+            archivo.write('{"nombre": "%s", "cumpleanos": "01/02/1990", "tipo": "AmigoRegular"}\\n' % nombre)
+    Main.ejecutar_comando(["importar", "amigos.ndjson", "--lote", "2"])
+"""
+
+RECUERDOS = """
+    import sys
+    import Main
+
+    with open("recuerdos.csv", "w", encoding="utf-8") as archivo:
+        archivo.write("nombre,recuerdo\\n")
+        archivo.write("Ana,Fuimos al cine\\n")
+        archivo.write("Ana,fuimos al CINE!\\n")
+        archivo.write("Beto,Paseo\\n")
+    Main.ejecutar_comando(["recuerdos", "recuerdos.csv"])
+"""
+
+RECUERDO = """
+    import json
+    import config
+    import Main
+
+    codigos = [Main.ejecutar_comando(["recuerdo", "Ana", texto])
+               for texto in ("Fuimos al cine", "Fuimos al cine.")]
+    recuerdos = config.obtener_gestor().buscarAmigo("Ana").recuerdos.contarRecuerdos()
+    print(json.dumps({"codigos": codigos, "recuerdos": recuerdos}))
+"""
+
+
+def test_importar_por_lotes_omite_los_que_ya_existen(proceso):
+    primero = proceso(IMPORTAR, "Ana", "Beto", "Carla")
+    segundo = proceso(IMPORTAR, "Beto", "Dani", "Dani", "Eva")
+
+    assert primero == {"agregados": 3, "reemplazados": 0, "omitidos": 0, "errores": 0}
+    assert segundo == {"agregados": 2, "reemplazados": 0, "omitidos": 2, "errores": 0}
+
+
+def test_recuerdos_rechaza_los_repetidos_como_la_api(proceso):
+    proceso(IMPORTAR, "Ana", "Beto")
+
+    assert proceso(RECUERDOS) == {"agregados": 2, "errores": 1}
+    assert proceso(RECUERDOS) == {"agregados": 0, "errores": 3}
+
+
+def test_recuerdo_rechaza_uno_repetido(proceso):
+    proceso(IMPORTAR, "Ana")
+
+    assert proceso(RECUERDO) == {"codigos": [0, 1], "recuerdos": 1}
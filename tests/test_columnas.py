@@ -0,0 +1,41 @@
+"""Pruebas del espejo columnar para /analitica (ColumnasAmigos.py, necesita NumPy)"""
+
+import itertools
+from collections import Counter
+
+import pytest
+
+# NumPy está en requirements-test.txt (es opcional para la app: solo lo usa /analitica)
+pytest.importorskip("numpy", reason="falta NumPy: python -m pip install -r requirements-test.txt")
+
+from AmigoRegular import AmigoRegular
+from ColumnasAmigos import ColumnasAmigos
+
+
+def _pares_esperados(amigos):
+    pares = Counter()
+    for amigo in amigos:
+        for par in itertools.combinations(sorted(set(amigo.gustos)), 2):
+            pares[par] = pares[par] + 1
+    return pares
+
+
+def test_pares_de_gustos_con_filas_de_distinto_largo_y_cambios():
+    amigos = [AmigoRegular("Ana", "01/02/1990", [f"g{i}" for i in range(100)], [], []),
+              AmigoRegular("Beto", "01/03/1990", ["g1", "g2"], [], []),
+              AmigoRegular("Carla", "01/04/1990", [], [], []),
+              AmigoRegular("Dani", "01/05/1990", ["g2", "g1", "g3"], [], [])]
+    columnas = ColumnasAmigos()
+    columnas.calcular(lambda: amigos)
+
+    # Ana (la fila más ancha) se va y Beto cambia sus gustos
+    columnas.actualizar("eliminar", amigos[0])
+    beto = AmigoRegular("Beto", "01/03/1990", ["g3", "g1"], [], [])
+    columnas.actualizar("agregar", beto)
+    vivos = [beto, amigos[2], amigos[3]]
+    resultado = columnas.calcular(lambda: vivos, top_gustos=100)
+
+    obtenidos = {tuple(sorted(par["gustos"])): par["amigos"]
+                 for par in resultado["gustos"]["pares_frecuentes"]}
+    assert obtenidos == dict(_pares_esperados(vivos))
+    assert columnas._csrGustos()[1].size == 5
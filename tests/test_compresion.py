@@ -0,0 +1,33 @@
+"""Pruebas de la caché de respuestas comprimidas (compresion.py)"""
+
+import gzip
+import json
+
+from flask import Flask, jsonify
+
+from compresion import CompresorRespuestas
+
+
+def test_solo_se_cachean_las_rutas_que_dependen_de_los_datos():
+    app = Flask(__name__)
+    contador = {"visitas": 0}
+
+    @app.route('/datos')
+    def datos():
+        return jsonify({"amigos": ["Ana"] * 500})
+
+    @app.route('/estadisticas')
+    def estadisticas():
+        contador["visitas"] = contador["visitas"] + 1
+        return jsonify({"visitas": contador["visitas"], "relleno": "x" * 2000})
+
+    CompresorRespuestas(app, lambda: 1, cacheables=("datos",), minimo=100)
+    cliente = app.test_client()
+    cabeceras = {"Accept-Encoding": "gzip"}
+
+    cache_datos = [cliente.get('/datos', headers=cabeceras).headers["X-Cache-Compresion"] for _ in range(2)]
+    visitas = [json.loads(gzip.decompress(cliente.get('/estadisticas', headers=cabeceras).data))["visitas"]
+               for _ in range(2)]
+
+    assert cache_datos == ["fallo", "acierto"]
+    assert visitas == [1, 2]
@@ -0,0 +1,40 @@
+"""Pruebas de la búsqueda de muchos amigos en una petición (GET /amigos/lote)"""
+
+
+CONSULTAR = """
+    import json
+    import sys
+    import config
+    import AmigoRegular_APIlaura as laura
+    from AmigoRegular import AmigoRegular
+
+    gestor = config.obtener_gestor()
+    for nombre in ("Ana", "Beto", "Carla", "Dani, el del centro"):
+        gestor.agregarAmigo(AmigoRegular(nombre, "01/02/1990", [], [], []))
+    config.guardar_datos()
+
+    cliente = laura.app.test_client()
+    respuestas = {}
+    for consulta in sys.argv[1:]:
+        respuesta = cliente.get("/amigos/lote" + consulta)
+        respuestas[consulta] = [respuesta.status_code, respuesta.get_json()]
+    print(json.dumps(respuestas))
+"""
+
+
+def test_encontrados_en_el_orden_pedido_y_faltantes(proceso):
+    consulta = "?nombres=Carla,Nadie,Ana,Carla&nombre=Dani, el del centro&campos=nombre"
+    codigo, cuerpo = proceso(CONSULTAR, consulta)[consulta]
+
+    assert codigo == 200
+    assert [amigo["nombre"] for amigo in cuerpo["encontrados"]] == \
+        ["Dani, el del centro", "Carla", "Ana"]
+    assert cuerpo["faltantes"] == ["Nadie"]
+    assert (cuerpo["total_encontrados"], cuerpo["total_faltantes"]) == (3, 1)
+
+
+def test_sin_nombres_o_demasiados_es_400(proceso):
+    demasiados = "?nombres=" + ",".join(f"N{i}" for i in range(1001))
+    respuestas = proceso(CONSULTAR, "", "?nombres=,,", demasiados)
+
+    assert [codigo for codigo, _ in respuestas.values()] == [400, 400, 400]
@@ -0,0 +1,104 @@
+"""Pruebas del diario de recuerdos con varios procesos escribiendo (config.escritura)"""
+
+import textwrap
+import threading
+
+
+PREPARAR = """
+    import json
+    import config
+    from AmigoRegular import AmigoRegular
+
+    config.obtener_gestor().agregarAmigo(AmigoRegular("Ana", "01/02/1990", ["cine"], [], []))
+    config.guardar_datos()
+    print(json.dumps({}))
+"""
+
+ESCRIBIR = """
+    import json
+    import sys
+    import config
+
+    for i in range(int(sys.argv[2])):
+        with config.escritura():
+            gestor = config.obtener_gestor()
+            amigo = gestor.buscarAmigo("Ana")
+            gestor.agregarRecuerdoAmigo(amigo, f"{sys.argv[1]} {i}")
+            config.registrar_recuerdo(amigo)
+    print(json.dumps({}))
+"""
+
+LEER = """
+    import json
+    import config
+
+    recuerdos = config.obtener_gestor().buscarAmigo("Ana").recuerdos
+    recuerdos._sincronizarMetadatos()
+    print(json.dumps({"textos": recuerdos.recuerdos,
+                      "ids": [par[0] for par in recuerdos.metadatos]}))
+"""
+
+
+def test_dos_procesos_agregan_y_compactan_sin_perder_recuerdos(proceso):
+    proceso(PREPARAR)
+    cantidad = 30
+    hilos = [threading.Thread(target=proceso, args=(ESCRIBIR, escritor, str(cantidad)),
+                              kwargs={"AMIGOS_COMPACTAR_CADA": 7})
+             for escritor in ("uno", "dos")]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    resultado = proceso(LEER)
+
+    esperados = {f"[Regular] {escritor} {i}" for escritor in ("uno", "dos") for i in range(cantidad)}
+    assert sorted(resultado["textos"]) == sorted(esperados)
+    assert len(set(resultado["ids"])) == len(resultado["ids"])
+
+
+COMPACTAR_DESACTUALIZADO = """
+    import json
+    import subprocess
+    import sys
+    import config
+
+    # Este proceso carga los datos y otro agrega un recuerdo al diario después
+    gestor = config.obtener_gestor()
+    subprocess.run([sys.executable, "-c", sys.argv[1], "otro", "1"], check=True)
+    config.guardar_datos()
+    print(json.dumps({}))
+"""
+
+
+def test_compactar_con_datos_viejos_conserva_el_diario_ajeno(proceso):
+    proceso(PREPARAR)
+    proceso(COMPACTAR_DESACTUALIZADO, textwrap.dedent(ESCRIBIR))
+
+    resultado = proceso(LEER)
+
+    assert resultado["textos"] == ["[Regular] otro 0"]
+
+
+COMPACTAR_CON_INDICES = """
+    import json
+    import subprocess
+    import sys
+    import config
+
+    gestor = config.obtener_gestor()
+    gestor.filtrarAmigos(min_recuerdos=1)
+    subprocess.run([sys.executable, "-c", sys.argv[1], "otro", "1"], check=True)
+    config.guardar_datos()
+    obsoleto = gestor.indices.obsoleto
+    amigos, plan = gestor.filtrarAmigos(min_recuerdos=1)
+    print(json.dumps({"obsoleto": obsoleto, "nombres": [amigo.nombre for amigo in amigos]}))
+"""
+
+
+def test_los_recuerdos_absorbidos_actualizan_los_indices_sin_rearmarlos(proceso):
+    proceso(PREPARAR)
+
+    resultado = proceso(COMPACTAR_CON_INDICES, textwrap.dedent(ESCRIBIR))
+
+    assert resultado == {"obsoleto": False, "nombres": ["Ana"]}
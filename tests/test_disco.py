@@ -0,0 +1,82 @@
+"""Pruebas del gestor con los amigos en disco (GestorDisco.py)"""
+
+from AmigoRegular import AmigoRegular
+from GestorDisco import GestorDisco
+from ManipuladorTexto import ManipuladorTexto
+
+
+class Espia:
+    """Observador que anota los eventos que recibe"""
+
+    def __init__(self):
+        self.eventos = []
+
+    def actualizar(self, evento, amigo):
+        self.eventos.append((evento, amigo.nombre if amigo is not None else None))
+
+
+def _gestor(directorio):
+    return GestorDisco(str(directorio), 10, ManipuladorTexto())
+
+
+def _amigo(nombre):
+    return AmigoRegular(nombre, "01/02/1990", [], [], [])
+
+
+def test_las_escrituras_propias_no_rearman_los_observadores(tmp_path):
+    gestor = _gestor(tmp_path)
+    espia = Espia()
+    gestor.agregarObservador(espia)
+
+    gestor.agregarAmigo(_amigo("Ana"))
+    gestor.agregarRecuerdo("Ana", "Café")
+    gestor._revisarDerivados()
+
+    assert espia.eventos == [("agregar", "Ana"), ("recuerdo", "Ana")]
+
+
+def test_solo_se_avisan_los_cambios_de_otro_proceso(tmp_path):
+    lector = _gestor(tmp_path)
+    escritor = _gestor(tmp_path)
+    escritor.agregarAmigo(_amigo("Ana"))
+    escritor.agregarAmigo(_amigo("Beto"))
+    assert lector.contarAmigos() == 2
+
+    espia = Espia()
+    lector.agregarObservador(espia)
+    lector.agregarAmigo(_amigo("Carla"))
+    escritor.agregarRecuerdo("Ana", "Café")
+    escritor.eliminarAmigo("Beto")
+    lector._revisarDerivados()
+
+    assert espia.eventos == [("agregar", "Carla"),
+                             ("eliminar", "Ana"), ("agregar", "Ana"),
+                             ("eliminar", "Beto")]
+    lector._revisarDerivados()
+    assert len(espia.eventos) == 4
+
+
+def test_la_compactacion_de_otro_proceso_rearma_todo(tmp_path):
+    lector = _gestor(tmp_path)
+    escritor = _gestor(tmp_path)
+    escritor.agregarAmigo(_amigo("Ana"))
+    assert lector.contarAmigos() == 1
+
+    espia = Espia()
+    lector.agregarObservador(espia)
+    escritor.amigos = [_amigo("Eva")]
+    lector._revisarDerivados()
+
+    assert espia.eventos == [("reemplazar", None)]
+
+
+def test_un_amigo_eliminado_durante_el_recorrido_se_salta(tmp_path):
+    gestor = _gestor(tmp_path)
+    for nombre in ("Ana", "Beto", "Carla"):
+        gestor.agregarAmigo(_amigo(nombre))
+
+    vista = gestor.amigos
+    gestor.eliminarAmigo("Beto")
+
+    assert vista[1] is None
+    assert [amigo.nombre for amigo in vista] == ["Ana", "Carla"]
@@ -0,0 +1,80 @@
+"""Pruebas de la fusión de duplicados (DuplicadosAmigos.fusionarDuplicados y POST /duplicados/fusionar)"""
+
+from AmigoRegular import AmigoRegular
+from DuplicadosAmigos import fusionarDuplicados
+
+
+CASI_IGUALES = ["Fuimos al cine el lunes 3 de marzo", "Fuimos al cine el lunes 4 de marzo",
+                "Viaje a Cancún con Pedro y Luis", "Viaje a Cancún con Pedro y Lucía"]
+
+
+def _amigo(recuerdos):
+    amigo = AmigoRegular("Ana", "01/02/1990", ["cine"], [], [])
+    for texto in recuerdos:
+        amigo.agregarRecuerdo(texto)
+    return amigo
+
+
+def test_fusionar_solo_quita_los_recuerdos_exactos_por_defecto():
+    amigo = _amigo(CASI_IGUALES + ["fuimos al CINE el lunes 3 de marzo!"])
+
+    _, resumen, _ = fusionarDuplicados([amigo])
+
+    assert resumen["recuerdos_quitados"] == 1
+    assert amigo.recuerdos.contarRecuerdos() == 4
+
+
+def test_fusionar_quita_los_casi_iguales_solo_si_se_pide():
+    amigo = _amigo(CASI_IGUALES)
+
+    _, resumen, _ = fusionarDuplicados([amigo], casi=True)
+
+    assert resumen["recuerdos_quitados"] == 2
+
+
+def test_nombres_iguales_solo_al_normalizar_no_se_unen_por_defecto():
+    amigos = [AmigoRegular(nombre, "01/02/1990", [], [], []) for nombre in ("José", "Jose", "José")]
+
+    lista, resumen, _ = fusionarDuplicados(amigos)
+
+    assert [amigo.nombre for amigo in lista] == ["José", "Jose"]
+    assert resumen["amigos_unidos"] == 1
+    assert resumen["posibles_duplicados"] == [["José", "Jose"]]
+
+
+def test_nombres_parecidos_se_unen_solo_si_se_pide():
+    amigos = [AmigoRegular(nombre, "01/02/1990", [], [], []) for nombre in ("Ana-María", "Ana María")]
+
+    lista, resumen, _ = fusionarDuplicados(amigos, parecidos=True)
+
+    assert [amigo.nombre for amigo in lista] == ["Ana-María"]
+    assert resumen["posibles_duplicados"] == []
+
+
+FUSIONAR_POR_API = """
+    import json
+    import config
+    from AmigoRegular import AmigoRegular
+    import AmigoCercano_APIJuandi as juan
+
+    amigo = AmigoRegular("Ana", "01/02/1990", ["cine"], [], [])
+    for texto in ("Fuimos al cine el lunes 3 de marzo", "Fuimos al cine el lunes 4 de marzo"):
+        amigo.agregarRecuerdo(texto)
+    config.obtener_gestor().agregarAmigo(amigo)
+    config.guardar_datos()
+
+    cliente = juan.app.test_client()
+    codigos = [cliente.post('/duplicados/fusionar', json={"recuerdos": valor}).status_code
+               for valor in ("false", 0, None)]
+    respuesta = cliente.post('/duplicados/fusionar', json={})
+    print(json.dumps({"codigos": codigos, "quitados": respuesta.get_json()["recuerdos_quitados"],
+                      "recuerdos": config.obtener_gestor().buscarAmigo("Ana").recuerdos.contarRecuerdos()}))
+"""
+
+
+def test_api_valida_las_opciones_como_booleanos(proceso):
+    resultado = proceso(FUSIONAR_POR_API)
+
+    assert resultado["codigos"] == [400, 400, 400]
+    assert resultado["quitados"] == 0
+    assert resultado["recuerdos"] == 2
@@ -0,0 +1,104 @@
+"""Pruebas del gestor fragmentado (GestorFragmentado.py)"""
+
+import os
+
+import pytest
+
+from AmigoRegular import AmigoRegular
+from GestorFragmentado import GestorFragmentado
+from ManipuladorTexto import ManipuladorTexto
+
+
+def _gestor(directorio):
+    return GestorFragmentado(str(directorio), 1, ManipuladorTexto())
+
+
+def test_la_lista_completa_no_se_modifica_en_el_lugar(tmp_path):
+    gestor = _gestor(tmp_path)
+    gestor.agregarAmigo(AmigoRegular("Ana", "01/02/1990", [], [], []))
+
+    with pytest.raises(AttributeError):
+        gestor.amigos.append(AmigoRegular("Beto", "01/02/1990", [], [], []))
+    assert [amigo.nombre for amigo in gestor.amigos] == ["Ana"]
+
+
+def test_detecta_un_fragmento_reemplazado_con_igual_tamano_y_fecha(tmp_path):
+    escritor = _gestor(tmp_path)
+    escritor.agregarAmigo(AmigoRegular("Ana", "01/02/1990", [], [], []))
+    escritor.guardarCambios()
+    lector = _gestor(tmp_path)
+    assert [amigo.nombre for amigo in lector.amigos] == ["Ana"]
+
+    # Otro proceso reemplaza el fragmento: mismo tamaño y misma fecha de modificación
+    ruta = escritor.rutaFragmento(0)
+    estado = os.stat(ruta)
+    escritor.amigos = [AmigoRegular("Eva", "01/02/1990", [], [], [])]
+    escritor.guardarCambios()
+    os.utime(ruta, ns=(estado.st_atime_ns, estado.st_mtime_ns))
+    assert os.stat(ruta).st_size == estado.st_size
+
+    assert [amigo.nombre for amigo in lector.amigos] == ["Eva"]
+
+
+def test_un_fragmento_cambiado_por_otro_proceso_no_rearma_los_indices(tmp_path):
+    escritor = GestorFragmentado(str(tmp_path), 4, ManipuladorTexto())
+    nombres = [f"A{i}" for i in range(20)]
+    escritor.agregarVarios([AmigoRegular(nombre, "01/02/1990", [], [], []) for nombre in nombres])
+    escritor.guardarCambios()
+    lector = GestorFragmentado(str(tmp_path), 4, ManipuladorTexto())
+    assert len(lector.filtrarAmigos(tipo="AmigoRegular")[0]) == 20
+
+    escritor.eliminarAmigo("A0")
+    escritor.guardarCambios()
+    reconstrucciones = []
+    reconstruir = lector.indices.reconstruir
+    lector.indices.reconstruir = lambda amigos: reconstrucciones.append(1) or reconstruir(amigos)
+    resultado, _ = lector.filtrarAmigos(tipo="AmigoRegular")
+
+    assert sorted(amigo.nombre for amigo in resultado) == sorted(nombres[1:])
+    assert reconstrucciones == []
+
+
+CANDADOS = """
+    import json
+    import threading
+    import config
+
+    gestor = config.obtener_gestor()
+    ana = gestor.fragmentoDe("Ana")
+    otro = next(f"B{i}" for i in range(100) if gestor.fragmentoDe(f"B{i}") != ana)
+    mismo = next(f"C{i}" for i in range(1000) if gestor.fragmentoDe(f"C{i}") == ana)
+
+    tomado, soltar = threading.Event(), threading.Event()
+
+    def escribir_ana():
+        with config.escritura(nombres=["Ana"]):
+            tomado.set()
+            soltar.wait(10)
+
+    def intentar(**argumentos):
+        hecho = threading.Event()
+
+        def escribir():
+            with config.escritura(**argumentos):
+                hecho.set()
+        threading.Thread(target=escribir, daemon=True).start()
+        return hecho
+
+    threading.Thread(target=escribir_ana).start()
+    tomado.wait(10)
+    otro_fragmento = intentar(nombres=[otro])
+    mismo_fragmento = intentar(nombres=[mismo])
+    todos = intentar()
+    resultado = {"otro": otro_fragmento.wait(2), "mismo": mismo_fragmento.wait(0.5),
+                 "todos": todos.wait(0.5)}
+    soltar.set()
+    resultado["despues"] = mismo_fragmento.wait(5) and todos.wait(5)
+    print(json.dumps(resultado))
+"""
+
+
+def test_escrituras_a_fragmentos_distintos_no_se_esperan(proceso):
+    resultado = proceso(CANDADOS, AMIGOS_FRAGMENTOS=8)
+
+    assert resultado == {"otro": True, "mismo": False, "todos": False, "despues": True}
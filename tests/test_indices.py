@@ -0,0 +1,70 @@
+"""Pruebas de los índices secundarios con cambios y consultas en hilos distintos (IndicesAmigos.py)"""
+
+import sys
+import threading
+import time
+
+from AmigoCercano import AmigoCercano
+from AmigoRegular import AmigoRegular
+from GestorAmigos import GestorAmigos
+from ManipuladorTexto import ManipuladorTexto
+
+
+def _amigo(i):
+    fecha = f"01/{i % 12 + 1:02d}/1990"
+    if i % 2:
+        return AmigoCercano(f"A{i}", fecha, ["cine"], [], [], i % 10 + 1)
+    return AmigoRegular(f"A{i}", fecha, ["cine"], [], [])
+
+
+def test_consultas_mientras_otro_hilo_agrega_y_reconstruye():
+    gestor = GestorAmigos([_amigo(i) for i in range(200)], ManipuladorTexto())
+    errores = []
+    fin = time.time() + 1.5
+    intervalo = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+
+    def consultar():
+        while time.time() < fin:
+            try:
+                gestor.filtrarAmigos(tipo="AmigoCercano")
+                gestor.filtrarAmigos(mes=3)
+                gestor.filtrarAmigos(confianza_min=5)
+                gestor.ordenarAmigos("recuerdos", 5)
+                gestor.ordenarAmigos("nombre", 5)
+            except Exception as e:
+                errores.append(repr(e))
+
+    hilos = [threading.Thread(target=consultar) for _ in range(3)]
+    try:
+        for hilo in hilos:
+            hilo.start()
+        i = 200
+        while time.time() < fin:
+            gestor.agregarAmigo(_amigo(i))
+            gestor.agregarRecuerdoAmigo(gestor.buscarAmigo(f"A{i}"), "Fuimos al cine")
+            if i % 50 == 0:
+                # Reemplazo completo: la siguiente consulta reconstruye los índices
+                gestor.amigos = list(gestor.amigos)
+            i = i + 1
+        for hilo in hilos:
+            hilo.join()
+    finally:
+        sys.setswitchinterval(intervalo)
+
+    assert errores == []
+    cercanos, _ = gestor.filtrarAmigos(tipo="AmigoCercano")
+    assert len(cercanos) == sum(1 for amigo in gestor.amigos if isinstance(amigo, AmigoCercano))
+
+
+def test_min_recuerdos_usa_el_indice_ordenado():
+    amigos = [_amigo(i) for i in range(20)]
+    for i in range(5):
+        amigos[i].agregarRecuerdo("Fuimos al cine")
+    gestor = GestorAmigos(amigos, ManipuladorTexto())
+
+    resultado, plan = gestor.filtrarAmigos(min_recuerdos=1)
+
+    assert plan["indice"] == "recuerdos"
+    assert plan["candidatos"] == 5
+    assert sorted(amigo.nombre for amigo in resultado) == [f"A{i}" for i in range(5)]
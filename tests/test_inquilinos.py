@@ -0,0 +1,52 @@
+"""Pruebas del modo multiusuario (inquilinos.py)"""
+
+import textwrap
+
+
+ENTORNO = {"AMIGOS_INQUILINOS": 1, "AMIGOS_INQUILINOS_MAX": 1}
+
+# API de escrituras: agrega un recuerdo a Pepe de "ana" (y antes lo crea si se pide)
+ESCRIBIR_RECUERDO = textwrap.dedent("""
+    import json
+    import sys
+    import AmigoCercano_APIJuandi as juan
+
+    cliente = juan.app.test_client()
+    cabecera = {"X-Usuario": "ana"}
+    if "crear" in sys.argv:
+        cliente.post('/amigo-regular', json={"nombre": "Pepe", "cumpleanos": "01/02/1990"},
+                     headers=cabecera)
+    respuesta = cliente.post('/amigo-regular/Pepe/recuerdo', json={"recuerdo": sys.argv[-1]},
+                             headers=cabecera)
+    print(json.dumps(respuesta.status_code))
+""")
+
+# API de consultas: carga a "ana", otro proceso le agrega un recuerdo y después
+# una petición de "bob" la desaloja
+CONSULTAR_Y_DESALOJAR = """
+    import json
+    import subprocess
+    import sys
+    import AmigoRegular_APIlaura as laura
+
+    cliente = laura.app.test_client()
+    cliente.get('/amigos', headers={"X-Usuario": "ana"})
+    escritor = subprocess.run([sys.executable, "-c", sys.argv[1], "dos"],
+                              capture_output=True, text=True)
+    cliente.get('/amigos', headers={"X-Usuario": "bob"})
+    print(escritor.stdout.strip().splitlines()[-1])
+"""
+
+LEER_RECUERDOS = """
+    import json
+    import AmigoRegular_APIlaura as laura
+
+    respuesta = laura.app.test_client().get('/amigos/Pepe/recuerdos', headers={"X-Usuario": "ana"})
+    print(json.dumps([recuerdo["texto"] for recuerdo in respuesta.get_json()["recuerdos"]]))
+"""
+
+
+def test_desalojar_en_la_api_de_consultas_no_pierde_recuerdos(proceso):
+    assert proceso(ESCRIBIR_RECUERDO, "crear", "uno", **ENTORNO) == 200
+    assert proceso(CONSULTAR_Y_DESALOJAR, ESCRIBIR_RECUERDO, **ENTORNO) == 200
+    assert proceso(LEER_RECUERDOS, **ENTORNO) == ["[Regular] uno", "[Regular] dos"]
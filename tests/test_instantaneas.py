@@ -0,0 +1,72 @@
+"""Pruebas de las instantáneas y la restauración a un momento dado (instantaneas.py)"""
+
+from GestorAmigos import GestorAmigos
+from AmigoRegular import AmigoRegular
+from ManipuladorTexto import ManipuladorTexto
+from instantaneas import GestorInstantaneas
+from persistencia import iterar_amigos_json
+
+
+def test_la_instantanea_es_la_del_momento_aunque_se_escriba_despues(tmp_path):
+    gestor = GestorAmigos([AmigoRegular(f"A{i}", "01/02/1990", ["cine"], [], []) for i in range(3000)],
+                          ManipuladorTexto())
+    gestor_instantaneas = GestorInstantaneas(str(tmp_path / "amigos_data.json"))
+
+    gestor_instantaneas.tomar(gestor, esperar=False)
+    # Cambios en el lugar mientras el hilo escribe
+    ultimo = gestor.buscarAmigo("A2999")
+    gestor.agregarRecuerdoAmigo(ultimo, "Después de la instantánea")
+    ultimo.gustos.append("teatro")
+    gestor_instantaneas.en_curso.join()
+
+    _, ruta = gestor_instantaneas._instantaneas()[-1]
+    guardado = list(iterar_amigos_json(ruta))[-1]
+    assert guardado.recuerdos.contarRecuerdos() == 0
+    assert guardado.gustos == ["cine"]
+
+
+RESTAURAR = """
+    import json
+    import time
+    import config
+    from AmigoRegular import AmigoRegular
+
+    def nombres():
+        gestor = config.obtener_gestor()
+        return {amigo.nombre: amigo.recuerdos.contarRecuerdos() for amigo in gestor.amigos}
+
+    gestor = config.obtener_gestor()
+    gestor.agregarAmigo(AmigoRegular("Ana", "01/02/1990", ["cine"], [], []))
+    config.guardar_datos()
+    config.tomar_instantanea(esperar=True)
+
+    with config.escritura():
+        gestor = config.obtener_gestor()
+        gestor.agregarAmigo(AmigoRegular("Beto", "02/03/1991", [], [], []))
+        config.guardar_datos()
+        gestor.agregarRecuerdoAmigo(gestor.buscarAmigo("Ana"), "Fuimos al cine")
+        config.registrar_recuerdo(gestor.buscarAmigo("Ana"))
+    time.sleep(0.05)
+    momento = time.time()
+    time.sleep(0.05)
+
+    with config.escritura():
+        gestor = config.obtener_gestor()
+        gestor.agregarAmigo(AmigoRegular("Carla", "03/04/1992", [], [], []))
+        gestor.eliminarAmigo("Beto")
+        gestor.agregarRecuerdoAmigo(gestor.buscarAmigo("Ana"), "Otro recuerdo")
+        config.registrar_recuerdo(gestor.buscarAmigo("Ana"))
+        config.guardar_datos()
+    antes = nombres()
+
+    resumen = config.restaurar_instantanea(momento)
+    print(json.dumps({"antes": antes, "despues": nombres(), "cambios": resumen["cambios_aplicados"]}))
+"""
+
+
+def test_restaurar_a_un_momento_dado(proceso):
+    resultado = proceso(RESTAURAR, AMIGOS_INSTANTANEAS=3600)
+
+    assert resultado["antes"] == {"Ana": 2, "Carla": 0}
+    assert resultado["despues"] == {"Ana": 1, "Beto": 0}
+    assert resultado["cambios"] == 2
@@ -0,0 +1,41 @@
+"""Pruebas del formato CSV de importación y exportación (intercambio.py)"""
+
+import csv
+import io
+
+from intercambio import (COLUMNAS_CSV, diccionario_a_fila_csv, leer_registros,
+                         fila_csv_a_diccionario)
+
+
+def _ida_y_vuelta(amigo_dict):
+    texto = io.StringIO()
+    escritor = csv.writer(texto)
+    escritor.writerow(COLUMNAS_CSV)
+    escritor.writerow(diccionario_a_fila_csv(amigo_dict))
+    texto.seek(0)
+    [(_, leido, error)] = list(leer_registros(texto, "csv"))
+    assert error is None
+    return leido
+
+
+def test_las_listas_vuelven_iguales_aunque_tengan_separadores_espacios_o_vacios():
+    amigo_dict = {"tipo": "AmigoRegular", "nombre": "Ana", "cumpleanos": "01/02/1990",
+                  "gustos": ["rock|pop", "  jazz ", ""],
+                  "recuerdos": ["[Regular] Fuimos a A|B, luego a C", "[Regular] \"citado\""],
+                  "anecdotas": []}
+
+    leido = _ida_y_vuelta(amigo_dict)
+
+    for campo in ("gustos", "recuerdos", "anecdotas"):
+        assert leido[campo] == amigo_dict[campo]
+
+
+def test_acepta_celdas_viejas_separadas_por_barra():
+    fila = {"tipo": "AmigoRegular", "nombre": "Ana", "cumpleanos": "01/02/1990",
+            "gustos": "cine|teatro", "recuerdos": "[Regular] Fuimos al cine", "anecdotas": ""}
+
+    leido = fila_csv_a_diccionario(fila)
+
+    assert leido["gustos"] == ["cine", "teatro"]
+    assert leido["recuerdos"] == ["[Regular] Fuimos al cine"]
+    assert leido["anecdotas"] == []
@@ -0,0 +1,32 @@
+"""Pruebas del limitador de escrituras (limitador.py)"""
+
+from flask import Flask, jsonify
+
+from limitador import LimitadorEscrituras
+
+
+def test_cambiar_la_cabecera_de_usuario_no_da_un_balde_nuevo():
+    app = Flask(__name__)
+    LimitadorEscrituras(app, tasa=0.001, rafaga=2, concurrencia=4, espera_ms=10)
+    app.add_url_rule('/escribir', 'escribir', lambda: jsonify({}), methods=['POST'])
+    cliente = app.test_client()
+
+    codigos = [cliente.post('/escribir', headers={"X-Usuario": f"usuario{i}"}).status_code
+               for i in range(4)]
+
+    assert codigos == [200, 200, 429, 429]
+
+
+def test_detras_de_un_proxy_se_usa_la_cabecera_configurada():
+    app = Flask(__name__)
+    LimitadorEscrituras(app, tasa=0.001, rafaga=1, concurrencia=4, espera_ms=10,
+                        cabecera="X-Forwarded-For")
+    app.add_url_rule('/escribir', 'escribir', lambda: jsonify({}), methods=['POST'])
+    cliente = app.test_client()
+
+    def escribir(reenviado):
+        return cliente.post('/escribir', headers={"X-Forwarded-For": reenviado}).status_code
+
+    # La última dirección es la que agregó el proxy; la primera la pudo inventar el cliente
+    assert [escribir("10.0.0.1"), escribir("10.0.0.2"), escribir("1.2.3.4, 10.0.0.1")] == \
+        [200, 200, 429]
@@ -0,0 +1,81 @@
+"""Pruebas del orden y top-k (IndicesAmigos.ordenar/seleccionar y GET /amigos?orden=)"""
+
+from AmigoCercano import AmigoCercano
+from AmigoRegular import AmigoRegular
+from GestorAmigos import GestorAmigos
+from IndicesAmigos import IndicesAmigos
+from ManipuladorTexto import ManipuladorTexto
+
+
+def _gestor():
+    amigos = [AmigoRegular("beto", "01/02/1990", [], ["a", "b", "c"], []),
+              AmigoCercano("Ángela", "01/02/1990", [], ["a"], [], 9),
+              AmigoCercano("Andrés", "01/02/1990", [], [], [], 4),
+              AmigoRegular("Zoe", "01/02/1990", [], ["a", "b"], []),
+              AmigoCercano("Carla", "01/02/1990", [], [], [], 7)]
+    return GestorAmigos(amigos, ManipuladorTexto())
+
+
+def _nombres(amigos):
+    return [amigo.nombre for amigo in amigos]
+
+
+def test_el_indice_da_el_top_k_en_cada_sentido():
+    gestor = _gestor()
+
+    assert _nombres(gestor.ordenarAmigos("confianza", 2)) == ["Ángela", "Carla"]
+    assert _nombres(gestor.ordenarAmigos("confianza", 2, descendente=False)) == ["Andrés", "Carla"]
+    assert _nombres(gestor.ordenarAmigos("recuerdos", 2)) == ["beto", "Zoe"]
+    # Alfabético sin distinguir acentos ni mayúsculas
+    assert _nombres(gestor.ordenarAmigos("nombre")) == ["Andrés", "Ángela", "beto", "Carla", "Zoe"]
+
+
+def test_los_cambios_mueven_al_amigo_en_el_indice():
+    gestor = _gestor()
+    assert _nombres(gestor.ordenarAmigos("recuerdos", 1)) == ["beto"]
+
+    for texto in ("x", "y", "z"):
+        gestor.agregarRecuerdo("Carla", texto)
+    gestor.eliminarAmigo("beto")
+
+    assert _nombres(gestor.ordenarAmigos("recuerdos", 2)) == ["Carla", "Zoe"]
+
+
+def test_seleccionar_coincide_con_ordenar_todo():
+    amigos = list(_gestor().amigos)
+    for orden in ("confianza", "recuerdos", "nombre"):
+        completo = _nombres(IndicesAmigos.seleccionar(amigos, orden))
+        assert _nombres(IndicesAmigos.seleccionar(amigos, orden, 2)) == completo[:2]
+
+
+CONSULTAR = """
+    import json
+    import sys
+    import config
+    import AmigoRegular_APIlaura as laura
+    from AmigoCercano import AmigoCercano
+
+    gestor = config.obtener_gestor()
+    for nombre, confianza in (("Ana", 3), ("Beto", 9), ("Carla", 6)):
+        gestor.agregarAmigo(AmigoCercano(nombre, "01/02/1990", [], [], [], confianza))
+    config.guardar_datos()
+
+    cliente = laura.app.test_client()
+    respuestas = {}
+    for consulta in sys.argv[1:]:
+        respuesta = cliente.get("/amigos" + consulta)
+        cuerpo = respuesta.get_json()
+        respuestas[consulta] = [respuesta.status_code,
+                                [amigo["nombre"] for amigo in cuerpo.get("amigos", [])]]
+    print(json.dumps(respuestas))
+"""
+
+
+def test_la_api_ordena_con_limite_y_rechaza_parametros_invalidos(proceso):
+    consultas = ["?orden=confianza&limite=2", "?orden=confianza&direccion=asc",
+                 "?orden=nombre&confianza_min=5", "?orden=edad", "?orden=nombre&limite=0"]
+    respuestas = proceso(CONSULTAR, *consultas)
+
+    assert [respuestas[consulta] for consulta in consultas] == [
+        [200, ["Beto", "Carla"]], [200, ["Ana", "Carla", "Beto"]], [200, ["Beto", "Carla"]],
+        [400, []], [400, []]]
@@ -0,0 +1,91 @@
+"""Pruebas del snapshot en partes (persistencia.guardar_partes / cargar_partes)"""
+
+import json
+import os
+
+from AmigoRegular import AmigoRegular
+from persistencia import (guardar_partes, cargar_partes, iterar_amigos_json, iterar_snapshot,
+                          directorio_partes, ARCHIVO_INDICE_PARTES)
+
+
+def _amigos(prefijo, cantidad):
+    return [AmigoRegular(f"{prefijo}{i}", "01/02/1990", ["cine"], [], []) for i in range(cantidad)]
+
+
+def _nombres(amigos):
+    return [amigo.nombre for amigo in amigos]
+
+
+def test_lector_con_el_indice_anterior_sigue_viendo_el_snapshot_anterior(tmp_path):
+    ruta = str(tmp_path / "amigos_data.json")
+    ruta_indice = os.path.join(directorio_partes(ruta), ARCHIVO_INDICE_PARTES)
+    guardar_partes(ruta, _amigos("viejo", 6), 2, 3)
+    # Un lector leyó el índice y todavía no abrió las partes
+    with open(ruta_indice, encoding="utf-8") as archivo:
+        indice_viejo = json.load(archivo)
+
+    # Otro guardado con menos partes: antes pisaba parte-0000 y borraba parte-0002
+    guardar_partes(ruta, _amigos("nuevo", 2), 2, 3)
+
+    vistos = []
+    for parte in indice_viejo["partes"]:
+        vistos.extend(iterar_amigos_json(os.path.join(directorio_partes(ruta), parte["archivo"])))
+    assert _nombres(vistos) == _nombres(_amigos("viejo", 6))
+    assert _nombres(cargar_partes(ruta)) == ["nuevo0", "nuevo1"]
+
+    # Un guardado más y la generación del lector ya no hace falta
+    guardar_partes(ruta, _amigos("otro", 1), 2, 3)
+    restantes = os.listdir(directorio_partes(ruta))
+    assert not any(parte["archivo"] in restantes for parte in indice_viejo["partes"])
+
+
+def test_los_procesos_hijos_escriben_las_partes_sin_tocar_el_archivo_unico(tmp_path):
+    ruta = str(tmp_path / "amigos_data.json")
+    amigos = _amigos("a", 7)
+    guardar_partes(ruta, amigos, 2, 3)
+
+    assert not os.path.exists(ruta)
+    assert not any(nombre.endswith(".tmp") for nombre in os.listdir(directorio_partes(ruta)))
+    assert _nombres(cargar_partes(ruta)) == _nombres(amigos)
+    assert _nombres(iterar_snapshot(ruta)) == _nombres(amigos)
+
+    guardar_partes(ruta, [], 2, 3)
+    assert list(iterar_snapshot(ruta)) == []
+
+
+MODO_UNICO = """
+    import json
+    import config
+    from AmigoRegular import AmigoRegular
+
+    gestor = config.obtener_gestor()
+    gestor.agregarAmigo(AmigoRegular("SinPartes", "01/02/1990", [], [], []))
+    config.guardar_datos()
+    print(json.dumps({}))
+"""
+
+MODO_PARTES = """
+    import json
+    import config
+    from AmigoRegular import AmigoRegular
+
+    gestor = config.obtener_gestor()
+    nombres = sorted(amigo.nombre for amigo in gestor.amigos)
+    gestor.agregarAmigo(AmigoRegular("ConPartes", "01/02/1990", [], [], []))
+    config.guardar_datos()
+    print(json.dumps(nombres))
+"""
+
+LEER = """
+    import json
+    import config
+    print(json.dumps(sorted(amigo.nombre for amigo in config.obtener_gestor().amigos)))
+"""
+
+
+def test_procesos_con_y_sin_partes_ven_los_mismos_datos(proceso):
+    assert proceso(MODO_PARTES, AMIGOS_PROCESOS=2) == []
+    assert proceso(LEER) == ["ConPartes"]
+
+    proceso(MODO_UNICO)
+    assert proceso(LEER, AMIGOS_PROCESOS=2) == ["ConPartes", "SinPartes"]
@@ -0,0 +1,64 @@
+"""Pruebas del perfilado de peticiones (perfilador.py)"""
+
+import json
+import os
+import threading
+
+from flask import Flask
+
+from perfilador import PerfiladorPeticiones, ARCHIVO_REGISTRO
+
+
+def _app(directorio, adentro=None, puede_seguir=None):
+    app = Flask(__name__)
+
+    @app.route("/lenta")
+    def lenta():
+        if adentro is not None:
+            adentro.set()
+            puede_seguir.wait(5)
+        return "ok"
+
+    @app.route("/rapida")
+    def rapida():
+        return "ok"
+
+    PerfiladorPeticiones(app, "prueba", directorio=str(directorio), umbral_ms=0, muestreo=0)
+    return app
+
+
+def _registro(directorio):
+    with open(os.path.join(directorio, ARCHIVO_REGISTRO), encoding="utf-8") as archivo:
+        return [json.loads(linea) for linea in archivo]
+
+
+def test_peticiones_del_mismo_segundo_no_pisan_sus_perfiles(tmp_path):
+    cliente = _app(tmp_path).test_client()
+
+    for _ in range(3):
+        assert cliente.get("/rapida", headers={"X-Perfilar": "1"}).status_code == 200
+
+    perfiles = [entrada["perfil"] for entrada in _registro(tmp_path)]
+    assert len(set(perfiles)) == 3
+    assert all(os.path.exists(ruta) for ruta in perfiles)
+
+
+def test_solo_una_peticion_a_la_vez_usa_cprofile(tmp_path):
+    adentro, puede_seguir = threading.Event(), threading.Event()
+    app = _app(tmp_path, adentro, puede_seguir)
+    codigos = []
+
+    hilo = threading.Thread(target=lambda: codigos.append(
+        app.test_client().get("/lenta", headers={"X-Perfilar": "1"}).status_code))
+    hilo.start()
+    assert adentro.wait(5)
+    codigos.append(app.test_client().get("/rapida", headers={"X-Perfilar": "1"}).status_code)
+    puede_seguir.set()
+    hilo.join()
+    codigos.append(app.test_client().get("/rapida", headers={"X-Perfilar": "1"}).status_code)
+
+    assert codigos == [200, 200, 200]
+    con_perfil = {entrada["endpoint"]: "perfil" in entrada for entrada in _registro(tmp_path)[:2]}
+    assert con_perfil == {"rapida": False, "lenta": True}
+    # Al terminar la petición lenta el perfil queda libre otra vez
+    assert "perfil" in _registro(tmp_path)[2]
@@ -0,0 +1,40 @@
+"""Pruebas de la lectura incremental de amigos_data.json (persistencia.py)"""
+
+import io
+import json
+
+import pytest
+
+from AmigoCercano import AmigoCercano
+from AmigoRegular import AmigoRegular
+from persistencia import escribir_amigos_json, iterar_amigos_json, iterar_json_arreglo
+
+
+def test_bloques_chicos_cortan_elementos_y_cadenas_en_cualquier_lugar():
+    elementos = [{"nombre": "Ana", "texto": "con ] y , y \"comillas\" y ñ"},
+                 [1, 2.5, None, True], "suelto", 12345, -0.75, {}]
+    texto = " [\n " + ",\n  ".join(json.dumps(elemento, ensure_ascii=False)
+                                     for elemento in elementos) + " ]\n"
+
+    for tamano in (1, 2, 3, 7, 64):
+        assert list(iterar_json_arreglo(io.StringIO(texto), tamano)) == elementos
+    assert list(iterar_json_arreglo(io.StringIO("[ ]"), 1)) == []
+
+
+@pytest.mark.parametrize("texto", ["", "{}", "[1, 2", "[1 2]", "[1,]", "[1] basura"])
+def test_contenido_que_no_es_un_arreglo_valido(texto):
+    with pytest.raises(ValueError):
+        list(iterar_json_arreglo(io.StringIO(texto), 2))
+
+
+def test_los_amigos_se_reconstruyen_al_leer(tmp_path):
+    ruta = tmp_path / "amigos_data.json"
+    amigos = [AmigoRegular("Ana", "01/02/1990", ["cine"], ["Café"], []),
+              AmigoCercano("Beto", "03/04/1985", [], [], ["Se perdió"], 8)]
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        escribir_amigos_json(archivo, amigos)
+
+    leidos = list(iterar_amigos_json(str(ruta), 5))
+
+    assert [type(amigo).__name__ for amigo in leidos] == ["AmigoRegular", "AmigoCercano"]
+    assert leidos[0].gustos == ["cine"] and leidos[1].nivelConfianza == 8
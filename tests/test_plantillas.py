@@ -0,0 +1,60 @@
+"""Pruebas de las plantillas de notificación (ManipuladorTexto.py)"""
+
+import json
+import os
+
+import pytest
+
+from AmigoRegular import AmigoRegular
+from ManipuladorTexto import ManipuladorTexto, compilarPlantilla
+
+
+def _amigo():
+    return AmigoRegular("Ana", "01/02/1990", ["cine", "mar"], [], [])
+
+
+def _escribir(ruta, texto, segundos):
+    ruta.write_text(json.dumps({"es": {"formal": {"*": texto}}}), encoding="utf-8")
+    # Fecha distinta en cada escritura: la firma no depende de la resolución del reloj
+    os.utime(ruta, (segundos, segundos))
+
+
+def test_compilar_rechaza_campos_desconocidos():
+    assert compilarPlantilla("{nombre} ({gustos}) {{ok}}")(_amigo()) == "Ana (cine, mar) {ok}"
+    with pytest.raises(ValueError):
+        compilarPlantilla("Hola {apellido}")
+
+
+def test_el_archivo_se_compila_al_cargar_y_uno_roto_conserva_el_anterior(tmp_path):
+    ruta = tmp_path / "plantillas.json"
+    _escribir(ruta, "Archivo: {nombre}", 1000)
+    manipulador = ManipuladorTexto(idioma="es", archivo_plantillas=str(ruta))
+    assert manipulador.formatearNotificacion(_amigo()) == "Archivo: Ana"
+
+    _escribir(ruta, "Roto: {apellido}", 2000)
+    assert manipulador.formatearNotificacion(_amigo()) == "Archivo: Ana"
+
+    ruta.write_text("{no es json", encoding="utf-8")
+    os.utime(ruta, (3000, 3000))
+    assert manipulador.formatearNotificaciones([_amigo()]) == ["Archivo: Ana"]
+
+
+def test_un_archivo_roto_al_iniciar_usa_las_predeterminadas(tmp_path):
+    ruta = tmp_path / "plantillas.json"
+    _escribir(ruta, "Roto: {apellido}", 1000)
+
+    manipulador = ManipuladorTexto(idioma="es", archivo_plantillas=str(ruta))
+
+    assert manipulador.formatearNotificacion(_amigo()) == \
+        "Estimado usuario, le recordamos contactar a: Ana"
+
+
+def test_una_notificacion_suelta_ve_el_archivo_cambiado(tmp_path):
+    ruta = tmp_path / "plantillas.json"
+    _escribir(ruta, "Antes: {nombre}", 1000)
+    manipulador = ManipuladorTexto(idioma="es", archivo_plantillas=str(ruta))
+    assert manipulador.formatearNotificacion(_amigo()) == "Antes: Ana"
+
+    _escribir(ruta, "Después: {nombre}", 2000)
+
+    assert manipulador.formatearNotificacion(_amigo()) == "Después: Ana"
@@ -0,0 +1,50 @@
+"""Pruebas de ?campos= y ?resumen= en GET /amigos (API de consultas)"""
+
+
+CONSULTAR = """
+    import json
+    import sys
+    import config
+    import AmigoRegular_APIlaura as laura
+    from AmigoCercano import AmigoCercano
+    from AmigoRegular import AmigoRegular
+
+    gestor = config.obtener_gestor()
+    gestor.agregarAmigo(AmigoRegular("Ana", "01/02/1990", ["cine", "mar"], ["Café"], []))
+    gestor.agregarAmigo(AmigoCercano("Beto", "03/04/1985", [], [], ["Se perdió"], 8))
+    config.guardar_datos()
+
+    cliente = laura.app.test_client()
+    respuestas = {}
+    for consulta in sys.argv[1:]:
+        respuesta = cliente.get("/amigos" + consulta)
+        respuestas[consulta] = [respuesta.status_code, respuesta.get_json()]
+    print(json.dumps(respuestas))
+"""
+
+
+def test_campos_devuelve_solo_lo_pedido(proceso):
+    consulta = "?campos=tipo,nombre,nivelConfianza"
+    codigo, cuerpo = proceso(CONSULTAR, consulta)[consulta]
+
+    assert codigo == 200
+    assert cuerpo["amigos"] == [{"tipo": "Amigo Regular", "nombre": "Ana"},
+                                {"tipo": "Amigo Cercano", "nombre": "Beto", "nivelConfianza": 8}]
+
+
+def test_resumen_cuenta_en_lugar_de_listar(proceso):
+    consultas = ["?resumen=1", "?nombre=Ana&resumen=1"]
+    respuestas = proceso(CONSULTAR, *consultas)
+
+    ana = {"nombre": "Ana", "tipo": "Amigo Regular", "cumpleanos": "01/02/1990",
+           "cantidad_gustos": 2, "cantidad_recuerdos": 1, "cantidad_anecdotas": 0}
+    assert respuestas["?resumen=1"][1]["amigos"][0] == ana
+    assert respuestas["?resumen=1"][1]["amigos"][1]["nivelConfianza"] == 8
+    assert respuestas["?nombre=Ana&resumen=1"][1] == dict(ana, exito=True)
+
+
+def test_un_campo_desconocido_o_vacio_es_400(proceso):
+    respuestas = proceso(CONSULTAR, "?campos=nombre,apellido", "?campos=,")
+
+    assert [codigo for codigo, _ in respuestas.values()] == [400, 400]
+    assert "apellido" in respuestas["?campos=nombre,apellido"][1]["error"]
@@ -0,0 +1,59 @@
+"""Pruebas de la carga masiva de recuerdos (POST /recuerdos/bulk)"""
+
+
+LOTE = """
+    import json
+    import config
+    import AmigoCercano_APIJuandi as juan
+
+    cliente = juan.app.test_client()
+    cliente.post("/amigo-regular", json={"nombre": "Ana", "cumpleanos": "01/02/1990",
+                                         "recuerdos": ["Fuimos al cine"]})
+    cliente.post("/amigo-cercano", json={"nombre": "Beto", "cumpleanos": "01/02/1990",
+                                         "nivelConfianza": 7})
+    respuesta = cliente.post("/recuerdos/bulk", json={"recuerdos": [
+        {"nombre": "Ana", "tipo": "regular", "recuerdo": "Paseo por el parque"},
+        {"nombre": "Beto", "tipo": "cercano", "recuerdo": "Concierto"},
+        {"nombre": "Ana", "tipo": "regular", "recuerdo": "paseo por el PARQUE"},
+        {"nombre": "Ana", "tipo": "regular", "recuerdo": "Fuimos al cine"},
+        {"nombre": "Beto", "tipo": "regular", "recuerdo": "Otro"},
+        {"nombre": "Nadie", "tipo": "regular", "recuerdo": "Otro"},
+        {"nombre": "Ana", "tipo": "regular"},
+        "no es un objeto"
+    ]})
+    cuerpo = respuesta.get_json()
+    with open(config.archivo_diario(), encoding="utf-8") as archivo:
+        lineas = sum(1 for linea in archivo if linea.strip())
+    gestor = config.obtener_gestor()
+    print(json.dumps({
+        "codigo": respuesta.status_code,
+        "agregados": cuerpo["agregados"], "fallidos": cuerpo["fallidos"],
+        "estados": [resultado["estado"] for resultado in cuerpo["resultados"]],
+        "diario": lineas,
+        "recuerdos": {nombre: gestor.buscarAmigo(nombre).recuerdos.contarRecuerdos()
+                      for nombre in ("Ana", "Beto")}
+    }))
+"""
+
+LIMITES = """
+    import json
+    import AmigoCercano_APIJuandi as juan
+
+    cliente = juan.app.test_client()
+    demasiados = [{"nombre": "Ana", "tipo": "regular", "recuerdo": str(i)}
+                  for i in range(juan.MAX_RECUERDOS_LOTE + 1)]
+    print(json.dumps([cliente.post("/recuerdos/bulk", json=cuerpo).status_code
+                      for cuerpo in ({"recuerdos": []}, {"otra": 1}, {"recuerdos": demasiados})]))
+"""
+
+
+def test_cada_entrada_tiene_su_estado_y_se_guardan_juntas(proceso):
+    resultado = proceso(LOTE)
+
+    assert resultado == {"codigo": 200, "agregados": 2, "fallidos": 6,
+                         "estados": [200, 200, 409, 409, 400, 404, 400, 400],
+                         "diario": 2, "recuerdos": {"Ana": 2, "Beto": 1}}
+
+
+def test_lotes_vacios_o_demasiado_grandes(proceso):
+    assert proceso(LIMITES) == [400, 400, 413]
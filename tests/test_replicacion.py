@@ -0,0 +1,108 @@
+"""Pruebas del modo réplica (replicacion.py y config.iniciar_replica)"""
+
+import os
+
+
+ENTORNO = {"AMIGOS_REPLICACION": 1, "AMIGOS_INSTANTANEAS": 60}
+
+ESCRITOR = """
+    import json
+    import config
+    from AmigoRegular import AmigoRegular
+
+    gestor = config.obtener_gestor()
+    for nombre in ("Ana", "Beto"):
+        gestor.agregarAmigo(AmigoRegular(nombre, "01/02/1990", ["cine"], [], []))
+    config.guardar_datos()
+    gestor.agregarRecuerdoAmigo(gestor.buscarAmigo("Ana"), "Fuimos al cine")
+    config.registrar_recuerdo(gestor.buscarAmigo("Ana"))
+    gestor.reemplazarVarios({"Beto": AmigoRegular("Beto", "02/03/1991", ["teatro"], [], [])})
+    config.guardar_datos()
+    print(json.dumps({}))
+"""
+
+REPLICA = """
+    import json
+    import config
+
+    replica = config.iniciar_replica()
+    gestor = config.obtener_gestor()
+    print(json.dumps({
+        "aplicadas": replica.estadisticas["aplicadas"],
+        "amigos": {amigo.nombre: [amigo.cumpleanos, amigo.recuerdos.contarRecuerdos()]
+                   for amigo in gestor.amigos}
+    }))
+"""
+
+
+def _lineas(ruta):
+    with open(ruta, encoding="utf-8") as archivo:
+        return archivo.readlines()
+
+
+def test_replica_aplica_cambios_sin_anotarlos_en_el_historial(proceso, tmp_path):
+    proceso(ESCRITOR, **ENTORNO)
+    historial = os.path.join(tmp_path, "amigos_data.json.instantaneas", "historial.ndjson")
+    antes = _lineas(historial)
+
+    resultado = proceso(REPLICA, **ENTORNO)
+
+    assert resultado["aplicadas"] > 0
+    assert resultado["amigos"] == {"Ana": ["01/02/1990", 1], "Beto": ["02/03/1991", 0]}
+    assert _lineas(historial) == antes
+
+
+LECTURAS_CONCURRENTES = """
+    import json
+    import sys
+    import threading
+    import time
+    import replicacion
+    from AmigoRegular import AmigoRegular
+    from AmigoCercano import AmigoCercano
+    import AmigoRegular_APIlaura as laura
+
+    # Cambiar de hilo muy seguido para que las carreras aparezcan enseguida
+    sys.setswitchinterval(1e-6)
+    cliente = laura.app.test_client()
+    cliente.get('/amigos')
+    publicador = replicacion.PublicadorCambios(replicacion.ruta_registro("amigos_data.json"))
+    codigos = {}
+    errores = []
+    fin = time.time() + 2
+
+    def leer(ruta):
+        while time.time() < fin:
+            respuesta = cliente.get(ruta)
+            codigos[respuesta.status_code] = codigos.get(respuesta.status_code, 0) + 1
+            if respuesta.status_code != 200:
+                errores.append(respuesta.get_json().get("error"))
+
+    hilos = [threading.Thread(target=leer, args=(ruta,)) for ruta in (
+        '/amigos', '/amigos?tipo=cercano', '/amigos?orden=confianza&limite=5',
+        '/amigos?mes=2', '/estadisticas', '/duplicados?recuerdos=0')]
+    for hilo in hilos:
+        hilo.start()
+    i = 0
+    while time.time() < fin:
+        fecha = f"01/{i % 12 + 1:02d}/1990"
+        if i % 2:
+            amigo = AmigoCercano(f"A{i}", fecha, ["cine", f"g{i % 7}"], [], [], i % 10 + 1)
+        else:
+            amigo = AmigoRegular(f"A{i}", fecha, ["cine"], [], [])
+        publicador.actualizar("agregar", amigo)
+        if i % 3 == 0:
+            publicador.actualizar("eliminar", AmigoRegular(f"A{i - 1}", "01/02/1990", [], [], []))
+        i = i + 1
+        if i % 50 == 0:
+            time.sleep(0.01)
+    for hilo in hilos:
+        hilo.join()
+    print(json.dumps({"codigos": codigos, "errores": errores[:5]}))
+"""
+
+
+def test_lecturas_concurrentes_con_la_replica_aplicando(proceso):
+    resultado = proceso(LECTURAS_CONCURRENTES, AMIGOS_REPLICACION=1,
+                        AMIGOS_REPLICACION_INTERVALO_MS=1)
+    assert set(resultado["codigos"]) == {"200"}, resultado["errores"]
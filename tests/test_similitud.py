@@ -0,0 +1,66 @@
+"""Pruebas de los amigos parecidos (SimilitudAmigos.py y GET /amigos/<nombre>/similares)"""
+
+from AmigoRegular import AmigoRegular
+from GestorAmigos import GestorAmigos
+from ManipuladorTexto import ManipuladorTexto
+
+
+def _gestor():
+    amigos = [AmigoRegular("Ana", "01/02/1990", ["cine", "mar", "cocina"], ["Café"], []),
+              AmigoRegular("Beto", "01/02/1990", ["Cine", "mar", "cocina"], ["café"], []),
+              AmigoRegular("Carla", "01/02/1990", ["cine", "mar"], [], []),
+              AmigoRegular("Dani", "01/02/1990", ["ajedrez"], ["Torneo"], [])]
+    return GestorAmigos(amigos, ManipuladorTexto())
+
+
+def test_los_mas_parecidos_primero_con_lo_que_comparten():
+    similares, plan = _gestor().buscarSimilares("Ana")
+
+    assert [similar["nombre"] for similar in similares] == ["Beto", "Carla"]
+    assert similares[0]["similitud"] == 1.0
+    assert similares[0]["gustos_comunes"] == ["cine", "cocina", "mar"]
+    assert 0 < similares[1]["similitud"] < 1
+    assert plan["total"] == 4 and plan["comparados"] <= 3
+
+
+def test_los_cambios_del_gestor_actualizan_las_firmas():
+    gestor = _gestor()
+    assert [s["nombre"] for s in gestor.buscarSimilares("Dani")[0]] == []
+
+    gestor.agregarAmigo(AmigoRegular("Eva", "01/02/1990", ["ajedrez"], ["Torneo"], []))
+    gestor.eliminarAmigo("Beto")
+
+    assert [s["nombre"] for s in gestor.buscarSimilares("Dani")[0]] == ["Eva"]
+    assert "Beto" not in [s["nombre"] for s in gestor.buscarSimilares("Ana")[0]]
+    assert gestor.buscarSimilares("Beto") == (None, None)
+
+
+CONSULTAR = """
+    import json
+    import sys
+    import config
+    import AmigoRegular_APIlaura as laura
+    from AmigoRegular import AmigoRegular
+
+    gestor = config.obtener_gestor()
+    for nombre in ("Ana", "Beto"):
+        gestor.agregarAmigo(AmigoRegular(nombre, "01/02/1990", ["cine"], [], []))
+    config.guardar_datos()
+
+    cliente = laura.app.test_client()
+    respuestas = {}
+    for ruta in sys.argv[1:]:
+        respuesta = cliente.get(ruta)
+        respuestas[ruta] = [respuesta.status_code, respuesta.get_json().get("similares")]
+    print(json.dumps(respuestas))
+"""
+
+
+def test_la_api_responde_404_y_valida_el_limite(proceso):
+    rutas = ["/amigos/Ana/similares?limite=5", "/amigos/Nadie/similares",
+             "/amigos/Ana/similares?limite=0", "/amigos/Ana/similares?limite=x"]
+    respuestas = proceso(CONSULTAR, *rutas)
+
+    assert respuestas[rutas[0]][0] == 200
+    assert [similar["nombre"] for similar in respuestas[rutas[0]][1]] == ["Beto"]
+    assert [respuestas[ruta][0] for ruta in rutas[1:]] == [404, 400, 400]
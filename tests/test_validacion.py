@@ -0,0 +1,46 @@
+"""Pruebas de la validación de los POST (validacion.py y la API de escrituras)"""
+
+from validacion import validar
+
+
+def test_un_nombre_con_solo_espacios_cuenta_como_vacio():
+    assert validar("AmigoRegular", {"nombre": "   ", "cumpleanos": "01/02/1990"}) == \
+        (False, "Falta el campo obligatorio: nombre")
+    assert validar("recuerdo", {"recuerdo": " \t"}) == (False, "Falta el campo: recuerdo")
+    assert validar("AmigoRegular", {"nombre": " Ana ", "cumpleanos": "01/02/1990"}) == (True, None)
+
+
+def test_los_esquemas_rechazan_tipos_y_rangos_invalidos():
+    assert validar("AmigoCercano", {"nombre": "Ana", "cumpleanos": "31/02/1990",
+                                    "nivelConfianza": 5})[0] is False
+    assert validar("AmigoCercano", {"nombre": "Ana", "cumpleanos": "01/02/1990",
+                                    "nivelConfianza": True})[0] is False
+    assert validar("AmigoCercano", {"nombre": "Ana", "cumpleanos": "01/02/1990",
+                                    "nivelConfianza": 11}) == \
+        (False, "El nivel de confianza debe estar entre 1 y 10")
+
+
+POST_INVALIDOS = """
+    import json
+    import AmigoCercano_APIJuandi as juan
+
+    cliente = juan.app.test_client()
+    codigos = {}
+    for ruta in ("/amigo-regular", "/amigo-cercano", "/amigo-regular/Ana/recuerdo",
+                 "/amigo-cercano/Ana/recuerdo", "/recuerdos/bulk"):
+        codigos[ruta] = cliente.post(ruta, data="nombre=Ana", content_type="text/plain").status_code
+    codigos["espacios"] = cliente.post("/amigo-regular", json={"nombre": "   ",
+                                                               "cumpleanos": "01/02/1990"}).status_code
+    codigos["sin_cuerpo"] = cliente.post("/amigo-regular").status_code
+    codigos["fusionar_sin_cuerpo"] = cliente.post("/duplicados/fusionar").status_code
+    print(json.dumps(codigos))
+"""
+
+
+def test_la_api_rechaza_cuerpos_que_no_son_json_sin_error_interno(proceso):
+    codigos = proceso(POST_INVALIDOS)
+
+    assert codigos == {"/amigo-regular": 415, "/amigo-cercano": 415,
+                       "/amigo-regular/Ana/recuerdo": 415, "/amigo-cercano/Ana/recuerdo": 415,
+                       "/recuerdos/bulk": 415, "espacios": 400, "sin_cuerpo": 400,
+                       "fusionar_sin_cuerpo": 200}
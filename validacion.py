@@ -0,0 +1,236 @@
+"""
+validacion.py - Validación de los datos que llegan a la API de escrituras (POST)
+
+Cada POST válido carga los datos y los vuelve a guardar, así que una petición
+mal formada debería rechazarse antes de llegar a ese camino caro:
+- Antes de la ruta se mira el tamaño: un cuerpo más grande que MAX_BYTES se
+  rechaza con 413 sin leerlo, un cuerpo que no es JSON (otro Content-Type)
+  con 415 y un JSON mal formado con 400
+- En la ruta, cada cuerpo se revisa con un esquema (tipos, formato de fecha,
+  largo de textos y listas) antes de tocar el gestor o el disco
+
+Los esquemas se compilan una sola vez al importar: cada campo queda como una
+lista de funciones de revisión, así validar una petición no vuelve a
+interpretar el esquema.
+
+Variables de entorno:
+- AMIGOS_MAX_BYTES=2097152  → tamaño máximo del cuerpo de una petición (2 MB)
+"""
+
+import os
+import re
+from datetime import date
+
+from flask import jsonify, request
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge
+
+
+# Tamaño máximo del cuerpo (alcanza para un lote de 10000 recuerdos)
+MAX_BYTES = int(os.environ.get("AMIGOS_MAX_BYTES", str(2 * 1024 * 1024)))
+
+# Largos máximos de los textos y de las listas
+MAX_NOMBRE = 100
+MAX_TEXTO = 1000
+MAX_ELEMENTOS = 100
+MAX_RECUERDOS_INICIALES = 1000
+
+# Métodos cuyo cuerpo se revisa
+METODOS_ESCRITURA = ("POST", "PUT", "PATCH")
+
+# Cumpleaños en formato dd/mm/aaaa (también d/m/aaaa)
+_FECHA = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})")
+
+
+def _esFecha(texto):
+    coincidencia = _FECHA.fullmatch(texto)
+    if coincidencia is None:
+        return False
+    dia, mes, anio = (int(parte) for parte in coincidencia.groups())
+    try:
+        date(anio, mes, dia)
+    except ValueError:
+        return False
+    return True
+
+
+# Esquemas: campo → reglas. Reglas posibles:
+#   tipo         "texto", "fecha", "entero" o "lista" (de textos)
+#   obligatorio  si el campo tiene que estar (y no vacío)
+#   max          largo máximo (textos y listas) o valor máximo (enteros)
+#   min          valor mínimo (enteros)
+#   opciones     valores aceptados (textos)
+#   falta        mensaje si falta; rango: mensaje si el valor no es aceptable
+ESQUEMA_AMIGO = {
+    "nombre": {"tipo": "texto", "obligatorio": True, "max": MAX_NOMBRE,
+               "falta": "Falta el campo obligatorio: nombre"},
+    "cumpleanos": {"tipo": "fecha", "obligatorio": True,
+                   "falta": "Falta el campo obligatorio: cumpleanos"},
+    "gustos": {"tipo": "lista", "max": MAX_ELEMENTOS},
+    "recuerdos": {"tipo": "lista", "max": MAX_RECUERDOS_INICIALES},
+    "anecdotas": {"tipo": "lista", "max": MAX_ELEMENTOS}
+}
+
+ESQUEMAS = {
+    "AmigoRegular": ESQUEMA_AMIGO,
+    "AmigoCercano": dict(ESQUEMA_AMIGO, nivelConfianza={
+        "tipo": "entero", "obligatorio": True, "min": 1, "max": 10,
+        "falta": "Falta el campo obligatorio: nivelConfianza",
+        "rango": "El nivel de confianza debe estar entre 1 y 10"
+    }),
+    "recuerdo": {
+        "recuerdo": {"tipo": "texto", "obligatorio": True, "max": MAX_TEXTO,
+                     "falta": "Falta el campo: recuerdo"}
+    },
+    "recuerdo_lote": {
+        "nombre": {"tipo": "texto", "obligatorio": True, "max": MAX_NOMBRE,
+                   "falta": "Faltan los campos: nombre y recuerdo"},
+        "recuerdo": {"tipo": "texto", "obligatorio": True, "max": MAX_TEXTO,
+                     "falta": "Faltan los campos: nombre y recuerdo"},
+        "tipo": {"tipo": "texto", "obligatorio": True,
+                 "opciones": ("regular", "cercano", "AmigoRegular", "AmigoCercano"),
+                 "falta": "El tipo debe ser 'regular' o 'cercano'",
+                 "rango": "El tipo debe ser 'regular' o 'cercano'"}
+    }
+}
+
+
+def _compilarCampo(campo, reglas):
+    """
+    Convierte las reglas de un campo en una función valor → mensaje de error o None.
+
+    Raises:
+        ValueError: Si las reglas usan un tipo desconocido
+    """
+    tipo = reglas["tipo"]
+    maximo = reglas.get("max")
+    minimo = reglas.get("min")
+    opciones = reglas.get("opciones")
+    rango = reglas.get("rango")
+
+    if tipo == "texto":
+        def revisar(valor):
+            if not isinstance(valor, str):
+                return f"{campo} debe ser un texto"
+            if maximo is not None and len(valor) > maximo:
+                return f"{campo} supera el máximo de {maximo} caracteres"
+            if opciones is not None and valor not in opciones:
+                return rango or f"{campo} debe ser uno de: {', '.join(opciones)}"
+            return None
+    elif tipo == "fecha":
+        def revisar(valor):
+            if not isinstance(valor, str) or not _esFecha(valor.strip()):
+                return f"{campo} debe ser una fecha dd/mm/aaaa"
+            return None
+    elif tipo == "entero":
+        def revisar(valor):
+            # bool es subclase de int, pero true/false no es un nivel
+            if not isinstance(valor, int) or isinstance(valor, bool):
+                return f"{campo} debe ser un número entero"
+            if (minimo is not None and valor < minimo) or (maximo is not None and valor > maximo):
+                return rango or f"{campo} debe estar entre {minimo} y {maximo}"
+            return None
+    elif tipo == "lista":
+        def revisar(valor):
+            if not isinstance(valor, list):
+                return f"{campo} debe ser una lista"
+            if maximo is not None and len(valor) > maximo:
+                return f"{campo} supera el máximo de {maximo} elementos"
+            for elemento in valor:
+                if not isinstance(elemento, str):
+                    return f"Los elementos de {campo} deben ser textos"
+                if len(elemento) > MAX_TEXTO:
+                    return f"Un elemento de {campo} supera el máximo de {MAX_TEXTO} caracteres"
+            return None
+    else:
+        raise ValueError(f"Tipo desconocido en el esquema: {tipo}")
+    return revisar
+
+
+def compilarEsquema(esquema):
+    """
+    Convierte un esquema en una función datos → (es_valido, mensaje_error).
+
+    Los campos que no están en el esquema se ignoran. Un campo opcional que
+    falta (o es None) no se revisa; uno obligatorio no puede faltar ni ser
+    vacío (un texto con solo espacios cuenta como vacío).
+    """
+    campos = [(campo, reglas.get("obligatorio", False),
+               reglas.get("falta", f"Falta el campo obligatorio: {campo}"),
+               _compilarCampo(campo, reglas))
+              for campo, reglas in esquema.items()]
+
+    def validar(datos):
+        if not datos:
+            return False, "No se enviaron datos"
+        if not isinstance(datos, dict):
+            return False, "Los datos deben ser un objeto JSON"
+        for campo, obligatorio, falta, revisar in campos:
+            valor = datos.get(campo)
+            if valor is None or (obligatorio and isinstance(valor, str) and not valor.strip()):
+                if obligatorio:
+                    return False, falta
+                continue
+            error = revisar(valor)
+            if error is not None:
+                return False, error
+        return True, None
+
+    return validar
+
+
+# Validadores listos para usar (compilados al importar)
+VALIDADORES = {nombre: compilarEsquema(esquema) for nombre, esquema in ESQUEMAS.items()}
+
+
+def validar(esquema, datos):
+    """
+    Valida datos con uno de los esquemas compilados.
+
+    Args:
+        esquema (str): "AmigoRegular", "AmigoCercano", "recuerdo" o "recuerdo_lote"
+        datos (dict): Datos recibidos
+
+    Returns:
+        tuple: (es_valido, mensaje_error)
+    """
+    return VALIDADORES[esquema](datos)
+
+
+def _rechazar(mensaje, codigo):
+    return jsonify({"exito": False, "error": mensaje}), codigo
+
+
+def instalar_validacion(app, max_bytes=None):
+    """
+    Rechaza antes de la ruta los cuerpos demasiado grandes (413), los que no
+    son JSON (415) y el JSON mal formado (400).
+
+    El JSON leído queda guardado en la petición, así la ruta no lo vuelve a leer.
+    Un cuerpo sin Content-Length (por partes) también se corta en max_bytes.
+
+    Args:
+        app (Flask): Aplicación a proteger
+        max_bytes (int): Tamaño máximo del cuerpo (por defecto AMIGOS_MAX_BYTES)
+    """
+    limite = max_bytes if max_bytes is not None else MAX_BYTES
+    app.config["MAX_CONTENT_LENGTH"] = limite
+
+    def revisar_cuerpo():
+        if request.method not in METODOS_ESCRITURA:
+            return None
+        if request.content_length is not None and request.content_length > limite:
+            return _rechazar(f"La petición supera el máximo de {limite} bytes", 413)
+        if not request.is_json:
+            # Sin cuerpo no hay nada que revisar (ej: POST /duplicados/fusionar)
+            if request.content_length or request.headers.get("Transfer-Encoding"):
+                return _rechazar("El cuerpo debe ser JSON (Content-Type: application/json)", 415)
+            return None
+        try:
+            request.get_json()
+        except RequestEntityTooLarge:
+            return _rechazar(f"La petición supera el máximo de {limite} bytes", 413)
+        except BadRequest:
+            return _rechazar("El cuerpo no es un JSON válido", 400)
+        return None
+
+    app.before_request(revisar_cuerpo)